@@ -6,6 +6,9 @@ pip3.10 install -r requirements.txt
 
 # kcat -b 127.0.0.1:9092 -t assets -o beginning
 
+# Publish generated ticks/bars to an event bus: none (default) | inprocess | log | kafka
+# export FUNDSIM_EVENT_BUS=kafka
+
 # docker-compose down
 # docker-compose up -d
 
@@ -0,0 +1,393 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: batch.py
+
+Relative Path: src/assets/bonds/batch.py
+"""
+
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from assets.bonds.intraday import generate_intraday_ticks, intraday_records
+from assets.bonds.model import (
+    Bond, BondHistoricalData, BondIntradayData, BondRating, BondRiskMetrics, CouponPayment
+)
+from assets.bonds.pricing import bond_analytics, frequency_per_year, risk_metrics_records, years_between
+from assets.bonds.rating_migration import RatingMigrationModel
+from assets.bonds.schedule import coupon_payment_records, coupon_schedule
+from assets.bonds.term_structure import create_short_rate_model, credit_spread, simulate_bond_prices
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+
+COUPON_FREQUENCIES = ["Annual", "Semi-Annual", "Quarterly", "Monthly"]
+BOND_TYPES = ["Corporate", "Government", "Municipal", "Treasury", "Agency"]
+RATING_AGENCIES = ["S&P", "Moody's", "Fitch"]
+ISSUERS = ["US Treasury", "Apple Inc.", "Microsoft Corp.", "JPMorgan Chase",
+           "Toyota Motor", "Siemens AG", "HSBC Holdings", "State of California"]
+
+# Response fields of the per-bond time series
+HISTORICAL_FIELDS = ["date", "open_price", "close_price", "day_high", "day_low", "trading_volume"]
+COUPON_FIELDS = ["payment_date", "payment_amount"]
+
+# Trailing daily bars per bond that get intraday ticks by default
+DEFAULT_INTRADAY_DAYS = 5
+
+
+class BondUniverseGenerator:
+    """
+    Generates a whole bond universe with array operations.
+
+    Bond terms are drawn as arrays, one short-rate path reprices every bond,
+    and daily bars, coupon schedules, risk metrics and ratings are built for
+    all bonds before anything touches the database.
+
+    Args:
+        number_of_bonds (int): Number of bonds to generate.
+        days (int): Days of history per bond, starting at its issue date.
+        annual_yield (float): Yield (percent) that sets each bond's credit spread.
+        base_volume (int): Average daily trading volume.
+        intraday_frequency_seconds (int, optional): Seconds between intraday
+            ticks derived from the daily bars; None skips intraday data.
+        intraday_days (int, optional): Only each bond's last intraday_days
+            daily bars get ticks; None ticks the full history.
+        rating_model (RatingMigrationModel, optional): Rating transition model.
+        rating_spreads (bool): Price bonds off their (migrating) rating's
+            credit spread instead of the flat annual_yield spread.
+        seed (int, optional): Seed for reproducible universes.
+    """
+
+    def __init__(self, number_of_bonds: int, days: int, annual_yield: float = 5.0,
+                 base_volume: int = 100_000, intraday_frequency_seconds: Optional[int] = 900,
+                 intraday_days: Optional[int] = DEFAULT_INTRADAY_DAYS,
+                 rating_model: Optional[RatingMigrationModel] = None, rating_spreads: bool = True,
+                 seed: Optional[int] = None):
+        self.number_of_bonds = number_of_bonds
+        self.days = days
+        self.annual_yield = annual_yield
+        self.base_volume = base_volume
+        self.intraday_frequency_seconds = intraday_frequency_seconds
+        self.intraday_days = intraday_days
+        self.rating_model = rating_model or RatingMigrationModel()
+        self.rating_spreads = rating_spreads
+        self.rng = np.random.default_rng(seed)
+        self.seed = seed
+
+    def generate_terms(self) -> List[Dict[str, Any]]:
+        """
+        Random bond terms, one dictionary per bond (Bond table columns).
+        """
+        n = self.number_of_bonds
+        rng = self.rng
+        today = datetime.now().date()
+
+        isins = set()
+        while len(isins) < n:
+            isins.update(f"US{number:010d}" for number in rng.integers(
+                0, 10 ** 10, n - len(isins)))
+        isins = sorted(isins)
+
+        face_values = np.round(rng.uniform(500, 10000, n), 2)
+        coupon_rates = np.round(rng.uniform(1.0, 10.0, n), 2)
+        issue_offsets = rng.integers(0, 365 * 5 + 1, n)
+        maturity_offsets = rng.integers(365, 365 * 30 + 1, n)
+        frequencies = rng.choice(COUPON_FREQUENCIES, n)
+        bond_types = rng.choice(BOND_TYPES, n)
+        issuers = rng.choice(ISSUERS, n)
+
+        bonds = []
+        for i in range(n):
+            maturity_date = today + timedelta(days=int(maturity_offsets[i]))
+            bonds.append({
+                "isin": isins[i],
+                "bond_name": f"{issuers[i]} {coupon_rates[i]:.2f}% {maturity_date.year}",
+                "issuer": str(issuers[i]),
+                "issue_date": today - timedelta(days=int(issue_offsets[i])),
+                "maturity_date": maturity_date,
+                "coupon_rate": float(coupon_rates[i]),
+                "coupon_frequency": str(frequencies[i]),
+                "face_value": float(face_values[i]),
+                "bond_type": str(bond_types[i]),
+                "currency": "USD",
+            })
+        return bonds
+
+    def generate_historical_data(self, bonds: List[Dict[str, Any]],
+                                 spreads: Optional[np.ndarray] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Daily bars for every bond from one shared short-rate path.
+
+        Args:
+            bonds (list): Bond terms.
+            spreads (array, optional): (bonds, days + 1) credit spreads from
+                each bond's issue date. The issue-date spread is used for
+                pricing; later changes move the price by -duration * change.
+                Defaults to the flat spread implied by annual_yield.
+
+        Returns:
+            dict: isin -> list of daily bar records.
+        """
+        if not bonds:
+            return {}
+
+        model = create_short_rate_model()
+        start = min(bond["issue_date"] for bond in bonds)
+        offsets = np.array([(bond["issue_date"] - start).days for bond in bonds])
+        if spreads is None:
+            spreads = np.full((len(bonds), self.days + 1),
+                              credit_spread(self.annual_yield, model))
+        simulated = simulate_bond_prices(
+            bonds, start, int(offsets.max()) + self.days, model,
+            spreads=spreads[:, 0], seed=self.seed)
+        prices = simulated["clean_price"]
+
+        # Each bond's window of days + 1 prices, starting at its issue date
+        window = offsets[:, None] + np.arange(self.days + 1)[None, :]
+        path = prices[window, np.arange(len(bonds))[:, None]]
+
+        # Spread moves after issue (e.g. rating migrations) as a duration shock
+        spread_change = spreads - spreads[:, :1]
+        if spread_change.any():
+            duration = bond_analytics(
+                [years_between(bond["issue_date"], bond["maturity_date"]) for bond in bonds],
+                [bond["coupon_rate"] for bond in bonds],
+                [bond["face_value"] for bond in bonds],
+                [frequency_per_year(bond["coupon_frequency"]) for bond in bonds],
+                ytm=(model.r0 + spreads[:, 0]) * 100.0
+            )["modified_duration"]
+            path = path * np.exp(-duration[:, None] * spread_change)
+        opens, closes = path[:, :-1], path[:, 1:]
+        live = np.isfinite(opens) & np.isfinite(closes)
+        live = np.cumprod(live, axis=1).astype(bool)
+
+        highs = np.maximum(opens, closes) * \
+            self.rng.uniform(1.0005, 1.003, opens.shape)
+        lows = np.minimum(opens, closes) * \
+            self.rng.uniform(0.997, 0.9995, opens.shape)
+        volumes = self.rng.integers(int(self.base_volume * 0.8),
+                                    int(self.base_volume * 1.2) + 1, opens.shape)
+
+        opens, closes = np.round(opens, 2), np.round(closes, 2)
+        highs, lows = np.round(highs, 2), np.round(lows, 2)
+
+        historical = {}
+        for i, bond in enumerate(bonds):
+            count = int(live[i].sum())
+            dates = [bond["issue_date"] + timedelta(days=day)
+                     for day in range(count)]
+            historical[bond["isin"]] = [{
+                "isin": bond["isin"],
+                "date": day,
+                "open_price": open_price,
+                "close_price": close_price,
+                "day_high": high,
+                "day_low": low,
+                "trading_volume": volume
+            } for day, open_price, close_price, high, low, volume in zip(
+                dates, opens[i, :count].tolist(), closes[i, :count].tolist(),
+                highs[i, :count].tolist(), lows[i, :count].tolist(),
+                volumes[i, :count].tolist())]
+
+        ROWS_GENERATED.inc(sum(len(rows) for rows in historical.values()),
+                           asset="bond", kind="daily")
+        return historical
+
+    def generate_coupon_payments(self, bonds: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Coupon schedules for every bond (identical terms share a cached schedule).
+        """
+        coupons = {
+            bond["isin"]: coupon_payment_records(
+                bond["isin"], bond["face_value"], bond["coupon_rate"],
+                coupon_schedule(bond["issue_date"], bond["maturity_date"], bond["coupon_frequency"]))
+            for bond in bonds
+        }
+        ROWS_GENERATED.inc(sum(len(rows) for rows in coupons.values()),
+                           asset="bond", kind="coupon")
+        return coupons
+
+    def generate_risk_metrics(self, bonds: List[Dict[str, Any]],
+                              historical: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Risk metrics for the whole universe, priced off each bond's latest close.
+        """
+        priced = [bond for bond in bonds if historical[bond["isin"]]]
+        records = risk_metrics_records(
+            priced,
+            [historical[bond["isin"]][-1]["date"] for bond in priced],
+            clean_prices=[historical[bond["isin"]][-1]["close_price"]
+                          for bond in priced]
+        )
+        return {record["isin"]: record for record in records}
+
+    def generate_intraday_data(self, historical: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Intraday ticks for the trailing daily bars of every bond in one array pass.
+        """
+        keep = self.intraday_days
+        daily = [row for rows in historical.values()
+                 for row in (rows if keep is None else rows[max(len(rows) - keep, 0):])]
+        ticks = generate_intraday_ticks(
+            daily, self.intraday_frequency_seconds, rng=self.rng)
+        return intraday_records(ticks)
+
+    def generate_rating_paths(self, bonds: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Monthly rating paths for every bond over its history window.
+
+        Returns:
+            array: (bonds, steps + 1) rating indices of self.rating_model.
+        """
+        steps = self.days // self.rating_model.step_days
+        initial = self.rating_model.initial_ratings(len(bonds), self.rng)
+        return self.rating_model.simulate(initial, steps, self.rng)
+
+    def generate_ratings(self, bonds: List[Dict[str, Any]], paths: np.ndarray) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Time-stamped ratings: the issue rating and every migration after it.
+        """
+        agencies = self.rng.choice(RATING_AGENCIES, len(bonds))
+        return self.rating_model.rating_records(
+            [bond["isin"] for bond in bonds],
+            [bond["issue_date"] for bond in bonds],
+            paths,
+            agencies=[str(agency) for agency in agencies]
+        )
+
+    def generate(self) -> Dict[str, Any]:
+        """
+        Generate the full universe in memory.
+
+        Returns:
+            dict: "bonds" (list of Bond rows), per-isin "historical_data",
+                "coupon_payments", "risk_metrics" and "bond_ratings" (rating
+                history), and the flat list of "intraday_data" ticks (grouped by isin).
+        """
+        with stage_timer("bond", "init"):
+            bonds = self.generate_terms()
+        with stage_timer("bond", "rating"):
+            rating_paths = self.generate_rating_paths(bonds)
+            ratings = self.generate_ratings(bonds, rating_paths)
+        with stage_timer("bond", "term_structure"):
+            spreads = self.rating_model.daily_spreads(
+                rating_paths, self.days) if self.rating_spreads else None
+            historical = self.generate_historical_data(bonds, spreads)
+        with stage_timer("bond", "coupon_generation"):
+            coupons = self.generate_coupon_payments(bonds)
+        with stage_timer("bond", "risk_metrics"):
+            risk_metrics = self.generate_risk_metrics(bonds, historical)
+        intraday = []
+        if self.intraday_frequency_seconds:
+            with stage_timer("bond", "intraday_generation"):
+                intraday = self.generate_intraday_data(historical)
+
+        for bond in bonds:
+            rows = historical[bond["isin"]]
+            bond["historical_data_start_date"] = rows[0]["date"] if rows else None
+            bond["historical_data_end_date"] = rows[-1]["date"] if rows else None
+
+        return {
+            "bonds": bonds,
+            "historical_data": historical,
+            "coupon_payments": coupons,
+            "risk_metrics": risk_metrics,
+            "bond_ratings": ratings,
+            "intraday_data": intraday,
+        }
+
+
+def write_bond_universe(session: Session, universe: Dict[str, Any], include_intraday: bool = True) -> None:
+    """
+    Insert every table of a generated universe in one transaction.
+
+    Uses executemany inserts on the tables directly, so no ORM objects are
+    built and nothing is read back.
+
+    Args:
+        session (Session): Session on the bonds database.
+        universe (dict): Output of BondUniverseGenerator.generate().
+        include_intraday (bool): Also write the intraday ticks (skip when an
+            event bus consumer persists them).
+    """
+    tables = [
+        (Bond, universe["bonds"]),
+        (BondHistoricalData, [row for rows in universe["historical_data"].values()
+                              for row in rows]),
+        (CouponPayment, [row for rows in universe["coupon_payments"].values()
+                         for row in rows]),
+        (BondRiskMetrics, list(universe["risk_metrics"].values())),
+        (BondRating, [row for rows in universe["bond_ratings"].values()
+                      for row in rows]),
+    ]
+    if include_intraday:
+        tables.append((BondIntradayData, universe.get("intraday_data", [])))
+    try:
+        for model, rows in tables:
+            if rows:
+                session.execute(model.__table__.insert(), rows)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    for model, rows in tables:
+        ROWS_WRITTEN.inc(len(rows), asset="bond", table=model.__tablename__)
+
+
+def intraday_by_isin(universe: Dict[str, Any]):
+    """
+    Yield (isin, ticks) pairs from the flat intraday list.
+    """
+    for isin, ticks in groupby(universe.get("intraday_data", []), key=lambda tick: tick["isin"]):
+        yield isin, list(ticks)
+
+
+def _isoformat(value: Any) -> Any:
+    return value.strftime("%Y-%m-%d") if isinstance(value, (date, datetime)) else value
+
+
+def universe_response(universe: Dict[str, Any], columnar: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Shape a generated universe like the per-bond output of assets.bonds.main.
+
+    Args:
+        universe (dict): BondUniverseGenerator.generate() output.
+        columnar (bool): Return historical_data and coupon_payments as one
+            list per field instead of a list of row dicts.
+    """
+    def series(rows: List[Dict[str, Any]], fields: List[str]) -> Any:
+        if columnar:
+            return {field: [row[field] for row in rows] for field in fields}
+        return [{field: row[field] for field in fields} for row in rows]
+
+    response = {}
+    for bond in universe["bonds"]:
+        isin = bond["isin"]
+        risk_metrics = universe["risk_metrics"].get(isin, {})
+        # Latest rating after any migrations
+        rating = universe["bond_ratings"][isin][-1]
+        response[isin] = {
+            "bond_info": {
+                "isin": isin,
+                "face_value": bond["face_value"],
+                "coupon_rate": bond["coupon_rate"],
+                "coupon_frequency": bond["coupon_frequency"],
+                "maturity_date": _isoformat(bond["maturity_date"]),
+                "issue_date": _isoformat(bond["issue_date"]),
+            },
+            "historical_data": series(universe["historical_data"][isin], HISTORICAL_FIELDS),
+            "coupon_payments": series(universe["coupon_payments"][isin], COUPON_FIELDS),
+            "risk_metrics": {key: value for key, value in risk_metrics.items() if key != "isin"},
+            "bond_rating": {
+                "rating_agency": rating["rating_agency"],
+                "credit_rating": rating["credit_rating"],
+                "outlook": rating["outlook"],
+                "rating_date": _isoformat(rating["rating_date"])
+            }
+        }
+    return response
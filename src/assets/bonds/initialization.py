@@ -1,7 +1,7 @@
 import random
 import string
 from datetime import datetime, timedelta
-from typing import Tuple, Set
+from typing import List, Tuple, Set
 
 from faker import Faker
 from sqlalchemy.orm import Session
@@ -9,6 +9,9 @@ from assets.bonds.model import (
     Bond, CouponPayment, BondRiskMetrics, BondRating, BondHistoricalData,
     BondIntradayData, Issuer
 )
+from assets.bonds.intraday import generate_intraday_ticks, intraday_records
+from assets.bonds.pricing import risk_metrics_records
+from assets.bonds.schedule import coupon_payment_records, coupon_schedule
 
 
 class BondDataInitializer:
@@ -119,29 +122,24 @@ class BondDataInitializer:
             sector=sector
         )
 
-    def generate_coupon_payment(self, bond: Bond) -> CouponPayment:
+    def generate_coupon_payments(self, bond: Bond) -> List[CouponPayment]:
         """
-        Generate a random coupon payment for a bond.
+        Generate the coupon payments of a bond from its coupon frequency.
 
         Args:
             bond (Bond): Bond object
 
         Returns:
-            CouponPayment: A CouponPayment object
+            list: CouponPayment objects, one per scheduled payment
         """
-        payment_date = self.fake.date_between(
-            start_date=bond.issue_date, end_date=bond.maturity_date)
-        payment_amount = round(bond.face_value * bond.coupon_rate / 100, 2)
-
-        return CouponPayment(
-            isin=bond.isin,
-            payment_date=payment_date,
-            payment_amount=payment_amount
-        )
+        schedule = coupon_schedule(
+            bond.issue_date, bond.maturity_date, bond.coupon_frequency)
+        return [CouponPayment(**record) for record in coupon_payment_records(
+            bond.isin, float(bond.face_value), float(bond.coupon_rate), schedule)]
 
     def generate_bond_risk_metrics(self, bond: Bond) -> BondRiskMetrics:
         """
-        Generate random bond risk metrics.
+        Compute bond risk metrics from a random market quote.
 
         Args:
             bond (Bond): Bond object
@@ -149,22 +147,27 @@ class BondDataInitializer:
         Returns:
             BondRiskMetrics: A BondRiskMetrics object
         """
-        duration = round(random.uniform(1, 20), 2)
-        modified_duration = round(duration * random.uniform(0.8, 1.2), 2)
-        convexity = round(random.uniform(0.1, 5), 2)
-        yield_to_maturity = round(random.uniform(0.5, 15), 2)
-        current_yield = round(yield_to_maturity - random.uniform(0, 2), 2)
-        spread_to_treasury = round(random.uniform(0, 5), 2)
-
-        return BondRiskMetrics(
-            isin=bond.isin,
-            duration=duration,
-            modified_duration=modified_duration,
-            convexity=convexity,
-            yield_to_maturity=yield_to_maturity,
-            current_yield=current_yield,
-            spread_to_treasury=spread_to_treasury
-        )
+        return self.generate_bond_risk_metrics_batch([bond])[0]
+
+    def generate_bond_risk_metrics_batch(self, bonds: List[Bond]) -> List[BondRiskMetrics]:
+        """
+        Compute risk metrics for many bonds in one vectorized pass.
+
+        Each bond is quoted at a random clean price between 90 and 110
+        percent of par; the yield, durations and convexity are solved from
+        its remaining cash flows.
+
+        Args:
+            bonds (list): Bond objects
+
+        Returns:
+            list: BondRiskMetrics objects, in the order of the bonds
+        """
+        clean_prices = [float(bond.face_value) * random.uniform(0.9, 1.1)
+                        for bond in bonds]
+        records = risk_metrics_records(
+            bonds, datetime.now(), clean_prices=clean_prices)
+        return [BondRiskMetrics(**record) for record in records]
 
     def generate_bond_rating(self, bond: Bond) -> BondRating:
         """
@@ -221,26 +224,27 @@ class BondDataInitializer:
             trading_volume=trading_volume
         )
 
-    def generate_intraday_data(self, bond: Bond) -> BondIntradayData:
+    def generate_intraday_data(self, bond: Bond, daily_bar: BondHistoricalData) -> List[BondIntradayData]:
         """
-        Generate random intraday data for a bond.
+        Generate hourly intraday ticks consistent with a daily bar.
 
         Args:
             bond (Bond): Bond object
+            daily_bar (BondHistoricalData): The day's OHLC and volume
 
         Returns:
-            BondIntradayData: A BondIntradayData object
+            list: BondIntradayData objects for the day
         """
-        timestamp = datetime.now() - timedelta(minutes=random.randint(0, 1440))
-        price = round(random.uniform(90, 110), 2)
-        volume = random.randint(1000, 100000)
-
-        return BondIntradayData(
-            isin=bond.isin,
-            timestamp=timestamp,
-            price=price,
-            volume=volume
-        )
+        ticks = generate_intraday_ticks([{
+            "isin": bond.isin,
+            "date": daily_bar.date,
+            "open_price": daily_bar.open_price,
+            "close_price": daily_bar.close_price,
+            "day_high": daily_bar.day_high,
+            "day_low": daily_bar.day_low,
+            "trading_volume": daily_bar.trading_volume
+        }], frequency_seconds=3600)
+        return [BondIntradayData(**record) for record in intraday_records(ticks)]
 
     def generate_random_bond_data(self, session: Session):
         """
@@ -256,17 +260,15 @@ class BondDataInitializer:
         bond = self.generate_bond(issuer)
         session.add(bond)
 
-        for _ in range(random.randint(1, 5)):
-            session.add(self.generate_coupon_payment(bond))
+        session.add_all(self.generate_coupon_payments(bond))
 
         session.add(self.generate_bond_risk_metrics(bond))
         session.add(self.generate_bond_rating(bond))
 
         for _ in range(random.randint(5, 15)):
-            session.add(self.generate_historical_data(bond))
-
-        for _ in range(random.randint(5, 15)):
-            session.add(self.generate_intraday_data(bond))
+            daily_bar = self.generate_historical_data(bond)
+            session.add(daily_bar)
+            session.add_all(self.generate_intraday_data(bond, daily_bar))
 
         session.commit()
 
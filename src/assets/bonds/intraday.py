@@ -0,0 +1,133 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: intraday.py
+
+Relative Path: src/assets/bonds/intraday.py
+"""
+
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from monitoring.metrics import ROWS_GENERATED
+
+# Bond trading session (dealer hours)
+MARKET_OPEN = time(8, 0)
+MARKET_CLOSE = time(17, 0)
+
+
+def _volume_profile(ticks: int) -> np.ndarray:
+    """
+    U-shaped share of the daily volume per tick (busy open and close).
+    """
+    x = np.linspace(-1.0, 1.0, ticks)
+    weights = 1.0 + 1.5 * x ** 2
+    return weights / weights.sum()
+
+
+def _session_start(day: Any, market_open: time) -> np.datetime64:
+    if isinstance(day, datetime):
+        day = day.date()
+    return np.datetime64(datetime.combine(day, market_open), "s")
+
+
+def generate_intraday_ticks(
+    daily_records: List[Dict[str, Any]],
+    frequency_seconds: int = 900,
+    market_open: time = MARKET_OPEN,
+    market_close: time = MARKET_CLOSE,
+    volatility: float = 0.25,
+    rng: Optional[np.random.Generator] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Intraday ticks for many daily bars at once, consistent with each bar.
+
+    Every day is a Brownian bridge from its open to its close, clipped to
+    the day's range, with one tick placed on the high and one on the low.
+    So the first and last ticks are the open and close and the tick
+    extremes are the high and low. Tick volumes split the daily volume
+    along a U-shaped profile and add up to it exactly.
+
+    Args:
+        daily_records (list): Daily bars with isin, date, open_price,
+            close_price, day_high, day_low and trading_volume.
+        frequency_seconds (int): Seconds between ticks.
+        market_open (time): First tick of the day.
+        market_close (time): End of the session (exclusive).
+        volatility (float): Bridge noise as a fraction of the day's range.
+        rng (Generator, optional): numpy random generator.
+
+    Returns:
+        dict: Columns "isin", "timestamp" (datetime64[s]), "price" and
+            "volume", each of length days * ticks_per_day.
+    """
+    rng = rng or np.random.default_rng()
+    session_seconds = (datetime.combine(date.min, market_close) -
+                       datetime.combine(date.min, market_open)).seconds
+    ticks = max(session_seconds // frequency_seconds, 4)
+    days = len(daily_records)
+    if days == 0:
+        return {"isin": np.array([], dtype=object), "timestamp": np.array([], dtype="datetime64[s]"),
+                "price": np.array([]), "volume": np.array([], dtype=int)}
+
+    opens = np.array([float(r["open_price"]) for r in daily_records])
+    closes = np.array([float(r["close_price"]) for r in daily_records])
+    highs = np.array([float(r["day_high"]) for r in daily_records])
+    lows = np.array([float(r["day_low"]) for r in daily_records])
+    volumes = np.array([int(r["trading_volume"] or 0)
+                       for r in daily_records])
+
+    # Brownian bridge pinned at 0 on both ends, one row per day
+    s = np.linspace(0.0, 1.0, ticks)
+    walk = np.cumsum(rng.standard_normal((days, ticks)), axis=1)
+    walk -= walk[:, :1]
+    bridge = (walk - s[None, :] * walk[:, -1:]) / np.sqrt(ticks)
+
+    day_range = np.maximum(highs - lows, 1e-9)
+    prices = opens[:, None] + (closes - opens)[:, None] * s[None, :] + \
+        volatility * day_range[:, None] * bridge
+    prices = np.clip(prices, lows[:, None], highs[:, None])
+
+    # Touch the high and the low on two distinct interior ticks
+    rows = np.arange(days)
+    interior = ticks - 2
+    high_tick = 1 + rng.integers(0, interior, days)
+    low_tick = 1 + (high_tick - 1 + rng.integers(1, interior, days)) % interior
+    prices[rows, high_tick] = highs
+    prices[rows, low_tick] = lows
+    prices[:, 0], prices[:, -1] = opens, closes
+
+    tick_volumes = rng.multinomial(volumes, _volume_profile(ticks))
+
+    day_starts = np.array([_session_start(r["date"], market_open)
+                           for r in daily_records])
+    timestamps = day_starts[:, None] + \
+        (np.arange(ticks) * frequency_seconds).astype("timedelta64[s]")[None, :]
+
+    isins = np.repeat(np.array([r["isin"] for r in daily_records], dtype=object), ticks)
+    ROWS_GENERATED.inc(days * ticks, asset="bond", kind="intraday")
+    return {
+        "isin": isins,
+        "timestamp": timestamps.ravel(),
+        "price": np.round(prices, 2).ravel(),
+        "volume": tick_volumes.ravel(),
+    }
+
+
+def intraday_records(ticks: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    BondIntradayData rows from tick columns.
+    """
+    return [{
+        "isin": isin,
+        "timestamp": timestamp,
+        "price": price,
+        "volume": volume
+    } for isin, timestamp, price, volume in zip(
+        ticks["isin"].tolist(), ticks["timestamp"].astype(object).tolist(),
+        ticks["price"].tolist(), ticks["volume"].tolist())]
+
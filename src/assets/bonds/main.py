@@ -8,131 +8,65 @@ Filename: main.py
 Relative Path: src/assets/bonds/main.py
 """
 
-from datetime import datetime, timedelta
-import random
+from typing import Optional
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
-from assets.bonds.model import Base, BondHistoricalData, BondRating, BondRiskMetrics, CouponPayment
-from assets.bonds.create_historical_data import create_and_insert_historical_bond_data
+from assets.bonds.model import Base
+from assets.bonds.batch import (
+    BondUniverseGenerator, intraday_by_isin, universe_response, write_bond_universe
+)
+from events.bus import ASSETS_TOPIC, EventBus, make_event
+from monitoring.metrics import StageTimer, stage_timer
 
 
-def main(number_of_bonds: int = 1, days: int = 365):
+def main(number_of_bonds: int = 1, days: int = 365, event_bus: Optional[EventBus] = None,
+         timer: Optional[StageTimer] = None, columnar: bool = False):
     """
     Main function to generate bond data, including historical data, coupon payments, risk metrics, and ratings.
 
     Args:
         number_of_bonds (int): Number of bonds to generate.
         days (int): Number of days for historical data generation.
+        event_bus (EventBus, optional): When given, intraday ticks are published to
+            the assets topic and left to its consumers; daily bars are written here.
+        timer (StageTimer, optional): Collects per-stage durations; logged at the end.
+        columnar (bool): Return each bond's historical data and coupon payments
+            as one list per field instead of a list of rows.
 
     Returns:
         dict: A dictionary containing all generated bond data.
     """
-    # Dictionary to store all generated bond data
-    all_bond_data = {}
+    timer = timer or StageTimer("bond")
+    with timer.activate():
+        all_bond_data = _generate_bonds(number_of_bonds, days, event_bus, columnar)
+    timer.log()
+    return all_bond_data
+
 
+def _generate_bonds(number_of_bonds: int, days: int, event_bus: Optional[EventBus], columnar: bool):
     # Setup the database connection
     engine = create_engine('sqlite:///data/bonds.db', echo=True)
     Base.metadata.create_all(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    for _ in range(number_of_bonds):
-        # Generate random bond details
-        isin = f"US{random.randint(100000000, 999999999)}"
-        face_value = random.uniform(500, 10000)
-        coupon_rate = random.uniform(1.0, 10.0)
-        maturity_date = datetime.now() + timedelta(days=random.randint(365, 365 * 30))
-        issue_date = datetime.now() - timedelta(days=random.randint(0, 365 * 5))
-
-        # Create and insert bond data into the database
-        create_and_insert_historical_bond_data(
-            session=session,
-            isin=isin,
-            face_value=face_value,
-            coupon_rate=coupon_rate,
-            maturity_date=maturity_date,
-            issue_date=issue_date,
-            days=days
-        )
-
-        # Fetch the generated historical data for the bond
-        historical_records = (
-            session.query(BondHistoricalData)
-            .filter_by(isin=isin)
-            .order_by(BondHistoricalData.date.asc())
-            .all()
-        )
-
-        # Fetch the generated coupon payments for the bond
-        coupon_records = (
-            session.query(CouponPayment)
-            .filter_by(isin=isin)
-            .order_by(CouponPayment.payment_date.asc())
-            .all()
-        )
-
-        # Fetch the generated risk metrics for the bond
-        risk_metrics = (
-            session.query(BondRiskMetrics)
-            .filter_by(isin=isin)
-            .first()
-        )
-
-        # Fetch the generated bond rating for the bond
-        bond_rating = (
-            session.query(BondRating)
-            .filter_by(isin=isin)
-            .first()
-        )
-
-        # Collect all data for the current bond
-        bond_data = {
-            "bond_info": {
-                "isin": isin,
-                "face_value": face_value,
-                "coupon_rate": coupon_rate,
-                "maturity_date": maturity_date.strftime("%Y-%m-%d"),
-                "issue_date": issue_date.strftime("%Y-%m-%d"),
-            },
-            "historical_data": [
-                {
-                    "date": record.date,
-                    "open_price": record.open_price,
-                    "close_price": record.close_price,
-                    "day_high": record.day_high,
-                    "day_low": record.day_low,
-                    "trading_volume": record.trading_volume
-                }
-                for record in historical_records
-            ],
-            "coupon_payments": [
-                {
-                    "payment_date": payment.payment_date,
-                    "payment_amount": payment.payment_amount
-                }
-                for payment in coupon_records
-            ],
-            "risk_metrics": {
-                "duration": risk_metrics.duration,
-                "modified_duration": risk_metrics.modified_duration,
-                "convexity": risk_metrics.convexity,
-                "yield_to_maturity": risk_metrics.yield_to_maturity,
-                "current_yield": risk_metrics.current_yield,
-                "spread_to_treasury": risk_metrics.spread_to_treasury
-            },
-            "bond_rating": {
-                "rating_agency": bond_rating.rating_agency,
-                "credit_rating": bond_rating.credit_rating,
-                "outlook": bond_rating.outlook,
-                "rating_date": bond_rating.rating_date.strftime("%Y-%m-%d")
-            }
-        }
-
-        # Add to the comprehensive dictionary
-        all_bond_data[isin] = bond_data
+    # Generate the whole universe in memory, then write it in one transaction
+    universe = BondUniverseGenerator(number_of_bonds, days).generate()
+    with stage_timer("bond", "db_write"):
+        # With an event bus, intraday ticks are persisted by its consumers
+        write_bond_universe(session, universe,
+                            include_intraday=event_bus is None)
+    session.close()
+
+    # The response is built from the generated data, not read back from the DB
+    with stage_timer("bond", "response_build"):
+        all_bond_data = universe_response(universe, columnar)
+
+    if event_bus is not None:
+        for isin, ticks in intraday_by_isin(universe):
+            event_bus.publish(ASSETS_TOPIC, make_event("bond.tick", isin, ticks))
 
     print(f"Total bonds generated: {len(all_bond_data)}")
-    session.close()
     return all_bond_data
 
 
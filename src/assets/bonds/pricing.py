@@ -0,0 +1,297 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: pricing.py
+
+Relative Path: src/assets/bonds/pricing.py
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Coupon payments per year for Bond.coupon_frequency
+FREQUENCY_PER_YEAR = {
+    "Annual": 1,
+    "Semi-Annual": 2,
+    "Quarterly": 4,
+    "Monthly": 12,
+}
+
+DAYS_PER_YEAR = 365.25
+
+
+def frequency_per_year(coupon_frequency: Optional[str]) -> int:
+    """
+    Number of coupons per year, defaulting to semi-annual.
+    """
+    return FREQUENCY_PER_YEAR.get(coupon_frequency or "Semi-Annual", 2)
+
+
+def years_between(start: Union[date, datetime], end: Union[date, datetime]) -> float:
+    """
+    Year fraction between two dates (actual/365.25).
+    """
+    if isinstance(start, datetime):
+        start = start.date()
+    if isinstance(end, datetime):
+        end = end.date()
+    return (end - start).days / DAYS_PER_YEAR
+
+
+def cash_flow_matrix(years_to_maturity, coupon_rate, face_value, frequency):
+    """
+    Remaining cash flows of plain fixed-coupon bonds as padded matrices.
+
+    All inputs broadcast against each other, so a (bonds,) or a
+    (bonds, dates) grid of maturities can be priced in one pass. Coupons
+    fall on a regular grid counted back from maturity.
+
+    Args:
+        years_to_maturity (array): Years from settlement to maturity.
+        coupon_rate (array): Annual coupon rate in percent.
+        face_value (array): Par value.
+        frequency (array): Coupons per year.
+
+    Returns:
+        dict: "times" (..., K) payment times in years, "cash_flows" (..., K)
+            amounts (zero-padded), "mask" (..., K) valid payments and
+            "accrued" (...) accrued interest at settlement.
+    """
+    years_to_maturity, coupon_rate, face_value, frequency = np.broadcast_arrays(
+        np.asarray(years_to_maturity, dtype=float),
+        np.asarray(coupon_rate, dtype=float),
+        np.asarray(face_value, dtype=float),
+        np.asarray(frequency, dtype=float),
+    )
+
+    # Number of coupons still to be paid (0 once the bond has matured)
+    periods = np.where(years_to_maturity > 0,
+                       np.ceil(years_to_maturity * frequency - 1e-9), 0).astype(int)
+    max_periods = max(int(periods.max(initial=0)), 1)
+    k = np.arange(max_periods)
+
+    mask = k < periods[..., None]
+    times = years_to_maturity[..., None] - \
+        (periods[..., None] - 1 - k) / frequency[..., None]
+    times = np.where(mask, times, 0.0)
+
+    coupon = face_value * coupon_rate / 100.0 / frequency
+    cash_flows = np.where(mask, coupon[..., None], 0.0)
+    cash_flows = cash_flows + \
+        np.where(k == periods[..., None] - 1, face_value[..., None], 0.0)
+
+    # Fraction of the current coupon period already elapsed
+    elapsed = np.clip(1.0 - times[..., 0] * frequency, 0.0, 1.0)
+    accrued = np.where(periods > 0, coupon * elapsed, 0.0)
+
+    return {"times": times, "cash_flows": cash_flows, "mask": mask, "accrued": accrued}
+
+
+def _discount_factors(times, ytm, frequency):
+    base = 1.0 + np.asarray(ytm, dtype=float)[..., None] / \
+        np.asarray(frequency, dtype=float)[..., None]
+    return base ** (-np.asarray(frequency, dtype=float)[..., None] * times)
+
+
+def dirty_price(times, cash_flows, ytm, frequency):
+    """
+    Present value of the cash flows at a periodically compounded yield (decimal).
+    """
+    return np.sum(cash_flows * _discount_factors(times, ytm, frequency), axis=-1)
+
+
+def yield_to_maturity(times, cash_flows, price, frequency, guess=None,
+                      tolerance: float = 1e-10, max_iterations: int = 50):
+    """
+    Solve for the yield that reprices every bond to its dirty price.
+
+    Newton's method runs on all bonds at once; bonds that have converged
+    are frozen while the rest keep iterating.
+
+    Args:
+        times (array): (..., K) payment times in years.
+        cash_flows (array): (..., K) payment amounts.
+        price (array): Dirty prices.
+        frequency (array): Compounding periods per year.
+        guess (array, optional): Starting yields. Defaults to the
+            approximate yield (coupon + pull to par) / average price.
+
+    Returns:
+        array: Yields as decimals (NaN where no cash flows remain).
+    """
+    price = np.asarray(price, dtype=float)
+    frequency = np.broadcast_to(
+        np.asarray(frequency, dtype=float), price.shape)
+    maturity = times.max(axis=-1)
+
+    if guess is None:
+        # The final cash flow holds the principal (plus the last coupon)
+        final = np.take_along_axis(
+            cash_flows, np.argmax(times, axis=-1)[..., None], axis=-1)[..., 0]
+        total = cash_flows.sum(axis=-1)
+        years = np.maximum(maturity, 1e-9)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            guess = ((total - price) / years) / ((final + price) / 2.0)
+    ytm = np.nan_to_num(np.asarray(guess, dtype=float) *
+                        np.ones_like(price), nan=0.05, posinf=0.05, neginf=0.05)
+    active = np.isfinite(price) & (maturity > 0)
+
+    for _ in range(max_iterations):
+        if not active.any():
+            break
+        base = 1.0 + ytm / frequency
+        discount = base[..., None] ** (-frequency[..., None] * times)
+        value = np.sum(cash_flows * discount, axis=-1) - price
+        slope = -np.sum(times * cash_flows * discount, axis=-1) / base
+        step = np.where(active, value / np.where(slope == 0, -1e-12, slope), 0.0)
+        # Keep 1 + y/f positive so the discount factors stay defined
+        ytm = np.maximum(ytm - step, -0.99 * frequency)
+        active &= np.abs(step) > tolerance
+
+    return np.where(maturity > 0, ytm, np.nan)
+
+
+def price_analytics(times, cash_flows, accrued, ytm, frequency):
+    """
+    Price and risk measures for given yields.
+
+    Returns:
+        dict: dirty_price, clean_price, macaulay_duration (years),
+            modified_duration and convexity arrays.
+    """
+    ytm = np.asarray(ytm, dtype=float)
+    frequency = np.asarray(frequency, dtype=float)
+    discount = _discount_factors(times, ytm, frequency)
+    present_values = cash_flows * discount
+    dirty = present_values.sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        macaulay = np.sum(times * present_values, axis=-1) / dirty
+        base = 1.0 + ytm / frequency
+        modified = macaulay / base
+        convexity = np.sum(times * (times + 1.0 / frequency[..., None]) * present_values,
+                           axis=-1) / (dirty * base ** 2)
+
+    return {
+        "dirty_price": dirty,
+        "clean_price": dirty - accrued,
+        "macaulay_duration": macaulay,
+        "modified_duration": modified,
+        "convexity": convexity,
+    }
+
+
+def bond_analytics(years_to_maturity, coupon_rate, face_value, frequency,
+                   clean_price=None, ytm=None) -> Dict[str, np.ndarray]:
+    """
+    Full analytics for a batch of bonds from either market prices or yields.
+
+    Exactly one of clean_price or ytm (percent) should be given. With a
+    price, the yield is solved with Newton's method; with a yield, the
+    price is computed from the cash flows.
+
+    Returns:
+        dict: Arrays of clean_price, dirty_price, accrued_interest,
+            yield_to_maturity (percent), current_yield (percent),
+            macaulay_duration, modified_duration and convexity.
+    """
+    flows = cash_flow_matrix(
+        years_to_maturity, coupon_rate, face_value, frequency)
+    frequency = np.broadcast_to(np.asarray(
+        frequency, dtype=float), flows["accrued"].shape)
+
+    if clean_price is not None:
+        dirty = np.asarray(clean_price, dtype=float) + flows["accrued"]
+        ytm_decimal = yield_to_maturity(
+            flows["times"], flows["cash_flows"], dirty, frequency)
+    elif ytm is not None:
+        ytm_decimal = np.broadcast_to(
+            np.asarray(ytm, dtype=float) / 100.0, flows["accrued"].shape)
+    else:
+        raise ValueError("Either clean_price or ytm is required")
+
+    analytics = price_analytics(
+        flows["times"], flows["cash_flows"], flows["accrued"], ytm_decimal, frequency)
+
+    annual_coupon = np.asarray(face_value, dtype=float) * \
+        np.asarray(coupon_rate, dtype=float) / 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        current_yield = annual_coupon / analytics["clean_price"] * 100.0
+
+    return {
+        "clean_price": analytics["clean_price"],
+        "dirty_price": analytics["dirty_price"],
+        "accrued_interest": flows["accrued"],
+        "yield_to_maturity": ytm_decimal * 100.0,
+        "current_yield": current_yield,
+        "macaulay_duration": analytics["macaulay_duration"],
+        "modified_duration": analytics["modified_duration"],
+        "convexity": analytics["convexity"],
+    }
+
+
+def _field(bond: Any, name: str) -> Any:
+    return bond[name] if isinstance(bond, dict) else getattr(bond, name)
+
+
+def risk_metrics_records(
+    bonds: Sequence[Any],
+    valuation_date: Union[date, datetime, Sequence[Union[date, datetime]]],
+    clean_prices: Optional[Sequence[float]] = None,
+    yields: Optional[Sequence[float]] = None,
+    treasury_yield: float = 4.0
+) -> List[Dict[str, Any]]:
+    """
+    BondRiskMetrics rows for a whole universe in one vectorized pass.
+
+    Args:
+        bonds (list): Bond ORM objects or dicts with isin, face_value,
+            coupon_rate, maturity_date and (optionally) coupon_frequency.
+        valuation_date (date or list): Settlement date, shared or one per bond.
+        clean_prices (list, optional): Market clean prices, one per bond.
+        yields (list, optional): Yields in percent, used when no prices are given.
+        treasury_yield (float): Benchmark yield in percent for the spread.
+
+    Returns:
+        list: Dictionaries ready for session.bulk_insert_mappings(BondRiskMetrics, ...).
+    """
+    if not bonds:
+        return []
+
+    if isinstance(valuation_date, (date, datetime)):
+        valuation_date = [valuation_date] * len(bonds)
+    years = np.array([years_between(settlement, _field(bond, "maturity_date"))
+                      for settlement, bond in zip(valuation_date, bonds)])
+    coupon_rate = np.array([float(_field(bond, "coupon_rate"))
+                           for bond in bonds])
+    face_value = np.array([float(_field(bond, "face_value"))
+                          for bond in bonds])
+    frequency = np.array([frequency_per_year(bond.get("coupon_frequency") if isinstance(bond, dict)
+                                             else getattr(bond, "coupon_frequency", None))
+                          for bond in bonds])
+
+    analytics = bond_analytics(
+        years, coupon_rate, face_value, frequency,
+        clean_price=None if clean_prices is None else np.asarray(
+            clean_prices, dtype=float),
+        ytm=None if yields is None else np.asarray(yields, dtype=float)
+    )
+
+    def rounded(column, i):
+        value = analytics[column][i]
+        return round(float(value), 2) if np.isfinite(value) else None
+
+    return [{
+        "isin": _field(bond, "isin"),
+        "duration": rounded("macaulay_duration", i),
+        "modified_duration": rounded("modified_duration", i),
+        "convexity": rounded("convexity", i),
+        "yield_to_maturity": rounded("yield_to_maturity", i),
+        "current_yield": rounded("current_yield", i),
+        "spread_to_treasury": None if not np.isfinite(analytics["yield_to_maturity"][i])
+        else round(float(analytics["yield_to_maturity"][i]) - treasury_yield, 2)
+    } for i, bond in enumerate(bonds)]
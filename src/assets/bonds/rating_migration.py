@@ -0,0 +1,172 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: rating_migration.py
+
+Relative Path: src/assets/bonds/rating_migration.py
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+RATINGS = ["AAA", "AA", "A", "BBB", "BB", "B", "CCC", "D"]
+
+# Average one-year transition probabilities in percent (rows: from, columns: to)
+DEFAULT_TRANSITION_MATRIX = [
+    [90.81, 8.33, 0.68, 0.06, 0.12, 0.00, 0.00, 0.00],
+    [0.70, 90.65, 7.79, 0.64, 0.06, 0.14, 0.02, 0.00],
+    [0.09, 2.27, 91.05, 5.52, 0.74, 0.26, 0.01, 0.06],
+    [0.02, 0.33, 5.95, 86.93, 5.30, 1.17, 0.12, 0.18],
+    [0.03, 0.14, 0.67, 7.73, 80.53, 8.84, 1.00, 1.06],
+    [0.00, 0.11, 0.24, 0.43, 6.48, 83.46, 4.07, 5.20],
+    [0.22, 0.00, 0.22, 1.30, 2.38, 11.24, 64.86, 19.79],
+    [0.00, 0.00, 0.00, 0.00, 0.00, 0.00, 0.00, 100.00],
+]
+
+# Credit spread over the risk-free curve per rating, in basis points
+RATING_SPREADS_BP = {
+    "AAA": 40, "AA": 60, "A": 90, "BBB": 150,
+    "BB": 300, "B": 500, "CCC": 900, "D": 2000,
+}
+
+# Share of new issues per rating (mostly investment grade)
+ISSUANCE_DISTRIBUTION = [0.05, 0.15, 0.30, 0.30, 0.10, 0.07, 0.03, 0.0]
+
+
+class RatingMigrationModel:
+    """
+    Discrete-time Markov chain over credit ratings.
+
+    Args:
+        transition_matrix (list, optional): One-year transition matrix (rows
+            are normalised, percent or probabilities). Defaults to
+            DEFAULT_TRANSITION_MATRIX.
+        ratings (list, optional): Rating labels in matrix order.
+        step_days (int): Length of one simulation step in days; the
+            one-year matrix is converted to that period.
+    """
+
+    def __init__(self, transition_matrix: Optional[Sequence[Sequence[float]]] = None,
+                 ratings: Optional[List[str]] = None, step_days: int = 30):
+        matrix = np.asarray(DEFAULT_TRANSITION_MATRIX if transition_matrix is None else transition_matrix,
+                            dtype=float)
+        self.ratings = ratings or RATINGS
+        if matrix.shape != (len(self.ratings), len(self.ratings)):
+            raise ValueError("Transition matrix must be square and match the ratings")
+        self.annual_matrix = matrix / matrix.sum(axis=1, keepdims=True)
+        self.step_days = step_days
+        self.step_matrix = self._period_matrix(self.annual_matrix, step_days / 365.0)
+        self._cumulative = np.cumsum(self.step_matrix, axis=1)
+        self._cumulative[:, -1] = 1.0
+
+    @staticmethod
+    def _period_matrix(annual: np.ndarray, years: float) -> np.ndarray:
+        """
+        annual ** years through the eigendecomposition, cleaned into a
+        valid stochastic matrix.
+        """
+        if years == 1.0:
+            return annual.copy()
+        values, vectors = np.linalg.eig(annual)
+        power = (vectors @ np.diag(values.astype(complex) ** years)
+                 @ np.linalg.inv(vectors)).real
+        power = np.clip(power, 0.0, None)
+        return power / power.sum(axis=1, keepdims=True)
+
+    def rating_index(self, ratings: Sequence[str]) -> np.ndarray:
+        lookup = {rating: i for i, rating in enumerate(self.ratings)}
+        return np.array([lookup[rating] for rating in ratings], dtype=int)
+
+    def initial_ratings(self, count: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Draw starting rating indices from the issuance distribution.
+        """
+        rng = rng or np.random.default_rng()
+        weights = np.asarray(ISSUANCE_DISTRIBUTION[:len(self.ratings)], dtype=float)
+        return rng.choice(len(self.ratings), size=count, p=weights / weights.sum())
+
+    def simulate(self, initial: np.ndarray, steps: int,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Rating paths for every bond at once.
+
+        Each step draws one uniform per bond and looks it up in the
+        cumulative row of the bond's current rating.
+
+        Args:
+            initial (array): (bonds,) starting rating indices.
+            steps (int): Number of steps of step_days each.
+            rng (Generator, optional): numpy random generator.
+
+        Returns:
+            array: (bonds, steps + 1) rating indices.
+        """
+        rng = rng or np.random.default_rng()
+        initial = np.asarray(initial, dtype=int)
+        paths = np.empty((len(initial), steps + 1), dtype=int)
+        paths[:, 0] = initial
+        draws = rng.random((steps, len(initial)))
+        for step in range(steps):
+            cumulative = self._cumulative[paths[:, step]]
+            paths[:, step + 1] = (draws[step][:, None] > cumulative).sum(axis=1)
+        return np.minimum(paths, len(self.ratings) - 1)
+
+    def spreads(self, paths: np.ndarray) -> np.ndarray:
+        """
+        Rating-dependent credit spreads (decimal) for rating index paths.
+        """
+        table = np.array([RATING_SPREADS_BP.get(rating, 0)
+                         for rating in self.ratings]) / 10_000.0
+        return table[paths]
+
+    def daily_spreads(self, paths: np.ndarray, days: int) -> np.ndarray:
+        """
+        (bonds, days + 1) spreads, holding each rating for step_days.
+        """
+        steps = np.minimum(np.arange(days + 1) // self.step_days, paths.shape[1] - 1)
+        return self.spreads(paths[:, steps])
+
+    def rating_records(
+        self,
+        isins: Sequence[str],
+        start_dates: Sequence[date],
+        paths: np.ndarray,
+        agencies: Optional[Sequence[str]] = None,
+        outlook_steps: int = 6
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        BondRating rows: the initial rating and every change along each path.
+
+        The outlook looks ahead up to outlook_steps steps: Positive before
+        an upgrade, Negative before a downgrade, Stable otherwise.
+
+        Returns:
+            dict: isin -> list of rating records in date order.
+        """
+        steps = paths.shape[1]
+        changed = np.ones_like(paths, dtype=bool)
+        changed[:, 1:] = paths[:, 1:] != paths[:, :-1]
+
+        # Next rating change within the outlook window (lower index = upgrade)
+        outlooks = np.full(paths.shape, "Stable", dtype=object)
+        for ahead in range(outlook_steps, 0, -1):
+            future = np.concatenate(
+                [paths[:, ahead:], np.repeat(paths[:, -1:], min(ahead, steps), axis=1)], axis=1)
+            outlooks = np.where(future < paths, "Positive",
+                                np.where(future > paths, "Negative", outlooks))
+
+        records = {}
+        for i, isin in enumerate(isins):
+            agency = agencies[i] if agencies is not None else "S&P"
+            records[isin] = [{
+                "isin": isin,
+                "rating_agency": agency,
+                "credit_rating": self.ratings[paths[i, step]],
+                "outlook": outlooks[i, step],
+                "rating_date": start_dates[i] + timedelta(days=int(step * self.step_days))
+            } for step in np.flatnonzero(changed[i])]
+        return records
@@ -0,0 +1,333 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: scenario.py
+
+Relative Path: src/assets/bonds/scenario.py
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from assets.bonds.model import Bond, CouponPayment
+from assets.bonds.term_structure import ShortRateModel, create_short_rate_model
+
+DAYS_PER_YEAR = 365.0
+KEY_RATE_TENORS = (0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0, 20.0, 30.0)
+
+
+def _ordinal(value: Union[date, datetime]) -> int:
+    return value.toordinal()
+
+
+class CashFlowBook:
+    """
+    Remaining cash flows of a bond book as a sparse (bonds x payment dates) matrix.
+
+    Stored in coordinate form sorted by bond: row (bond index), column
+    (payment date index) and amount per non-zero entry. Repricing gathers
+    the discount factor of each entry's column and sums per row.
+
+    Args:
+        as_of (date): Valuation date; only later payments are kept.
+        isins (list): Bond identifiers, one per row.
+        payment_dates (array): datetime64[D] payment dates, one per column.
+        rows (array): Row index per cash flow.
+        columns (array): Column index per cash flow.
+        amounts (array): Cash-flow amounts.
+    """
+
+    def __init__(self, as_of: date, isins: List[str], payment_dates: np.ndarray,
+                 rows: np.ndarray, columns: np.ndarray, amounts: np.ndarray):
+        order = np.argsort(rows, kind="stable")
+        self.as_of = as_of
+        self.isins = list(isins)
+        self.payment_dates = payment_dates
+        self.times = (payment_dates - np.datetime64(as_of, "D")
+                      ).astype(int) / DAYS_PER_YEAR
+        self.rows = rows[order]
+        self.columns = columns[order]
+        self.amounts = amounts[order]
+        for array in (self.payment_dates, self.times, self.rows, self.columns, self.amounts):
+            array.setflags(write=False)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.isins), len(self.payment_dates)
+
+    @classmethod
+    def from_records(cls, as_of: Union[date, datetime], bonds: Sequence[Dict[str, Any]],
+                     coupons: Sequence[Dict[str, Any]]) -> "CashFlowBook":
+        """
+        Build a book from Bond rows (isin, face_value, maturity_date) and
+        CouponPayment rows (isin, payment_date, payment_amount).
+        """
+        as_of = as_of.date() if isinstance(as_of, datetime) else as_of
+        isins = [bond["isin"] for bond in bonds]
+        index = {isin: i for i, isin in enumerate(isins)}
+
+        flows = [(index[c["isin"]], c["payment_date"], float(c["payment_amount"]))
+                 for c in coupons if c["isin"] in index]
+        flows += [(index[b["isin"]], b["maturity_date"], float(b["face_value"]))
+                  for b in bonds]
+
+        as_of64 = np.datetime64(as_of, "D")
+        rows = np.array([flow[0] for flow in flows], dtype=int)
+        # Ordinals avoid numpy's slow per-object date conversion
+        epoch = date(1970, 1, 1).toordinal()
+        dates = (np.fromiter((_ordinal(flow[1]) for flow in flows), dtype=np.int64,
+                             count=len(flows)) - epoch).astype("datetime64[D]")
+        amounts = np.array([flow[2] for flow in flows], dtype=float)
+
+        future = dates > as_of64
+        payment_dates, columns = np.unique(dates[future], return_inverse=True)
+        return cls(as_of, isins, payment_dates, rows[future], columns.ravel(), amounts[future])
+
+    def present_values(self, discount_factors: np.ndarray) -> np.ndarray:
+        """
+        Sparse matrix-vector product for one or many discount curves.
+
+        Args:
+            discount_factors (array): (G,) or (S, G) factors per payment date.
+
+        Returns:
+            array: (bonds,) or (S, bonds) present values.
+        """
+        factors = np.atleast_2d(discount_factors)
+        scenarios, bonds = factors.shape[0], len(self.isins)
+        weighted = self.amounts[None, :] * factors[:, self.columns]
+        # Offset each scenario's rows so one bincount sums every scenario
+        index = self.rows[None, :] + bonds * np.arange(scenarios)[:, None]
+        values = np.bincount(index.ravel(), weighted.ravel(), minlength=scenarios * bonds)
+        values = values.reshape(scenarios, bonds)
+        return values[0] if np.ndim(discount_factors) == 1 else values
+
+
+_BOOK_CACHE: Dict[Tuple[Any, ...], CashFlowBook] = {}
+
+
+def load_cash_flow_book(session: Session, as_of: Optional[Union[date, datetime]] = None) -> CashFlowBook:
+    """
+    Cash-flow book for every bond in the database, cached per valuation date.
+
+    The cache key includes the row counts and highest coupon id, so newly
+    generated bonds or coupons rebuild the matrix on the next call.
+    """
+    as_of = as_of or datetime.now().date()
+    as_of = as_of.date() if isinstance(as_of, datetime) else as_of
+    key = (
+        str(session.get_bind().url),
+        as_of,
+        session.query(func.count(Bond.isin)).scalar(),
+        session.query(func.count(CouponPayment.id),
+                      func.max(CouponPayment.id)).one(),
+    )
+    book = _BOOK_CACHE.get(key)
+    if book is None:
+        bonds = [{"isin": isin, "face_value": face_value, "maturity_date": maturity_date}
+                 for isin, face_value, maturity_date in session.query(
+                     Bond.isin, Bond.face_value, Bond.maturity_date).all()]
+        coupons = [{"isin": isin, "payment_date": payment_date, "payment_amount": amount}
+                   for isin, payment_date, amount in session.query(
+                       CouponPayment.isin, CouponPayment.payment_date, CouponPayment.payment_amount)
+                   .filter(CouponPayment.payment_date > as_of).all()]
+        book = CashFlowBook.from_records(as_of, bonds, coupons)
+        _BOOK_CACHE.clear()
+        _BOOK_CACHE[key] = book
+    return book
+
+
+class CurveScenario:
+    """
+    Zero-curve shift given at a few tenors and interpolated linearly between them.
+
+    Args:
+        name (str): Scenario label.
+        tenors (list): Tenors in years.
+        shifts_bp (list): Shift at each tenor in basis points.
+    """
+
+    def __init__(self, name: str, tenors: Sequence[float], shifts_bp: Sequence[float]):
+        self.name = name
+        self.tenors = np.asarray(tenors, dtype=float)
+        self.shifts_bp = np.asarray(shifts_bp, dtype=float)
+
+    def shift(self, times: np.ndarray) -> np.ndarray:
+        """
+        Shift in decimal at each time (flat beyond the end tenors).
+        """
+        return np.interp(times, self.tenors, self.shifts_bp) / 10_000.0
+
+
+def parallel_shift(bp: float) -> CurveScenario:
+    return CurveScenario(f"parallel {bp:+g}bp", [0.0], [bp])
+
+
+def twist(short_bp: float, long_bp: float, short_tenor: float = 2.0, long_tenor: float = 10.0) -> CurveScenario:
+    """
+    Steepener (short_bp < long_bp) or flattener around the two tenors.
+    """
+    return CurveScenario(f"twist {short_bp:+g}/{long_bp:+g}bp",
+                         [short_tenor, long_tenor], [short_bp, long_bp])
+
+
+def butterfly(wings_bp: float, belly_bp: float, tenors: Tuple[float, float, float] = (2.0, 10.0, 30.0)) -> CurveScenario:
+    """
+    Wings (short and long end) move by wings_bp, the belly by belly_bp.
+    """
+    return CurveScenario(f"butterfly {wings_bp:+g}/{belly_bp:+g}bp",
+                         tenors, [wings_bp, belly_bp, wings_bp])
+
+
+STANDARD_SCENARIOS = [
+    parallel_shift(100),
+    parallel_shift(-100),
+    twist(-50, 50),
+    twist(50, -50),
+    butterfly(25, -25),
+    butterfly(-25, 25),
+]
+
+
+def base_zero_rates(times: np.ndarray, model: Optional[ShortRateModel] = None) -> np.ndarray:
+    """
+    Continuously compounded zero rates implied by the short-rate model today.
+    """
+    model = model or create_short_rate_model()
+    times = np.maximum(np.asarray(times, dtype=float), 1e-6)
+    prices = model.zero_coupon_price(model.r0, times, 0.0)
+    return -np.log(prices) / times
+
+
+def _triangular_bumps(times: np.ndarray, tenors: Sequence[float], bump_bp: float) -> np.ndarray:
+    """
+    (K, G) key-rate bumps: each key tenor's bump fades linearly to zero at its neighbours.
+    """
+    tenors = np.asarray(tenors, dtype=float)
+    bumps = np.empty((len(tenors), len(times)))
+    for k in range(len(tenors)):
+        unit = np.zeros(len(tenors))
+        unit[k] = 1.0
+        bumps[k] = np.interp(times, tenors, unit)
+    return bumps * bump_bp / 10_000.0
+
+
+def run_scenarios(
+    book: CashFlowBook,
+    scenarios: Optional[Sequence[CurveScenario]] = None,
+    zero_rates: Optional[np.ndarray] = None,
+    spread: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Reprice the whole book under every scenario in one vectorized pass.
+
+    Args:
+        book (CashFlowBook): Remaining cash flows.
+        scenarios (list, optional): Curve scenarios. Defaults to STANDARD_SCENARIOS.
+        zero_rates (array, optional): Base zero rates per payment date.
+            Defaults to the short-rate model's curve.
+        spread (float): Flat discount spread (decimal) on top of the curve.
+
+    Returns:
+        dict: "isins", "scenarios" (names), "base_value" (bonds,),
+            "scenario_value" (S, bonds) and "pnl_percent" (S, bonds).
+    """
+    scenarios = STANDARD_SCENARIOS if scenarios is None else scenarios
+    times = book.times
+    rates = base_zero_rates(times) if zero_rates is None else np.asarray(zero_rates)
+
+    shifts = np.array([scenario.shift(times) for scenario in scenarios]
+                      ).reshape(len(scenarios), len(times))
+    curves = np.vstack([rates[None, :], rates[None, :] + shifts]) + spread
+    values = book.present_values(np.exp(-curves * times[None, :]))
+
+    base, shocked = values[0], values[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl = (shocked / base[None, :] - 1.0) * 100.0
+    return {
+        "isins": book.isins,
+        "scenarios": [scenario.name for scenario in scenarios],
+        "base_value": base,
+        "scenario_value": shocked,
+        "pnl_percent": pnl,
+    }
+
+
+def key_rate_durations(
+    book: CashFlowBook,
+    tenors: Sequence[float] = KEY_RATE_TENORS,
+    zero_rates: Optional[np.ndarray] = None,
+    bump_bp: float = 1.0,
+    spread: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Key-rate durations of every bond by central differences.
+
+    All up and down bumps are priced together: 2K curves against the
+    sparse cash-flow matrix.
+
+    Returns:
+        dict: "isins", "tenors" and "durations" (bonds, K); the durations of
+            a bond sum to (approximately) its effective duration.
+    """
+    times = book.times
+    rates = base_zero_rates(times) if zero_rates is None else np.asarray(zero_rates)
+    bumps = _triangular_bumps(times, tenors, bump_bp)
+
+    curves = np.vstack([rates[None, :] + bumps, rates[None, :] - bumps,
+                        rates[None, :]]) + spread
+    values = book.present_values(np.exp(-curves * times[None, :]))
+
+    k = len(tenors)
+    up, down, base = values[:k], values[k:2 * k], values[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        durations = (down - up) / (2.0 * base[None, :] * bump_bp / 10_000.0)
+    return {"isins": book.isins, "tenors": list(tenors), "durations": durations.T}
+
+
+def fund_scenario_returns(
+    holdings: Sequence[Any],
+    isins: Sequence[str],
+    pnl_percent: np.ndarray
+) -> Dict[Any, np.ndarray]:
+    """
+    Scenario returns of credit funds from their bond holdings.
+
+    Scenarios shock interest rates only, with exchange rates held where
+    they are, so each bond's percentage return is the same in its own
+    currency and in the fund's; no FX conversion is needed. Currency
+    moves are not part of the scenarios.
+
+    Args:
+        holdings (list): CreditFundHoldings rows or dicts with fund_id,
+            asset_type, asset_id (the ISIN) and weight (percent).
+        isins (list): Bond order of pnl_percent's columns.
+        pnl_percent (array): (S, bonds) scenario returns in percent.
+
+    Returns:
+        dict: fund_id -> (S,) weighted scenario returns in percent of NAV
+            (non-bond holdings are left unshocked).
+    """
+    def field(holding, name):
+        return holding[name] if isinstance(holding, dict) else getattr(holding, name)
+
+    index = {isin: i for i, isin in enumerate(isins)}
+    bond_holdings = [h for h in holdings
+                     if field(h, "asset_type") == "Bond" and field(h, "asset_id") in index]
+    fund_ids = sorted({field(h, "fund_id") for h in bond_holdings})
+    fund_index = {fund_id: i for i, fund_id in enumerate(fund_ids)}
+
+    # (funds x bonds) weight matrix, so every fund is one matrix product
+    weights = np.zeros((len(fund_ids), len(isins)))
+    for h in bond_holdings:
+        weights[fund_index[field(h, "fund_id")], index[field(h, "asset_id")]] += \
+            float(field(h, "weight") or 0.0) / 100.0
+
+    returns = weights @ np.nan_to_num(pnl_percent).T
+    return {fund_id: returns[i] for fund_id, i in fund_index.items()}
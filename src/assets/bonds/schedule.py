@@ -0,0 +1,191 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: schedule.py
+
+Relative Path: src/assets/bonds/schedule.py
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from assets.bonds.pricing import frequency_per_year
+
+DAY_COUNT_CONVENTIONS = ("30/360", "ACT/360", "ACT/365", "ACT/ACT")
+
+
+def _to_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def add_months(anchor: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    Shift dates by whole months, clamping the day to the end of the month.
+
+    Args:
+        anchor (datetime64 or array): Start date(s), broadcast against months.
+        months (array): Month offsets (may be negative).
+
+    Returns:
+        array: datetime64[D] dates.
+    """
+    anchor = np.asarray(anchor, dtype="datetime64[D]")
+    month_start = anchor.astype("datetime64[M]")
+    day = (anchor - month_start.astype("datetime64[D]")).astype(int)
+
+    target = month_start + np.asarray(months, dtype=int)
+    days_in_month = ((target + 1).astype("datetime64[D]") -
+                     target.astype("datetime64[D]")).astype(int)
+    return target.astype("datetime64[D]") + np.minimum(day, days_in_month - 1)
+
+
+def _date_parts(dates: np.ndarray):
+    years = dates.astype("datetime64[Y]").astype(int) + 1970
+    months = dates.astype("datetime64[M]").astype(int) % 12 + 1
+    days = (dates - dates.astype("datetime64[M]").astype("datetime64[D]")).astype(int) + 1
+    return years, months, days
+
+
+def year_fraction(start: np.ndarray, end: np.ndarray, convention: str = "30/360",
+                  period_start: np.ndarray = None, frequency: int = 2) -> np.ndarray:
+    """
+    Accrual fractions between arrays of dates.
+
+    Args:
+        start (array): datetime64[D] accrual start dates.
+        end (array): datetime64[D] accrual end dates.
+        convention (str): One of DAY_COUNT_CONVENTIONS.
+        period_start (array, optional): Start of the regular coupon period
+            ending at `end` (ACT/ACT only, for stub periods).
+        frequency (int): Coupons per year (ACT/ACT only).
+
+    Returns:
+        array: Year fractions.
+    """
+    start = np.asarray(start, dtype="datetime64[D]")
+    end = np.asarray(end, dtype="datetime64[D]")
+    actual_days = (end - start).astype(int)
+
+    if convention == "30/360":
+        # US (bond basis) 30/360
+        y1, m1, d1 = _date_parts(start)
+        y2, m2, d2 = _date_parts(end)
+        d1 = np.minimum(d1, 30)
+        d2 = np.where((d2 == 31) & (d1 == 30), 30, d2)
+        return (360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)) / 360.0
+    if convention == "ACT/360":
+        return actual_days / 360.0
+    if convention == "ACT/365":
+        return actual_days / 365.0
+    if convention == "ACT/ACT":
+        # ICMA: actual days over the days of the (notional) regular period
+        if period_start is None:
+            return actual_days / 365.25
+        period_days = (end - np.asarray(period_start, dtype="datetime64[D]")).astype(int)
+        return actual_days / (period_days * float(frequency))
+    raise ValueError(f"Unknown day-count convention: {convention}")
+
+
+class CouponSchedule:
+    """
+    Payment dates and accrual fractions for one set of bond terms.
+
+    Instances are shared between bonds through the schedule cache, so the
+    arrays are read-only.
+    """
+
+    def __init__(self, payment_dates: np.ndarray, accrual_start: np.ndarray,
+                 year_fractions: np.ndarray, frequency: int, day_count: str):
+        for array in (payment_dates, accrual_start, year_fractions):
+            array.setflags(write=False)
+        self.payment_dates = payment_dates
+        self.accrual_start = accrual_start
+        self.year_fractions = year_fractions
+        self.frequency = frequency
+        self.day_count = day_count
+
+    def __len__(self) -> int:
+        return len(self.payment_dates)
+
+    def payment_amounts(self, face_value: float, coupon_rate: float) -> np.ndarray:
+        """
+        Coupon amounts for a face value and an annual rate in percent.
+        """
+        return face_value * coupon_rate / 100.0 * self.year_fractions
+
+
+@lru_cache(maxsize=4096)
+def _build_schedule(issue_date: date, maturity_date: date, frequency: int, day_count: str) -> CouponSchedule:
+    step = 12 // frequency
+    issue = np.datetime64(issue_date, "D")
+    maturity = np.datetime64(maturity_date, "D")
+    if maturity <= issue:
+        empty = np.array([], dtype="datetime64[D]")
+        return CouponSchedule(empty, empty.copy(), np.array([], dtype=float), frequency, day_count)
+
+    total_months = (maturity.astype("datetime64[M]") -
+                    issue.astype("datetime64[M]")).astype(int)
+    # Roll back from maturity one period past the issue date
+    periods = max(total_months // step + 2, 1)
+    grid = add_months(maturity, -step * np.arange(periods, -1, -1))
+
+    first = np.searchsorted(grid, issue, side="right")
+    payment_dates = grid[max(first, 1):]
+    regular_start = grid[max(first, 1) - 1:-1]
+    accrual_start = np.maximum(regular_start, issue)
+
+    fractions = year_fraction(accrual_start, payment_dates, day_count,
+                              period_start=regular_start, frequency=frequency)
+    return CouponSchedule(payment_dates, accrual_start, fractions, frequency, day_count)
+
+
+def coupon_schedule(
+    issue_date: Union[date, datetime],
+    maturity_date: Union[date, datetime],
+    coupon_frequency: str = "Semi-Annual",
+    day_count: str = "30/360"
+) -> CouponSchedule:
+    """
+    Coupon payment schedule, memoized by (issue, maturity, frequency, convention).
+
+    Dates are rolled back from maturity in whole months, so an irregular
+    first period becomes a short stub accruing from the issue date.
+
+    Args:
+        issue_date (date): Issue (first accrual) date.
+        maturity_date (date): Maturity (final payment) date.
+        coupon_frequency (str): Annual, Semi-Annual, Quarterly or Monthly.
+        day_count (str): One of DAY_COUNT_CONVENTIONS.
+
+    Returns:
+        CouponSchedule: Shared, read-only schedule.
+    """
+    if day_count not in DAY_COUNT_CONVENTIONS:
+        raise ValueError(f"Unknown day-count convention: {day_count}")
+    return _build_schedule(_to_date(issue_date), _to_date(maturity_date),
+                           frequency_per_year(coupon_frequency), day_count)
+
+
+def coupon_payment_records(isin: str, face_value: float, coupon_rate: float,
+                           schedule: CouponSchedule) -> List[Dict[str, Any]]:
+    """
+    CouponPayment rows for one bond on a schedule.
+    """
+    amounts = np.round(schedule.payment_amounts(face_value, coupon_rate), 2)
+    return [{
+        "isin": isin,
+        "payment_date": payment_date,
+        "payment_amount": float(amount)
+    } for payment_date, amount in zip(schedule.payment_dates.astype(object), amounts)]
+
+
+def schedule_cache_info():
+    """
+    Hit/miss statistics of the schedule cache.
+    """
+    return _build_schedule.cache_info()
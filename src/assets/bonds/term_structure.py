@@ -0,0 +1,366 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: term_structure.py
+
+Relative Path: src/assets/bonds/term_structure.py
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from assets.bonds.schedule import coupon_schedule
+
+DAYS_PER_YEAR = 365.0
+# Upper bound on (paths x days x grid) discount factors materialised at once
+_DISCOUNT_BLOCK = 4_000_000
+
+
+class ShortRateModel:
+    """
+    One-factor short-rate model with closed-form zero-coupon bond prices.
+
+    Args:
+        r0 (float): Initial short rate (decimal).
+        mean_reversion (float): Speed of mean reversion (a).
+        sigma (float): Rate volatility.
+    """
+
+    def __init__(self, r0: float = 0.04, mean_reversion: float = 0.1, sigma: float = 0.01):
+        self.r0 = r0
+        self.mean_reversion = mean_reversion
+        self.sigma = sigma
+
+    def step(self, rates: np.ndarray, t: float, dt: float, shocks: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def simulate(self, steps: int, paths: int = 1, dt: float = 1 / DAYS_PER_YEAR,
+                 seed: Optional[int] = None) -> np.ndarray:
+        """
+        Simulate short-rate paths.
+
+        Returns:
+            array: (paths, steps + 1) rates, starting at r0.
+        """
+        rng = np.random.default_rng(seed)
+        shocks = rng.standard_normal((steps, paths))
+        rates = np.empty((steps + 1, paths))
+        rates[0] = self.r0
+        for i in range(steps):
+            rates[i + 1] = self.step(rates[i], i * dt, dt, shocks[i])
+        return rates.T
+
+    def zero_coupon_price(self, rates: np.ndarray, tau: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """
+        P(t, t + tau) given the short rate at t (all inputs broadcast).
+        """
+        raise NotImplementedError
+
+    def _b(self, tau):
+        a = self.mean_reversion
+        return (1.0 - np.exp(-a * tau)) / a
+
+
+class Vasicek(ShortRateModel):
+    """
+    dr = a (b - r) dt + sigma dW, simulated with the exact transition.
+    """
+
+    def __init__(self, r0: float = 0.04, mean_reversion: float = 0.1, sigma: float = 0.01,
+                 long_run_rate: float = 0.04):
+        super().__init__(r0, mean_reversion, sigma)
+        self.long_run_rate = long_run_rate
+
+    def step(self, rates, t, dt, shocks):
+        a, b = self.mean_reversion, self.long_run_rate
+        decay = np.exp(-a * dt)
+        std = self.sigma * np.sqrt((1.0 - decay ** 2) / (2.0 * a))
+        return rates * decay + b * (1.0 - decay) + std * shocks
+
+    def zero_coupon_price(self, rates, tau, t):
+        a, b, sigma = self.mean_reversion, self.long_run_rate, self.sigma
+        B = self._b(tau)
+        log_a = (b - sigma ** 2 / (2.0 * a ** 2)) * (B - tau) - \
+            sigma ** 2 * B ** 2 / (4.0 * a)
+        return np.exp(log_a - B * rates)
+
+
+class CIR(ShortRateModel):
+    """
+    dr = a (b - r) dt + sigma sqrt(r) dW, simulated with full truncation Euler.
+    """
+
+    def __init__(self, r0: float = 0.04, mean_reversion: float = 0.2, sigma: float = 0.05,
+                 long_run_rate: float = 0.04):
+        super().__init__(r0, mean_reversion, sigma)
+        self.long_run_rate = long_run_rate
+
+    def step(self, rates, t, dt, shocks):
+        a, b = self.mean_reversion, self.long_run_rate
+        positive = np.maximum(rates, 0.0)
+        return rates + a * (b - positive) * dt + self.sigma * np.sqrt(positive * dt) * shocks
+
+    def zero_coupon_price(self, rates, tau, t):
+        a, b, sigma = self.mean_reversion, self.long_run_rate, self.sigma
+        gamma = np.sqrt(a ** 2 + 2.0 * sigma ** 2)
+        growth = np.expm1(gamma * tau)
+        denominator = (gamma + a) * growth + 2.0 * gamma
+        B = 2.0 * growth / denominator
+        A = (2.0 * gamma * np.exp((a + gamma) * tau / 2.0) /
+             denominator) ** (2.0 * a * b / sigma ** 2)
+        return A * np.exp(-B * np.maximum(rates, 0.0))
+
+
+class HullWhite(ShortRateModel):
+    """
+    dr = (theta(t) - a r) dt + sigma dW, fitted to a flat initial curve at r0.
+    """
+
+    def step(self, rates, t, dt, shocks):
+        a, sigma = self.mean_reversion, self.sigma
+        # r = x + alpha(t) where x is a zero-mean OU process
+        x = rates - self._alpha(t)
+        decay = np.exp(-a * dt)
+        std = sigma * np.sqrt((1.0 - decay ** 2) / (2.0 * a))
+        return x * decay + std * shocks + self._alpha(t + dt)
+
+    def _alpha(self, t):
+        a = self.mean_reversion
+        return self.r0 + self.sigma ** 2 / (2.0 * a ** 2) * (1.0 - np.exp(-a * t)) ** 2
+
+    def zero_coupon_price(self, rates, tau, t):
+        a, sigma, f0 = self.mean_reversion, self.sigma, self.r0
+        B = self._b(tau)
+        # P(0, T) / P(0, t) = exp(-f0 tau) on a flat curve
+        log_a = -f0 * tau + B * f0 - sigma ** 2 / \
+            (4.0 * a) * (1.0 - np.exp(-2.0 * a * t)) * B ** 2
+        return np.exp(log_a - B * rates)
+
+
+SHORT_RATE_MODELS = {
+    "vasicek": Vasicek,
+    "cir": CIR,
+    "hull_white": HullWhite,
+}
+
+
+def create_short_rate_model(name: Optional[str] = None, **params) -> ShortRateModel:
+    """
+    Build a short-rate model by name.
+
+    Args:
+        name (str, optional): "vasicek", "cir" or "hull_white". Defaults to
+            the FUNDSIM_SHORT_RATE_MODEL environment variable (vasicek).
+        **params: Model parameters (r0, mean_reversion, sigma, ...).
+
+    Returns:
+        ShortRateModel
+    """
+    name = (name or os.environ.get(
+        "FUNDSIM_SHORT_RATE_MODEL", "vasicek")).lower()
+    if name not in SHORT_RATE_MODELS:
+        raise ValueError(f"Unknown short-rate model: {name}")
+    return SHORT_RATE_MODELS[name](**params)
+
+
+def credit_spread(annual_yield: float, model: ShortRateModel) -> float:
+    """
+    Spread over the short-rate curve implied by an annual yield in percent (decimal).
+    """
+    return max(annual_yield / 100.0 - model.r0, 0.0)
+
+
+def _to_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _field(bond: Any, name: str, default: Any = None) -> Any:
+    if isinstance(bond, dict):
+        return bond.get(name, default)
+    return getattr(bond, name, default)
+
+
+class TermStructureSimulator:
+    """
+    Reprices a whole bond universe along simulated short-rate paths.
+
+    Every cash flow of every bond is placed on one grid of payment dates,
+    giving a (bonds x grid) matrix. Each day's dirty prices are then one
+    matrix multiply of the day's discount factors against it.
+
+    Args:
+        model (ShortRateModel): Rate dynamics.
+        start_date (date): First simulated day.
+        days (int): Number of days after start_date.
+    """
+
+    def __init__(self, model: ShortRateModel, start_date: Union[date, datetime], days: int):
+        self.model = model
+        self.start_date = _to_date(start_date)
+        self.days = days
+        self.dates = np.datetime64(self.start_date, "D") + np.arange(days + 1)
+        self.times = np.arange(days + 1) / DAYS_PER_YEAR
+
+    def simulate(self, paths: int = 1, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Daily short rates, (paths, days + 1).
+        """
+        return self.model.simulate(self.days, paths, 1 / DAYS_PER_YEAR, seed)
+
+    def cash_flow_matrix(self, bonds: Sequence[Any]) -> Dict[str, np.ndarray]:
+        """
+        Place every bond's coupons and principal on a shared date grid.
+
+        Returns:
+            dict: "grid" payment dates (G,), "cash_flows" (bonds, G) and the
+                per-bond schedules used for accrued interest.
+        """
+        schedules = []
+        for bond in bonds:
+            schedules.append(coupon_schedule(
+                _field(bond, "issue_date"), _field(bond, "maturity_date"),
+                _field(bond, "coupon_frequency", "Semi-Annual")))
+
+        all_dates = [schedule.payment_dates for schedule in schedules]
+        grid = np.unique(np.concatenate(all_dates)) if all_dates else np.array(
+            [], dtype="datetime64[D]")
+
+        cash_flows = np.zeros((len(bonds), len(grid)))
+        for i, (bond, schedule) in enumerate(zip(bonds, schedules)):
+            if not len(schedule):
+                continue
+            face_value = float(_field(bond, "face_value"))
+            columns = np.searchsorted(grid, schedule.payment_dates)
+            cash_flows[i, columns] = schedule.payment_amounts(
+                face_value, float(_field(bond, "coupon_rate")))
+            cash_flows[i, columns[-1]] += face_value
+
+        return {"grid": grid, "cash_flows": cash_flows, "schedules": schedules}
+
+    def discount_factors(self, rates: np.ndarray, grid: np.ndarray,
+                         days: slice = slice(None)) -> np.ndarray:
+        """
+        Discount factors from each simulated day to each grid date.
+
+        Args:
+            rates (array): (..., D) short rates on the simulated days[days].
+            grid (array): (G,) payment dates.
+            days (slice): Simulated days covered by rates (all by default).
+
+        Returns:
+            array: (..., D, G) factors; zero for dates already paid.
+        """
+        dates, times = self.dates[days], self.times[days]
+        tau = (grid[None, :] - dates[:, None]).astype(int) / DAYS_PER_YEAR
+        alive = tau > 0
+        factors = self.model.zero_coupon_price(
+            rates[..., None], np.where(alive, tau, 0.0), times[:, None])
+        return np.where(alive, factors, 0.0)
+
+    def accrued_interest(self, bonds: Sequence[Any], schedules: List[Any]) -> np.ndarray:
+        """
+        Accrued interest of each bond on each simulated day, (days + 1, bonds).
+        """
+        accrued = np.zeros((len(self.dates), len(bonds)))
+        for i, (bond, schedule) in enumerate(zip(bonds, schedules)):
+            if not len(schedule):
+                continue
+            amounts = schedule.payment_amounts(
+                float(_field(bond, "face_value")), float(_field(bond, "coupon_rate")))
+            period = np.searchsorted(
+                schedule.payment_dates, self.dates, side="right")
+            inside = (period < len(schedule)) & (
+                self.dates >= schedule.accrual_start[0])
+            period = np.minimum(period, len(schedule) - 1)
+            start = schedule.accrual_start[period]
+            end = schedule.payment_dates[period]
+            elapsed = (self.dates - start).astype(int) / \
+                np.maximum((end - start).astype(int), 1)
+            accrued[:, i] = np.where(inside, amounts[period] * elapsed, 0.0)
+        return accrued
+
+    def price_universe(self, bonds: Sequence[Any], rates: np.ndarray,
+                       spreads: Optional[Sequence[float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Dirty and clean prices of every bond on every day of every path.
+
+        A constant credit spread s per bond keeps pricing a single matrix
+        multiply: exp(-s (T - t)) = exp(-s T) * exp(s t), so the first
+        factor is folded into the cash-flow matrix and the second applied
+        per day. Discount factors are built and contracted in blocks of
+        paths and days of at most _DISCOUNT_BLOCK elements, so memory grows
+        with the prices returned, not with paths x days x grid.
+
+        Args:
+            bonds (list): Bond ORM objects or dicts (isin, face_value,
+                coupon_rate, issue_date, maturity_date, coupon_frequency).
+            rates (array): (days + 1,) or (paths, days + 1) short rates.
+            spreads (list, optional): Credit spread per bond (decimal).
+
+        Returns:
+            dict: "dirty_price" and "clean_price" shaped (days + 1, bonds)
+                or (paths, days + 1, bonds); NaN before issue and after maturity.
+        """
+        flows = self.cash_flow_matrix(bonds)
+        grid, cash_flows = flows["grid"], flows["cash_flows"]
+
+        spreads = np.zeros(len(bonds)) if spreads is None else np.asarray(
+            spreads, dtype=float)
+        grid_times = (grid - self.dates[0]).astype(int) / DAYS_PER_YEAR
+        cash_flows = cash_flows * np.exp(-spreads[:, None] * grid_times[None, :])
+
+        rates = np.asarray(rates, dtype=float)
+        paths = rates.reshape(-1, rates.shape[-1])
+        dirty = np.empty((len(paths), len(self.dates), len(bonds)))
+        day_block = max(1, min(len(self.dates), _DISCOUNT_BLOCK // max(len(grid), 1)))
+        path_block = max(1, _DISCOUNT_BLOCK // (day_block * max(len(grid), 1)))
+        for first_day in range(0, len(self.dates), day_block):
+            days = slice(first_day, first_day + day_block)
+            for first_path in range(0, len(paths), path_block):
+                block = slice(first_path, first_path + path_block)
+                dirty[block, days] = self.discount_factors(paths[block, days], grid, days) @ cash_flows.T
+        dirty = dirty.reshape(rates.shape[:-1] + dirty.shape[1:])
+        dirty = dirty * np.exp(self.times[:, None] * spreads[None, :])
+
+        issue = np.array([np.datetime64(_to_date(_field(bond, "issue_date")), "D")
+                          for bond in bonds])
+        maturity = np.array([np.datetime64(_to_date(_field(bond, "maturity_date")), "D")
+                             for bond in bonds])
+        live = (self.dates[:, None] >= issue[None, :]) & (
+            self.dates[:, None] < maturity[None, :])
+        dirty = np.where(live, dirty, np.nan)
+
+        accrued = self.accrued_interest(bonds, flows["schedules"])
+        return {"dirty_price": dirty, "clean_price": dirty - accrued}
+
+
+def simulate_bond_prices(
+    bonds: Sequence[Any],
+    start_date: Union[date, datetime],
+    days: int,
+    model: Optional[ShortRateModel] = None,
+    spreads: Optional[Sequence[float]] = None,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Simulate one rate path and the clean prices it implies for every bond.
+
+    Returns:
+        dict: "dates" (list of date), "short_rate" (days + 1,) and
+            "clean_price" (days + 1, bonds).
+    """
+    simulator = TermStructureSimulator(
+        model or create_short_rate_model(), start_date, days)
+    rates = simulator.simulate(seed=seed)[0]
+    prices = simulator.price_universe(bonds, rates, spreads)
+    start = _to_date(start_date)
+    return {
+        "dates": [start + timedelta(days=i) for i in range(days + 1)],
+        "short_rate": rates,
+        "clean_price": prices["clean_price"],
+    }
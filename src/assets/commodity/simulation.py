@@ -0,0 +1,569 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: simulation.py
+
+Relative Path: src/assets/commodity/simulation.py
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.commodity.model import (
+    Base, Commodity, CommodityFundamentalMetrics, CommodityHistoricalData, CommodityPriceTradingInfo,
+    CommodityVolatilityRisk
+)
+from assets.rolling import WEEK_52_WINDOW, range_and_volume_metrics, rolling_mean
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+
+COMMODITY_DATABASE_URL = "sqlite:///data/commodities.db"
+TRADING_DAYS_PER_YEAR = 252
+DAYS_PER_YEAR = 365.0
+DEFAULT_HISTORY_DAYS = 3 * 365
+
+# Speed of mean reversion (per year) and correlation of price shocks
+# within a category; shocks across categories share CROSS_CATEGORY_CORRELATION
+MEAN_REVERSION = {"Energy": 1.5, "Metal": 0.5, "Agricultural": 2.0}
+CATEGORY_CORRELATION = 0.5
+CROSS_CATEGORY_CORRELATION = 0.15
+# Log-price response to log(demand / supply)
+PRICE_ELASTICITY = 1.5
+# Supply and demand shocks: mean reversion per year, annual volatility, and
+# supply disruptions per year per point of geopolitical risk (0-10)
+SHOCK_MEAN_REVERSION = 4.0
+SUPPLY_VOLATILITY = 0.04
+DEMAND_VOLATILITY = 0.03
+DISRUPTIONS_PER_RISK_POINT = 0.05
+DISRUPTION_SIZE = 0.05
+# Daily open gap and intraday range as fractions of the close
+GAP_VOLATILITY = 0.004
+RANGE_VOLATILITY = 0.006
+# Rolling window (trading days) for the daily risk columns
+RISK_WINDOW = WEEK_52_WINDOW
+
+# commodity_id, name, category, unit, price, production cost, annual volatility,
+# storage cost and transport cost per unit, seasonal demand variation %,
+# peak demand month, harvest (or restocking) month, global supply and demand
+# per day, geopolitical risk, daily volume
+DEFAULT_COMMODITIES = [
+    ("CL", "Crude Oil", "Energy", "barrel", 80.0, 55.0, 0.35, 0.50, 2.00, 3.0, 7, 4,
+     102_000_000, 101_500_000, 7.0, 900_000),
+    ("NG", "Natural Gas", "Energy", "MMBtu", 3.0, 2.2, 0.55, 0.08, 0.10, 25.0, 1, 5,
+     400_000_000, 398_000_000, 5.0, 450_000),
+    ("GC", "Gold", "Metal", "oz", 2000.0, 1300.0, 0.15, 2.00, 1.00, 2.0, 11, 1,
+     320_000, 318_000, 3.0, 250_000),
+    ("SI", "Silver", "Metal", "oz", 24.0, 16.0, 0.25, 0.10, 0.05, 3.0, 11, 1,
+     2_700_000, 2_720_000, 3.0, 120_000),
+    ("HG", "Copper", "Metal", "lb", 4.0, 2.6, 0.22, 0.02, 0.05, 5.0, 4, 1,
+     120_000_000, 121_000_000, 4.0, 180_000),
+    ("ZW", "Wheat", "Agricultural", "ton", 250.0, 180.0, 0.28, 12.0, 20.0, 15.0, 12, 7,
+     2_150_000, 2_140_000, 5.0, 140_000),
+    ("ZC", "Corn", "Agricultural", "ton", 190.0, 150.0, 0.25, 10.0, 18.0, 18.0, 12, 10,
+     3_300_000, 3_290_000, 3.0, 300_000),
+    ("KC", "Coffee", "Agricultural", "lb", 1.8, 1.2, 0.30, 0.05, 0.10, 10.0, 12, 6,
+     48_000_000, 47_500_000, 4.0, 40_000),
+    ("SB", "Sugar", "Agricultural", "lb", 0.22, 0.15, 0.28, 0.01, 0.01, 8.0, 7, 10,
+     1_000_000_000, 990_000_000, 3.0, 90_000),
+]
+
+
+def _markup(row: Sequence[Any]) -> float:
+    """
+    Listed price over production cost, net of transport, of a DEFAULT_COMMODITIES row.
+    """
+    return (row[4] - row[8]) / row[5]
+
+
+# Long-run markup per category, for commodities without a DEFAULT_COMMODITIES row
+CATEGORY_MARKUP = {category: float(np.mean([_markup(row) for row in DEFAULT_COMMODITIES if row[2] == category]))
+                   for category in sorted({row[2] for row in DEFAULT_COMMODITIES})}
+
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _to_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def trading_days(start_date: date, end_date: date) -> np.ndarray:
+    """
+    Weekdays from start_date to end_date inclusive, as datetime64[D].
+    """
+    days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+    return days[np.is_busday(days)]
+
+
+def category_correlation(categories: Sequence[str]) -> np.ndarray:
+    categories = np.asarray(categories)
+    same = categories[:, None] == categories[None, :]
+    correlation = np.where(same, CATEGORY_CORRELATION, CROSS_CATEGORY_CORRELATION)
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+def seasonal_factors(dates: np.ndarray, variation: np.ndarray, peak_month: np.ndarray,
+                     harvest_month: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Seasonal demand multiplier and storage phase per (commodity, date).
+
+    Demand peaks mid-month of peak_month, varying by +/- variation percent.
+    The storage phase is the fraction of a year since the last harvest
+    (or restocking): carry accumulates through it and resets at harvest.
+
+    Returns:
+        dict: "demand" (commodities, dates) multiplier and "phase" in [0, 1).
+    """
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(int)[None, :]
+    peak_day = ((peak_month - 1) * 30.5 + 15.0)[:, None]
+    harvest_day = ((harvest_month - 1) * 30.5 + 15.0)[:, None]
+    demand = 1.0 + variation[:, None] / 100.0 * np.cos(2.0 * np.pi * (day_of_year - peak_day) / DAYS_PER_YEAR)
+    phase = np.mod(day_of_year - harvest_day, DAYS_PER_YEAR) / DAYS_PER_YEAR
+    return {"demand": demand, "phase": phase}
+
+
+def ou_paths(initial: np.ndarray, target: np.ndarray, speed: np.ndarray, volatility: np.ndarray,
+             shocks: np.ndarray, dt: float, jumps: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Exact Ornstein-Uhlenbeck steps towards a time-varying target for all
+    series at once.
+
+    X(t+dt) = X(t) e^(-k dt) + target(t) (1 - e^(-k dt)) + s sqrt((1 - e^(-2k dt)) / 2k) Z
+
+    Args:
+        initial (array): (series,) starting values.
+        target (array): (series, steps) long-run level per step.
+        speed (array): (series,) mean reversion per year.
+        volatility (array): (series,) instantaneous volatility per sqrt(year).
+        shocks (array): (series, steps) standard normal (possibly correlated) draws.
+        dt (float): Step in years.
+        jumps (array, optional): (series, steps) level jumps added on each
+            step, which then decay like any other deviation.
+
+    Returns:
+        array: (series, steps) values after each step.
+    """
+    decay = np.exp(-speed * dt)
+    scale = volatility * np.sqrt(np.where(speed > 0, (1.0 - decay ** 2) / (2.0 * np.maximum(speed, 1e-12)), dt))
+    pull = (1.0 - decay)[:, None] * target + scale[:, None] * shocks
+    if jumps is not None:
+        pull = pull + jumps
+    paths = np.empty(target.shape)
+    value = np.asarray(initial, dtype=float)
+    # The recursion is sequential in time only; every step updates all series
+    for step in range(target.shape[1]):
+        value = value * decay + pull[:, step]
+        paths[:, step] = value
+    return paths
+
+
+class CommoditySimulator:
+    """
+    Schwartz one-factor model for many commodities in one pass.
+
+    The log spot price reverts to an equilibrium built from production
+    cost (growing with inflation), delivery (transport) cost, the
+    storage carry accumulated since the last harvest, and the
+    supply/demand balance. Demand follows its seasonal cycle times a
+    mean-reverting shock; supply follows a mean-reverting shock plus
+    disruptions whose frequency rises with geopolitical risk. Price
+    shocks are correlated within categories.
+
+    Args:
+        parameters (dict): Per-commodity arrays, as returned by
+            CommodityEngine.load_parameters.
+        seed (int, optional): Seed for reproducible paths.
+    """
+
+    def __init__(self, parameters: Dict[str, Any], seed: Optional[int] = None):
+        self.parameters = parameters
+        self.rng = np.random.default_rng(seed)
+
+    def fundamentals(self, dates: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Daily supply, demand, production cost and carry per commodity.
+        """
+        p, rng = self.parameters, self.rng
+        count, days = len(p["commodity_ids"]), len(dates)
+        dt = 1.0 / TRADING_DAYS_PER_YEAR
+        season = seasonal_factors(dates, p["seasonal_variation"], p["peak_month"], p["harvest_month"])
+
+        demand_shock = ou_paths(np.zeros(count), np.zeros((count, days)), np.full(count, SHOCK_MEAN_REVERSION),
+                                np.full(count, DEMAND_VOLATILITY), rng.standard_normal((count, days)), dt)
+        # A disruption knocks supply down; mean reversion then restores it
+        disruptions = rng.poisson(p["geopolitical_risk"][:, None] * DISRUPTIONS_PER_RISK_POINT * dt, (count, days))
+        supply_shock = ou_paths(np.zeros(count), np.zeros((count, days)), np.full(count, SHOCK_MEAN_REVERSION),
+                                np.full(count, SUPPLY_VOLATILITY), rng.standard_normal((count, days)), dt,
+                                jumps=-DISRUPTION_SIZE * disruptions)
+
+        years = (dates - dates[0]).astype(int)[None, :] / DAYS_PER_YEAR
+        production_cost = p["production_cost"][:, None] * (1.0 + p["inflation_impact"][:, None] / 100.0) ** years
+        return {
+            "demand": p["global_demand"][:, None] * season["demand"] * np.exp(demand_shock),
+            "supply": p["global_supply"][:, None] * np.exp(supply_shock),
+            "production_cost": production_cost,
+            "storage_cost": p["storage_cost"][:, None] * season["phase"],
+            "transportation_cost": np.broadcast_to(p["transportation_cost"][:, None], (count, days)),
+        }
+
+    def simulate(self, dates: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Daily closes and fundamentals for every commodity.
+
+        Returns:
+            dict: (commodities, dates) "close", "equilibrium" and the
+                fundamentals from CommoditySimulator.fundamentals.
+        """
+        p = self.parameters
+        fundamentals = self.fundamentals(dates)
+        # A fixed markup over cost keeps each market's long-run level
+        markup = np.maximum(p["markup"], 1e-6)
+        balance = np.log(fundamentals["demand"] / fundamentals["supply"]) - \
+            np.log(p["global_demand"] / p["global_supply"])[:, None]
+        equilibrium = (fundamentals["production_cost"] * markup[:, None] + fundamentals["transportation_cost"] +
+                       fundamentals["storage_cost"]) * np.exp(PRICE_ELASTICITY * balance)
+
+        correlation = category_correlation(p["categories"])
+        shocks = (self.rng.standard_normal((len(dates), len(correlation))) @ np.linalg.cholesky(correlation).T).T
+        variance = 0.5 * p["volatility"] ** 2 / np.maximum(p["speed"], 1e-12)
+        # Target the log level whose stationary mean is the equilibrium price
+        log_close = ou_paths(np.log(p["initial_price"]), np.log(equilibrium) - 0.5 * variance[:, None],
+                             p["speed"], p["volatility"], shocks, 1.0 / TRADING_DAYS_PER_YEAR)
+        ROWS_GENERATED.inc(log_close.size, asset="commodity", kind="daily")
+        return {"close": np.exp(log_close), "equilibrium": equilibrium, **fundamentals}
+
+
+def daily_bars(closes: np.ndarray, previous: np.ndarray, volatility: np.ndarray, base_volume: np.ndarray,
+               rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Open, high, low and volume around simulated closes.
+
+    Opens gap from the previous close; volume rises with the size of the
+    day's move relative to the commodity's volatility.
+    """
+    shape = closes.shape
+    opens = previous * np.exp(rng.normal(0.0, GAP_VOLATILITY, shape))
+    high = np.maximum(opens, closes) * (1.0 + np.abs(rng.normal(0.0, RANGE_VOLATILITY, shape)))
+    low = np.minimum(opens, closes) * (1.0 - np.abs(rng.normal(0.0, RANGE_VOLATILITY, shape)))
+    moves = np.abs(np.log(closes / previous)) / (volatility[:, None] / np.sqrt(TRADING_DAYS_PER_YEAR))
+    volume = np.rint(base_volume[:, None] * (0.6 + 0.4 * moves) * rng.lognormal(0.0, 0.25, shape))
+    return {"open": opens, "high": high, "low": low, "volume": volume}
+
+
+def rolling_risk(closes: np.ndarray, previous: np.ndarray, window: int = RISK_WINDOW) -> Dict[str, np.ndarray]:
+    """
+    Trailing daily volatility (percent), annualised Sharpe ratio and beta
+    against the equal-weighted commodity index, for every (commodity, day).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.log(closes / previous)
+        valid = np.isfinite(returns)
+        index = np.where(valid, returns, 0.0).sum(axis=0, keepdims=True) / valid.sum(axis=0, keepdims=True)
+        mean = rolling_mean(returns, window)
+        index_mean = rolling_mean(index, window)
+        variance = np.maximum(rolling_mean(returns ** 2, window) - mean ** 2, 0.0)
+        index_variance = rolling_mean(index ** 2, window) - index_mean ** 2
+        covariance = rolling_mean(returns * index, window) - mean * index_mean
+        std = np.sqrt(variance)
+        return {
+            "standard_deviation": std * 100.0,
+            "sharpe_ratio": mean / std * np.sqrt(TRADING_DAYS_PER_YEAR),
+            "beta": covariance / index_variance,
+        }
+
+
+def _rounded(values: np.ndarray, digits: int = 2) -> List[Optional[float]]:
+    return [v if v == v and abs(v) != float("inf") else None for v in np.round(values, digits).tolist()]
+
+
+def historical_records(commodity_ids: Sequence[str], dates: np.ndarray,
+                       columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    CommodityHistoricalData rows from (commodities, dates) columns.
+    """
+    day_values = dates.astype(object).tolist()
+    prices = ("open_price", "close_price", "day_high", "day_low", "week_52_high", "week_52_low",
+              "production_cost", "storage_cost", "transportation_cost",
+              "beta", "standard_deviation", "sharpe_ratio")
+    counts = ("trading_volume", "average_volume", "global_supply", "global_demand")
+    records = []
+    for i, commodity_id in enumerate(commodity_ids):
+        values = {name: _rounded(columns[name][i]) for name in prices}
+        values.update({name: np.rint(columns[name][i]).astype(np.int64).tolist() for name in counts})
+        records.extend({
+            "commodity_id": commodity_id,
+            "date": day,
+            **{name: values[name][d] for name in values},
+        } for d, day in enumerate(day_values))
+    return records
+
+
+def seed_commodities(session: Session, as_of: date) -> None:
+    """
+    Insert the DEFAULT_COMMODITIES with their fundamentals and trading
+    info when the commodity tables are empty.
+    """
+    if session.query(func.count(Commodity.commodity_id)).scalar():
+        return
+    session.execute(Commodity.__table__.insert(), [{
+        "commodity_id": commodity_id, "name": name, "category": category, "unit_of_measurement": unit,
+        "physical_properties": None, "geographical_origin": None, "traded_exchanges": None,
+        "seasonality": json.dumps({"peak_demand_month": peak, "harvest_month": harvest}),
+    } for commodity_id, name, category, unit, _, _, _, _, _, _, peak, harvest, *_ in DEFAULT_COMMODITIES])
+    session.execute(CommodityFundamentalMetrics.__table__.insert(), [{
+        "commodity_id": row[0], "global_supply": row[12], "global_demand": row[13], "production_cost": row[5],
+        "storage_availability": 50.0, "seasonal_demand_variation": row[9], "inflation_impact": 2.5,
+        "geopolitical_risk": row[14], "historical_data_start_date": as_of, "historical_data_end_date": as_of,
+    } for row in DEFAULT_COMMODITIES])
+    session.execute(CommodityPriceTradingInfo.__table__.insert(), [{
+        "commodity_id": row[0], "current_price": row[4], "close_price": row[4], "average_volume": row[15],
+        "storage_cost": row[7], "transportation_cost": row[8],
+    } for row in DEFAULT_COMMODITIES])
+    session.commit()
+    ROWS_WRITTEN.inc(len(DEFAULT_COMMODITIES), asset="commodity", table="commodities")
+
+
+class CommodityEngine:
+    """
+    Simulates and stores daily history for every commodity in the database.
+
+    Paths continue from each commodity's latest stored close, so repeated
+    runs over later windows join up.
+
+    Args:
+        session (Session): Session on the commodity database.
+        seed (int, optional): Seed for reproducible paths.
+    """
+
+    def __init__(self, session: Session, seed: Optional[int] = None):
+        self.session = session
+        self.seed = seed
+
+    def load_parameters(self, start_date: date) -> Dict[str, Any]:
+        """
+        Per-commodity model inputs from the latest fundamentals and trading
+        info rows, with DEFAULT_COMMODITIES (or category defaults) for gaps.
+
+        The markup over production cost comes from DEFAULT_COMMODITIES (or
+        CATEGORY_MARKUP), not from current_price, which every run
+        overwrites with its last close: anchoring on it would re-centre
+        the long-run level on the path at each new window.
+        """
+        defaults = {row[0]: row for row in DEFAULT_COMMODITIES}
+        commodities = self.session.query(Commodity.commodity_id, Commodity.category, Commodity.seasonality) \
+            .order_by(Commodity.commodity_id).all()
+        fundamentals = {row.commodity_id: row for row in self.session.query(CommodityFundamentalMetrics)
+                        .order_by(CommodityFundamentalMetrics.id).all()}
+        trading = {row.commodity_id: row for row in self.session.query(CommodityPriceTradingInfo)
+                   .order_by(CommodityPriceTradingInfo.id).all()}
+
+        latest = dict(self.session.query(CommodityHistoricalData.commodity_id, func.max(CommodityHistoricalData.date))
+                      .filter(CommodityHistoricalData.date < start_date)
+                      .group_by(CommodityHistoricalData.commodity_id).all())
+        last_close = {}
+        for commodity_id, day in latest.items():
+            last_close[commodity_id] = float(self.session.query(CommodityHistoricalData.close_price).filter(
+                CommodityHistoricalData.commodity_id == commodity_id,
+                CommodityHistoricalData.date == day).first()[0])
+
+        generic = (None, None, "Other", None, 100.0, 70.0, 0.3, 1.0, 1.0, 5.0, 1, 1, 1_000_000, 1_000_000, 5.0, 100_000)
+
+        def value(row, column, fallback):
+            found = getattr(row, column, None) if row is not None else None
+            return float(found) if found is not None else float(fallback)
+
+        columns: Dict[str, List[Any]] = {name: [] for name in (
+            "commodity_ids", "categories", "markup", "initial_price", "production_cost", "volatility",
+            "speed", "storage_cost", "transportation_cost", "seasonal_variation", "peak_month", "harvest_month",
+            "global_supply", "global_demand", "geopolitical_risk", "inflation_impact", "base_volume")}
+        for commodity_id, category, seasonality in commodities:
+            d = defaults.get(commodity_id, generic)
+            f, t = fundamentals.get(commodity_id), trading.get(commodity_id)
+            try:
+                season = json.loads(seasonality) if seasonality else {}
+            except ValueError:
+                season = {}
+            category = category or d[2]
+            reference = value(t, "current_price", d[4])
+            columns["commodity_ids"].append(commodity_id)
+            columns["categories"].append(category)
+            columns["markup"].append(_markup(d) if commodity_id in defaults else
+                                     CATEGORY_MARKUP.get(category, _markup(generic)))
+            columns["initial_price"].append(last_close.get(commodity_id, reference))
+            columns["production_cost"].append(value(f, "production_cost", d[5]))
+            columns["volatility"].append(d[6])
+            columns["speed"].append(MEAN_REVERSION.get(category, 1.0))
+            columns["storage_cost"].append(value(t, "storage_cost", d[7]))
+            columns["transportation_cost"].append(value(t, "transportation_cost", d[8]))
+            columns["seasonal_variation"].append(value(f, "seasonal_demand_variation", d[9]))
+            columns["peak_month"].append(int(season.get("peak_demand_month", d[10])))
+            columns["harvest_month"].append(int(season.get("harvest_month", d[11])))
+            columns["global_supply"].append(value(f, "global_supply", d[12]))
+            columns["global_demand"].append(value(f, "global_demand", d[13]))
+            columns["geopolitical_risk"].append(value(f, "geopolitical_risk", d[14]))
+            columns["inflation_impact"].append(value(f, "inflation_impact", 2.5))
+            columns["base_volume"].append(value(t, "average_volume", d[15]))
+        return {name: values if name in ("commodity_ids", "categories") else np.array(values, dtype=float)
+                for name, values in columns.items()}
+
+    def load_history(self, commodity_ids: Sequence[str], start_date: date,
+                     window: int = RISK_WINDOW) -> Dict[str, np.ndarray]:
+        """
+        Stored closes and volumes of the last `window` trading days before
+        start_date as (commodities, days) matrices, forward-filled; days
+        before a commodity's first stored row are NaN.
+
+        Returns:
+            dict: "close", "previous" (prior day's close) and "volume".
+        """
+        earliest = start_date - timedelta(days=int(window * 7 / 5) + 10)
+        row_of = {commodity_id: i for i, commodity_id in enumerate(commodity_ids)}
+        rows, ordinals, closes, volumes = [], [], [], []
+        for start in range(0, len(commodity_ids), _IN_CHUNK):
+            for commodity_id, day, close, volume in self.session.query(
+                    CommodityHistoricalData.commodity_id, CommodityHistoricalData.date,
+                    CommodityHistoricalData.close_price, CommodityHistoricalData.trading_volume
+            ).filter(CommodityHistoricalData.commodity_id.in_(commodity_ids[start:start + _IN_CHUNK]),
+                     CommodityHistoricalData.date >= earliest, CommodityHistoricalData.date < start_date).all():
+                if close is None:
+                    continue
+                rows.append(row_of[commodity_id])
+                ordinals.append(day.toordinal())
+                closes.append(float(close))
+                volumes.append(float(volume or 0))
+
+        empty = np.empty((len(commodity_ids), 0))
+        if not rows:
+            return {"close": empty, "previous": empty, "volume": empty}
+        axis, columns = np.unique(np.asarray(ordinals), return_inverse=True)
+        axis, columns = axis[-window:], columns.ravel() - max(len(axis) - window, 0)
+        keep = columns >= 0
+        matrices = {}
+        for name, values in (("close", closes), ("volume", volumes)):
+            matrix = np.full((len(commodity_ids), len(axis)), np.nan)
+            matrix[np.asarray(rows)[keep], columns[keep]] = np.asarray(values)[keep]
+            last = np.where(np.isfinite(matrix), np.arange(len(axis))[None, :], 0)
+            matrices[name] = np.take_along_axis(matrix, np.maximum.accumulate(last, axis=1), axis=1)
+        matrices["previous"] = np.concatenate([np.full((len(commodity_ids), 1), np.nan),
+                                               matrices["close"][:, :-1]], axis=1)
+        return matrices
+
+    def run(self, start_date: date, end_date: date) -> Dict[str, int]:
+        """
+        Simulate and store history for trading days from start_date to end_date.
+
+        Returns:
+            dict: Rows written per table.
+        """
+        start_date, end_date = _to_date(start_date), _to_date(end_date)
+        with stage_timer("commodity", "init"):
+            seed_commodities(self.session, end_date)
+            parameters = self.load_parameters(start_date)
+        dates = trading_days(start_date, end_date)
+        commodity_ids = parameters["commodity_ids"]
+        if not len(dates) or not commodity_ids:
+            return {}
+
+        with stage_timer("commodity", "simulate"):
+            simulator = CommoditySimulator(parameters, self.seed)
+            paths = simulator.simulate(dates)
+            closes = paths["close"]
+            previous = np.concatenate([parameters["initial_price"][:, None], closes[:, :-1]], axis=1)
+            bars = daily_bars(closes, previous, parameters["volatility"], parameters["base_volume"], simulator.rng)
+
+            # The 52-week range, average volume and risk windows run over the
+            # stored history before start_date too, via the shared rolling windows
+            history = self.load_history(commodity_ids, start_date)
+            lead = history["close"].shape[1]
+            all_closes = np.concatenate([history["close"], closes], axis=1)
+            all_previous = np.concatenate([history["previous"], previous], axis=1)
+            ranges = range_and_volume_metrics(all_closes, np.concatenate([history["volume"], bars["volume"]], axis=1))
+            ranges = {name: values[:, lead:] for name, values in ranges.items()}
+            risk = {name: values[:, lead:] for name, values in rolling_risk(all_closes, all_previous).items()}
+            columns = {
+                "open_price": bars["open"], "close_price": closes, "day_high": bars["high"], "day_low": bars["low"],
+                "trading_volume": bars["volume"], **ranges, **risk,
+                **{name: paths[name] for name in ("production_cost", "storage_cost", "transportation_cost")},
+                "global_supply": paths["supply"], "global_demand": paths["demand"],
+            }
+            records = historical_records(commodity_ids, dates, columns)
+
+        with stage_timer("commodity", "db_write"):
+            first, last = dates[0].astype(object), dates[-1].astype(object)
+            for start in range(0, len(commodity_ids), _IN_CHUNK):
+                chunk = commodity_ids[start:start + _IN_CHUNK]
+                self.session.query(CommodityHistoricalData).filter(
+                    CommodityHistoricalData.commodity_id.in_(chunk),
+                    CommodityHistoricalData.date >= first, CommodityHistoricalData.date <= last
+                ).delete(synchronize_session=False)
+                for model in (CommodityPriceTradingInfo, CommodityVolatilityRisk):
+                    self.session.query(model).filter(model.commodity_id.in_(chunk)).delete(synchronize_session=False)
+            self.session.execute(CommodityHistoricalData.__table__.insert(), records)
+
+            snapshot = [record for record in records if record["date"] == last]
+            latest_columns = ("open_price", "close_price", "day_high", "day_low", "week_52_high", "week_52_low",
+                              "trading_volume", "average_volume", "storage_cost", "transportation_cost")
+            trading_info = [{
+                "commodity_id": record["commodity_id"],
+                "current_price": record["close_price"],
+                **{column: record[column] for column in latest_columns},
+                "historical_data_start_date": first,
+                "historical_data_end_date": last,
+            } for record in snapshot]
+            # One-month at-the-money straddle as the cost of hedging a unit
+            hedge_cost = 0.8 * closes[:, -1] * parameters["volatility"] * np.sqrt(1.0 / 12.0)
+            volatility = [{
+                "commodity_id": record["commodity_id"],
+                "beta": record["beta"],
+                "standard_deviation": record["standard_deviation"],
+                "sharpe_ratio": record["sharpe_ratio"],
+                "hedging_cost": round(float(hedge_cost[i]), 2),
+                "correlation_with_equities": None,
+                "historical_data_start_date": first,
+                "historical_data_end_date": last,
+            } for i, record in enumerate(snapshot)]
+            tables = [(CommodityHistoricalData, records), (CommodityPriceTradingInfo, trading_info),
+                      (CommodityVolatilityRisk, volatility)]
+            for model, rows in tables[1:]:
+                if rows:
+                    self.session.execute(model.__table__.insert(), rows)
+            self.session.query(CommodityFundamentalMetrics).filter(
+                CommodityFundamentalMetrics.commodity_id.in_(commodity_ids)
+            ).update({CommodityFundamentalMetrics.historical_data_end_date: last}, synchronize_session=False)
+            self.session.commit()
+
+        for model, rows in tables:
+            ROWS_WRITTEN.inc(len(rows), asset="commodity", table=model.__tablename__)
+        return {model.__tablename__: len(rows) for model, rows in tables}
+
+
+def simulate_commodities(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                         seed: Optional[int] = None) -> Dict[str, int]:
+    """
+    Simulate commodity history into the commodity database (last
+    DEFAULT_HISTORY_DAYS up to today by default).
+
+    Returns:
+        dict: Rows written per table.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_HISTORY_DAYS - 1)
+    engine = create_engine(COMMODITY_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        summary = CommodityEngine(session, seed).run(start_date, end_date)
+    finally:
+        session.close()
+
+    print(f"Commodity history simulated: {summary}")
+    return summary
@@ -0,0 +1,642 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: cashflows.py
+
+Relative Path: src/assets/creditFund/cashflows.py
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.bonds.model import Bond, CouponPayment
+from assets.bonds.schedule import coupon_schedule
+from assets.creditFund.model import Base, CreditFund, CreditFundHistoricalData, CreditFundHoldings
+from assets.loan.amortization import LOAN_DATABASE_URL
+from assets.loan.model import Loan, RepaymentSchedule
+from assets.mutualFund.nav import (
+    _IN_CHUNK, BONDS_DATABASE_URL, DEFAULT_BASE_NAV, STOCKS_DATABASE_URL, load_close_matrix
+)
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+from valuation.fx import DEFAULT_CURRENCY, FXConverter, load_asset_currencies, load_fx_rates
+from valuation.incremental import CASH_ASSET_TYPES, CREDIT_FUND_DATABASE_URL, VOLATILITY_WINDOW
+
+DAYS_PER_YEAR = 365
+# Holdings valued by discounting their scheduled cash flows
+CASH_FLOW_ASSET_TYPES = ("Bond", "Loan")
+# Holdings marked to their daily closes
+MARKET_ASSET_TYPES = ("Stock",)
+# Upper bound on (cash flows x days) elements discounted at once
+_DISCOUNT_BLOCK = 4_000_000
+NEWTON_ITERATIONS = 12
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+class CashFlowSchedule:
+    """
+    Scheduled cash flows of many assets in coordinate form.
+
+    Args:
+        assets (list): (asset_type, asset_id) pairs, one row each.
+        rows (array): Asset row per cash flow.
+        ordinals (array): Payment date ordinal per cash flow.
+        amounts (array): Cash-flow amount per unit of the asset.
+    """
+
+    def __init__(self, assets: Sequence[Tuple[str, str]], rows: np.ndarray,
+                 ordinals: np.ndarray, amounts: np.ndarray):
+        self.assets = list(assets)
+        self.rows = np.asarray(rows, dtype=int)
+        self.ordinals = np.asarray(ordinals, dtype=np.int64)
+        self.amounts = np.asarray(amounts, dtype=float)
+
+    def subset(self, rows: Sequence[int]) -> "CashFlowSchedule":
+        """
+        Schedule of only the given asset rows (renumbered in that order).
+        """
+        rows = np.asarray(rows, dtype=int)
+        renumber = np.full(len(self.assets), -1)
+        renumber[rows] = np.arange(len(rows))
+        keep = renumber[self.rows] >= 0
+        return CashFlowSchedule([self.assets[row] for row in rows], renumber[self.rows[keep]],
+                                self.ordinals[keep], self.amounts[keep])
+
+    def converted(self, converter: "FXConverter", asset_currencies: Sequence[str],
+                  base_currency: str) -> "CashFlowSchedule":
+        """
+        Schedule with every flow converted into base_currency at its
+        payment date's rate (converter on this schedule's ordinals).
+        """
+        unique, inverse = np.unique(np.asarray(asset_currencies, dtype=object).astype(str),
+                                    return_inverse=True)
+        factors = converter.factors(list(unique), base_currency)
+        rates = factors[np.arange(len(self.amounts)), inverse.ravel()[self.rows]]
+        return CashFlowSchedule(self.assets, self.rows, self.ordinals, self.amounts * rates)
+
+    def received(self, day_ordinals: np.ndarray) -> np.ndarray:
+        """
+        (assets, days) cumulative cash paid on or before each day.
+        """
+        paid = np.zeros((len(self.assets), len(day_ordinals)))
+        columns = np.searchsorted(day_ordinals, self.ordinals, side="left")
+        inside = columns < len(day_ordinals)
+        np.add.at(paid, (self.rows[inside], columns[inside]), self.amounts[inside])
+        return np.cumsum(paid, axis=1)
+
+    def on_grid(self) -> Dict[str, Any]:
+        """
+        Dense (assets, payment dates) matrix of the flows.
+        """
+        grid, columns = np.unique(self.ordinals, return_inverse=True)
+        flows = np.zeros((len(self.assets), len(grid)))
+        np.add.at(flows, (self.rows, columns.ravel()), self.amounts)
+        return {"ordinals": grid, "dates": [date.fromordinal(int(o)) for o in grid], "flows": flows}
+
+
+def load_asset_cash_flows(bond_session: Optional[Session], loan_session: Optional[Session],
+                          assets: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Coupons and principal of bonds and repayments of loans.
+
+    Bonds pay their CouponPayment rows plus face value at maturity; loans
+    pay the RepaymentSchedule amount due, or only the amount paid on
+    overdue instalments.
+
+    Returns:
+        dict: "schedule" (CashFlowSchedule over the given assets),
+            "coupon_rates" (assets,) contractual rates in percent, the
+            fallback discount rate, and "coupon_schedules": row ->
+            (CouponSchedule, face value, coupon rate) per bond, for accrued
+            interest.
+    """
+    row_of = {asset: i for i, asset in enumerate(assets)}
+    rows, ordinals, amounts = [], [], []
+    coupon_rates = np.zeros(len(assets))
+    coupon_schedules = {}
+
+    def add(asset, payment_date, amount):
+        if payment_date is not None and amount:
+            rows.append(row_of[asset])
+            ordinals.append(payment_date.toordinal())
+            amounts.append(float(amount))
+
+    isins = [asset_id for kind, asset_id in assets if kind == "Bond"]
+    loan_ids = [asset_id for kind, asset_id in assets if kind == "Loan"]
+    for start in range(0, len(isins) if bond_session is not None else 0, _IN_CHUNK):
+        chunk = isins[start:start + _IN_CHUNK]
+        for isin, issue_date, maturity_date, face_value, coupon_rate, coupon_frequency in bond_session.query(
+                Bond.isin, Bond.issue_date, Bond.maturity_date, Bond.face_value, Bond.coupon_rate,
+                Bond.coupon_frequency
+        ).filter(Bond.isin.in_(chunk)).all():
+            add(("Bond", isin), maturity_date, face_value)
+            row = row_of[("Bond", isin)]
+            coupon_rates[row] = float(coupon_rate or 0.0)
+            if issue_date is not None and maturity_date is not None:
+                coupon_schedules[row] = (coupon_schedule(issue_date, maturity_date,
+                                                         coupon_frequency or "Semi-Annual"),
+                                         float(face_value or 0.0), coupon_rates[row])
+        for isin, payment_date, amount in bond_session.query(
+                CouponPayment.isin, CouponPayment.payment_date, CouponPayment.payment_amount
+        ).filter(CouponPayment.isin.in_(chunk)).all():
+            add(("Bond", isin), payment_date, amount)
+
+    for start in range(0, len(loan_ids) if loan_session is not None else 0, _IN_CHUNK):
+        chunk = loan_ids[start:start + _IN_CHUNK]
+        for loan_id, interest_rate in loan_session.query(
+                Loan.loan_id, Loan.interest_rate).filter(Loan.loan_id.in_(chunk)).all():
+            coupon_rates[row_of[("Loan", loan_id)]] = float(interest_rate or 0.0)
+        for loan_id, due_date, amount_due, amount_paid, status in loan_session.query(
+                RepaymentSchedule.loan_id, RepaymentSchedule.due_date, RepaymentSchedule.amount_due,
+                RepaymentSchedule.amount_paid, RepaymentSchedule.status
+        ).filter(RepaymentSchedule.loan_id.in_(chunk)).all():
+            add(("Loan", loan_id), due_date, amount_paid if status == "Overdue" else amount_due)
+
+    return {"schedule": CashFlowSchedule(assets, rows, ordinals, amounts),
+            "coupon_rates": coupon_rates, "coupon_schedules": coupon_schedules}
+
+
+def accrued_interest(coupon_schedules: Dict[int, Tuple[Any, float, float]], assets: int,
+                     day_ordinals: np.ndarray) -> np.ndarray:
+    """
+    (assets, days) interest accrued since the last coupon, on the accrual
+    schedule the bond generator splits clean from dirty prices with.
+
+    Args:
+        coupon_schedules (dict): load_asset_cash_flows "coupon_schedules".
+        assets (int): Number of asset rows.
+        day_ordinals (array): (days,) valuation dates.
+    """
+    days = (np.asarray(day_ordinals, dtype=np.int64) - _EPOCH).astype("datetime64[D]")
+    accrued = np.zeros((assets, len(days)))
+    for row, (schedule, face_value, coupon_rate) in coupon_schedules.items():
+        if not len(schedule):
+            continue
+        amounts = schedule.payment_amounts(face_value, coupon_rate)
+        period = np.searchsorted(schedule.payment_dates, days, side="right")
+        inside = (period < len(schedule)) & (days >= schedule.accrual_start[0])
+        period = np.minimum(period, len(schedule) - 1)
+        start = schedule.accrual_start[period]
+        end = schedule.payment_dates[period]
+        elapsed = (days - start).astype(int) / np.maximum((end - start).astype(int), 1)
+        accrued[row] = np.where(inside, amounts[period] * elapsed, 0.0)
+    return accrued
+
+
+def discount_cash_flows(schedule: CashFlowSchedule, day_ordinals: np.ndarray,
+                        yields: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Present value of every asset's remaining cash flows on every day.
+
+    Each flow is discounted at its asset's annually compounded yield for
+    that day; flows paid on or before the day are excluded. Days are
+    processed in blocks so (flows x block) stays below _DISCOUNT_BLOCK.
+
+    Args:
+        schedule (CashFlowSchedule): Cash flows per unit.
+        day_ordinals (array): (days,) valuation dates.
+        yields (array): (assets, days) yields as fractions.
+
+    Returns:
+        dict: (assets, days) "present_value" and "time_weighted" (sum of
+            time x discounted flow, so Macaulay duration = time_weighted /
+            present_value and dPV/dy = -time_weighted / (1 + y)).
+    """
+    assets, days = len(schedule.assets), len(day_ordinals)
+    present_value = np.zeros((assets, days))
+    time_weighted = np.zeros((assets, days))
+    flows = len(schedule.amounts)
+    if not flows or not days:
+        return {"present_value": present_value, "time_weighted": time_weighted}
+
+    block = max(1, _DISCOUNT_BLOCK // flows)
+    for start in range(0, days, block):
+        stop = min(start + block, days)
+        width = stop - start
+        tau = (schedule.ordinals[:, None] - day_ordinals[None, start:stop]) / DAYS_PER_YEAR
+        alive = tau > 0
+        tau = np.where(alive, tau, 0.0)
+        discounted = np.where(alive, schedule.amounts[:, None] *
+                              (1.0 + yields[schedule.rows, start:stop]) ** -tau, 0.0)
+        # One bincount per block: flatten (asset, day) into asset * width + day
+        index = (schedule.rows[:, None] * width + np.arange(width)[None, :]).ravel()
+        present_value[:, start:stop] = np.bincount(
+            index, discounted.ravel(), minlength=assets * width).reshape(assets, width)
+        time_weighted[:, start:stop] = np.bincount(
+            index, (discounted * tau).ravel(), minlength=assets * width).reshape(assets, width)
+    return {"present_value": present_value, "time_weighted": time_weighted}
+
+
+def loan_values(loan_session: Session, loan_ids: Sequence[str], as_of: date) -> Dict[str, np.ndarray]:
+    """
+    Per-unit value of loans on one day, on the CreditFundCashFlowEngine basis.
+
+    Returns:
+        dict: (loans,) "present_value" of the repayments still due, at the
+            contract rate, and "received", the repayments paid up to as_of.
+    """
+    loaded = load_asset_cash_flows(None, loan_session, [("Loan", loan_id) for loan_id in loan_ids])
+    schedule, day = loaded["schedule"], np.array([as_of.toordinal()])
+    discounted = discount_cash_flows(schedule, day, loaded["coupon_rates"][:, None] / 100.0)
+    return {"present_value": discounted["present_value"][:, 0], "received": schedule.received(day)[:, 0]}
+
+
+def implied_yields(schedule: CashFlowSchedule, day_ordinals: np.ndarray, prices: np.ndarray,
+                   initial: np.ndarray, iterations: int = NEWTON_ITERATIONS) -> np.ndarray:
+    """
+    Yields that reprice every asset to its (dirty) price on every day.
+
+    All (asset, day) cells take Newton steps together; cells without a
+    price, or whose remaining flows are worth nothing, keep the initial
+    yield.
+
+    Args:
+        prices (array): (assets, days) dirty prices (clean close plus
+            accrued interest), NaN where unknown.
+        initial (array): (assets, days) starting and fallback yields.
+
+    Returns:
+        array: (assets, days) yields as fractions.
+    """
+    yields = initial.copy()
+    solvable = np.isfinite(prices) & (prices > 0)
+    for _ in range(iterations):
+        discounted = discount_cash_flows(schedule, day_ordinals, yields)
+        value, slope = discounted["present_value"], discounted["time_weighted"]
+        solvable &= value > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = (value - prices) * (1.0 + yields) / slope
+        step = np.where(solvable & np.isfinite(step), step, 0.0)
+        yields = np.clip(yields + step, -0.5, 2.0)
+        if np.abs(step).max(initial=0.0) < 1e-10:
+            break
+    return yields
+
+
+def rolling_volatility(log_returns: np.ndarray, window: int = VOLATILITY_WINDOW,
+                       risk_free_rate: float = 4.0) -> Dict[str, np.ndarray]:
+    """
+    Trailing annualised volatility and Sharpe ratio of daily log returns.
+
+    Matches the incremental EOD state: population variance of the last
+    window returns, NaN returns ignored.
+
+    Returns:
+        dict: (funds, days) "volatility" (percent) and "sharpe_ratio".
+    """
+    valid = np.isfinite(log_returns)
+    values = np.where(valid, log_returns, 0.0)
+
+    def trailing(array):
+        total = np.cumsum(array, axis=1)
+        total[:, window:] = total[:, window:] - total[:, :-window]
+        return total
+
+    count = trailing(valid.astype(float))
+    mean = trailing(values) / np.maximum(count, 1.0)
+    variance = np.maximum(trailing(values ** 2) / np.maximum(count, 1.0) - mean ** 2, 0.0)
+    volatility = np.where(count > 1, np.sqrt(variance * DAYS_PER_YEAR) * 100.0, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (mean * DAYS_PER_YEAR * 100.0 - risk_free_rate) / volatility
+    return {"volatility": volatility, "sharpe_ratio": sharpe}
+
+
+class CreditFundCashFlowEngine:
+    """
+    Daily NAV, yield and duration of credit funds from their holdings' cash flows.
+
+    Every fund buys its CreditFundHoldings weights on its first day
+    (inception or start_date, whichever is later). Bonds and loans are
+    valued by discounting their remaining coupons, principal and
+    repayments: bonds at the yield implied by their close price plus
+    accrued interest (coupon rate before their first close), loans at their contract rate. Stocks
+    are marked to their closes, cash and other holdings are held at cost,
+    and cash flows received are kept as cash. The expense ratio accrues
+    daily. With exchange rates, funds are valued in DEFAULT_CURRENCY:
+    present values and closes convert at each day's rate and cash flows at
+    their payment date's rate.
+
+    A fund's first-day NAV is its stored CreditFundHistoricalData NAV on
+    or before that day, so re-running a window reproduces it; funds
+    without history start from total_assets, then net_asset_value.
+    CreditFund.net_asset_value is rolled forward only by the end-of-day
+    valuation (valuation.incremental), never here.
+
+    Args:
+        fund_session (Session): Session on the credit fund database.
+        bond_session (Session, optional): Session on the bond database.
+        loan_session (Session, optional): Session on the loan database.
+        stock_session (Session, optional): Session on the stock database.
+        base_nav (float): Starting NAV for funds without history, total_assets
+            or net_asset_value.
+        risk_free_rate (float): Annual rate in percent for the Sharpe ratio.
+        fx_rates (CrossRateCache, optional): Exchange rates; when given,
+            holdings in other currencies are converted into DEFAULT_CURRENCY.
+    """
+
+    def __init__(self, fund_session: Session, bond_session: Optional[Session] = None,
+                 loan_session: Optional[Session] = None, stock_session: Optional[Session] = None,
+                 base_nav: float = DEFAULT_BASE_NAV, risk_free_rate: float = 4.0,
+                 fx_rates: Optional[Any] = None):
+        self.fund_session = fund_session
+        self.bond_session = bond_session
+        self.loan_session = loan_session
+        self.stock_session = stock_session
+        self.base_nav = base_nav
+        self.risk_free_rate = risk_free_rate
+        self.fx_rates = fx_rates
+
+    def load_funds(self, fund_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        query = self.fund_session.query(CreditFund)
+        if fund_ids is not None:
+            query = query.filter(CreditFund.fund_id.in_(list(fund_ids)))
+        funds = query.order_by(CreditFund.fund_id).all()
+        ids = [fund.fund_id for fund in funds]
+        holdings = []
+        for start in range(0, len(ids), _IN_CHUNK):
+            holdings += self.fund_session.query(
+                CreditFundHoldings.fund_id, CreditFundHoldings.asset_type,
+                CreditFundHoldings.asset_id, CreditFundHoldings.weight
+            ).filter(CreditFundHoldings.fund_id.in_(ids[start:start + _IN_CHUNK])).all()
+        return {"funds": funds, "holdings": holdings}
+
+    def load_start_navs(self, fund_ids: Sequence[int], first_days: Sequence[date]) -> Dict[int, float]:
+        """
+        Latest stored NAV on or before each fund's first day, one query per
+        distinct first day and chunk of funds.
+        """
+        by_day: Dict[date, List[int]] = {}
+        for fund_id, day in zip(fund_ids, first_days):
+            by_day.setdefault(day, []).append(fund_id)
+
+        navs = {}
+        history = CreditFundHistoricalData
+        for day, ids in by_day.items():
+            for start in range(0, len(ids), _IN_CHUNK):
+                latest = self.fund_session.query(
+                    history.fund_id, func.max(history.date).label("date")
+                ).filter(history.fund_id.in_(ids[start:start + _IN_CHUNK]), history.date <= day,
+                         history.nav.isnot(None)).group_by(history.fund_id).subquery()
+                for fund_id, nav in self.fund_session.query(history.fund_id, history.nav).join(
+                        latest, (history.fund_id == latest.c.fund_id) & (history.date == latest.c.date)).all():
+                    navs[fund_id] = float(nav)
+        return navs
+
+    def run(self, start_date: date, end_date: date,
+            fund_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """
+        Value the funds on every calendar day from start_date to end_date.
+
+        Returns:
+            dict: "fund_ids", "dates", (funds, days) arrays "nav",
+                "yield_to_maturity" and "average_duration" (value-weighted
+                over bonds, loans and cash, cash at zero), "return_percentage"
+                (daily), "volatility", "sharpe_ratio", "expense_ratio"
+                (funds,), and the aggregated "cash_flows": fund-level
+                (funds, payment dates) flows received from the holdings.
+        """
+        if end_date < start_date:
+            raise ValueError(f"end_date {end_date} is before start_date {start_date}")
+        with stage_timer("credit_fund", "cash_flow_load"):
+            loaded = self.load_funds(fund_ids)
+            funds, holdings = loaded["funds"], loaded["holdings"]
+            fund_ids = [fund.fund_id for fund in funds]
+            fund_index = {fund_id: i for i, fund_id in enumerate(fund_ids)}
+
+            day_ordinals = np.arange(start_date.toordinal(), end_date.toordinal() + 1)
+            dates = [date.fromordinal(int(o)) for o in day_ordinals]
+            first = np.array([max(fund.inception_date or start_date, start_date).toordinal()
+                              for fund in funds], dtype=np.int64) - day_ordinals[0]
+            first = np.clip(first, 0, len(dates))
+
+            flow_assets = sorted({(h.asset_type, h.asset_id) for h in holdings
+                                  if h.asset_type in CASH_FLOW_ASSET_TYPES})
+            market_assets = sorted({(h.asset_type, h.asset_id) for h in holdings
+                                    if h.asset_type in MARKET_ASSET_TYPES})
+            loaded_flows = load_asset_cash_flows(self.bond_session, self.loan_session, flow_assets)
+            schedule = loaded_flows["schedule"]
+
+        with stage_timer("credit_fund", "discounting"):
+            # Bond closes on the calendar grid (latest close on or before each day)
+            bond_rows = [i for i, (kind, _) in enumerate(flow_assets) if kind == "Bond"]
+            prices = np.full((len(flow_assets), len(dates)), np.nan)
+            if bond_rows and self.bond_session is not None:
+                closes = load_close_matrix({"Bond": self.bond_session},
+                                           [flow_assets[i] for i in bond_rows])
+                if len(closes["ordinals"]):
+                    column = np.searchsorted(closes["ordinals"], day_ordinals, side="right") - 1
+                    prices[bond_rows] = np.where(column >= 0, closes["closes"][:, np.maximum(column, 0)], np.nan)
+
+            contract = np.repeat(loaded_flows["coupon_rates"][:, None] / 100.0, len(dates), axis=1)
+            yields = contract.copy()
+            if bond_rows:
+                # Closes are clean; the discounted flows are worth the dirty price
+                dirty = prices + accrued_interest(loaded_flows["coupon_schedules"], len(flow_assets),
+                                                  day_ordinals)
+                yields[bond_rows] = implied_yields(schedule.subset(bond_rows), day_ordinals,
+                                                   dirty[bond_rows], contract[bond_rows])
+            discounted = discount_cash_flows(schedule, day_ordinals, yields)
+            present_value = discounted["present_value"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                modified_duration = np.where(present_value > 0, discounted["time_weighted"] /
+                                             present_value / (1.0 + yields), 0.0)
+
+            market = np.full((len(market_assets), len(dates)), np.nan)
+            if market_assets and self.stock_session is not None:
+                closes = load_close_matrix({"Stock": self.stock_session}, market_assets)
+                if len(closes["ordinals"]):
+                    column = np.searchsorted(closes["ordinals"], day_ordinals, side="right") - 1
+                    market = np.where(column >= 0, closes["closes"][:, np.maximum(column, 0)], np.nan)
+
+            if self.fx_rates is not None:
+                # Value in DEFAULT_CURRENCY; flows convert on their payment dates
+                price_sessions = {"Bond": self.bond_session, "Loan": self.loan_session,
+                                  "Stock": self.stock_session}
+                flow_currencies = load_asset_currencies(price_sessions, flow_assets)
+                converter = FXConverter(self.fx_rates, day_ordinals)
+                present_value = converter.convert(present_value, flow_currencies, DEFAULT_CURRENCY)
+                market = converter.convert(market, load_asset_currencies(price_sessions, market_assets),
+                                           DEFAULT_CURRENCY)
+                schedule = schedule.converted(FXConverter(self.fx_rates, schedule.ordinals),
+                                              flow_currencies, DEFAULT_CURRENCY)
+            received = schedule.received(day_ordinals)
+
+        with stage_timer("credit_fund", "fund_nav"):
+            first_days = [max(fund.inception_date or start_date, start_date) for fund in funds]
+            stored = self.load_start_navs(fund_ids, first_days)
+            base = np.array([stored.get(fund.fund_id) or float(fund.total_assets or fund.net_asset_value or
+                                                                self.base_nav) for fund in funds])
+            flow_index = {asset: i for i, asset in enumerate(flow_assets)}
+            market_index = {asset: i for i, asset in enumerate(market_assets)}
+            allocation_flow = np.zeros((len(fund_ids), len(flow_assets)))
+            allocation_market = np.zeros((len(fund_ids), len(market_assets)))
+            cash = np.zeros(len(fund_ids))
+            at_cost = np.zeros(len(fund_ids))
+            for h in holdings:
+                f = fund_index[h.fund_id]
+                amount = float(h.weight or 0.0) / 100.0 * base[f]
+                asset = (h.asset_type, h.asset_id)
+                if asset in flow_index:
+                    allocation_flow[f, flow_index[asset]] += amount
+                elif asset in market_index:
+                    allocation_market[f, market_index[asset]] += amount
+                elif h.asset_type in CASH_ASSET_TYPES:
+                    cash[f] += amount
+                else:
+                    at_cost[f] += amount
+            # Unweighted remainder stays in cash
+            cash += base - allocation_flow.sum(axis=1) - allocation_market.sum(axis=1) - cash - at_cost
+
+            live = first < len(dates)
+            start_column = np.minimum(first, len(dates) - 1)
+            entry_value = present_value[:, start_column].T
+            entry_price = market[:, start_column].T
+            with np.errstate(divide="ignore", invalid="ignore"):
+                units_flow = np.where(entry_value > 0, allocation_flow / entry_value, 0.0)
+                units_market = np.where(np.isfinite(entry_price) & (entry_price > 0),
+                                        allocation_market / entry_price, 0.0)
+            # Holdings without a value on the first day are kept as cash
+            cash += (allocation_flow * (units_flow == 0)).sum(axis=1) + \
+                (allocation_market * (units_market == 0)).sum(axis=1)
+
+            received_at_entry = (units_flow * received[:, start_column].T).sum(axis=1)
+            fund_cash = cash[:, None] + units_flow @ received - received_at_entry[:, None]
+            fixed_income = units_flow @ present_value
+            gross = fixed_income + fund_cash + units_market @ np.nan_to_num(market) + at_cost[:, None]
+
+            expense_ratio = np.array([float(fund.expense_ratio or 0.0) for fund in funds])
+            elapsed = np.arange(len(dates))[None, :] - first[:, None]
+            nav = gross * np.exp(-expense_ratio[:, None] / 100.0 / DAYS_PER_YEAR * np.maximum(elapsed, 0))
+            nav = np.where((elapsed >= 0) & live[:, None], nav, np.nan)
+
+            income_base = fixed_income + fund_cash
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ytm = units_flow @ (present_value * yields) / income_base * 100.0
+                duration = units_flow @ (present_value * modified_duration) / income_base
+                log_returns = np.log(nav[:, 1:] / nav[:, :-1])
+            log_returns = np.concatenate([np.full((len(fund_ids), 1), np.nan), log_returns], axis=1)
+            statistics = rolling_volatility(log_returns, risk_free_rate=self.risk_free_rate)
+
+            grid = schedule.on_grid()
+            fund_flows = units_flow @ grid["flows"]
+
+        ROWS_GENERATED.inc(int(np.isfinite(nav).sum()), asset="credit_fund", kind="daily")
+        return {
+            "fund_ids": fund_ids,
+            "dates": dates,
+            "nav": nav,
+            "total_assets": gross,
+            "expense_ratio": expense_ratio,
+            "yield_to_maturity": np.where(np.isfinite(nav), ytm, np.nan),
+            "average_duration": np.where(np.isfinite(nav), duration, np.nan),
+            "return_percentage": np.expm1(log_returns) * 100.0,
+            "volatility": statistics["volatility"],
+            "sharpe_ratio": statistics["sharpe_ratio"],
+            "cash_flows": {"dates": grid["dates"], "flows": fund_flows},
+        }
+
+    def historical_records(self, result: Dict[str, Any], first: int = 0,
+                           count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        CreditFundHistoricalData rows for result["fund_ids"][first:first + count].
+        """
+        stop = len(result["fund_ids"]) if count is None else first + count
+
+        def rounded(values):
+            return [round(float(v), 2) if np.isfinite(v) else None for v in values]
+
+        records = []
+        for i in range(first, min(stop, len(result["fund_ids"]))):
+            nav = result["nav"][i]
+            columns = {
+                "nav": rounded(nav),
+                "total_assets": rounded(np.where(np.isfinite(nav), result["total_assets"][i], np.nan)),
+                "yield_to_maturity": rounded(result["yield_to_maturity"][i]),
+                "average_duration": rounded(result["average_duration"][i]),
+                "return_percentage": rounded(result["return_percentage"][i]),
+                "volatility": rounded(result["volatility"][i]),
+                "sharpe_ratio": rounded(result["sharpe_ratio"][i]),
+            }
+            expense_ratio = round(float(result["expense_ratio"][i]), 2)
+            records += [{
+                "fund_id": result["fund_ids"][i],
+                "date": day,
+                "expense_ratio": expense_ratio,
+                **{column: values[t] for column, values in columns.items()}
+            } for t, day in enumerate(result["dates"]) if columns["nav"][t] is not None]
+        return records
+
+    def write(self, result: Dict[str, Any], funds_per_batch: int = 100) -> int:
+        """
+        Replace the computed funds' CreditFundHistoricalData over the result's
+        dates and roll CreditFund's YTM and duration to the last day.
+
+        Returns:
+            int: Number of CreditFundHistoricalData rows written.
+        """
+        fund_ids, dates = result["fund_ids"], result["dates"]
+        for start in range(0, len(fund_ids), _IN_CHUNK):
+            self.fund_session.query(CreditFundHistoricalData).filter(
+                CreditFundHistoricalData.fund_id.in_(fund_ids[start:start + _IN_CHUNK]),
+                CreditFundHistoricalData.date >= dates[0],
+                CreditFundHistoricalData.date <= dates[-1]
+            ).delete(synchronize_session=False)
+
+        written = 0
+        for first in range(0, len(fund_ids), funds_per_batch):
+            records = self.historical_records(result, first, funds_per_batch)
+            if records:
+                self.fund_session.execute(CreditFundHistoricalData.__table__.insert(), records)
+                written += len(records)
+
+        latest = [{
+            "id": fund_id,
+            "ytm": round(float(result["yield_to_maturity"][i, -1]), 2),
+            "duration": round(float(result["average_duration"][i, -1]), 2),
+        } for i, fund_id in enumerate(fund_ids) if np.isfinite(result["nav"][i, -1])]
+        if latest:
+            self.fund_session.execute(
+                CreditFund.__table__.update()
+                .where(CreditFund.__table__.c.fund_id == bindparam("id"))
+                .values(yield_to_maturity=bindparam("ytm"),
+                        average_duration=bindparam("duration"), historical_data_end_date=dates[-1]),
+                latest
+            )
+        self.fund_session.commit()
+        ROWS_WRITTEN.inc(written, asset="credit_fund", table="credit_fund_historical_data")
+        return written
+
+
+def update_credit_fund_history(start_date: date, end_date: Optional[date] = None,
+                               fund_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    """
+    Recompute and store CreditFundHistoricalData from the bond, loan and stock databases.
+
+    Returns:
+        dict: Engine result plus "rows_written".
+    """
+    end_date = end_date or date.today()
+    fx_rates = load_fx_rates()
+    fund_engine = create_engine(CREDIT_FUND_DATABASE_URL)
+    Base.metadata.create_all(fund_engine)
+    fund_session = sessionmaker(bind=fund_engine)()
+    sessions = [sessionmaker(bind=create_engine(url))()
+                for url in (BONDS_DATABASE_URL, LOAN_DATABASE_URL, STOCKS_DATABASE_URL)]
+    try:
+        engine = CreditFundCashFlowEngine(fund_session, *sessions, fx_rates=fx_rates)
+        result = engine.run(start_date, end_date, fund_ids)
+        with stage_timer("credit_fund", "db_write"):
+            result["rows_written"] = engine.write(result)
+    finally:
+        fund_session.close()
+        for session in sessions:
+            session.close()
+
+    print(f"Credit fund history computed for {len(result['fund_ids'])} funds "
+          f"over {len(result['dates'])} days")
+    return result
@@ -0,0 +1,561 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: simulation.py
+
+Relative Path: src/assets/currency/simulation.py
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.currency.model import (
+    Base, Currency, CurrencyFundamentals, CurrencyVolatility, ExchangeRate, IntradayCurrencyData
+)
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+
+CURRENCY_DATABASE_URL = "sqlite:///data/currency.db"
+# Every rate is stored as the price of one unit of the currency in the numeraire
+NUMERAIRE = "USD"
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_HISTORY_DAYS = 365
+INTRADAY_TICKS_PER_DAY = 96
+
+# iso, name, symbol, country, USD per unit, annual volatility, policy rate %,
+# inflation %, region, loading on the dollar factor, loading on the region factor,
+# daily turnover (USD bn)
+DEFAULT_CURRENCIES = [
+    ("USD", "US Dollar", "$", "United States", 1.0, 0.0, 5.25, 3.1, "Dollar", 0.0, 0.0, 0),
+    ("EUR", "Euro", "€", "Euro Area", 1.08, 0.075, 4.00, 2.6, "Europe", 0.65, 0.55, 2200),
+    ("GBP", "Pound Sterling", "£", "United Kingdom", 1.27, 0.085, 5.00, 3.9, "Europe", 0.60, 0.45, 960),
+    ("CHF", "Swiss Franc", "CHF", "Switzerland", 1.12, 0.080, 1.50, 1.4, "Europe", 0.55, 0.50, 390),
+    ("SEK", "Swedish Krona", "kr", "Sweden", 0.095, 0.100, 3.75, 4.0, "Europe", 0.55, 0.55, 150),
+    ("NOK", "Norwegian Krone", "kr", "Norway", 0.093, 0.110, 4.50, 4.5, "Commodity", 0.55, 0.45, 110),
+    ("JPY", "Japanese Yen", "¥", "Japan", 0.0067, 0.100, 0.10, 2.8, "Asia", 0.45, 0.35, 1250),
+    ("CNY", "Chinese Yuan", "¥", "China", 0.138, 0.040, 3.45, 0.2, "Asia", 0.50, 0.40, 530),
+    ("HKD", "Hong Kong Dollar", "HK$", "Hong Kong", 0.128, 0.005, 5.75, 2.0, "Asia", 0.10, 0.10, 190),
+    ("SGD", "Singapore Dollar", "S$", "Singapore", 0.74, 0.050, 3.70, 3.6, "Asia", 0.60, 0.45, 140),
+    ("KRW", "South Korean Won", "₩", "South Korea", 0.00075, 0.090, 3.50, 2.7, "Emerging", 0.50, 0.45, 120),
+    ("INR", "Indian Rupee", "₹", "India", 0.012, 0.050, 6.50, 5.1, "Emerging", 0.35, 0.35, 110),
+    ("CAD", "Canadian Dollar", "C$", "Canada", 0.74, 0.070, 5.00, 3.1, "Commodity", 0.45, 0.45, 450),
+    ("AUD", "Australian Dollar", "A$", "Australia", 0.66, 0.105, 4.35, 4.1, "Commodity", 0.55, 0.55, 490),
+    ("NZD", "New Zealand Dollar", "NZ$", "New Zealand", 0.61, 0.110, 5.50, 4.7, "Commodity", 0.55, 0.55, 100),
+    ("BRL", "Brazilian Real", "R$", "Brazil", 0.20, 0.150, 11.75, 4.6, "Emerging", 0.40, 0.50, 60),
+    ("MXN", "Mexican Peso", "Mex$", "Mexico", 0.058, 0.120, 11.25, 4.7, "Emerging", 0.40, 0.50, 140),
+    ("ZAR", "South African Rand", "R", "South Africa", 0.053, 0.160, 8.25, 5.4, "Emerging", 0.45, 0.50, 70),
+]
+
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+
+def _to_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _to_day(value: Union[date, datetime, np.datetime64]) -> np.datetime64:
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[D]")
+    return np.datetime64(_to_date(value), "D")
+
+
+def trading_days(start_date: date, end_date: date) -> np.ndarray:
+    """
+    Weekdays from start_date to end_date inclusive, as datetime64[D].
+    """
+    days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+    return days[np.is_busday(days)]
+
+
+def factor_correlation(regions: Sequence[str], dollar_loadings: Sequence[float],
+                       region_loadings: Sequence[float]) -> np.ndarray:
+    """
+    Correlation of log returns from a dollar factor plus one factor per region.
+
+    Every currency loads on the common dollar factor and on its region's
+    factor; the rest is idiosyncratic. The result is positive
+    semi-definite by construction, so it always has a Cholesky factor
+    once the numeraire (zero volatility) is excluded.
+    """
+    dollar = np.asarray(dollar_loadings, dtype=float)
+    regional = np.asarray(region_loadings, dtype=float)
+    regions = np.asarray(regions)
+    same_region = regions[:, None] == regions[None, :]
+    correlation = np.outer(dollar, dollar) + np.outer(regional, regional) * same_region
+    np.fill_diagonal(correlation, 1.0)
+    return np.clip(correlation, -1.0, 1.0)
+
+
+class CrossRateCache:
+    """
+    Exchange rates of every currency against the numeraire on every date.
+
+    Only N rates per date are kept (dates x currencies, in numeraire per
+    unit); any cross rate is the ratio of two entries of a date's vector,
+    so N^2 pairs are never stored. Lookups for dates without a fixing
+    (weekends, holidays) use the latest earlier date.
+
+    Args:
+        dates (array): Sorted datetime64[D] dates, one per row.
+        currencies (list): ISO codes, one per column.
+        rates (array): (dates, currencies) numeraire per unit of currency.
+        numeraire (str): Currency the rates are quoted in.
+    """
+
+    def __init__(self, dates: np.ndarray, currencies: Sequence[str], rates: np.ndarray,
+                 numeraire: str = NUMERAIRE):
+        currencies = list(currencies)
+        if numeraire not in currencies:
+            currencies.append(numeraire)
+            rates = np.column_stack([rates, np.ones(len(dates))])
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.currencies = currencies
+        self.index = {iso: i for i, iso in enumerate(currencies)}
+        self.rates = np.asarray(rates, dtype=float)
+        self.numeraire = numeraire
+        self.dates.setflags(write=False)
+        self.rates.setflags(write=False)
+
+    def __contains__(self, iso_code: str) -> bool:
+        return iso_code in self.index
+
+    def rows(self, dates: Any) -> np.ndarray:
+        """
+        Row of the latest fixing on or before each date.
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        rows = np.searchsorted(self.dates, dates, side="right") - 1
+        if np.any(rows < 0):
+            raise KeyError(f"No exchange rates on or before {dates.min()}")
+        return rows
+
+    def columns(self, currencies: Sequence[str]) -> np.ndarray:
+        missing = [iso for iso in currencies if iso not in self.index]
+        if missing:
+            raise KeyError(f"No exchange rates for {', '.join(sorted(set(missing)))}")
+        return np.array([self.index[iso] for iso in currencies], dtype=int)
+
+    def vector(self, day: Union[date, datetime, np.datetime64]) -> np.ndarray:
+        """
+        Numeraire per unit of every currency on one date.
+        """
+        return self.rates[self.rows(_to_day(day))]
+
+    def cross_rate(self, iso_code: str, base_currency: str, day: Union[date, datetime, np.datetime64]) -> float:
+        """
+        Units of base_currency per unit of iso_code on one date.
+        """
+        vector = self.vector(day)
+        return float(vector[self.index[iso_code]] / vector[self.index[base_currency]])
+
+    def cross_matrix(self, day: Union[date, datetime, np.datetime64]) -> np.ndarray:
+        """
+        Every cross rate on one date: entry [i, j] is units of currency j
+        per unit of currency i.
+        """
+        vector = self.vector(day)
+        return vector[:, None] / vector[None, :]
+
+    def matrix(self, dates: Any, currencies: Sequence[str], base_currency: Optional[str] = None) -> np.ndarray:
+        """
+        (dates, currencies) units of base_currency per unit of each currency.
+        """
+        base_currency = base_currency or self.numeraire
+        selected = self.rates[np.ix_(self.rows(dates), self.columns(currencies))]
+        if base_currency == self.numeraire:
+            return selected
+        return selected / self.rates[self.rows(dates), self.index[base_currency]][:, None]
+
+    @classmethod
+    def from_session(cls, session: Session, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None, numeraire: str = NUMERAIRE) -> "CrossRateCache":
+        """
+        Load stored ExchangeRate rows quoted in the numeraire with one query.
+
+        Each currency's rate is carried forward over dates it has no row for.
+        """
+        query = session.query(ExchangeRate.date, ExchangeRate.iso_code, ExchangeRate.rate).filter(
+            ExchangeRate.base_currency == numeraire)
+        if start_date is not None:
+            query = query.filter(ExchangeRate.date >= start_date)
+        if end_date is not None:
+            query = query.filter(ExchangeRate.date <= end_date)
+        rows = query.all()
+        if not rows:
+            raise ValueError(f"No exchange rates quoted in {numeraire}")
+
+        currencies = sorted({iso for _, iso, _ in rows})
+        column = {iso: i for i, iso in enumerate(currencies)}
+        epoch = date(1970, 1, 1).toordinal()
+        ordinals = np.fromiter((day.toordinal() - epoch for day, _, _ in rows), dtype=np.int64, count=len(rows))
+        dates, row_index = np.unique(ordinals, return_inverse=True)
+        rates = np.full((len(dates), len(currencies)), np.nan)
+        rates[row_index.ravel(), [column[iso] for _, iso, _ in rows]] = [float(rate) for _, _, rate in rows]
+
+        # Forward fill gaps per currency
+        filled = np.where(np.isnan(rates), 0, np.arange(len(dates))[:, None])
+        rates = rates[np.maximum.accumulate(filled, axis=0), np.arange(len(currencies))]
+        return cls(dates.astype("datetime64[D]"), currencies, rates, numeraire)
+
+
+_RATE_CACHE: Dict[Tuple[Any, ...], CrossRateCache] = {}
+
+
+def load_cross_rates(session: Session, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                     numeraire: str = NUMERAIRE) -> CrossRateCache:
+    """
+    CrossRateCache over the stored rates, cached per window.
+
+    The cache key includes the row count and highest ExchangeRate id, so
+    newly simulated rates rebuild the matrix on the next call.
+    """
+    key = (
+        str(session.get_bind().url), start_date, end_date, numeraire,
+        session.query(func.count(ExchangeRate.id), func.max(ExchangeRate.id)).one(),
+    )
+    cache = _RATE_CACHE.get(key)
+    if cache is None:
+        cache = CrossRateCache.from_session(session, start_date, end_date, numeraire)
+        _RATE_CACHE.clear()
+        _RATE_CACHE[key] = cache
+    return cache
+
+
+class FXSimulator:
+    """
+    Correlated simulation of every currency against one numeraire.
+
+    Log rates follow a multivariate GBM whose drift is the interest-rate
+    differential (uncovered interest parity: high-yield currencies are
+    expected to depreciate by their carry) and whose shocks are drawn for
+    all currencies and dates at once through the Cholesky factor of the
+    covariance matrix.
+
+    Args:
+        currencies (list): ISO codes; the numeraire is held at 1.
+        initial_rates (array): Numeraire per unit on the day before the first date.
+        volatilities (array): Annualised volatility of each log rate.
+        interest_rates (array): Policy rates in percent.
+        correlation (array): (N, N) correlation of log returns.
+        numeraire (str): Quote currency.
+        seed (int, optional): Seed for reproducible paths.
+    """
+
+    def __init__(self, currencies: Sequence[str], initial_rates: np.ndarray, volatilities: np.ndarray,
+                 interest_rates: np.ndarray, correlation: np.ndarray, numeraire: str = NUMERAIRE,
+                 seed: Optional[int] = None):
+        self.currencies = list(currencies)
+        self.initial_rates = np.asarray(initial_rates, dtype=float)
+        self.volatilities = np.asarray(volatilities, dtype=float)
+        self.interest_rates = np.asarray(interest_rates, dtype=float) / 100.0
+        self.correlation = np.asarray(correlation, dtype=float)
+        self.numeraire = numeraire
+        self.rng = np.random.default_rng(seed)
+
+        floating = np.array([iso != numeraire for iso in self.currencies])
+        self.volatilities = np.where(floating, self.volatilities, 0.0)
+        numeraire_rate = self.interest_rates[~floating][0] if (~floating).any() else 0.0
+        self.drift = np.where(floating, numeraire_rate - self.interest_rates - 0.5 * self.volatilities ** 2, 0.0)
+        covariance = self.correlation * np.outer(self.volatilities, self.volatilities)
+        # Jitter keeps the factor defined for the zero-volatility numeraire
+        self.cholesky = np.linalg.cholesky(covariance + np.eye(len(self.currencies)) * 1e-14)
+
+    def simulate(self, dates: np.ndarray) -> np.ndarray:
+        """
+        (dates, currencies) rates in the numeraire; consecutive dates are
+        one trading day apart.
+        """
+        dt = 1.0 / TRADING_DAYS_PER_YEAR
+        shocks = self.rng.standard_normal((len(dates), len(self.currencies))) @ self.cholesky.T
+        log_returns = self.drift[None, :] * dt + shocks * np.sqrt(dt)
+        ROWS_GENERATED.inc(log_returns.size, asset="currency", kind="exchange_rate")
+        return self.initial_rates[None, :] * np.exp(np.cumsum(log_returns, axis=0))
+
+    def intraday(self, dates: np.ndarray, closes: np.ndarray, previous: np.ndarray,
+                 ticks: int = INTRADAY_TICKS_PER_DAY) -> np.ndarray:
+        """
+        (dates, currencies, ticks) round-the-clock prices bridging each
+        previous close to the day's close with the day's volatility.
+        """
+        s = np.linspace(0.0, 1.0, ticks + 1)[1:]
+        dt = 1.0 / (TRADING_DAYS_PER_YEAR * ticks)
+        walk = np.cumsum(self.rng.standard_normal((len(dates), len(self.currencies), ticks)), axis=2)
+        bridge = (walk - s * walk[:, :, -1:]) * np.sqrt(dt) * self.volatilities[None, :, None]
+        start, end = np.log(previous), np.log(closes)
+        return np.exp(start[:, :, None] + (end - start)[:, :, None] * s + bridge)
+
+
+def volatility_records(currencies: Sequence[str], rates: np.ndarray, dates: np.ndarray,
+                       numeraire: str = NUMERAIRE) -> List[Dict[str, Any]]:
+    """
+    CurrencyVolatility rows over the simulated window.
+
+    Beta is measured against an equal-weighted index of all floating
+    currencies; value at risk is the 95% one-day loss as a fraction of
+    the rate.
+    """
+    returns = np.diff(np.log(rates), axis=0)
+    floating = np.array([iso != numeraire for iso in currencies])
+    if len(returns) < 2 or not floating.any():
+        return []
+    index = returns[:, floating].mean(axis=1)
+    centred = returns - returns.mean(axis=0)
+    index_centred = index - index.mean()
+    beta = centred.T @ index_centred / max(float(index_centred @ index_centred), 1e-18)
+    std = returns.std(axis=0, ddof=1)
+    var = -np.percentile(returns, 5, axis=0)
+    start, end = dates[0].astype(object), dates[-1].astype(object)
+    return [{
+        "iso_code": iso,
+        "standard_deviation": round(float(std[i]), 6),
+        "beta": round(float(beta[i]), 6),
+        "value_at_risk": round(float(max(var[i], 0.0)), 6),
+        "historical_data_start_date": start,
+        "historical_data_end_date": end,
+    } for i, iso in enumerate(currencies) if floating[i]]
+
+
+def exchange_rate_records(currencies: Sequence[str], dates: np.ndarray, rates: np.ndarray,
+                          previous: np.ndarray, inflation: np.ndarray, volumes: np.ndarray,
+                          numeraire: str = NUMERAIRE) -> List[Dict[str, Any]]:
+    """
+    ExchangeRate rows for every (date, floating currency).
+
+    The adjusted rate deflates by the inflation differential since the
+    first date (a real exchange rate); the daily change is against the
+    previous fixing.
+    """
+    full = np.vstack([previous[None, :], rates])
+    change = (full[1:] / full[:-1] - 1.0) * 100.0
+    years = (dates - dates[0]).astype(int)[:, None] / 365.0
+    numeraire_inflation = inflation[currencies.index(numeraire)] / 100.0 if numeraire in currencies else 0.0
+    deflator = ((1.0 + inflation[None, :] / 100.0) / (1.0 + numeraire_inflation)) ** years
+    adjusted = rates * deflator
+
+    floating = [i for i, iso in enumerate(currencies) if iso != numeraire]
+    day_values = dates.astype(object).tolist()
+    records = []
+    for i in floating:
+        iso = currencies[i]
+        records.extend({
+            "iso_code": iso,
+            "base_currency": numeraire,
+            "date": day,
+            "rate": rate,
+            "adjusted_rate": adjusted_rate,
+            "daily_change_percentage": daily_change,
+            "trading_volume": volume,
+        } for day, rate, adjusted_rate, daily_change, volume in zip(
+            day_values, np.round(rates[:, i], 6).tolist(), np.round(adjusted[:, i], 6).tolist(),
+            np.round(change[:, i], 2).tolist(), volumes[:, i].tolist()))
+    return records
+
+
+def seed_currencies(session: Session, as_of: date) -> None:
+    """
+    Insert the DEFAULT_CURRENCIES and their fundamentals when the
+    currency tables are empty.
+    """
+    if session.query(func.count(Currency.iso_code)).scalar():
+        return
+    session.execute(Currency.__table__.insert(), [{
+        "iso_code": iso, "name": name, "symbol": symbol, "country": country, "type": "Fiat",
+        "market_cap": None, "historical_data_start_date": None, "historical_data_end_date": None,
+    } for iso, name, symbol, country, *_ in DEFAULT_CURRENCIES])
+    session.execute(CurrencyFundamentals.__table__.insert(), [{
+        "iso_code": iso, "interest_rate": rate, "inflation_rate": inflation,
+        "gdp_growth_rate": None, "debt_to_gdp_ratio": None, "purchasing_power_parity": None,
+        "historical_data_start_date": as_of, "historical_data_end_date": as_of,
+    } for iso, _, _, _, _, _, rate, inflation, *_ in DEFAULT_CURRENCIES])
+    session.commit()
+    ROWS_WRITTEN.inc(len(DEFAULT_CURRENCIES), asset="currency", table="currencies")
+
+
+class CurrencyEngine:
+    """
+    Simulates and stores exchange rates for every currency in the database.
+
+    Paths continue from each currency's latest stored rate (or its
+    default level), so repeated runs over later windows join up.
+
+    Args:
+        session (Session): Session on the currency database.
+        numeraire (str): Quote currency of the stored rates.
+        seed (int, optional): Seed for reproducible paths.
+    """
+
+    def __init__(self, session: Session, numeraire: str = NUMERAIRE, seed: Optional[int] = None):
+        self.session = session
+        self.numeraire = numeraire
+        self.seed = seed
+
+    def load_parameters(self, start_date: date) -> Dict[str, Any]:
+        defaults = {row[0]: row for row in DEFAULT_CURRENCIES}
+        currencies = sorted(iso for (iso,) in self.session.query(Currency.iso_code).all())
+        if self.numeraire not in currencies:
+            currencies.append(self.numeraire)
+
+        # Latest fundamentals row per currency
+        fundamentals = {}
+        for iso, interest, inflation in self.session.query(
+                CurrencyFundamentals.iso_code, CurrencyFundamentals.interest_rate,
+                CurrencyFundamentals.inflation_rate).order_by(CurrencyFundamentals.id).all():
+            fundamentals[iso] = (interest, inflation)
+
+        latest = dict(self.session.query(ExchangeRate.iso_code, func.max(ExchangeRate.date)).filter(
+            ExchangeRate.base_currency == self.numeraire, ExchangeRate.date < start_date
+        ).group_by(ExchangeRate.iso_code).all())
+        previous = {}
+        for iso, day in latest.items():
+            previous[iso] = float(self.session.query(ExchangeRate.rate).filter(
+                ExchangeRate.iso_code == iso, ExchangeRate.base_currency == self.numeraire,
+                ExchangeRate.date == day).first()[0])
+
+        # Unknown currencies get a generic emerging-market profile
+        generic = (None, None, None, None, 1.0, 0.12, 5.0, 4.0, "Other", 0.4, 0.0, 10)
+        profile = [defaults.get(iso, generic) for iso in currencies]
+
+        def stored(iso, field, fallback):
+            # A stored 0% rate is a value, not a missing one
+            value = fundamentals.get(iso, (None, None))[field]
+            return float(fallback if value is None else value)
+
+        interest = np.array([stored(iso, 0, p[6]) for iso, p in zip(currencies, profile)])
+        inflation = np.array([stored(iso, 1, p[7]) for iso, p in zip(currencies, profile)])
+        return {
+            "currencies": currencies,
+            "initial_rates": np.array([1.0 if iso == self.numeraire else previous.get(iso, p[4])
+                                       for iso, p in zip(currencies, profile)]),
+            "volatilities": np.array([p[5] for p in profile]),
+            "interest_rates": interest,
+            "inflation_rates": inflation,
+            "correlation": factor_correlation([p[8] for p in profile], [p[9] for p in profile],
+                                              [p[10] for p in profile]),
+            "turnover": np.array([p[11] for p in profile], dtype=float),
+        }
+
+    def run(self, start_date: date, end_date: date, intraday_days: int = 0) -> Dict[str, int]:
+        """
+        Simulate and store rates for trading days from start_date to end_date.
+
+        Args:
+            start_date (date): First date.
+            end_date (date): Last date.
+            intraday_days (int): Also write round-the-clock ticks for this
+                many trailing days.
+
+        Returns:
+            dict: Rows written per table.
+        """
+        start_date, end_date = _to_date(start_date), _to_date(end_date)
+        with stage_timer("currency", "init"):
+            seed_currencies(self.session, end_date)
+            parameters = self.load_parameters(start_date)
+        currencies = parameters["currencies"]
+        simulator = FXSimulator(currencies, parameters["initial_rates"], parameters["volatilities"],
+                                parameters["interest_rates"], parameters["correlation"],
+                                self.numeraire, self.seed)
+        dates = trading_days(start_date, end_date)
+        if not len(dates):
+            return {}
+
+        with stage_timer("currency", "simulate"):
+            rates = simulator.simulate(dates)
+            previous = np.vstack([parameters["initial_rates"][None, :], rates[:-1]])
+            # Turnover rises with the size of the day's move
+            moves = np.abs(np.log(rates / previous)) / np.maximum(
+                parameters["volatilities"] / np.sqrt(TRADING_DAYS_PER_YEAR), 1e-9)
+            volumes = np.rint(parameters["turnover"][None, :] * 1e9 * (0.5 + 0.5 * moves) *
+                              simulator.rng.lognormal(0.0, 0.2, rates.shape)).astype(np.int64)
+            exchange_rates = exchange_rate_records(currencies, dates, rates, parameters["initial_rates"],
+                                                   parameters["inflation_rates"], volumes, self.numeraire)
+            volatility = volatility_records(currencies, np.vstack([parameters["initial_rates"], rates]),
+                                            dates, self.numeraire)
+
+            intraday = []
+            if intraday_days:
+                window = slice(max(len(dates) - intraday_days, 0), len(dates))
+                ticks = simulator.intraday(dates[window], rates[window], previous[window])
+                tick_count = ticks.shape[2]
+                offsets = (np.arange(tick_count) * (86400 // tick_count)).astype("timedelta64[s]")
+                stamps = dates[window].astype("datetime64[s]")[:, None] + offsets
+                tick_volumes = np.rint(volumes[window][:, :, None] / tick_count *
+                                       simulator.rng.lognormal(0.0, 0.3, ticks.shape)).astype(np.int64)
+                for i, iso in enumerate(currencies):
+                    if iso == self.numeraire:
+                        continue
+                    intraday.extend({
+                        "iso_code": iso,
+                        "date": stamp.date(),
+                        "timestamp": stamp,
+                        "price": price,
+                        "volume": volume,
+                    } for stamp, price, volume in zip(
+                        stamps.ravel().astype(object).tolist(), np.round(ticks[:, i, :], 6).ravel().tolist(),
+                        tick_volumes[:, i, :].ravel().tolist()))
+                ROWS_GENERATED.inc(len(intraday), asset="currency", kind="intraday")
+
+        with stage_timer("currency", "db_write"):
+            floating = [iso for iso in currencies if iso != self.numeraire]
+            first, last = dates[0].astype(object), dates[-1].astype(object)
+            for start in range(0, len(floating), _IN_CHUNK):
+                chunk = floating[start:start + _IN_CHUNK]
+                self.session.query(ExchangeRate).filter(
+                    ExchangeRate.iso_code.in_(chunk), ExchangeRate.base_currency == self.numeraire,
+                    ExchangeRate.date >= first, ExchangeRate.date <= last
+                ).delete(synchronize_session=False)
+                self.session.query(CurrencyVolatility).filter(
+                    CurrencyVolatility.iso_code.in_(chunk),
+                    CurrencyVolatility.historical_data_start_date == first,
+                    CurrencyVolatility.historical_data_end_date == last
+                ).delete(synchronize_session=False)
+                if intraday:
+                    self.session.query(IntradayCurrencyData).filter(
+                        IntradayCurrencyData.iso_code.in_(chunk),
+                        IntradayCurrencyData.date >= intraday[0]["date"],
+                        IntradayCurrencyData.date <= last
+                    ).delete(synchronize_session=False)
+            tables = [(ExchangeRate, exchange_rates), (CurrencyVolatility, volatility),
+                      (IntradayCurrencyData, intraday)]
+            for model, rows in tables:
+                if rows:
+                    self.session.execute(model.__table__.insert(), rows)
+            self.session.query(Currency).filter(Currency.iso_code.in_(floating)).update(
+                {Currency.historical_data_end_date: last}, synchronize_session=False)
+            self.session.query(Currency).filter(
+                Currency.iso_code.in_(floating), Currency.historical_data_start_date.is_(None)
+            ).update({Currency.historical_data_start_date: first}, synchronize_session=False)
+            self.session.commit()
+
+        for model, rows in tables:
+            ROWS_WRITTEN.inc(len(rows), asset="currency", table=model.__tablename__)
+        return {model.__tablename__: len(rows) for model, rows in tables}
+
+
+def simulate_exchange_rates(start_date: Optional[date] = None, end_date: Optional[date] = None,
+                            intraday_days: int = 0, seed: Optional[int] = None) -> Dict[str, int]:
+    """
+    Simulate exchange rates into the currency database (last
+    DEFAULT_HISTORY_DAYS up to today by default).
+
+    Returns:
+        dict: Rows written per table.
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_HISTORY_DAYS - 1)
+    engine = create_engine(CURRENCY_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        summary = CurrencyEngine(session, seed=seed).run(start_date, end_date, intraday_days)
+    finally:
+        session.close()
+
+    print(f"Exchange rates simulated: {summary}")
+    return summary
@@ -0,0 +1,411 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: engine.py
+
+Relative Path: src/assets/etf/engine.py
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.bonds.model import Bond, BondHistoricalData
+from assets.etf.leveraged import DEFAULT_FINANCING_RATE, daily_reset_returns, leverage_factors
+from assets.etf.model import Base, ETF, ETFHistoricalData, ETFPerformanceMetrics, ETFUnderlyingAsset
+from assets.mutualFund.nav import (
+    BONDS_DATABASE_URL, PRICE_SOURCES, STOCKS_DATABASE_URL, compute_nav, compute_units,
+    load_close_matrix, weight_matrix
+)
+from assets.stocks.model import HistoricalData
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+from valuation.fx import FXConverter, currency_groups, load_asset_currencies, load_fx_rates
+
+ETF_DATABASE_URL = "sqlite:///data/etfs.db"
+
+# Launch price of a new ETF
+DEFAULT_BASE_PRICE = 50.0
+DEFAULT_AUM = 100_000_000.0
+DAYS_PER_YEAR = 365
+
+# Income is paid out on the first day of each quarter
+DISTRIBUTION_MONTHS = 3
+
+# Market price noise around NAV and intraday range (fractions)
+PREMIUM_VOLATILITY = 0.0005
+GAP_VOLATILITY = 0.002
+RANGE_VOLATILITY = 0.003
+# Median share of AUM traded per day
+DAILY_TURNOVER = 0.005
+
+_IN_CHUNK = 500
+
+
+def load_asset_yields(price_sessions: Dict[str, Session],
+                      assets: Sequence[Tuple[str, str]]) -> np.ndarray:
+    """
+    Annual income yield in percent per asset.
+
+    Stocks use their average HistoricalData.dividend_yield, bonds their
+    coupon over the average close (current yield).
+    """
+    yields = np.zeros(len(assets))
+    column_of = {asset: i for i, asset in enumerate(assets)}
+
+    tickers = [asset_id for kind, asset_id in assets if kind == "Stock"]
+    if tickers and "Stock" in price_sessions:
+        for start in range(0, len(tickers), _IN_CHUNK):
+            for ticker, dividend_yield in price_sessions["Stock"].query(
+                    HistoricalData.ticker, func.avg(HistoricalData.dividend_yield)
+            ).filter(HistoricalData.ticker.in_(tickers[start:start + _IN_CHUNK])) \
+                    .group_by(HistoricalData.ticker).all():
+                yields[column_of[("Stock", ticker)]] = float(dividend_yield or 0.0)
+
+    isins = [asset_id for kind, asset_id in assets if kind == "Bond"]
+    if isins and "Bond" in price_sessions:
+        for start in range(0, len(isins), _IN_CHUNK):
+            for isin, coupon_rate, face_value, close in price_sessions["Bond"].query(
+                    Bond.isin, Bond.coupon_rate, Bond.face_value, func.avg(BondHistoricalData.close_price)
+            ).join(BondHistoricalData, BondHistoricalData.isin == Bond.isin) \
+                    .filter(Bond.isin.in_(isins[start:start + _IN_CHUNK])).group_by(Bond.isin).all():
+                if close:
+                    yields[column_of[("Bond", isin)]] = \
+                        float(coupon_rate or 0.0) * float(face_value) / float(close)
+    return yields
+
+
+def _annualised_statistics(returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Mean and volatility of daily returns with NaN gaps, per row.
+    """
+    valid = np.isfinite(returns)
+    count = valid.sum(axis=1)
+    values = np.where(valid, returns, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = values.sum(axis=1) / count
+        variance = (np.where(valid, returns - mean[:, None], 0.0) ** 2).sum(axis=1) / (count - 1)
+    return {"count": count, "mean": mean, "variance": variance}
+
+
+class ETFEngine:
+    """
+    Daily prices and performance of ETFs from their underlying baskets.
+
+    Every ETF buys its ETFUnderlyingAsset weights at launch (the later of
+    its inception date and the first priced day) and holds them. The
+    basket's income accrues in cash and is distributed quarterly, and the
+    expense ratio is charged daily on NAV. The traded close is NAV plus
+    a small premium/discount; the adjusted close is back-adjusted for
+    the distributions. ETFs flagged is_leveraged / is_inverse are daily-reset
+    funds on the basket instead.
+
+    Args:
+        etf_session (Session): Session on the ETF database.
+        price_sessions (dict): asset_type -> session on its price database.
+        base_price (float): NAV per share at launch.
+        risk_free_rate (float): Annual rate in percent for Sharpe ratios.
+        financing_rate (float): Annual rate in percent for leveraged and
+            inverse ETFs' borrowing and cash (see assets.etf.leveraged).
+        seed (int, optional): Seed for the market price noise.
+        fx_rates (CrossRateCache, optional): Exchange rates; when given, the
+            basket is converted into each ETF's trading currency.
+    """
+
+    def __init__(self, etf_session: Session, price_sessions: Dict[str, Session],
+                 base_price: float = DEFAULT_BASE_PRICE, risk_free_rate: float = 4.0,
+                 financing_rate: float = DEFAULT_FINANCING_RATE, seed: Optional[int] = None,
+                 fx_rates: Optional[Any] = None):
+        self.etf_session = etf_session
+        self.fx_rates = fx_rates
+        self.price_sessions = price_sessions
+        self.base_price = base_price
+        self.risk_free_rate = risk_free_rate
+        self.financing_rate = financing_rate
+        self.rng = np.random.default_rng(seed)
+
+    def load_etfs(self, etf_ids: Optional[Sequence[str]] = None) -> Tuple[List[Any], List[Any]]:
+        """
+        ETF rows (id, inception date, trading currency, expense ratio, AUM,
+        leverage flags) and their underlying assets.
+        """
+        etfs = self.etf_session.query(ETF.etf_id, ETF.inception_date, ETF.trading_currency, ETF.expense_ratio,
+                                      ETF.assets_under_management, ETF.is_leveraged, ETF.is_inverse)
+        holdings = self.etf_session.query(
+            ETFUnderlyingAsset.etf_id.label("fund_id"), ETFUnderlyingAsset.asset_type,
+            ETFUnderlyingAsset.asset_id, ETFUnderlyingAsset.weight.label("weightage"))
+        if etf_ids is not None:
+            etfs = etfs.filter(ETF.etf_id.in_(list(etf_ids)))
+            holdings = holdings.filter(ETFUnderlyingAsset.etf_id.in_(list(etf_ids)))
+        return etfs.order_by(ETF.etf_id).all(), holdings.all()
+
+    def run(self, etf_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Price every ETF over the shared date axis.
+
+        Returns:
+            dict: "etf_ids", "dates", (etfs, dates) arrays "benchmark"
+                (basket total return index), "nav", "open", "high", "low",
+                "close", "adjusted_close", "volume" and "distributions",
+                plus "market" (dates,) equal-weighted stock returns.
+        """
+        with stage_timer("etf", "price_load"):
+            etfs, holdings = self.load_etfs(etf_ids)
+            unsupported = {h.asset_type for h in holdings} - set(PRICE_SOURCES)
+            if unsupported:
+                print(f"Skipping underlying assets without price history: {sorted(unsupported)}")
+            assets = sorted({(h.asset_type, h.asset_id) for h in holdings
+                             if h.asset_type in PRICE_SOURCES})
+            prices = load_close_matrix(self.price_sessions, assets)
+            yields = load_asset_yields(self.price_sessions, assets)
+
+        with stage_timer("etf", "nav"):
+            ids = [etf.etf_id for etf in etfs]
+            closes = prices["closes"]
+            days = closes.shape[1]
+            weights = weight_matrix(holdings, ids, assets)
+            inception = np.array([etf.inception_date.toordinal() for etf in etfs], dtype=int)
+            start_index = np.searchsorted(prices["ordinals"], inception, side="left")
+
+            # Baskets are valued in each ETF's trading currency
+            converter = None
+            if self.fx_rates is not None:
+                converter = FXConverter(self.fx_rates, prices["ordinals"])
+                asset_currencies = load_asset_currencies(self.price_sessions, assets)
+            else:
+                asset_currencies = []
+            basket = np.full((len(ids), days), np.nan)
+            income = np.zeros((len(ids), days))
+            for rows, panel in currency_groups(closes, asset_currencies,
+                                               [etf.trading_currency for etf in etfs], converter):
+                units = compute_units(panel, weights[rows], start_index[rows], self.base_price)
+                basket[rows] = compute_nav(panel, units, start_index[rows], prices["last_index"])
+                # Income accrues daily and is paid on the first day of each quarter
+                income[rows] = units @ (np.nan_to_num(panel) * yields[:, None] / 100.0) / DAYS_PER_YEAR
+            active = np.isfinite(basket)
+            income = np.where(active, income, 0.0)
+            period = np.array([(d.year * 12 + d.month - 1) // DISTRIBUTION_MONTHS
+                               for d in prices["dates"]])
+            ex_date = np.zeros(days, dtype=bool)
+            ex_date[1:] = period[1:] != period[:-1]
+            accumulated = np.cumsum(income, axis=1)
+            last_ex = np.maximum.accumulate(np.where(ex_date, np.arange(days), 0))
+            paid_through = np.where(last_ex > 0, accumulated[:, np.maximum(last_ex - 1, 0)], 0.0)
+            accrued = accumulated - paid_through
+            distributions = np.where(ex_date[None, :], np.diff(
+                paid_through, axis=1, prepend=0.0), 0.0)
+
+            # Expense ratio charged daily from launch
+            expense = np.array([float(etf.expense_ratio or 0.0) for etf in etfs]) / 100.0
+            elapsed = np.maximum(np.arange(days)[None, :] - start_index[:, None], 0)
+            cost_factor = (1.0 - expense[:, None] / DAYS_PER_YEAR) ** elapsed
+            nav = (basket + accrued) * cost_factor
+            distributions = distributions * cost_factor
+
+            # Benchmark: the basket with its income reinvested and no costs
+            growth = np.zeros(basket.shape)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                growth[:, 1:] = np.log1p((np.diff(basket, axis=1) + income[:, 1:]) / basket[:, :-1])
+            benchmark = np.where(active, self.base_price * np.exp(
+                np.cumsum(np.nan_to_num(growth), axis=1)), np.nan)
+
+            # Leveraged and inverse ETFs reset to L x the basket's total return
+            # every day and reinvest income; their benchmark is that without costs.
+            leverage = leverage_factors([etf.is_leveraged for etf in etfs],
+                                        [etf.is_inverse for etf in etfs])
+            geared = np.flatnonzero(leverage != 1.0)
+            if len(geared):
+                index_returns = np.expm1(np.nan_to_num(growth[geared]))
+                trading = np.zeros((len(geared), days), dtype=bool)
+                trading[:, 1:] = active[geared, 1:] & active[geared, :-1]
+                for target, costs, rate in ((nav, expense[geared] * 100.0, self.financing_rate),
+                                            (benchmark, 0.0, 0.0)):
+                    returns = np.where(trading, daily_reset_returns(
+                        index_returns, leverage[geared], costs, rate), 0.0)
+                    target[geared] = np.where(active[geared], self.base_price * np.cumprod(
+                        np.maximum(1.0 + returns, 0.0), axis=1), np.nan)
+                distributions[geared] = 0.0
+
+        with stage_timer("etf", "market_prices"):
+            shape = nav.shape
+            close = nav * (1.0 + self.rng.normal(0.0, PREMIUM_VOLATILITY, shape))
+            previous = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+            previous = np.where(np.isfinite(previous), previous, close)
+            open_ = previous * (1.0 + self.rng.normal(0.0, GAP_VOLATILITY, shape))
+            high = np.maximum(open_, close) * (1.0 + np.abs(self.rng.normal(0.0, RANGE_VOLATILITY, shape)))
+            low = np.minimum(open_, close) * (1.0 - np.abs(self.rng.normal(0.0, RANGE_VOLATILITY, shape)))
+
+            aum = np.array([float(etf.assets_under_management or DEFAULT_AUM) for etf in etfs])
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                volume = aum[:, None] / close * DAILY_TURNOVER * self.rng.lognormal(0.0, 0.5, shape)
+
+            # Back-adjust closes for distributions (factor = product of later ex-date drops)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                drop = np.where(distributions > 0, 1.0 - distributions / previous, 1.0)
+            drop = np.nan_to_num(drop, nan=1.0)
+            later = np.cumprod(drop[:, ::-1], axis=1)[:, ::-1]
+            factor = np.concatenate([later[:, 1:], np.ones((len(ids), 1))], axis=1)
+            adjusted_close = close * factor
+
+        stock_rows = [i for i, (kind, _) in enumerate(assets) if kind == "Stock"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stock_returns = closes[stock_rows, 1:] / closes[stock_rows, :-1] - 1.0
+            market = np.full(days, np.nan)
+            if stock_rows:
+                valid = np.isfinite(stock_returns)
+                market[1:] = np.where(valid, stock_returns, 0.0).sum(axis=0) / valid.sum(axis=0)
+
+        ROWS_GENERATED.inc(int(active.sum()), asset="etf", kind="daily")
+        return {
+            "etf_ids": ids, "dates": prices["dates"], "benchmark": benchmark, "nav": nav,
+            "open": open_, "high": high, "low": low, "close": close,
+            "adjusted_close": adjusted_close, "volume": volume,
+            "distributions": distributions, "market": market,
+        }
+
+    def performance(self, result: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Annualised return and volatility, Sharpe ratio, tracking error,
+        trailing dividend yield and beta for every ETF at once.
+
+        Returns are total returns from the adjusted close. Tracking error
+        is against the benchmark, beta against the equal-weighted stock market.
+        """
+        adjusted = result["adjusted_close"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = adjusted[:, 1:] / adjusted[:, :-1] - 1.0
+            benchmark_returns = result["benchmark"][:, 1:] / result["benchmark"][:, :-1] - 1.0
+        stats = _annualised_statistics(returns)
+        active = _annualised_statistics(returns - benchmark_returns)
+
+        market = result["market"][1:][None, :]
+        paired = np.isfinite(returns) & np.isfinite(market)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            count = paired.sum(axis=1)
+            etf_mean = np.where(paired, returns, 0.0).sum(axis=1) / count
+            market_mean = np.where(paired, market, 0.0).sum(axis=1) / count
+            covariance = np.where(paired, (returns - etf_mean[:, None]) * (market - market_mean[:, None]),
+                                  0.0).sum(axis=1)
+            market_variance = np.where(paired, (market - market_mean[:, None]) ** 2, 0.0).sum(axis=1)
+            beta = covariance / market_variance
+
+            valid = np.isfinite(adjusted)
+            first = np.argmax(valid, axis=1)
+            last = adjusted.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+            rows = np.arange(len(adjusted))
+            years = (last - first) / DAYS_PER_YEAR
+            annualized_return = ((adjusted[rows, last] / adjusted[rows, first]) ** (1.0 / years) - 1.0) * 100.0
+            annualized_volatility = np.sqrt(stats["variance"] * DAYS_PER_YEAR) * 100.0
+            sharpe_ratio = (annualized_return - self.risk_free_rate) / annualized_volatility
+            tracking_error = np.sqrt(active["variance"] * DAYS_PER_YEAR) * 100.0
+
+            # Distributions over the last year relative to the latest close
+            window = np.arange(adjusted.shape[1])[None, :] > (last - DAYS_PER_YEAR)[:, None]
+            trailing = np.where(window, result["distributions"], 0.0).sum(axis=1)
+            dividend_yield = trailing / result["close"][rows, last] * 100.0
+
+        return {
+            "annualized_return": annualized_return,
+            "annualized_volatility": annualized_volatility,
+            "sharpe_ratio": sharpe_ratio,
+            "tracking_error": tracking_error,
+            "dividend_yield": dividend_yield,
+            "beta": beta,
+        }
+
+    @staticmethod
+    def historical_records(result: Dict[str, Any], first: int = 0,
+                           count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        ETFHistoricalData rows for ETFs first .. first + count (all by default).
+        """
+        rows = slice(first, None if count is None else first + count)
+        etfs, days = np.nonzero(np.isfinite(result["close"][rows]))
+        etfs += first
+        columns = {}
+        for column, key in (("open_price", "open"), ("close_price", "close"), ("day_high", "high"),
+                            ("day_low", "low"), ("adjusted_close_price", "adjusted_close")):
+            columns[column] = np.round(result[key][etfs, days], 2).tolist()
+        volume = np.nan_to_num(result["volume"][etfs, days]).astype(np.int64).tolist()
+
+        etf_ids, dates = result["etf_ids"], result["dates"]
+        return [{
+            "etf_id": etf_ids[e],
+            "date": dates[d],
+            **{column: values[i] for column, values in columns.items()},
+            "trading_volume": volume[i]
+        } for i, (e, d) in enumerate(zip(etfs.tolist(), days.tolist()))]
+
+    def performance_records(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        One ETFPerformanceMetrics row per ETF with any history.
+        """
+        metrics = self.performance(result)
+        rounded = {column: [v if np.isfinite(v) else None for v in np.round(values, 2).tolist()]
+                   for column, values in metrics.items()}
+        priced = np.isfinite(result["close"]).any(axis=1)
+        return [{
+            "etf_id": etf_id,
+            **{column: rounded[column][i] for column in rounded}
+        } for i, etf_id in enumerate(result["etf_ids"]) if priced[i]]
+
+    def write(self, result: Dict[str, Any], etfs_per_batch: int = 100) -> Dict[str, int]:
+        """
+        Replace the ETFs' history and performance metrics in one transaction.
+
+        Returns:
+            dict: Rows written per table.
+        """
+        etf_ids = result["etf_ids"]
+        for start in range(0, len(etf_ids), _IN_CHUNK):
+            chunk = etf_ids[start:start + _IN_CHUNK]
+            for model in (ETFHistoricalData, ETFPerformanceMetrics):
+                self.etf_session.query(model).filter(model.etf_id.in_(chunk)) \
+                    .delete(synchronize_session=False)
+
+        historical = 0
+        for first in range(0, len(etf_ids), etfs_per_batch):
+            records = self.historical_records(result, first, etfs_per_batch)
+            if records:
+                self.etf_session.execute(ETFHistoricalData.__table__.insert(), records)
+                historical += len(records)
+        performance = self.performance_records(result)
+        if performance:
+            self.etf_session.execute(ETFPerformanceMetrics.__table__.insert(), performance)
+        self.etf_session.commit()
+
+        ROWS_WRITTEN.inc(historical, asset="etf", table="etf_historical_data")
+        ROWS_WRITTEN.inc(len(performance), asset="etf", table="etf_performance_metrics")
+        return {"etf_historical_data": historical, "etf_performance_metrics": len(performance)}
+
+
+def update_etf_data(etf_ids: Optional[Sequence[str]] = None, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Regenerate ETFHistoricalData and ETFPerformanceMetrics from the
+    stock and bond databases.
+
+    Returns:
+        dict: Engine result plus "rows_written" per table.
+    """
+    etf_engine = create_engine(ETF_DATABASE_URL)
+    Base.metadata.create_all(etf_engine)
+    etf_session = sessionmaker(bind=etf_engine)()
+    price_sessions = {
+        "Stock": sessionmaker(bind=create_engine(STOCKS_DATABASE_URL))(),
+        "Bond": sessionmaker(bind=create_engine(BONDS_DATABASE_URL))(),
+    }
+    try:
+        engine = ETFEngine(etf_session, price_sessions, seed=seed, fx_rates=load_fx_rates())
+        result = engine.run(etf_ids)
+        with stage_timer("etf", "db_write"):
+            result["rows_written"] = engine.write(result)
+    finally:
+        etf_session.close()
+        for session in price_sessions.values():
+            session.close()
+
+    print(f"ETF data generated for {len(result['etf_ids'])} ETFs over {len(result['dates'])} days")
+    return result
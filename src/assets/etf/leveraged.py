@@ -0,0 +1,114 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: leveraged.py
+
+Relative Path: src/assets/etf/leveraged.py
+"""
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+# ETF only flags leverage; flagged funds get this daily multiple
+DEFAULT_LEVERAGE_MULTIPLE = 2.0
+# Annual rate in percent paid on borrowed exposure (earned on excess cash)
+DEFAULT_FINANCING_RATE = 4.0
+DAYS_PER_YEAR = 365
+
+
+def leverage_factors(is_leveraged: Sequence[Any], is_inverse: Sequence[Any],
+                     multiple: float = DEFAULT_LEVERAGE_MULTIPLE) -> np.ndarray:
+    """
+    Daily leverage from the ETF.is_leveraged / ETF.is_inverse flags
+    (1, multiple, -1 or -multiple).
+    """
+    leveraged = np.array([bool(flag) for flag in is_leveraged])
+    inverse = np.array([bool(flag) for flag in is_inverse])
+    return np.where(leveraged, multiple, 1.0) * np.where(inverse, -1.0, 1.0)
+
+
+def daily_reset_returns(index_returns, leverage, expense_ratio=0.0,
+                        financing_rate=DEFAULT_FINANCING_RATE) -> np.ndarray:
+    """
+    Daily returns of funds that reset to a fixed multiple of the index each day.
+
+    A fund with leverage L has L times the index exposure and 1 - L of
+    its NAV in cash: it pays financing on borrowed exposure (L > 1) and
+    earns it on surplus cash (L < 1, e.g. inverse funds). The expense
+    ratio is charged daily.
+
+    Shapes broadcast as leverage[..., None] against index_returns, so one
+    (dates,) index with (variants,) leverages gives (variants, dates), and
+    (underlyings, 1, dates) with (variants,) gives (underlyings, variants, dates).
+
+    Args:
+        index_returns (array): (..., dates) simple daily index returns.
+        leverage (array): Daily multiple per variant.
+        expense_ratio (array): Annual expense ratio in percent per variant.
+        financing_rate (array): Annual financing rate in percent per variant.
+
+    Returns:
+        array: Simple daily fund returns.
+    """
+    index_returns = np.asarray(index_returns, dtype=float)
+    leverage = np.asarray(leverage, dtype=float)[..., None]
+    daily_financing = np.asarray(financing_rate, dtype=float)[..., None] / 100.0 / DAYS_PER_YEAR
+    daily_expense = np.asarray(expense_ratio, dtype=float)[..., None] / 100.0 / DAYS_PER_YEAR
+    return leverage * index_returns + (1.0 - leverage) * daily_financing - daily_expense
+
+
+def daily_reset_nav(index_returns, leverage, expense_ratio=0.0,
+                    financing_rate=DEFAULT_FINANCING_RATE, base_price: float = 100.0) -> np.ndarray:
+    """
+    NAV paths of daily-reset funds (see daily_reset_returns).
+
+    A day losing 100% or more wipes the fund out; its NAV stays at zero.
+    The first NAV is base_price after the first day's return, so pass
+    a zero return for the launch day.
+    """
+    returns = daily_reset_returns(index_returns, leverage, expense_ratio, financing_rate)
+    return base_price * np.cumprod(np.maximum(1.0 + returns, 0.0), axis=-1)
+
+
+def leveraged_analytics(index_returns, leverage, expense_ratio=0.0,
+                        financing_rate=DEFAULT_FINANCING_RATE) -> Dict[str, np.ndarray]:
+    """
+    Break each variant's period return into its sources.
+
+    Without costs a daily-reset fund grows like (1 + index return) ** L
+    times a volatility decay of about exp(-L(L - 1) / 2 * variance); this
+    separates that decay from financing and expenses.
+
+    Returns:
+        dict: Arrays in percent over the whole period: "index_return",
+            "target_return" (L x index return), "gross_return" (daily reset
+            without costs), "fund_return", "volatility_decay" (gross minus
+            the compounded (1 + index) ** L - 1), "expected_decay" (the
+            continuous-time approximation of it), "financing_and_expenses"
+            (fund - gross) and "realised_volatility" (annualised).
+    """
+    index_returns = np.asarray(index_returns, dtype=float)
+    leverage = np.asarray(leverage, dtype=float)
+    gross = daily_reset_nav(index_returns, leverage, 0.0, 0.0, base_price=1.0)[..., -1]
+    net_returns = daily_reset_returns(index_returns, leverage, expense_ratio, financing_rate)
+    net = np.prod(np.maximum(1.0 + net_returns, 0.0), axis=-1)
+
+    index_growth = np.prod(1.0 + index_returns, axis=-1)
+    compounded = index_growth ** leverage
+    variance = np.var(np.log1p(index_returns), axis=-1) * index_returns.shape[-1]
+    expected_decay = compounded * (np.exp(-leverage * (leverage - 1.0) / 2.0 * variance) - 1.0)
+    realised = np.std(net_returns, axis=-1) * np.sqrt(DAYS_PER_YEAR)
+
+    return {
+        "index_return": np.broadcast_to((index_growth - 1.0) * 100.0, gross.shape),
+        "target_return": leverage * (index_growth - 1.0) * 100.0,
+        "gross_return": (gross - 1.0) * 100.0,
+        "fund_return": (net - 1.0) * 100.0,
+        "volatility_decay": (gross - compounded) * 100.0,
+        "expected_decay": expected_decay * 100.0,
+        "financing_and_expenses": (net - gross) * 100.0,
+        "realised_volatility": realised * 100.0,
+    }
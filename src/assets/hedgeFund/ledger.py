@@ -0,0 +1,456 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: ledger.py
+
+Relative Path: src/assets/hedgeFund/ledger.py
+"""
+
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import and_, create_engine, or_
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.hedgeFund.model import (
+    Base, HedgeFund, HedgeFundLedgerSnapshot, HedgeFundPerformance, HedgeFundRiskExposure,
+    HedgeFundTransaction
+)
+from assets.mutualFund.nav import BONDS_DATABASE_URL, STOCKS_DATABASE_URL, load_close_matrix
+from monitoring.metrics import ROWS_WRITTEN, stage_timer
+
+HEDGE_FUND_DATABASE_URL = "sqlite:///data/hedge_funds.db"
+
+# NAV per share at inception (shares = total_assets / INITIAL_SHARE_PRICE)
+INITIAL_SHARE_PRICE = 100.0
+# Maintenance margin as a fraction of long and short market value
+LONG_MAINTENANCE_MARGIN = 0.25
+SHORT_MAINTENANCE_MARGIN = 0.30
+# Replay snapshots are taken every this many days of transactions
+DEFAULT_SNAPSHOT_INTERVAL_DAYS = 30
+MONTHS_PER_YEAR = 12
+
+# Signed change in position per transaction type
+TRANSACTION_SIGNS = {"Buy": 1, "Sell": -1, "Short": -1, "Cover": 1}
+
+
+def _as_datetime(as_of: Union[date, datetime]) -> datetime:
+    """
+    Dates mean the end of that day.
+    """
+    if isinstance(as_of, datetime):
+        return as_of
+    return datetime.combine(as_of, time.max)
+
+
+def _field(row: Any, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+class PositionLedger:
+    """
+    Positions, cash and P&L folded from a stream of hedge fund transactions.
+
+    Each position carries a signed quantity (negative = short), its average
+    cost and the last traded price. Buys and covers spend cash, sells and
+    shorts raise it; transaction costs always reduce it. A negative cash
+    balance is a margin loan.
+
+    Args:
+        fund_id (int): Fund the ledger belongs to.
+        cash (float): Opening cash.
+        shares (float): Fund shares outstanding (for NAV per share).
+    """
+
+    def __init__(self, fund_id: int, cash: float, shares: float):
+        self.fund_id = fund_id
+        self.cash = float(cash)
+        self.shares = float(shares)
+        self.realized_pnl = 0.0
+        self.transaction_costs = 0.0
+        self.positions: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.last_event: Optional[Tuple[datetime, int]] = None
+
+    def apply(self, transaction: Any) -> None:
+        """
+        Fold one HedgeFundTransaction (ORM row or dict) into the state.
+        """
+        kind = _field(transaction, "transaction_type")
+        if kind not in TRANSACTION_SIGNS:
+            raise ValueError(f"Unknown transaction type: {kind}")
+        price = float(_field(transaction, "transaction_price") or 0.0)
+        volume = float(_field(transaction, "transaction_volume") or 0.0)
+        cost = float(_field(transaction, "transaction_cost") or 0.0)
+        delta = TRANSACTION_SIGNS[kind] * volume
+
+        key = (_field(transaction, "asset_type"), _field(transaction, "asset_id"))
+        position = self.positions.setdefault(
+            key, {"quantity": 0.0, "average_cost": 0.0, "last_price": price})
+        quantity = position["quantity"]
+
+        if quantity == 0.0 or np.sign(quantity) == np.sign(delta):
+            # Opening or adding: blend the average cost
+            total = abs(quantity) + abs(delta)
+            position["average_cost"] = (abs(quantity) * position["average_cost"] +
+                                        abs(delta) * price) / total if total else 0.0
+        else:
+            # Reducing (and possibly flipping): realise P&L on the closed part
+            closed = min(abs(delta), abs(quantity))
+            self.realized_pnl += closed * (price - position["average_cost"]) * np.sign(quantity)
+            if abs(delta) > abs(quantity):
+                position["average_cost"] = price
+
+        position["quantity"] = quantity + delta
+        position["last_price"] = price
+        if position["quantity"] == 0.0:
+            del self.positions[key]
+
+        self.cash -= delta * price + cost
+        self.transaction_costs += cost
+        self.last_event = (_field(transaction, "transaction_date"), _field(transaction, "id"))
+
+    def valuation(self, prices: Optional[Dict[Tuple[str, str], float]] = None) -> Dict[str, float]:
+        """
+        Mark the book to market.
+
+        Args:
+            prices (dict, optional): (asset_type, asset_id) -> price; positions
+                without one are marked at their last traded price.
+
+        Returns:
+            dict: nav, nav_per_share, cash, long/short market value, gross
+                and net exposure, leverage_ratio (gross / NAV), market_exposure
+                (net / NAV in %), margin_requirement, excess_margin,
+                unrealized_pnl and realized_pnl.
+        """
+        prices = prices or {}
+        long_value = short_value = unrealized = 0.0
+        for key, position in self.positions.items():
+            price = prices.get(key)
+            if price is None or not np.isfinite(price):
+                price = position["last_price"]
+            value = position["quantity"] * price
+            if value >= 0:
+                long_value += value
+            else:
+                short_value -= value
+            unrealized += position["quantity"] * (price - position["average_cost"])
+
+        nav = self.cash + long_value - short_value
+        gross = long_value + short_value
+        margin = long_value * LONG_MAINTENANCE_MARGIN + short_value * SHORT_MAINTENANCE_MARGIN
+        return {
+            "nav": nav,
+            "nav_per_share": nav / self.shares if self.shares else float("nan"),
+            "cash": self.cash,
+            "long_market_value": long_value,
+            "short_market_value": short_value,
+            "gross_exposure": gross,
+            "net_exposure": long_value - short_value,
+            "leverage_ratio": gross / nav if nav > 0 else float("nan"),
+            "market_exposure": (long_value - short_value) / nav * 100.0 if nav > 0 else float("nan"),
+            "margin_requirement": margin,
+            "excess_margin": nav - margin,
+            "unrealized_pnl": unrealized,
+            "realized_pnl": self.realized_pnl,
+        }
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        HedgeFundLedgerSnapshot row for the current state.
+        """
+        transaction_date, transaction_id = self.last_event
+        return {
+            "fund_id": self.fund_id,
+            "transaction_date": transaction_date,
+            "transaction_id": transaction_id,
+            "cash": self.cash,
+            "realized_pnl": self.realized_pnl,
+            "state": json.dumps({
+                "shares": self.shares,
+                "transaction_costs": self.transaction_costs,
+                "positions": [{"asset_type": asset_type, "asset_id": asset_id, **position}
+                              for (asset_type, asset_id), position in self.positions.items()],
+            }),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Any) -> "PositionLedger":
+        state = json.loads(_field(snapshot, "state"))
+        ledger = cls(_field(snapshot, "fund_id"), _field(snapshot, "cash"), state["shares"])
+        ledger.realized_pnl = float(_field(snapshot, "realized_pnl") or 0.0)
+        ledger.transaction_costs = state["transaction_costs"]
+        ledger.positions = {
+            (position.pop("asset_type"), position.pop("asset_id")): position
+            for position in state["positions"]
+        }
+        ledger.last_event = (_field(snapshot, "transaction_date"), _field(snapshot, "transaction_id"))
+        return ledger
+
+
+class HedgeFundLedger:
+    """
+    Event-sourced book of one hedge fund with replay snapshots.
+
+    The state as of any time is the nearest earlier snapshot plus a
+    replay of the transactions after it, so point-in-time NAVs cost
+    O(transactions since the snapshot) rather than O(history).
+
+    Args:
+        session (Session): Session on the hedge fund database.
+        fund_id (int): Fund to track.
+        price_sessions (dict, optional): asset_type -> session on its price
+            database, used to mark positions to market.
+    """
+
+    def __init__(self, session: Session, fund_id: int,
+                 price_sessions: Optional[Dict[str, Session]] = None):
+        self.session = session
+        self.fund_id = fund_id
+        self.price_sessions = price_sessions or {}
+        self.fund = session.get(HedgeFund, fund_id)
+        if self.fund is None:
+            raise ValueError(f"Unknown hedge fund: {fund_id}")
+
+    def initial_state(self) -> PositionLedger:
+        capital = float(self.fund.total_assets)
+        return PositionLedger(self.fund_id, capital, capital / INITIAL_SHARE_PRICE)
+
+    def transactions(self, after: Optional[Tuple[datetime, int]] = None,
+                     until: Optional[datetime] = None) -> List[HedgeFundTransaction]:
+        """
+        Transactions in replay order, optionally after an event and up to a time.
+        """
+        query = self.session.query(HedgeFundTransaction).filter(
+            HedgeFundTransaction.fund_id == self.fund_id)
+        if after is not None:
+            after_date, after_id = after
+            query = query.filter(or_(
+                HedgeFundTransaction.transaction_date > after_date,
+                and_(HedgeFundTransaction.transaction_date == after_date,
+                     HedgeFundTransaction.id > after_id)))
+        if until is not None:
+            query = query.filter(HedgeFundTransaction.transaction_date <= until)
+        return query.order_by(HedgeFundTransaction.transaction_date, HedgeFundTransaction.id).all()
+
+    def rebuild_snapshots(self, interval_days: int = DEFAULT_SNAPSHOT_INTERVAL_DAYS) -> int:
+        """
+        Replay the full history once and store a snapshot every interval_days.
+
+        Returns:
+            int: Number of snapshots written.
+        """
+        self.session.query(HedgeFundLedgerSnapshot).filter(
+            HedgeFundLedgerSnapshot.fund_id == self.fund_id).delete(synchronize_session=False)
+
+        ledger = self.initial_state()
+        snapshots = []
+        next_snapshot = None
+        for transaction in self.transactions():
+            if next_snapshot is None:
+                next_snapshot = transaction.transaction_date + timedelta(days=interval_days)
+            elif transaction.transaction_date >= next_snapshot:
+                snapshots.append(ledger.to_snapshot())
+                while next_snapshot <= transaction.transaction_date:
+                    next_snapshot += timedelta(days=interval_days)
+            ledger.apply(transaction)
+        if ledger.last_event is not None:
+            snapshots.append(ledger.to_snapshot())
+
+        if snapshots:
+            self.session.execute(HedgeFundLedgerSnapshot.__table__.insert(), snapshots)
+        self.session.commit()
+        ROWS_WRITTEN.inc(len(snapshots), asset="hedge_fund", table="hedge_fund_ledger_snapshots")
+        return len(snapshots)
+
+    def take_snapshot(self, as_of: Optional[Union[date, datetime]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Store the state as of a time (now by default) for later replays.
+        """
+        ledger = self.state_as_of(as_of or datetime.now())
+        if ledger.last_event is None:
+            return None
+        snapshot = ledger.to_snapshot()
+        self.session.execute(HedgeFundLedgerSnapshot.__table__.insert(), [snapshot])
+        self.session.commit()
+        return snapshot
+
+    def nearest_snapshot(self, as_of: datetime) -> Optional[HedgeFundLedgerSnapshot]:
+        return self.session.query(HedgeFundLedgerSnapshot).filter(
+            HedgeFundLedgerSnapshot.fund_id == self.fund_id,
+            HedgeFundLedgerSnapshot.transaction_date <= as_of
+        ).order_by(HedgeFundLedgerSnapshot.transaction_date.desc(),
+                   HedgeFundLedgerSnapshot.transaction_id.desc()).first()
+
+    def state_as_of(self, as_of: Union[date, datetime]) -> PositionLedger:
+        """
+        Positions and cash after every transaction up to as_of.
+        """
+        as_of = _as_datetime(as_of)
+        snapshot = self.nearest_snapshot(as_of)
+        ledger = PositionLedger.from_snapshot(snapshot) if snapshot else self.initial_state()
+        for transaction in self.transactions(after=ledger.last_event, until=as_of):
+            ledger.apply(transaction)
+        return ledger
+
+    def market_prices(self, assets: Sequence[Tuple[str, str]], as_of: date) -> Dict[Tuple[str, str], float]:
+        """
+        Latest close on or before as_of for assets with a price history.
+        """
+        assets = list(assets)
+        prices = load_close_matrix(self.price_sessions, assets)
+        ordinals = prices["ordinals"]
+        column = np.searchsorted(ordinals, as_of.toordinal(), side="right") - 1
+        if column < 0:
+            return {}
+        return {asset: float(price) for asset, price in zip(assets, prices["closes"][:, column])
+                if np.isfinite(price)}
+
+    def nav_as_of(self, as_of: Union[date, datetime]) -> Dict[str, float]:
+        """
+        Marked-to-market NAV and exposures as of a date.
+        """
+        ledger = self.state_as_of(as_of)
+        day = as_of.date() if isinstance(as_of, datetime) else as_of
+        return ledger.valuation(self.market_prices(ledger.positions.keys(), day))
+
+    def valuation_series(self, dates: Sequence[date]) -> List[Dict[str, float]]:
+        """
+        Valuations on many dates with a single replay of the history.
+        """
+        dates = sorted(dates)
+        assets = sorted({(t.asset_type, t.asset_id) for t in self.transactions()})
+        prices = load_close_matrix(self.price_sessions, assets)
+        columns = np.searchsorted(prices["ordinals"], [d.toordinal() for d in dates], side="right") - 1
+
+        ledger = self.initial_state()
+        pending = iter(self.transactions(until=_as_datetime(dates[-1]))) if dates else iter(())
+        transaction = next(pending, None)
+        series = []
+        for day, column in zip(dates, columns):
+            end = _as_datetime(day)
+            while transaction is not None and transaction.transaction_date <= end:
+                ledger.apply(transaction)
+                transaction = next(pending, None)
+            marks = {} if column < 0 else {
+                asset: prices["closes"][i, column] for i, asset in enumerate(assets)}
+            series.append({"date": day, **ledger.valuation(marks)})
+        return series
+
+
+def month_ends(start: date, end: date) -> List[date]:
+    """
+    Last calendar day of every month from start's month through end's.
+    """
+    days = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        following = date(year + month // 12, month % 12 + 1, 1)
+        days.append(following - timedelta(days=1))
+        year, month = following.year, following.month
+    return days
+
+
+def performance_records(fund_id: int, series: List[Dict[str, Any]],
+                        risk_free_rate: float = 4.0, window: int = MONTHS_PER_YEAR) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    HedgeFundPerformance and HedgeFundRiskExposure rows from monthly valuations.
+
+    Returns are month on month; volatility, Sharpe and Sortino ratios are
+    annualised over the trailing window of monthly returns.
+    """
+    nav = np.array([row["nav_per_share"] for row in series], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.concatenate([[np.nan], nav[1:] / nav[:-1] - 1.0])
+
+    def rounded(value):
+        return round(float(value), 2) if np.isfinite(value) else None
+
+    performance, exposure = [], []
+    for i, row in enumerate(series):
+        trailing = returns[max(i - window + 1, 1):i + 1]
+        trailing = trailing[np.isfinite(trailing)]
+        volatility = sharpe = sortino = np.nan
+        if len(trailing) > 1:
+            mean = trailing.mean() * MONTHS_PER_YEAR * 100.0
+            volatility = trailing.std(ddof=1) * np.sqrt(MONTHS_PER_YEAR) * 100.0
+            downside = np.sqrt(np.mean(np.minimum(trailing, 0.0) ** 2) * MONTHS_PER_YEAR) * 100.0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sharpe = (mean - risk_free_rate) / volatility
+                sortino = (mean - risk_free_rate) / downside
+        performance.append({
+            "fund_id": fund_id,
+            "date": row["date"],
+            "net_asset_value": rounded(row["nav_per_share"]),
+            "return_percentage": rounded(returns[i] * 100.0),
+            "sharpe_ratio": rounded(sharpe),
+            "sortino_ratio": rounded(sortino),
+            "alpha": None,
+            "beta": None,
+            "volatility": rounded(volatility),
+        })
+        exposure.append({
+            "fund_id": fund_id,
+            "date": row["date"],
+            "market_exposure": rounded(row["market_exposure"]),
+            "leverage_ratio": rounded(row["leverage_ratio"]),
+        })
+    return {"performance": performance, "risk_exposure": exposure}
+
+
+def update_hedge_fund_performance(fund_ids: Optional[Sequence[int]] = None,
+                                  end_date: Optional[date] = None,
+                                  snapshot_interval_days: int = DEFAULT_SNAPSHOT_INTERVAL_DAYS) -> Dict[str, int]:
+    """
+    Rebuild ledger snapshots and monthly HedgeFundPerformance /
+    HedgeFundRiskExposure rows for hedge funds (all by default).
+
+    Returns:
+        dict: Rows written per table.
+    """
+    engine = create_engine(HEDGE_FUND_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    price_sessions = {
+        "Stock": sessionmaker(bind=create_engine(STOCKS_DATABASE_URL))(),
+        "Bond": sessionmaker(bind=create_engine(BONDS_DATABASE_URL))(),
+    }
+    written = {"hedge_fund_ledger_snapshots": 0, "hedge_fund_performance": 0,
+               "hedge_fund_risk_exposure": 0}
+    try:
+        fund_ids = fund_ids if fund_ids is not None else \
+            [fund_id for (fund_id,) in session.query(HedgeFund.fund_id).all()]
+        for fund_id in fund_ids:
+            ledger = HedgeFundLedger(session, fund_id, price_sessions)
+            with stage_timer("hedge_fund", "snapshots"):
+                written["hedge_fund_ledger_snapshots"] += ledger.rebuild_snapshots(snapshot_interval_days)
+
+            with stage_timer("hedge_fund", "valuation"):
+                last = session.query(HedgeFundTransaction.transaction_date).filter(
+                    HedgeFundTransaction.fund_id == fund_id
+                ).order_by(HedgeFundTransaction.transaction_date.desc()).first()
+                end = end_date or (last[0].date() if last else ledger.fund.inception_date)
+                series = ledger.valuation_series(month_ends(ledger.fund.inception_date, end))
+                records = performance_records(fund_id, series)
+
+            with stage_timer("hedge_fund", "db_write"):
+                for model, key in ((HedgeFundPerformance, "performance"),
+                                   (HedgeFundRiskExposure, "risk_exposure")):
+                    session.query(model).filter(model.fund_id == fund_id).delete(synchronize_session=False)
+                    if records[key]:
+                        session.execute(model.__table__.insert(), records[key])
+                    written[model.__tablename__] += len(records[key])
+                session.commit()
+    finally:
+        session.close()
+        for price_session in price_sessions.values():
+            price_session.close()
+
+    for table in ("hedge_fund_performance", "hedge_fund_risk_exposure"):
+        ROWS_WRITTEN.inc(written[table], asset="hedge_fund", table=table)
+    print(f"Hedge fund ledgers replayed: {written}")
+    return written
@@ -140,3 +140,21 @@ class HedgeFundStrategy(Base):
 
     # Relationships
     hedge_fund = relationship("HedgeFund")
+
+
+# Table 7: Position Ledger Snapshots
+class HedgeFundLedgerSnapshot(Base):
+    __tablename__ = "hedge_fund_ledger_snapshots"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    fund_id = Column(Integer, ForeignKey("hedge_funds.fund_id"))
+    # Last transaction folded into this state (replay resumes after it)
+    transaction_date = Column(DateTime, nullable=False)
+    transaction_id = Column(Integer, nullable=False)
+    cash = Column(Float, nullable=False)  # Cash balance (negative = margin loan)
+    realized_pnl = Column(Float, default=0.0)
+    # JSON/Text representation of open positions and ledger totals
+    state = Column(Text, nullable=False)
+
+    # Relationships
+    hedge_fund = relationship("HedgeFund")
@@ -0,0 +1,590 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: claims.py
+
+Relative Path: src/assets/insurance/claims.py
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.insurance.model import (
+    Base, InsuranceClaim, InsuranceHistoricalData, InsurancePolicy, InsuranceRiskMetrics, InsuranceType
+)
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+
+INSURANCE_DATABASE_URL = "sqlite:///data/insurance.db"
+
+DAYS_PER_YEAR = 365.0
+# Expected claims per policy-year by policy type
+CLAIM_FREQUENCIES = {
+    "Life": 0.005,
+    "Health": 1.2,
+    "Property": 0.08,
+    "Vehicle": 0.2,
+    "Liability": 0.05,
+    "Travel": 0.1,
+    "Pet": 0.6,
+}
+# Ground-up loss per claim as a fraction of coverage:
+# ("lognormal", median, sigma) or ("pareto", alpha, minimum)
+CLAIM_SEVERITIES = {
+    "Life": ("lognormal", 1.0, 0.0),
+    "Health": ("lognormal", 0.02, 1.2),
+    "Property": ("pareto", 2.5, 0.01),
+    "Vehicle": ("lognormal", 0.05, 1.0),
+    "Liability": ("pareto", 1.8, 0.02),
+    "Travel": ("lognormal", 0.05, 1.0),
+    "Pet": ("lognormal", 0.1, 0.8),
+}
+CLAIM_REASONS = {
+    "Life": ["Death benefit"],
+    "Health": ["Hospitalisation", "Outpatient treatment", "Prescription", "Surgery"],
+    "Property": ["Fire damage", "Water damage", "Theft", "Storm damage"],
+    "Vehicle": ["Collision", "Theft", "Windscreen", "Third-party damage"],
+    "Liability": ["Bodily injury", "Property damage", "Legal defence"],
+    "Travel": ["Trip cancellation", "Lost baggage", "Medical emergency abroad"],
+    "Pet": ["Veterinary treatment", "Accident", "Illness"],
+}
+# Mean days from filing to settlement, and claims filed within this many
+# days of the as-of date are still pending
+SETTLEMENT_LAG_DAYS = 30
+DEFAULT_HISTORY_DAYS = 365
+# Claims drawn at once when simulating loss-ratio distributions
+_CLAIM_BATCH = 2_000_000
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _to_dates(ordinals: np.ndarray) -> List[date]:
+    return [date.fromordinal(int(value)) for value in ordinals]
+
+
+class ClaimsModel:
+    """
+    Frequency-severity model of insurance claims.
+
+    Claim counts are Poisson with a per-type annual rate, or negative
+    binomial (a Poisson whose rate is Gamma distributed with mean 1 and
+    variance `dispersion`, i.e. heterogeneous policyholders). Each claim's
+    ground-up loss is a lognormal or Pareto fraction of the policy's
+    coverage; the insurer pays the loss above the deductible, capped by
+    the coverage remaining on the policy.
+
+    Args:
+        frequencies (dict): policy_type -> expected claims per year.
+        severities (dict): policy_type -> severity spec (see CLAIM_SEVERITIES).
+        count_model (str): "poisson" or "negative_binomial".
+        dispersion (float): Variance of the Gamma rate multiplier.
+        seed (int, optional): Seed for reproducible simulations.
+    """
+
+    def __init__(self, frequencies: Optional[Dict[str, float]] = None,
+                 severities: Optional[Dict[str, Tuple[Any, ...]]] = None,
+                 count_model: str = "poisson", dispersion: float = 0.5, seed: Optional[int] = None):
+        if count_model not in ("poisson", "negative_binomial"):
+            raise ValueError(f"Unknown claim count model: {count_model}")
+        self.frequencies = frequencies or CLAIM_FREQUENCIES
+        self.severities = severities or CLAIM_SEVERITIES
+        self.count_model = count_model
+        self.dispersion = dispersion
+        self.rng = np.random.default_rng(seed)
+
+    def type_codes(self, policy_types: Sequence[str]) -> np.ndarray:
+        """
+        Index of each policy's type in InsuranceType.CATEGORIES.
+        """
+        code = {name: i for i, name in enumerate(InsuranceType.CATEGORIES)}
+        return np.array([code[t] for t in policy_types], dtype=int)
+
+    def annual_rates(self, type_codes: np.ndarray) -> np.ndarray:
+        rates = np.array([self.frequencies.get(t, 0.0) for t in InsuranceType.CATEGORIES])
+        return rates[type_codes]
+
+    def sample_counts(self, expected: np.ndarray) -> np.ndarray:
+        """
+        Claim counts for an array of expected counts.
+        """
+        if self.count_model == "negative_binomial" and self.dispersion > 0:
+            shape = 1.0 / self.dispersion
+            expected = expected * self.rng.gamma(shape, 1.0 / shape, np.shape(expected))
+        return self.rng.poisson(expected)
+
+    def sample_losses(self, type_codes: np.ndarray, coverage: np.ndarray) -> np.ndarray:
+        """
+        Ground-up losses of claims on policies of the given types and coverage.
+        """
+        fractions = np.empty(len(type_codes))
+        for code, name in enumerate(InsuranceType.CATEGORIES):
+            mask = type_codes == code
+            count = int(mask.sum())
+            if not count:
+                continue
+            kind, first, second = self.severities.get(name, ("lognormal", 0.05, 1.0))
+            if kind == "lognormal":
+                fractions[mask] = self.rng.lognormal(np.log(first), second, count)
+            elif kind == "pareto":
+                fractions[mask] = second * (1.0 + self.rng.pareto(first, count))
+            else:
+                raise ValueError(f"Unknown severity distribution: {kind}")
+        return fractions * coverage
+
+    def expected_loss(self, type_codes: np.ndarray, coverage: np.ndarray,
+                      deductible: np.ndarray, samples: int = 2000) -> np.ndarray:
+        """
+        Expected annual payments per policy (Monte Carlo over severities).
+
+        One shared set of severity draws per type is rescaled to each
+        policy's coverage, so the cost is (types x samples), not per policy.
+        """
+        expected = np.zeros(len(type_codes))
+        for code, name in enumerate(InsuranceType.CATEGORIES):
+            mask = type_codes == code
+            if not mask.any():
+                continue
+            draws = self.sample_losses(np.full(samples, code), np.ones(samples))
+            payments = np.clip(draws[None, :] * coverage[mask, None] - deductible[mask, None],
+                               0.0, coverage[mask, None])
+            expected[mask] = payments.mean(axis=1)
+        return expected * self.annual_rates(type_codes)
+
+
+def _policy_arrays(policies: Sequence[Any]) -> Dict[str, Any]:
+    def field(policy, name):
+        return policy[name] if isinstance(policy, dict) else getattr(policy, name)
+
+    return {
+        "policy_ids": [field(p, "policy_id") for p in policies],
+        "policy_types": [field(p, "policy_type") for p in policies],
+        "issue": np.array([field(p, "issue_date").toordinal() for p in policies], dtype=np.int64),
+        "expiration": np.array([field(p, "expiration_date").toordinal() for p in policies], dtype=np.int64),
+        "premium": np.array([float(field(p, "premium_amount")) for p in policies]),
+        "coverage": np.array([float(field(p, "coverage_amount")) for p in policies]),
+        "deductible": np.array([float(field(p, "deductible") or 0.0) for p in policies]),
+    }
+
+
+def capped_payments(policy_index: np.ndarray, losses: np.ndarray, deductible: np.ndarray,
+                    coverage: np.ndarray) -> np.ndarray:
+    """
+    Insurer payments for claims sorted by policy (then date).
+
+    Each claim pays its loss above the deductible; payments stop once a
+    policy's cumulative payments reach its coverage.
+    """
+    payments = np.clip(losses - deductible[policy_index], 0.0, None)
+    if not len(payments):
+        return payments
+    cumulative = np.cumsum(payments)
+    first = np.r_[True, policy_index[1:] != policy_index[:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(payments)), 0))
+    before = cumulative - payments - np.where(group_start > 0, cumulative[group_start - 1], 0.0)
+    return np.clip(coverage[policy_index] - before, 0.0, payments)
+
+
+class ClaimsSimulator:
+    """
+    Simulates claims and daily underwriting history for a policy book.
+
+    All policies are simulated together: counts for every policy in one
+    draw, claims laid out in flat arrays sorted by policy and date, and
+    daily history built from (policy, day) keys, so nothing loops per
+    policy.
+
+    Args:
+        model (ClaimsModel): Frequency-severity model.
+        as_of (date): Simulation date; claims are drawn up to it.
+    """
+
+    def __init__(self, model: Optional[ClaimsModel] = None, as_of: Optional[date] = None):
+        self.model = model or ClaimsModel()
+        self.as_of = as_of or date.today()
+
+    def simulate_claims(self, policies: Sequence[Any]) -> Dict[str, Any]:
+        """
+        One realised claims history per policy from issue to min(expiration, as_of).
+
+        Returns:
+            dict: Policy arrays plus flat claim arrays "policy_index",
+                "claim_date" and "settlement_date" (ordinals), "loss",
+                "payment" and "status".
+        """
+        book = _policy_arrays(policies)
+        model, rng = self.model, self.model.rng
+        codes = model.type_codes(book["policy_types"])
+        end = np.minimum(book["expiration"], self.as_of.toordinal())
+        exposure_days = np.maximum(end - book["issue"], 0)
+        counts = model.sample_counts(model.annual_rates(codes) * exposure_days / DAYS_PER_YEAR)
+
+        policy_index = np.repeat(np.arange(len(codes)), counts)
+        claim_date = book["issue"][policy_index] + \
+            np.floor(rng.random(len(policy_index)) * exposure_days[policy_index]).astype(np.int64)
+        order = np.lexsort((claim_date, policy_index))
+        policy_index, claim_date = policy_index[order], claim_date[order]
+
+        loss = model.sample_losses(codes[policy_index], book["coverage"][policy_index])
+        payment = capped_payments(policy_index, loss, book["deductible"], book["coverage"])
+        settlement_date = claim_date + rng.geometric(1.0 / SETTLEMENT_LAG_DAYS, len(claim_date))
+
+        as_of = self.as_of.toordinal()
+        status = np.where(payment > 0, "Settled", "Rejected").astype(object)
+        status[settlement_date > as_of] = "Pending"
+        ROWS_GENERATED.inc(len(policy_index), asset="insurance", kind="claim")
+        return {**book, "type_codes": codes, "exposure_days": exposure_days,
+                "policy_index": policy_index, "claim_date": claim_date,
+                "settlement_date": settlement_date, "loss": loss, "payment": payment, "status": status}
+
+    def daily_history(self, claims: Dict[str, Any],
+                      history_days: Optional[int] = DEFAULT_HISTORY_DAYS) -> Dict[str, np.ndarray]:
+        """
+        Daily earned premium, claims paid and claims filed per policy.
+
+        The annual premium is earned evenly over the policy term; claims
+        are paid on their settlement date and counted on their filing date.
+
+        Returns:
+            dict: Flat "policy_index", "dates" (ordinals), "premium",
+                "claims_paid", "underwriting_profit" and "claims_filed".
+        """
+        as_of = self.as_of.toordinal()
+        start = claims["issue"]
+        if history_days is not None:
+            start = np.maximum(start, as_of - history_days + 1)
+        end = np.minimum(claims["expiration"], as_of)
+        days = np.maximum(end - start + 1, 0)
+        policy_index = np.repeat(np.arange(len(days)), days)
+        first = np.concatenate([[0], np.cumsum(days)[:-1]])
+        day = start[policy_index] + np.arange(days.sum()) - first[policy_index]
+
+        # Flat row of each (policy, day) so claims can be binned with bincount
+        def rows_of(index, ordinals):
+            row = first[index] + ordinals - start[index]
+            inside = (ordinals >= start[index]) & (ordinals <= end[index])
+            return row[inside], inside
+
+        settled = claims["status"] == "Settled"
+        rows, inside = rows_of(claims["policy_index"][settled], claims["settlement_date"][settled])
+        claims_paid = np.bincount(rows, claims["payment"][settled][inside], minlength=len(day))
+        rows, _ = rows_of(claims["policy_index"], claims["claim_date"])
+        claims_filed = np.bincount(rows, minlength=len(day)).astype(int)
+
+        premium = np.full(len(day), 0.0) + (claims["premium"] / DAYS_PER_YEAR)[policy_index]
+        return {"policy_index": policy_index, "dates": day, "premium": premium,
+                "claims_paid": claims_paid, "underwriting_profit": premium - claims_paid,
+                "claims_filed": claims_filed}
+
+
+def loss_ratio_distribution(model: ClaimsModel, policies: Sequence[Any],
+                            scenarios: int = 1000) -> Dict[str, Any]:
+    """
+    Monte Carlo distribution of one-year losses across the policy book.
+
+    Every scenario draws a year of claims for every policy; scenarios are
+    processed in batches of about _CLAIM_BATCH claims. The deductible
+    applies per claim and coverage caps each policy's annual total.
+
+    Returns:
+        dict: "portfolio_loss_ratio" (scenarios,) percent, "quantiles"
+            (5/50/95/99th percentile and mean, percent), and per-policy
+            "expected_loss_ratio" (percent), "probability_of_claim"
+            (percent), "claim_frequency" (mean claims per year) and
+            "loss_ratio_std" (percent).
+    """
+    book = _policy_arrays(policies)
+    codes = model.type_codes(book["policy_types"])
+    rates = model.annual_rates(codes)
+    policies_count = len(codes)
+    premium_total = book["premium"].sum()
+
+    portfolio = np.empty(scenarios)
+    paid_sum = np.zeros(policies_count)
+    paid_squares = np.zeros(policies_count)
+    claimed = np.zeros(policies_count)
+    counts_sum = np.zeros(policies_count)
+
+    expected_claims = max(rates.sum(), 1e-9)
+    batch = int(max(1, min(scenarios, _CLAIM_BATCH // expected_claims)))
+    for first in range(0, scenarios, batch):
+        size = min(batch, scenarios - first)
+        counts = model.sample_counts(np.broadcast_to(rates, (size, policies_count)))
+        cell = np.repeat(np.arange(size * policies_count), counts.ravel())
+        policy = cell % policies_count
+        losses = model.sample_losses(codes[policy], book["coverage"][policy])
+        payments = np.clip(losses - book["deductible"][policy], 0.0, None)
+        annual = np.bincount(cell, payments, minlength=size * policies_count).reshape(size, policies_count)
+        annual = np.minimum(annual, book["coverage"][None, :])
+
+        portfolio[first:first + size] = annual.sum(axis=1)
+        paid_sum += annual.sum(axis=0)
+        paid_squares += (annual ** 2).sum(axis=0)
+        claimed += (counts > 0).sum(axis=0)
+        counts_sum += counts.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        portfolio_ratio = portfolio / premium_total * 100.0
+        mean_paid = paid_sum / scenarios
+        std_paid = np.sqrt(np.maximum(paid_squares / scenarios - mean_paid ** 2, 0.0))
+        expected_ratio = mean_paid / book["premium"] * 100.0
+        ratio_std = std_paid / book["premium"] * 100.0
+    ROWS_GENERATED.inc(scenarios * policies_count, asset="insurance", kind="loss_scenario")
+    return {
+        "policy_ids": book["policy_ids"],
+        "portfolio_loss_ratio": portfolio_ratio,
+        "quantiles": {
+            "p5": float(np.percentile(portfolio_ratio, 5)),
+            "p50": float(np.percentile(portfolio_ratio, 50)),
+            "p95": float(np.percentile(portfolio_ratio, 95)),
+            "p99": float(np.percentile(portfolio_ratio, 99)),
+            "mean": float(portfolio_ratio.mean()),
+        },
+        "expected_loss_ratio": expected_ratio,
+        "loss_ratio_std": ratio_std,
+        "probability_of_claim": claimed / scenarios * 100.0,
+        "claim_frequency": counts_sum / scenarios,
+        "exposure_days": np.maximum(book["expiration"] - book["issue"], 0),
+    }
+
+
+def risk_metrics_records(distribution: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    InsuranceRiskMetrics rows from a loss-ratio distribution.
+
+    The risk score is the policy's percentile rank of expected loss ratio
+    in the book (0 to 100).
+    """
+    ratio = np.nan_to_num(distribution["expected_loss_ratio"], nan=0.0)
+    ranks = np.argsort(np.argsort(ratio))
+    score = ranks / max(len(ratio) - 1, 1) * 100.0
+
+    def rounded(value):
+        return round(float(value), 2) if np.isfinite(value) else None
+
+    return [{
+        "policy_id": policy_id,
+        "risk_score": rounded(score[i]),
+        "probability_of_claim": rounded(distribution["probability_of_claim"][i]),
+        "loss_ratio": rounded(distribution["expected_loss_ratio"][i]),
+        "underwriting_profit_margin": rounded(100.0 - distribution["expected_loss_ratio"][i]),
+        "exposure_duration": int(distribution["exposure_days"][i]),
+        "claim_frequency": int(np.rint(distribution["claim_frequency"][i])),
+    } for i, policy_id in enumerate(distribution["policy_ids"])]
+
+
+def claim_records(claims: Dict[str, Any]) -> List[Dict[str, Any]]:
+    policy_ids, types = claims["policy_ids"], claims["policy_types"]
+    rng = np.random.default_rng(len(claims["policy_index"]))
+    sequence = np.arange(len(claims["policy_index"])) - np.searchsorted(
+        claims["policy_index"], claims["policy_index"], side="left")
+    records = []
+    for i, (policy, claim_date, loss, payment, status) in enumerate(zip(
+            claims["policy_index"].tolist(), _to_dates(claims["claim_date"]),
+            np.round(claims["loss"], 2).tolist(), np.round(claims["payment"], 2).tolist(),
+            claims["status"])):
+        reasons = CLAIM_REASONS.get(types[policy], ["Other"])
+        records.append({
+            "policy_id": policy_ids[policy],
+            "claim_id": f"{policy_ids[policy]}-{int(sequence[i]) + 1:04d}",
+            "claim_date": claim_date,
+            "claim_amount": loss,
+            "settlement_amount": None if status == "Pending" else payment,
+            "claim_status": status,
+            "reason": reasons[int(rng.integers(len(reasons)))],
+            "claimant": f"Policyholder {policy_ids[policy]}",
+        })
+    return records
+
+
+def history_records(claims: Dict[str, Any], history: Dict[str, np.ndarray],
+                    risk_scores: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    policy_ids = claims["policy_ids"]
+    scores = [None] * len(policy_ids) if risk_scores is None else \
+        [round(float(s), 2) for s in risk_scores]
+    return [{
+        "policy_id": policy_ids[policy],
+        "date": day,
+        "premium_amount": premium,
+        "claims_paid": paid,
+        "underwriting_profit": profit,
+        "claim_frequency": filed,
+        "risk_score": scores[policy],
+    } for policy, day, premium, paid, profit, filed in zip(
+        history["policy_index"].tolist(), _to_dates(history["dates"]),
+        np.round(history["premium"], 2).tolist(), np.round(history["claims_paid"], 2).tolist(),
+        np.round(history["underwriting_profit"], 2).tolist(), history["claims_filed"].tolist())]
+
+
+class PolicyBookGenerator:
+    """
+    Generates InsurancePolicy rows with array operations.
+
+    Premiums are set so each policy's expected loss ratio is near
+    target_loss_ratio, with some mispricing noise.
+
+    Args:
+        number_of_policies (int): Number of policies to generate.
+        as_of (date): Book date; policies are issued up to three years before it.
+        model (ClaimsModel, optional): Model used to price the premiums.
+        target_loss_ratio (float): Expected claims / premium.
+        seed (int, optional): Seed for reproducible books.
+    """
+
+    def __init__(self, number_of_policies: int, as_of: Optional[date] = None,
+                 model: Optional[ClaimsModel] = None, target_loss_ratio: float = 0.65,
+                 seed: Optional[int] = None):
+        self.number_of_policies = number_of_policies
+        self.as_of = as_of or date.today()
+        self.model = model or ClaimsModel(seed=seed)
+        self.target_loss_ratio = target_loss_ratio
+        self.rng = np.random.default_rng(seed)
+
+    def generate_terms(self) -> List[Dict[str, Any]]:
+        n, rng = self.number_of_policies, self.rng
+        types = rng.choice(InsuranceType.CATEGORIES, n)
+        codes = self.model.type_codes(types)
+        coverage = np.round(np.where(np.isin(types, ["Life", "Property", "Liability"]),
+                                     rng.lognormal(np.log(250_000), 0.6, n),
+                                     rng.lognormal(np.log(20_000), 0.7, n)), -2)
+        deductible = np.where(types == "Life", 0.0, np.round(coverage * rng.choice([0.0, 0.005, 0.01, 0.02], n), 2))
+        expected = self.model.expected_loss(codes, coverage, deductible)
+        premium = np.round(np.maximum(expected / self.target_loss_ratio * rng.lognormal(0.0, 0.15, n), 10.0), 2)
+
+        issue = self.as_of.toordinal() - rng.integers(0, 3 * 365 + 1, n)
+        term = np.where(types == "Travel", rng.integers(7, 61, n),
+                        np.where(types == "Life", 365 * rng.integers(10, 31, n), 365))
+        expiration = issue + term
+        status = np.where(expiration > self.as_of.toordinal(), "Active", "Expired")
+        issue_dates, expiration_dates = _to_dates(issue), _to_dates(expiration)
+        return [{
+            "policy_id": f"PL{i:08d}",
+            "policy_name": f"{types[i]} cover {i}",
+            "policy_type": str(types[i]),
+            "issue_date": issue_dates[i],
+            "expiration_date": expiration_dates[i],
+            "premium_amount": float(premium[i]),
+            "coverage_amount": float(coverage[i]),
+            "deductible": float(deductible[i]),
+            "currency": "USD",
+            "policy_status": str(status[i]),
+        } for i in range(n)]
+
+
+class InsuranceClaimsEngine:
+    """
+    Runs the claims simulation over stored policies and writes the results.
+
+    Claims, daily history and risk metrics replace what the policies had
+    before, policies_per_batch policies at a time.
+
+    Args:
+        session (Session): Session on the insurance database.
+        model (ClaimsModel, optional): Frequency-severity model.
+        as_of (date): Simulation date.
+        scenarios (int): Monte Carlo years for the loss-ratio distribution.
+        history_days (int, optional): Days of daily history up to as_of;
+            None writes each policy's whole term.
+    """
+
+    def __init__(self, session: Session, model: Optional[ClaimsModel] = None,
+                 as_of: Optional[date] = None, scenarios: int = 1000,
+                 history_days: Optional[int] = DEFAULT_HISTORY_DAYS):
+        self.session = session
+        self.simulator = ClaimsSimulator(model, as_of)
+        self.scenarios = scenarios
+        self.history_days = history_days
+
+    def write_batch(self, policies: Sequence[Any]) -> Dict[str, Any]:
+        with stage_timer("insurance", "loss_distribution"):
+            distribution = loss_ratio_distribution(self.simulator.model, policies, self.scenarios)
+            metrics = risk_metrics_records(distribution)
+        with stage_timer("insurance", "claims"):
+            claims = self.simulator.simulate_claims(policies)
+            history = self.simulator.daily_history(claims, self.history_days)
+            scores = np.array([m["risk_score"] for m in metrics], dtype=float)
+            tables = [(InsuranceClaim, claim_records(claims)),
+                      (InsuranceHistoricalData, history_records(claims, history, scores)),
+                      (InsuranceRiskMetrics, metrics)]
+
+        with stage_timer("insurance", "db_write"):
+            policy_ids = claims["policy_ids"]
+            for model, _ in tables:
+                for start in range(0, len(policy_ids), _IN_CHUNK):
+                    self.session.query(model).filter(
+                        model.policy_id.in_(policy_ids[start:start + _IN_CHUNK])
+                    ).delete(synchronize_session=False)
+            for model, rows in tables:
+                if rows:
+                    self.session.execute(model.__table__.insert(), rows)
+            self.session.commit()
+
+        for model, rows in tables:
+            ROWS_WRITTEN.inc(len(rows), asset="insurance", table=model.__tablename__)
+        return {"quantiles": distribution["quantiles"],
+                **{model.__tablename__: len(rows) for model, rows in tables}}
+
+    def run(self, policy_ids: Optional[Sequence[str]] = None,
+            policies_per_batch: int = 20_000) -> Dict[str, Any]:
+        """
+        Simulate stored policies (all by default).
+
+        Returns:
+            dict: Rows written per table and the loss-ratio quantiles of each batch.
+        """
+        query = self.session.query(
+            InsurancePolicy.policy_id, InsurancePolicy.policy_type, InsurancePolicy.issue_date,
+            InsurancePolicy.expiration_date, InsurancePolicy.premium_amount,
+            InsurancePolicy.coverage_amount, InsurancePolicy.deductible)
+        if policy_ids is not None:
+            policies, policy_ids = [], list(policy_ids)
+            for start in range(0, len(policy_ids), _IN_CHUNK):
+                policies += query.filter(
+                    InsurancePolicy.policy_id.in_(policy_ids[start:start + _IN_CHUNK])).all()
+        else:
+            policies = query.order_by(InsurancePolicy.policy_id).all()
+
+        summary = {"insurance_claims": 0, "insurance_historical_data": 0,
+                   "insurance_risk_metrics": 0, "quantiles": []}
+        for start in range(0, len(policies), policies_per_batch):
+            result = self.write_batch(policies[start:start + policies_per_batch])
+            summary["quantiles"].append(result.pop("quantiles"))
+            for table, count in result.items():
+                summary[table] += count
+        return summary
+
+
+def simulate_insurance_book(number_of_policies: Optional[int] = None, as_of: Optional[date] = None,
+                            count_model: str = "poisson", scenarios: int = 1000,
+                            seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Simulate claims for the stored policy book, generating
+    number_of_policies new policies first when given.
+
+    Returns:
+        dict: Rows written per table and loss-ratio quantiles.
+    """
+    engine = create_engine(INSURANCE_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    model = ClaimsModel(count_model=count_model, seed=seed)
+    try:
+        if number_of_policies:
+            generator = PolicyBookGenerator(number_of_policies, as_of, model, seed=seed)
+            with stage_timer("insurance", "init"):
+                policies = generator.generate_terms()
+            session.execute(InsurancePolicy.__table__.insert(), policies)
+            session.commit()
+            ROWS_WRITTEN.inc(len(policies), asset="insurance", table="insurance_policies")
+        summary = InsuranceClaimsEngine(session, model, as_of, scenarios).run()
+    finally:
+        session.close()
+
+    print(f"Insurance book simulated: { {k: v for k, v in summary.items() if k != 'quantiles'} }")
+    return summary
@@ -32,8 +32,8 @@ class InsurancePolicy(Base):
     policy_name = Column(String(255), nullable=False)  # Policy Name/Title
     policy_type = Column(Enum(*InsuranceType.CATEGORIES,
                          name="policy_type_enum"))  # Policy Type
-    issuer_id = Column(Integer, ForeignKey(
-        "issuers.issuer_id"))  # Link to Issuer Table
+    # Issuer.issuer_id (issuers live in the bonds database)
+    issuer_id = Column(Integer)
     issue_date = Column(Date, nullable=False)  # Date of Policy Issuance
     expiration_date = Column(Date, nullable=False)  # Policy Expiration Date
     premium_amount = Column(DECIMAL(20, 2), nullable=False)  # Premium Amount
@@ -53,7 +53,6 @@ class InsurancePolicy(Base):
     historical_data = relationship(
         "InsuranceHistoricalData", back_populates="policy", cascade="all, delete-orphan"
     )
-    issuer = relationship("Issuer", back_populates="insurance_policies")
 
 
 # Table 2: Claim Information
@@ -0,0 +1,447 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: amortization.py
+
+Relative Path: src/assets/loan/amortization.py
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.bonds.schedule import add_months
+from assets.loan.model import Base, Loan, LoanHistoricalData, RepaymentSchedule
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+
+LOAN_DATABASE_URL = "sqlite:///data/loans.db"
+
+# Installments per year per Loan.repayment_frequency
+REPAYMENT_FREQUENCIES = {"Monthly": 12, "Quarterly": 4, "Annual": 1}
+LOAN_TYPES = ["Personal", "Business", "Mortgage", "Auto", "Student", "Asset-Backed", "Other"]
+BORROWER_TYPES = ["Individual", "Business", "Government"]
+LENDERS = ["JPMorgan Chase", "Bank of America", "Wells Fargo", "Citibank", "HSBC", "Barclays"]
+# Term range in years per loan type
+LOAN_TERMS = {"Personal": (1, 7), "Business": (2, 10), "Mortgage": (10, 30), "Auto": (2, 7),
+              "Student": (5, 20), "Asset-Backed": (3, 10), "Other": (1, 10)}
+
+# Daily history written by default (days up to as_of)
+DEFAULT_HISTORY_DAYS = 365
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _to_datetime64(values: Sequence[date]) -> np.ndarray:
+    # Ordinals avoid numpy's slow per-object date conversion
+    return (np.fromiter((value.toordinal() for value in values), dtype=np.int64,
+                        count=len(values)) - _EPOCH).astype("datetime64[D]")
+
+
+def _to_dates(values: np.ndarray) -> List[date]:
+    return [date.fromordinal(int(value) + _EPOCH) for value in values.astype(np.int64)]
+
+
+def amortization_schedule(principal: np.ndarray, annual_rate: np.ndarray, periods_per_year: np.ndarray,
+                          start_dates: np.ndarray, maturity_dates: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Level-payment (annuity) schedules of many loans at once.
+
+    Installments fall every 12 / periods_per_year months after the start
+    date, the last one on the maturity date. Each loan's installments are
+    laid out back to back in flat arrays, and balances come from the closed
+    form B_k = L (1 + r)^k - P ((1 + r)^k - 1) / r, so no step loops over
+    installments. Interest is rounded to cents from that balance, the
+    reported balance is the amount less the rounded principal repaid so
+    far, and the final installment repays that remainder, so principal
+    sums to the amount to the cent.
+
+    Args:
+        principal (array): (loans,) amounts borrowed.
+        annual_rate (array): (loans,) annual interest rates in percent.
+        periods_per_year (array): (loans,) installments per year.
+        start_dates (array): (loans,) datetime64[D] start dates.
+        maturity_dates (array): (loans,) datetime64[D] maturity dates.
+
+    Returns:
+        dict: "offsets" and "counts" (loans,) locating each loan's
+            installments, "amount" (loans,) principal, and flat arrays
+            "loan_index", "period" (1-based), "due_dates", "payment",
+            "interest", "principal" and "balance" (after the installment).
+    """
+    principal = np.asarray(principal, dtype=float)
+    step = 12 // np.asarray(periods_per_year, dtype=int)
+    start_dates = np.asarray(start_dates, dtype="datetime64[D]")
+    maturity_dates = np.asarray(maturity_dates, dtype="datetime64[D]")
+    months = (maturity_dates.astype("datetime64[M]") - start_dates.astype("datetime64[M]")).astype(int)
+    counts = np.maximum(-(-months // step), 1)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    loan_index = np.repeat(np.arange(len(principal)), counts)
+    period = np.arange(counts.sum()) - offsets[loan_index] + 1
+    due_dates = add_months(start_dates[loan_index], period * step[loan_index])
+    last = offsets + counts - 1
+    due_dates[last] = maturity_dates
+
+    rate = np.asarray(annual_rate, dtype=float) / 100.0 / np.asarray(periods_per_year, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(rate > 0, principal * rate / -np.expm1(-counts * np.log1p(rate)),
+                           principal / counts)
+    payment = np.round(payment, 2)
+
+    r, level = rate[loan_index], payment[loan_index]
+    growth = np.exp(period * np.log1p(r))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(r > 0, (growth - 1.0) / r, period)
+    balance = principal[loan_index] * growth - level * annuity
+    previous = np.where(period > 1, np.roll(balance, 1), principal[loan_index])
+    interest = np.round(previous * r, 2)
+
+    # Running balance in cents: amount less the rounded principal repaid so far
+    is_last = np.arange(len(period)) == last[loan_index]
+    repaid = np.where(is_last, 0, np.rint((level - interest) * 100.0)).astype(np.int64)
+    cumulative = np.cumsum(repaid)
+    cumulative -= (cumulative[offsets] - repaid[offsets])[loan_index]
+    amount = np.rint(principal * 100.0).astype(np.int64)
+    remaining = amount[loan_index] - cumulative
+
+    # The final installment repays whatever is left, with interest on it
+    outstanding = amount - cumulative[last]
+    repaid[last] = outstanding
+    remaining[last] = 0
+    interest[last] = np.round(outstanding / 100.0 * rate, 2)
+    installment = np.round(repaid / 100.0 + interest, 2)
+
+    ROWS_GENERATED.inc(len(period), asset="loan", kind="repayment")
+    return {
+        "offsets": offsets,
+        "counts": counts,
+        "amount": principal,
+        "loan_index": loan_index,
+        "period": period,
+        "due_dates": due_dates,
+        "payment": installment,
+        "interest": interest,
+        "principal": repaid / 100.0,
+        "balance": remaining / 100.0,
+    }
+
+
+def repayment_status(schedule: Dict[str, np.ndarray], as_of: date,
+                     defaulted: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Which installments are paid, overdue or still due on as_of.
+
+    Installments due on or before as_of are paid, except that a defaulted
+    loan's latest past-due installment is overdue and unpaid.
+
+    Returns:
+        dict: Flat "status" (Paid/Overdue/Due), "amount_paid" and per-loan
+            "paid_count" (installments paid) and "default_dates"
+            (datetime64[D], NaT without a default).
+    """
+    as_of64 = np.datetime64(as_of, "D")
+    offsets, loan_index = schedule["offsets"], schedule["loan_index"]
+    past_due = schedule["due_dates"] <= as_of64
+    due_count = np.bincount(loan_index, past_due, minlength=len(offsets)).astype(int)
+
+    defaulted = np.asarray(defaulted, dtype=bool) & (due_count > 0)
+    paid_count = due_count - defaulted
+    overdue_row = offsets + due_count - 1
+    position = schedule["period"] - 1
+
+    status = np.where(past_due, "Paid", "Due").astype(object)
+    overdue = defaulted[loan_index] & (position == due_count[loan_index] - 1)
+    status[overdue] = "Overdue"
+    default_dates = np.full(len(offsets), np.datetime64("NaT"), dtype="datetime64[D]")
+    default_dates[defaulted] = schedule["due_dates"][overdue_row[defaulted]]
+    return {
+        "status": status,
+        "amount_paid": np.where(position < paid_count[loan_index], schedule["payment"], 0.0),
+        "paid_count": paid_count,
+        "default_dates": default_dates,
+    }
+
+
+def daily_balances(schedule: Dict[str, np.ndarray], status: Dict[str, np.ndarray],
+                   start_dates: np.ndarray, end_dates: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Outstanding balance of every loan on every day of its window.
+
+    Each loan's days are laid out back to back; the number of installments
+    paid by each day comes from one searchsorted over (loan, date) keys.
+
+    Args:
+        start_dates (array): (loans,) first day of each window.
+        end_dates (array): (loans,) last day of each window (windows ending
+            before they start are empty).
+
+    Returns:
+        dict: Flat "loan_index", "dates", "outstanding_balance",
+            "amount_paid" and "default_flag".
+    """
+    start = np.asarray(start_dates, dtype="datetime64[D]").astype(np.int64)
+    end = np.asarray(end_dates, dtype="datetime64[D]").astype(np.int64)
+    days = np.maximum(end - start + 1, 0)
+    loan_index = np.repeat(np.arange(len(days)), days)
+    first_day = np.concatenate([[0], np.cumsum(days)[:-1]])
+    day = start[loan_index] + np.arange(days.sum()) - first_day[loan_index]
+
+    # Installments due on or before each day, per loan
+    span = int(max(day.max(initial=0), schedule["due_dates"].astype(np.int64).max(initial=0))) + 1
+    installment_keys = schedule["loan_index"] * span + schedule["due_dates"].astype(np.int64)
+    day_keys = loan_index * span + day
+    due = np.searchsorted(installment_keys, day_keys, side="right") - schedule["offsets"][loan_index]
+    paid = np.minimum(due, status["paid_count"][loan_index])
+
+    flat = schedule["offsets"][loan_index] + paid - 1
+    balance = np.where(paid > 0, schedule["balance"][np.maximum(flat, 0)], schedule["amount"][loan_index])
+
+    # Payments land on their due dates
+    on_due_date = np.searchsorted(installment_keys, day_keys, side="left")
+    hit = on_due_date < len(installment_keys)
+    hit[hit] = installment_keys[on_due_date[hit]] == day_keys[hit]
+    amount_paid = np.where(hit, status["amount_paid"][np.minimum(on_due_date, len(installment_keys) - 1)], 0.0)
+
+    default_day = status["default_dates"].astype(np.int64)
+    defaulted = ~np.isnat(status["default_dates"])
+    return {
+        "loan_index": loan_index,
+        "dates": day.astype("datetime64[D]"),
+        "outstanding_balance": balance,
+        "amount_paid": amount_paid,
+        "default_flag": defaulted[loan_index] & (day >= default_day[loan_index]),
+    }
+
+
+class LoanAmortizationEngine:
+    """
+    Writes RepaymentSchedule and daily LoanHistoricalData for stored loans.
+
+    Loans are processed loans_per_batch at a time: each batch's schedules
+    and balances are computed with array operations and inserted with
+    executemany, replacing whatever the loans had before.
+
+    Args:
+        session (Session): Session on the loan database.
+        as_of (date): Valuation date; installments due by then are paid.
+        history_days (int, optional): Days of history up to as_of per loan;
+            None writes each loan's full life up to as_of.
+    """
+
+    def __init__(self, session: Session, as_of: Optional[date] = None,
+                 history_days: Optional[int] = DEFAULT_HISTORY_DAYS):
+        self.session = session
+        self.as_of = as_of or date.today()
+        self.history_days = history_days
+
+    def compute(self, loans: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Schedules, statuses and daily balances of a batch of loans.
+
+        Args:
+            loans (list): Loan rows or dicts (loan_id, principal_amount,
+                interest_rate, repayment_frequency, start_date,
+                maturity_date, loan_status).
+        """
+        def field(loan, name):
+            return loan[name] if isinstance(loan, dict) else getattr(loan, name)
+
+        starts = _to_datetime64([field(loan, "start_date") for loan in loans])
+        maturities = _to_datetime64([field(loan, "maturity_date") for loan in loans])
+        schedule = amortization_schedule(
+            [float(field(loan, "principal_amount")) for loan in loans],
+            [float(field(loan, "interest_rate")) for loan in loans],
+            [REPAYMENT_FREQUENCIES[field(loan, "repayment_frequency") or "Monthly"] for loan in loans],
+            starts, maturities)
+        status = repayment_status(schedule, self.as_of,
+                                  [field(loan, "loan_status") == "Defaulted" for loan in loans])
+
+        as_of64 = np.datetime64(self.as_of, "D")
+        window_end = np.minimum(maturities, as_of64)
+        window_start = starts if self.history_days is None else \
+            np.maximum(starts, as_of64 - np.timedelta64(self.history_days - 1, "D"))
+        history = daily_balances(schedule, status, window_start, window_end)
+        return {"loan_ids": [field(loan, "loan_id") for loan in loans], "schedule": schedule,
+                "status": status, "history": history}
+
+    @staticmethod
+    def repayment_records(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        schedule, status = result["schedule"], result["status"]
+        loan_ids = result["loan_ids"]
+        due_dates = _to_dates(schedule["due_dates"])
+        return [{
+            "loan_id": loan_ids[loan],
+            "due_date": due_date,
+            "amount_due": amount_due,
+            "amount_paid": amount_paid,
+            "payment_date": due_date if state == "Paid" else None,
+            "status": state,
+        } for loan, due_date, amount_due, amount_paid, state in zip(
+            schedule["loan_index"].tolist(), due_dates, schedule["payment"].tolist(),
+            status["amount_paid"].tolist(), status["status"])]
+
+    @staticmethod
+    def history_records(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        history, loan_ids = result["history"], result["loan_ids"]
+        return [{
+            "loan_id": loan_ids[loan],
+            "date": day,
+            "outstanding_balance": balance,
+            "amount_paid": amount_paid,
+            "default_flag": flag,
+        } for loan, day, balance, amount_paid, flag in zip(
+            history["loan_index"].tolist(), _to_dates(history["dates"]),
+            np.round(history["outstanding_balance"], 2).tolist(),
+            np.round(history["amount_paid"], 2).tolist(), history["default_flag"].tolist())]
+
+    def write_batch(self, loans: Sequence[Any]) -> Dict[str, int]:
+        """
+        Replace the schedules and history of one batch of loans.
+        """
+        with stage_timer("loan", "amortization"):
+            result = self.compute(loans)
+            repayments = self.repayment_records(result)
+            history = self.history_records(result)
+
+        with stage_timer("loan", "db_write"):
+            loan_ids = result["loan_ids"]
+            for model in (RepaymentSchedule, LoanHistoricalData):
+                for start in range(0, len(loan_ids), _IN_CHUNK):
+                    self.session.query(model).filter(
+                        model.loan_id.in_(loan_ids[start:start + _IN_CHUNK])
+                    ).delete(synchronize_session=False)
+            if repayments:
+                self.session.execute(RepaymentSchedule.__table__.insert(), repayments)
+            if history:
+                self.session.execute(LoanHistoricalData.__table__.insert(), history)
+            self.session.commit()
+
+        ROWS_WRITTEN.inc(len(repayments), asset="loan", table="repayment_schedule")
+        ROWS_WRITTEN.inc(len(history), asset="loan", table="loan_historical_data")
+        return {"repayment_schedule": len(repayments), "loan_historical_data": len(history)}
+
+    def run(self, loan_ids: Optional[Sequence[str]] = None,
+            loans_per_batch: int = 1000) -> Dict[str, int]:
+        """
+        Amortize stored loans (all by default).
+
+        Returns:
+            dict: Rows written per table.
+        """
+        query = self.session.query(
+            Loan.loan_id, Loan.principal_amount, Loan.interest_rate, Loan.repayment_frequency,
+            Loan.start_date, Loan.maturity_date, Loan.loan_status)
+        if loan_ids is not None:
+            loans = []
+            loan_ids = list(loan_ids)
+            for start in range(0, len(loan_ids), _IN_CHUNK):
+                loans += query.filter(Loan.loan_id.in_(loan_ids[start:start + _IN_CHUNK])).all()
+        else:
+            loans = query.order_by(Loan.loan_id).all()
+
+        written = {"repayment_schedule": 0, "loan_historical_data": 0}
+        for start in range(0, len(loans), loans_per_batch):
+            for table, count in self.write_batch(loans[start:start + loans_per_batch]).items():
+                written[table] += count
+        return written
+
+
+class LoanBookGenerator:
+    """
+    Generates Loan rows for a whole loan book with array operations.
+
+    Args:
+        number_of_loans (int): Number of loans to generate.
+        as_of (date): Book date; loans start up to ten years before it.
+        default_rate (float): Fraction of live loans marked Defaulted.
+        seed (int, optional): Seed for reproducible books.
+    """
+
+    def __init__(self, number_of_loans: int, as_of: Optional[date] = None,
+                 default_rate: float = 0.02, seed: Optional[int] = None):
+        self.number_of_loans = number_of_loans
+        self.as_of = as_of or date.today()
+        self.default_rate = default_rate
+        self.rng = np.random.default_rng(seed)
+
+    def generate_terms(self) -> List[Dict[str, Any]]:
+        """
+        Random loan terms, one dictionary per loan (Loan table columns).
+        """
+        n, rng = self.number_of_loans, self.rng
+        loan_types = rng.choice(LOAN_TYPES, n)
+        low, high = (np.array([LOAN_TERMS[t][i] for t in loan_types]) for i in (0, 1))
+        term_months = rng.integers(low * 12, high * 12 + 1)
+        frequencies = np.where(np.isin(loan_types, ["Business", "Asset-Backed"]),
+                               rng.choice(list(REPAYMENT_FREQUENCIES), n), "Monthly")
+        step = 12 // np.array([REPAYMENT_FREQUENCIES[f] for f in frequencies])
+        term_months = np.maximum(term_months // step, 1) * step
+
+        as_of64 = np.datetime64(self.as_of, "D")
+        starts = as_of64 - rng.integers(0, 365 * 10 + 1, n).astype("timedelta64[D]")
+        maturities = add_months(starts, term_months)
+        principal = np.round(np.where(loan_types == "Mortgage", rng.lognormal(12.5, 0.5, n),
+                                      rng.lognormal(10.0, 1.0, n)), 2)
+        rates = np.round(rng.uniform(2.0, 15.0, n), 2)
+        borrower_types = np.where(np.isin(loan_types, ["Business", "Asset-Backed"]), "Business",
+                                  np.where(loan_types == "Other", rng.choice(BORROWER_TYPES, n), "Individual"))
+
+        live = maturities > as_of64
+        status = np.where(live, np.where(rng.random(n) < self.default_rate, "Defaulted", "Active"), "Closed")
+        lenders = rng.choice(LENDERS, n)
+        start_dates, maturity_dates = _to_dates(starts), _to_dates(maturities)
+        return [{
+            "loan_id": f"LN{i:010d}",
+            "loan_type": str(loan_types[i]),
+            "borrower_name": f"Borrower {i}",
+            "borrower_type": str(borrower_types[i]),
+            "lender_name": str(lenders[i]),
+            "principal_amount": float(principal[i]),
+            "interest_rate": float(rates[i]),
+            "repayment_frequency": str(frequencies[i]),
+            "start_date": start_dates[i],
+            "maturity_date": maturity_dates[i],
+            "loan_status": str(status[i]),
+            "currency": "USD",
+        } for i in range(n)]
+
+
+def generate_loan_book(number_of_loans: int, as_of: Optional[date] = None, seed: Optional[int] = None,
+                       history_days: Optional[int] = DEFAULT_HISTORY_DAYS,
+                       loans_per_batch: int = 1000) -> Dict[str, int]:
+    """
+    Generate a loan book with repayment schedules and daily balances.
+
+    Returns:
+        dict: Rows written per table.
+    """
+    engine = create_engine(LOAN_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    generator = LoanBookGenerator(number_of_loans, as_of, seed=seed)
+    try:
+        with stage_timer("loan", "init"):
+            loans = generator.generate_terms()
+        ROWS_GENERATED.inc(len(loans), asset="loan", kind="loan")
+        with stage_timer("loan", "db_write"):
+            session.execute(Loan.__table__.insert(), loans)
+            session.commit()
+        ROWS_WRITTEN.inc(len(loans), asset="loan", table="loans")
+
+        amortization = LoanAmortizationEngine(session, generator.as_of, history_days)
+        written = {"loans": len(loans), "repayment_schedule": 0, "loan_historical_data": 0}
+        for start in range(0, len(loans), loans_per_batch):
+            for table, count in amortization.write_batch(loans[start:start + loans_per_batch]).items():
+                written[table] += count
+    finally:
+        session.close()
+
+    print(f"Loan book generated: {written}")
+    return written
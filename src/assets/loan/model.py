@@ -40,8 +40,8 @@ class Loan(Base):
     loan_status = Column(Enum(
         "Active", "Closed", "Defaulted", "Restructured", name="loan_status_enum"
     ), default="Active")  # Loan Status
-    currency = Column(String(3), ForeignKey(
-        "currencies.iso_code"))  # Currency of Loan
+    # ISO code of the loan currency (currencies live in their own database)
+    currency = Column(String(3), default="USD")
     collateral_type = Column(Enum(
         "Real Estate", "Stock", "Bond", "Commodity", "Cash", "Other", name="collateral_type_enum"
     ), nullable=True)  # Type of Collateral
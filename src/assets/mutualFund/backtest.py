@@ -0,0 +1,292 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: backtest.py
+
+Relative Path: src/assets/mutualFund/backtest.py
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from assets.mutualFund.model import MutualFund, MutualFundExpense, MutualFundPortfolio
+from assets.mutualFund.nav import DEFAULT_BASE_NAV, PRICE_SOURCES, load_close_matrix, weight_matrix
+from monitoring.metrics import stage_timer
+from valuation.fx import FXConverter, currency_groups, load_asset_currencies
+
+DAYS_PER_YEAR = 365
+
+# Calendar rebalancing frequency -> period length in months
+CALENDAR_FREQUENCIES = {
+    "monthly": 1,
+    "quarterly": 3,
+    "semi-annual": 6,
+    "annual": 12,
+}
+
+
+class RebalancingPolicy:
+    """
+    When a portfolio is traded back to its target weights.
+
+    Args:
+        name (str): Label used in the results.
+        frequency (str, optional): Calendar rebalancing on the first day of
+            each period (see CALENDAR_FREQUENCIES).
+        threshold (float, optional): Rebalance whenever any weight drifts
+            more than this many percentage points from its target.
+
+    Both may be combined; with neither the portfolio is buy-and-hold.
+    """
+
+    def __init__(self, name: str, frequency: Optional[str] = None, threshold: Optional[float] = None):
+        if frequency is not None and frequency not in CALENDAR_FREQUENCIES:
+            raise ValueError(f"Unknown rebalancing frequency: {frequency}")
+        self.name = name
+        self.frequency = frequency
+        self.threshold = threshold
+
+    def calendar_mask(self, dates: Sequence[date]) -> np.ndarray:
+        """
+        (dates,) True on the first day of each new calendar period.
+        """
+        mask = np.zeros(len(dates), dtype=bool)
+        if self.frequency is None or not dates:
+            return mask
+        months = CALENDAR_FREQUENCIES[self.frequency]
+        period = np.array([(d.year * 12 + d.month - 1) // months for d in dates])
+        mask[1:] = period[1:] != period[:-1]
+        return mask
+
+
+STANDARD_POLICIES = [
+    RebalancingPolicy("buy_and_hold"),
+    RebalancingPolicy("monthly", frequency="monthly"),
+    RebalancingPolicy("quarterly", frequency="quarterly"),
+    RebalancingPolicy("threshold_5pct", threshold=5.0),
+    RebalancingPolicy("quarterly_or_5pct", frequency="quarterly", threshold=5.0),
+]
+
+
+def run_backtest(
+    closes: np.ndarray,
+    dates: Sequence[date],
+    target_weights: np.ndarray,
+    policies: Sequence[RebalancingPolicy],
+    expense_ratio: Any = 0.0,
+    entry_load: Any = 0.0,
+    exit_load: Any = 0.0,
+    base_nav: float = DEFAULT_BASE_NAV
+) -> Dict[str, Any]:
+    """
+    Backtest every (policy, weight vector) pair over one price panel.
+
+    All pairs move through the panel together: each day is one array
+    update over (policies x portfolios x assets). Holdings drift with
+    prices and pay expense_ratio / 365 a day. When a pair rebalances it
+    trades back to target, paying entry_load on purchases and exit_load
+    on sales.
+
+    Args:
+        closes (array): (assets, dates) forward-filled closes.
+        dates (list): Dates of the closes.
+        target_weights (array): (portfolios, assets) target weights in any
+            unit; assets without a price on the first day are dropped.
+        policies (list): RebalancingPolicy objects.
+        expense_ratio (float or array): Annual expense ratio in percent,
+            shared or per portfolio. Entry and exit loads likewise.
+        base_nav (float): Starting NAV.
+
+    Returns:
+        dict: "nav" (policies, portfolios, dates), and (policies, portfolios)
+            arrays "turnover" (annualised one-way %), "trading_costs" and
+            "expense_drag" (annualised % of NAV), "cost_drag" (their sum),
+            "rebalances" (count) and "annual_return" (%). A panel without
+            dates gives empty NAVs and NaN returns.
+    """
+    closes = np.asarray(closes, dtype=float)
+    portfolios, days = target_weights.shape[0], closes.shape[1]
+    shape = (len(policies), portfolios)
+    if days == 0:
+        return {
+            "policies": [policy.name for policy in policies],
+            "dates": [],
+            "nav": np.empty(shape + (0,)),
+            **{column: np.zeros(shape) for column in ("turnover", "trading_costs", "expense_drag", "cost_drag")},
+            "rebalances": np.zeros(shape, dtype=int),
+            "annual_return": np.full(shape, np.nan),
+        }
+
+    def per_portfolio(value):
+        return np.broadcast_to(np.asarray(value, dtype=float) / 100.0, (portfolios,))[None, :, None]
+
+    expense, entry, exit_ = (per_portfolio(v) for v in (expense_ratio, entry_load, exit_load))
+    calendar = np.stack([policy.calendar_mask(dates) for policy in policies]) \
+        if policies else np.zeros((0, days), dtype=bool)
+    threshold = np.array([np.inf if policy.threshold is None else policy.threshold / 100.0
+                          for policy in policies])[:, None]
+
+    priced = np.isfinite(closes[:, 0]) & (closes[:, 0] > 0)
+    target = np.asarray(target_weights, dtype=float) * priced[None, :]
+    totals = target.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        target = np.where(totals > 0, target / totals, 0.0)[None, :, :]
+        growth = np.nan_to_num(closes[:, 1:] / closes[:, :-1], nan=1.0, posinf=1.0)
+
+    # Initial purchase pays the entry load
+    holdings = np.broadcast_to(target * base_nav * (1.0 - entry), shape + target.shape[2:]).copy()
+    nav = np.empty(shape + (days,))
+    nav[..., 0] = holdings.sum(axis=-1)
+    turnover = np.zeros(shape)
+    trading_costs = np.zeros(shape)
+    expense_drag = np.zeros(shape)
+    rebalances = np.zeros(shape, dtype=int)
+
+    for t in range(1, days):
+        holdings *= growth[:, t - 1]
+        value = holdings.sum(axis=-1, keepdims=True)
+        fee = value * expense / DAYS_PER_YEAR
+        holdings *= 1.0 - expense / DAYS_PER_YEAR
+        value -= fee
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drift = np.abs(holdings / value - target).max(axis=-1)
+        trigger = calendar[:, t][:, None] | (drift > threshold)
+        if trigger.any():
+            trades = target * value - holdings
+            buys = np.clip(trades, 0.0, None).sum(axis=-1, keepdims=True)
+            sells = np.clip(-trades, 0.0, None).sum(axis=-1, keepdims=True)
+            cost = buys * entry + sells * exit_
+            rebalanced = target * (value - cost)
+            holdings = np.where(trigger[..., None], rebalanced, holdings)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                turnover += np.where(trigger, ((buys + sells) / 2.0 / value)[..., 0], 0.0)
+                trading_costs += np.where(trigger, (cost / value)[..., 0], 0.0)
+            rebalances += trigger
+            value = holdings.sum(axis=-1, keepdims=True)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expense_drag += (fee / (value + fee))[..., 0]
+        nav[..., t] = value[..., 0]
+
+    years = max((days - 1) / DAYS_PER_YEAR, 1.0 / DAYS_PER_YEAR)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual_return = ((nav[..., -1] / base_nav) ** (1.0 / years) - 1.0) * 100.0
+    return {
+        "policies": [policy.name for policy in policies],
+        "dates": list(dates),
+        "nav": nav,
+        "turnover": turnover / years * 100.0,
+        "trading_costs": trading_costs / years * 100.0,
+        "expense_drag": expense_drag / years * 100.0,
+        "cost_drag": (trading_costs + expense_drag) / years * 100.0,
+        "rebalances": rebalances,
+        "annual_return": annual_return,
+    }
+
+
+def backtest_funds(
+    fund_session: Session,
+    price_sessions: Dict[str, Session],
+    fund_ids: Sequence[str],
+    policies: Sequence[RebalancingPolicy] = STANDARD_POLICIES,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    fx_rates: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Backtest the portfolio weights of existing funds under several policies.
+
+    Targets come from MutualFundPortfolio.weightage; the expense ratio
+    (management_fee when it is missing) and the entry and exit loads come
+    from MutualFundExpense. With fx_rates (a CrossRateCache), each fund is
+    backtested on closes converted into its MutualFund.currency.
+
+    Returns:
+        dict: run_backtest result with "fund_ids" for the portfolio axis.
+    """
+    fund_ids = list(fund_ids)
+    if not fund_ids:
+        result = run_backtest(np.empty((0, 0)), [], np.empty((0, 0)), policies)
+        result["fund_ids"] = fund_ids
+        return result
+    with stage_timer("mutual_fund", "price_load"):
+        holdings = fund_session.query(
+            MutualFundPortfolio.fund_id, MutualFundPortfolio.asset_type,
+            MutualFundPortfolio.asset_id, MutualFundPortfolio.weightage
+        ).filter(MutualFundPortfolio.fund_id.in_(fund_ids)).all()
+        assets = sorted({(h.asset_type, h.asset_id) for h in holdings
+                         if h.asset_type in PRICE_SOURCES})
+        prices = load_close_matrix(price_sessions, assets)
+
+        dates = prices["dates"]
+        first = next((i for i, d in enumerate(dates) if start_date is None or d >= start_date), len(dates))
+        last = max((i + 1 for i, d in enumerate(dates) if end_date is None or d <= end_date), default=0)
+        closes, dates = prices["closes"][:, first:last], dates[first:last]
+
+        converter = None
+        fund_currencies = [None] * len(fund_ids)
+        if fx_rates is not None:
+            converter = FXConverter(fx_rates, prices["ordinals"][first:last])
+            asset_currencies = load_asset_currencies(price_sessions, assets)
+            currency_of = dict(fund_session.query(MutualFund.fund_id, MutualFund.currency)
+                               .filter(MutualFund.fund_id.in_(fund_ids)).all())
+            fund_currencies = [currency_of.get(fund_id) for fund_id in fund_ids]
+        else:
+            asset_currencies = []
+
+    costs = {fund_id: (0.0, 0.0, 0.0) for fund_id in fund_ids}
+    for fund_id, expense_ratio, management_fee, entry_load, exit_load in fund_session.query(
+            MutualFundExpense.fund_id, MutualFundExpense.expense_ratio, MutualFundExpense.management_fee,
+            MutualFundExpense.entry_load, MutualFundExpense.exit_load
+    ).filter(MutualFundExpense.fund_id.in_(fund_ids)).all():
+        costs[fund_id] = (float(expense_ratio if expense_ratio is not None else management_fee or 0.0),
+                          float(entry_load or 0.0), float(exit_load or 0.0))
+    expense_ratio, entry_load, exit_load = (np.array(column) for column in
+                                            zip(*(costs[fund_id] for fund_id in fund_ids)))
+
+    with stage_timer("mutual_fund", "backtest"):
+        weights = weight_matrix(holdings, fund_ids, assets)
+        result = None
+        # One run per fund currency, on closes converted into it
+        for rows, panel in currency_groups(closes, asset_currencies, fund_currencies, converter):
+            part = run_backtest(panel, dates, weights[rows], policies,
+                                expense_ratio[rows], entry_load[rows], exit_load[rows])
+            if result is None:
+                result = {key: np.zeros((len(policies), len(fund_ids)) + value.shape[2:], dtype=value.dtype)
+                          if isinstance(value, np.ndarray) else value for key, value in part.items()}
+            for key, value in part.items():
+                if isinstance(value, np.ndarray):
+                    result[key][:, rows] = value
+    result["fund_ids"] = fund_ids
+    return result
+
+
+def backtest_summary(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    One row per (policy, portfolio) with the headline statistics.
+    """
+    portfolios = result.get("fund_ids") or list(range(result["nav"].shape[1]))
+
+    nav = result["nav"]
+    final_nav = nav[..., -1] if nav.shape[-1] else np.full(nav.shape[:-1], np.nan)
+
+    def rounded(value):
+        return round(float(value), 4) if np.isfinite(value) else None
+
+    return [{
+        "policy": policy,
+        "portfolio": portfolio,
+        "final_nav": rounded(final_nav[i, j]),
+        "annual_return": rounded(result["annual_return"][i, j]),
+        "turnover": rounded(result["turnover"][i, j]),
+        "trading_costs": rounded(result["trading_costs"][i, j]),
+        "expense_drag": rounded(result["expense_drag"][i, j]),
+        "cost_drag": rounded(result["cost_drag"][i, j]),
+        "rebalances": int(result["rebalances"][i, j])
+    } for i, policy in enumerate(result["policies"]) for j, portfolio in enumerate(portfolios)]
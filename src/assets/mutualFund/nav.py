@@ -0,0 +1,379 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: nav.py
+
+Relative Path: src/assets/mutualFund/nav.py
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.bonds.model import BondHistoricalData
+from assets.mutualFund.model import Base, MutualFund, MutualFundPerformance, MutualFundPortfolio
+from assets.stocks.model import HistoricalData
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+from valuation.fx import FXConverter, currency_groups, load_asset_currencies, load_fx_rates
+
+MUTUAL_FUND_DATABASE_URL = "sqlite:///data/mutual_funds.db"
+STOCKS_DATABASE_URL = "sqlite:///data/stocks.db"
+BONDS_DATABASE_URL = "sqlite:///data/bonds.db"
+
+# NAV per unit on the fund's first priced day
+DEFAULT_BASE_NAV = 10.0
+
+# MutualFundPerformance column -> horizon in years (3y and 5y are annualised)
+RETURN_HORIZONS = {
+    "one_year_return": 1,
+    "three_year_return": 3,
+    "five_year_return": 5,
+}
+
+# Daily close table and identifier column per MutualFundPortfolio.asset_type
+PRICE_SOURCES = {
+    "Stock": (HistoricalData, "ticker"),
+    "Bond": (BondHistoricalData, "isin"),
+}
+
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+
+def _field(row: Any, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def load_close_matrix(price_sessions: Dict[str, Session],
+                      assets: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Closing prices of many assets aligned on one date axis.
+
+    Prices are forward-filled over days an asset did not trade; days
+    before an asset's first close stay NaN.
+
+    Args:
+        price_sessions (dict): asset_type -> session on its price database.
+        assets (list): (asset_type, asset_id) pairs, one row each.
+
+    Returns:
+        dict: "ordinals" (dates,) proleptic ordinals, "dates" (list of date),
+            "closes" (assets, dates) and "last_index" (assets,) index of each
+            asset's last actual close (-1 without prices).
+    """
+    row_of = {asset: i for i, asset in enumerate(assets)}
+    rows, ordinals, prices = [], [], []
+
+    for asset_type, (model, key) in PRICE_SOURCES.items():
+        ids = [asset_id for kind, asset_id in assets if kind == asset_type]
+        session = price_sessions.get(asset_type)
+        if not ids or session is None:
+            continue
+        key_column = getattr(model, key)
+        for start in range(0, len(ids), _IN_CHUNK):
+            for asset_id, day, close in session.query(key_column, model.date, model.close_price) \
+                    .filter(key_column.in_(ids[start:start + _IN_CHUNK])).all():
+                if close is None:
+                    continue
+                rows.append(row_of[(asset_type, asset_id)])
+                ordinals.append(day.toordinal())
+                prices.append(float(close))
+
+    if not rows:
+        return {"ordinals": np.array([], dtype=int), "dates": [],
+                "closes": np.full((len(assets), 0), np.nan),
+                "last_index": np.full(len(assets), -1)}
+
+    ordinals = np.asarray(ordinals, dtype=int)
+    axis, columns = np.unique(ordinals, return_inverse=True)
+    closes = np.full((len(assets), len(axis)), np.nan)
+    closes[np.asarray(rows), columns] = prices
+
+    # Forward-fill: index of the last valid close at or before each day
+    last = np.where(np.isfinite(closes), np.arange(len(axis))[None, :], 0)
+    np.maximum.accumulate(last, axis=1, out=last)
+    closes = np.take_along_axis(closes, last, axis=1)
+    last_index = np.where(np.isfinite(closes[:, -1]), last[:, -1], -1)
+
+    return {"ordinals": axis, "dates": [date.fromordinal(int(o)) for o in axis],
+            "closes": closes, "last_index": last_index}
+
+
+def weight_matrix(holdings: Sequence[Any], fund_ids: Sequence[str],
+                  assets: Sequence[Tuple[str, str]]) -> np.ndarray:
+    """
+    (funds, assets) matrix of MutualFundPortfolio.weightage in percent.
+
+    Duplicate holdings of the same asset are added together; holdings of
+    unknown funds or assets are ignored.
+    """
+    fund_index = {fund_id: i for i, fund_id in enumerate(fund_ids)}
+    asset_index = {asset: i for i, asset in enumerate(assets)}
+    weights = np.zeros((len(fund_ids), len(assets)))
+    pairs = [(fund_index.get(_field(h, "fund_id")),
+              asset_index.get((_field(h, "asset_type"), _field(h, "asset_id"))),
+              float(_field(h, "weightage") or 0.0)) for h in holdings]
+    pairs = [p for p in pairs if p[0] is not None and p[1] is not None]
+    if pairs:
+        funds, columns, values = zip(*pairs)
+        np.add.at(weights, (np.array(funds), np.array(columns)), values)
+    return weights
+
+
+def compute_units(closes: np.ndarray, weights: np.ndarray, start_index: np.ndarray,
+                  base_nav: float = DEFAULT_BASE_NAV) -> np.ndarray:
+    """
+    Units of each holding bought on each fund's start day.
+
+    A fund with NAV base_nav buys its weights at the closes of its start
+    day. Holdings without a price on that day are left out and the other
+    weights rescaled.
+
+    Args:
+        closes (array): (assets, dates) forward-filled closes.
+        weights (array): (funds, assets) weights in any unit.
+        start_index (array): (funds,) first date index of each fund;
+            values >= dates mean the fund has not started yet.
+        base_nav (float): NAV on the start day.
+
+    Returns:
+        array: (funds, assets) units held per fund unit (zero rows for
+            funds that have not started or hold nothing priced).
+    """
+    units = np.zeros(weights.shape)
+    for start in np.unique(start_index[start_index < closes.shape[1]]):
+        group = np.flatnonzero(start_index == start)
+        priced = np.isfinite(closes[:, start]) & (closes[:, start] > 0)
+        group_weights = weights[group] * priced[None, :]
+        totals = group_weights.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            group_weights = np.where(totals > 0, group_weights / totals, 0.0)
+            prices = np.where(priced, closes[:, start], np.inf)
+        units[group] = base_nav * group_weights / prices[None, :]
+    return units
+
+
+def compute_nav(closes: np.ndarray, units: np.ndarray, start_index: np.ndarray,
+                last_index: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Buy-and-hold NAV per unit for every fund in one matrix product.
+
+    NAV(t) = sum_i units_i * P_i(t). Holdings that stop trading are
+    carried at their last close, until none of the fund's holdings
+    trade any more.
+
+    Args:
+        closes (array): (assets, dates) forward-filled closes.
+        units (array): (funds, assets) from compute_units.
+        start_index (array): (funds,) first date index of each fund.
+        last_index (array, optional): (assets,) last date index with an
+            actual close per asset; NAV ends with the fund's latest one.
+
+    Returns:
+        array: (funds, dates) NAV, NaN outside the fund's priced life or
+            when none of its holdings are priced.
+    """
+    days = closes.shape[1]
+    nav = units @ np.nan_to_num(closes)
+    index = np.arange(days)[None, :]
+    nav[(index < start_index[:, None]) | ~(units > 0).any(axis=1)[:, None]] = np.nan
+
+    if last_index is not None:
+        end = np.where(units > 0, last_index[None, :], -1).max(axis=1, initial=-1)
+        nav[index > end[:, None]] = np.nan
+
+    return nav
+
+
+def rolling_returns(ordinals: np.ndarray, nav: np.ndarray, years: int) -> np.ndarray:
+    """
+    Trailing return in percent over `years` calendar years for every day.
+
+    The reference NAV is the last one on or before the same day `years`
+    earlier. Horizons longer than a year are annualised.
+
+    Returns:
+        array: (funds, dates) returns, NaN without a full history.
+    """
+    target = ordinals - int(round(365.25 * years))
+    lag = np.searchsorted(ordinals, target, side="right") - 1
+    reference = np.where(lag >= 0, nav[:, np.maximum(lag, 0)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = nav / reference
+        if years > 1:
+            growth = growth ** (1.0 / years)
+    return (growth - 1.0) * 100.0
+
+
+class MutualFundNAVEngine:
+    """
+    NAV and trailing returns for many mutual funds in one batch.
+
+    Args:
+        fund_session (Session): Session on the mutual fund database.
+        price_sessions (dict): asset_type -> session on the database holding
+            its daily closes ("Stock" and "Bond" are supported).
+        base_nav (float): NAV per unit on each fund's first priced day.
+        fx_rates (CrossRateCache, optional): Exchange rates; when given,
+            holdings are converted into each fund's currency before valuation.
+    """
+
+    def __init__(self, fund_session: Session, price_sessions: Dict[str, Session],
+                 base_nav: float = DEFAULT_BASE_NAV, fx_rates: Optional[Any] = None):
+        self.fund_session = fund_session
+        self.price_sessions = price_sessions
+        self.base_nav = base_nav
+        self.fx_rates = fx_rates
+
+    def load_funds(self, fund_ids: Optional[Sequence[str]] = None) -> Tuple[List[Tuple[str, date, str]], List[Any]]:
+        """
+        Funds (id, inception date, currency) and their portfolio holdings.
+        """
+        query = self.fund_session.query(MutualFund.fund_id, MutualFund.inception_date, MutualFund.currency)
+        holdings = self.fund_session.query(
+            MutualFundPortfolio.fund_id, MutualFundPortfolio.asset_type,
+            MutualFundPortfolio.asset_id, MutualFundPortfolio.weightage)
+        if fund_ids is not None:
+            query = query.filter(MutualFund.fund_id.in_(list(fund_ids)))
+            holdings = holdings.filter(MutualFundPortfolio.fund_id.in_(list(fund_ids)))
+        return [tuple(row) for row in query.order_by(MutualFund.fund_id).all()], holdings.all()
+
+    def run(self, fund_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Compute the NAV series and 1/3/5-year returns of the given funds (all by default).
+
+        Returns:
+            dict: "fund_ids", "dates", "nav" (funds, dates), one
+                (funds, dates) array per RETURN_HORIZONS column, and the
+                "assets" held with the funds' "units" (funds, assets) and
+                their "last_prices", plus "asset_currencies" and
+                "fund_currencies" when exchange rates were applied.
+        """
+        with stage_timer("mutual_fund", "price_load"):
+            funds, holdings = self.load_funds(fund_ids)
+            unsupported = {h.asset_type for h in holdings} - set(PRICE_SOURCES)
+            if unsupported:
+                print(f"Skipping holdings without price history: {sorted(unsupported)}")
+            assets = sorted({(h.asset_type, h.asset_id) for h in holdings
+                             if h.asset_type in PRICE_SOURCES})
+            prices = load_close_matrix(self.price_sessions, assets)
+
+        with stage_timer("mutual_fund", "nav"):
+            ids = [fund_id for fund_id, _, _ in funds]
+            weights = weight_matrix(holdings, ids, assets)
+            inception = np.array([d.toordinal() if d else 0 for _, d, _ in funds], dtype=int)
+            start_index = np.searchsorted(prices["ordinals"], inception, side="left")
+
+            # Value each fund in its own currency, one converted panel per currency
+            converter = None
+            if self.fx_rates is not None:
+                converter = FXConverter(self.fx_rates, prices["ordinals"])
+                asset_currencies = load_asset_currencies(self.price_sessions, assets)
+            else:
+                asset_currencies = []
+            units = np.zeros(weights.shape)
+            nav = np.full((len(ids), len(prices["dates"])), np.nan)
+            for rows, closes in currency_groups(prices["closes"], asset_currencies,
+                                                [currency for _, _, currency in funds], converter):
+                units[rows] = compute_units(closes, weights[rows], start_index[rows], self.base_nav)
+                nav[rows] = compute_nav(closes, units[rows], start_index[rows], prices["last_index"])
+
+            result = {"fund_ids": ids, "dates": prices["dates"], "nav": nav,
+                      "assets": assets, "units": units,
+                      "asset_currencies": asset_currencies if converter is not None else None,
+                      "fund_currencies": [currency for _, _, currency in funds] if converter is not None else None,
+                      "last_prices": prices["closes"][:, -1] if prices["dates"] else
+                      np.full(len(assets), np.nan)}
+            for column, years in RETURN_HORIZONS.items():
+                result[column] = rolling_returns(prices["ordinals"], nav, years)
+
+        ROWS_GENERATED.inc(int(np.isfinite(nav).sum()), asset="mutual_fund", kind="nav")
+        return result
+
+    @staticmethod
+    def performance_records(result: Dict[str, Any], first: int = 0,
+                            count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        MutualFundPerformance rows for every day with a NAV of funds
+        first .. first + count (all funds by default).
+        """
+        rows = slice(first, None if count is None else first + count)
+        funds, days = np.nonzero(np.isfinite(result["nav"][rows]))
+        funds += first
+        columns = {"nav": result["nav"]}
+        columns.update({column: result[column] for column in RETURN_HORIZONS})
+        values = {}
+        for column, matrix in columns.items():
+            picked = np.round(matrix[funds, days], 2)
+            values[column] = [None if v != v else v for v in picked.tolist()]
+
+        fund_ids, dates = result["fund_ids"], result["dates"]
+        return [{
+            "fund_id": fund_ids[f],
+            "date": dates[d],
+            **{column: values[column][i] for column in columns}
+        } for i, (f, d) in enumerate(zip(funds.tolist(), days.tolist()))]
+
+    def write_performance(self, result: Dict[str, Any], funds_per_batch: int = 100) -> int:
+        """
+        Replace the stored performance of the computed funds in one transaction.
+
+        Rows are built and inserted funds_per_batch funds at a time so the
+        full (funds x dates) history never exists as Python objects at once.
+
+        Returns:
+            int: Number of MutualFundPerformance rows written.
+        """
+        fund_ids = result["fund_ids"]
+        for start in range(0, len(fund_ids), _IN_CHUNK):
+            self.fund_session.query(MutualFundPerformance).filter(
+                MutualFundPerformance.fund_id.in_(fund_ids[start:start + _IN_CHUNK])
+            ).delete(synchronize_session=False)
+
+        written = 0
+        for first in range(0, len(fund_ids), funds_per_batch):
+            records = self.performance_records(result, first, funds_per_batch)
+            if records:
+                self.fund_session.execute(MutualFundPerformance.__table__.insert(), records)
+                written += len(records)
+        self.fund_session.commit()
+        ROWS_WRITTEN.inc(written, asset="mutual_fund", table="mutual_fund_performance")
+        return written
+
+
+def update_mutual_fund_performance(fund_ids: Optional[Sequence[str]] = None,
+                                   base_nav: float = DEFAULT_BASE_NAV) -> Dict[str, Any]:
+    """
+    Recompute and store MutualFundPerformance from the stock and bond databases.
+
+    Args:
+        fund_ids (list, optional): Funds to update; all funds by default.
+        base_nav (float): NAV per unit on each fund's first priced day.
+
+    Returns:
+        dict: Engine result plus "rows_written".
+    """
+    fund_engine = create_engine(MUTUAL_FUND_DATABASE_URL)
+    Base.metadata.create_all(fund_engine)
+    fund_session = sessionmaker(bind=fund_engine)()
+    price_sessions = {
+        "Stock": sessionmaker(bind=create_engine(STOCKS_DATABASE_URL))(),
+        "Bond": sessionmaker(bind=create_engine(BONDS_DATABASE_URL))(),
+    }
+    try:
+        engine = MutualFundNAVEngine(fund_session, price_sessions, base_nav, load_fx_rates())
+        result = engine.run(fund_ids)
+        with stage_timer("mutual_fund", "db_write"):
+            result["rows_written"] = engine.write_performance(result)
+    finally:
+        fund_session.close()
+        for session in price_sessions.values():
+            session.close()
+
+    print(f"NAV computed for {len(result['fund_ids'])} funds over {len(result['dates'])} days")
+    return result
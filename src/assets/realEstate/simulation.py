@@ -0,0 +1,636 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: simulation.py
+
+Relative Path: src/assets/realEstate/simulation.py
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy import bindparam, create_engine, func, or_
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.realEstate.model import (
+    Base, FinancialMetrics, HistoricalData, MarketIndicators, Property, TenantInfo
+)
+from assets.rolling import rolling_mean
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+
+REAL_ESTATE_DATABASE_URL = "sqlite:///data/real_estate.db"
+DEFAULT_HISTORY_MONTHS = 60
+
+# Market assumptions per Property.property_type: base cap rate (%), annual
+# market rent growth and volatility (%), probability a tenant renews at
+# expiry, lease term and mean re-letting downtime (months), operating
+# expenses as a share of potential rent, and monthly market rent per sqft
+PROPERTY_TYPES = {
+    "Residential": {"cap_rate": 5.0, "rent_growth": 3.0, "rent_volatility": 4.0, "renewal_probability": 0.60,
+                    "lease_months": 12, "downtime_months": 1.5, "expense_ratio": 0.35, "rent_per_sqft": 2.0},
+    "Commercial": {"cap_rate": 6.5, "rent_growth": 2.0, "rent_volatility": 6.0, "renewal_probability": 0.70,
+                   "lease_months": 60, "downtime_months": 6.0, "expense_ratio": 0.30, "rent_per_sqft": 3.0},
+    "Industrial": {"cap_rate": 5.5, "rent_growth": 4.0, "rent_volatility": 5.0, "renewal_probability": 0.75,
+                   "lease_months": 84, "downtime_months": 4.0, "expense_ratio": 0.20, "rent_per_sqft": 1.0},
+}
+DEFAULT_PROPERTY_TYPE = "Residential"
+# Renewals keep the old rent plus this annual step, or move to market if higher
+RENEWAL_RENT_STEP = 0.03
+# Cap rates revert to the type's base at this speed (per year) with this
+# volatility (percentage points per sqrt(year)); a common rates factor
+# moves every property type together
+CAP_RATE_MEAN_REVERSION = 0.5
+CAP_RATE_VOLATILITY = 0.6
+RATES_FACTOR_WEIGHT = 0.7
+# Share of operating expenses that is fixed (taxes, insurance) rather than
+# scaling with occupancy, and their annual inflation
+FIXED_EXPENSE_SHARE = 0.7
+EXPENSE_INFLATION = 3.0
+# Mortgage terms for the stored balances: the term left when a property's
+# history starts (Property.historical_data_start_date), running down from there
+MORTGAGE_RATE = 6.0
+MORTGAGE_REMAINING_YEARS = 25
+# Months of NOI behind the valuation (trailing, annualised)
+NOI_WINDOW = 12
+
+CITIES = [("New York", "NY", "10001"), ("Chicago", "IL", "60601"), ("Austin", "TX", "73301"),
+          ("Seattle", "WA", "98101"), ("Miami", "FL", "33101"), ("Denver", "CO", "80201")]
+
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _to_date(value: Union[date, datetime]) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _month(value: date) -> int:
+    """
+    Months since January 1970.
+    """
+    return (value.year - 1970) * 12 + value.month - 1
+
+
+def _month_ends(months: np.ndarray) -> List[date]:
+    ends = (np.asarray(months).astype("datetime64[M]") + 1).astype("datetime64[D]") - 1
+    return [date.fromordinal(int(day) + _EPOCH) for day in ends.astype(np.int64)]
+
+
+def _unit_number(number: int) -> str:
+    """
+    TenantInfo.unit_number of a property's 1-based unit number.
+    """
+    return f"U{number:04d}"
+
+
+def _type_parameters(property_types: Sequence[str]) -> Dict[str, np.ndarray]:
+    types = [t if t in PROPERTY_TYPES else DEFAULT_PROPERTY_TYPE for t in property_types]
+    return {name: np.array([PROPERTY_TYPES[t][name] for t in types], dtype=float)
+            for name in PROPERTY_TYPES[DEFAULT_PROPERTY_TYPE]}
+
+
+def mortgage_balances(balance: np.ndarray, months: int, annual_rate: float = MORTGAGE_RATE,
+                      remaining_months: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Level monthly debt service and month-end balances of many mortgages.
+
+    Uses the closed form B_k = B (1 + r)^k - P ((1 + r)^k - 1) / r. A
+    level-payment balance re-amortised over its true remaining term gives
+    back the original payment, so carrying the term across runs is enough
+    to keep debt service constant until the loan is repaid.
+
+    Args:
+        remaining_months (np.ndarray, optional): Months left on each loan
+            (MORTGAGE_REMAINING_YEARS for all by default).
+
+    Returns:
+        dict: "payment" (properties,), and (properties, months) "balance"
+            and "paying" (whether the loan is still amortising).
+    """
+    r = annual_rate / 1200.0
+    n = np.full(len(balance), MORTGAGE_REMAINING_YEARS * 12) if remaining_months is None \
+        else np.maximum(np.asarray(remaining_months, dtype=np.int64), 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(n > 0, balance * r / (1.0 - (1.0 + r) ** -n), 0.0)
+    elapsed = np.minimum(np.arange(1, months + 1)[None, :], n[:, None])
+    growth = (1.0 + r) ** elapsed
+    balances = np.maximum(balance[:, None] * growth - payment[:, None] * (growth - 1.0) / r, 0.0)
+    balances[n == 0] = 0.0
+    paying = np.arange(1, months + 1)[None, :] <= n[:, None]
+    return {"payment": payment, "balance": balances, "paying": paying}
+
+
+class RealEstatePortfolioSimulator:
+    """
+    Monthly lease, NOI and valuation simulation for a property portfolio.
+
+    Every unit of every property lives in flat arrays (property index,
+    rent, lease end month, vacancy), and each month updates all of them at
+    once: expiring leases renew with their type's renewal probability or
+    go vacant for a random downtime and re-let at market rent. Market rents
+    per sqft follow a GBM per property with a shared factor per type; cap
+    rates mean-revert around the type's base with a common rates factor.
+    Market value is trailing annualised NOI over the cap rate.
+
+    Args:
+        properties (dict): Portfolio arrays from RealEstateEngine.load_portfolio.
+        seed (int, optional): Seed for reproducible simulations.
+    """
+
+    def __init__(self, properties: Dict[str, Any], seed: Optional[int] = None):
+        self.properties = properties
+        self.rng = np.random.default_rng(seed)
+
+    def market_paths(self, months: int) -> Dict[str, np.ndarray]:
+        """
+        (properties, months) market rent per sqft and cap rate (percent).
+        """
+        p, rng = self.properties, self.rng
+        count = len(p["property_ids"])
+        types = np.unique(p["property_types"], return_inverse=True)[1].ravel()
+        params = p["type_parameters"]
+        dt = 1.0 / 12.0
+
+        volatility = params["rent_volatility"][:, None] / 100.0
+        type_shocks = rng.standard_normal((types.max() + 1 if count else 0, months))[types]
+        shocks = np.sqrt(0.6) * type_shocks + np.sqrt(0.4) * rng.standard_normal((count, months))
+        log_growth = (params["rent_growth"][:, None] / 100.0 - 0.5 * volatility ** 2) * dt + \
+            volatility * np.sqrt(dt) * shocks
+        rent_per_sqft = p["market_rent_per_sqft"][:, None] * np.exp(np.cumsum(log_growth, axis=1))
+
+        rates = rng.standard_normal(months)[None, :]
+        cap_shocks = RATES_FACTOR_WEIGHT * rates + np.sqrt(1.0 - RATES_FACTOR_WEIGHT ** 2) * \
+            rng.standard_normal((count, months))
+        decay = np.exp(-CAP_RATE_MEAN_REVERSION * dt)
+        scale = CAP_RATE_VOLATILITY * np.sqrt((1.0 - decay ** 2) / (2.0 * CAP_RATE_MEAN_REVERSION))
+        cap_rate = np.empty((count, months))
+        current = p["cap_rate"].copy()
+        for month in range(months):
+            current = params["cap_rate"] + (current - params["cap_rate"]) * decay + scale * cap_shocks[:, month]
+            cap_rate[:, month] = current
+        return {"rent_per_sqft": rent_per_sqft, "cap_rate": np.maximum(cap_rate, 2.0)}
+
+    def run(self, first_month: int, months: int) -> Dict[str, Any]:
+        """
+        Simulate `months` months starting with first_month (months since 1970).
+
+        Returns:
+            dict: (properties, months) arrays "rental_income",
+                "operating_expenses", "net_operating_income", "debt_service",
+                "cash_flow", "market_value", "cap_rate", "occupancy_rate",
+                "rent_per_sqft", "mortgage_balance", plus "leases": new lease
+                arrays (unit, start_month, end_month, rent) and "units"
+                (final unit state).
+        """
+        p, rng = self.properties, self.rng
+        count = len(p["property_ids"])
+        params = p["type_parameters"]
+        market = self.market_paths(months)
+
+        unit_property = p["unit_property"]
+        unit_sqft = p["unit_sqft"]
+        rent = p["unit_rent"].copy()
+        lease_end = p["unit_lease_end"].copy()
+        occupied = p["unit_occupied"].copy()
+        renewal = params["renewal_probability"][unit_property]
+        lease_months = params["lease_months"][unit_property].astype(np.int64)
+        downtime = params["downtime_months"][unit_property]
+        # Units vacant at the start are part-way through a re-letting downtime
+        vacant_until = np.where(occupied, first_month,
+                                first_month + rng.geometric(1.0 / np.maximum(downtime, 1.0)) - 1)
+
+        income = np.zeros((count, months))
+        occupied_units = np.zeros((count, months))
+        new_units, new_starts, new_ends, new_rents = [], [], [], []
+
+        for step in range(months):
+            month = first_month + step
+            market_rent = market["rent_per_sqft"][unit_property, step] * unit_sqft
+
+            # Leases ending last month either renew or leave the unit vacant
+            expiring = occupied & (lease_end < month)
+            renews = expiring & (rng.random(len(rent)) < renewal)
+            leaving = expiring & ~renews
+            rent = np.where(renews, np.maximum(rent * (1.0 + RENEWAL_RENT_STEP) ** (lease_months / 12.0),
+                                               market_rent), rent)
+            occupied &= ~leaving
+            vacant_until = np.where(leaving, month + rng.geometric(1.0 / np.maximum(downtime, 1.0)) - 1,
+                                    vacant_until)
+
+            # Vacant units whose downtime is over sign a new lease at market rent
+            letting = ~occupied & (vacant_until <= month)
+            rent = np.where(letting, market_rent * rng.lognormal(0.0, 0.05, len(rent)), rent)
+            occupied |= letting
+
+            signed = renews | letting
+            lease_end = np.where(signed, month + lease_months - 1, lease_end)
+            if signed.any():
+                index = np.flatnonzero(signed)
+                new_units.append(index)
+                new_starts.append(np.full(len(index), month))
+                new_ends.append(lease_end[index])
+                new_rents.append(rent[index])
+
+            income[:, step] = np.bincount(unit_property, np.where(occupied, rent, 0.0), minlength=count)
+            occupied_units[:, step] = np.bincount(unit_property, occupied, minlength=count)
+
+        occupancy = occupied_units / np.maximum(p["num_units"][:, None], 1)
+        inflation = (1.0 + EXPENSE_INFLATION / 100.0) ** (np.arange(1, months + 1) / 12.0)
+        expenses = p["monthly_expenses"][:, None] * inflation[None, :] * \
+            (FIXED_EXPENSE_SHARE + (1.0 - FIXED_EXPENSE_SHARE) * occupancy)
+        noi = income - expenses
+
+        mortgage = mortgage_balances(p["mortgage_balance"], months, remaining_months=p["mortgage_months"])
+        debt_service = np.where(mortgage["paying"], mortgage["payment"][:, None], 0.0)
+
+        # Trailing NOI (seeded with the stored run rate) annualised, over the cap rate
+        history = np.repeat(p["monthly_noi"][:, None], NOI_WINDOW - 1, axis=1)
+        trailing = rolling_mean(np.concatenate([history, noi], axis=1), NOI_WINDOW)[:, NOI_WINDOW - 1:] * 12.0
+        market_value = np.maximum(trailing, 0.0) / (market["cap_rate"] / 100.0)
+
+        ROWS_GENERATED.inc(count * months, asset="real_estate", kind="monthly")
+        concat = (lambda parts, dtype: np.concatenate(parts) if parts else np.array([], dtype=dtype))
+        return {
+            "months": np.arange(first_month, first_month + months),
+            "rental_income": income, "operating_expenses": expenses, "net_operating_income": noi,
+            "debt_service": debt_service, "cash_flow": noi - debt_service, "market_value": market_value,
+            "cap_rate": market["cap_rate"], "occupancy_rate": occupancy * 100.0,
+            "rent_per_sqft": market["rent_per_sqft"], "mortgage_balance": mortgage["balance"],
+            "leases": {"unit": concat(new_units, int), "start_month": concat(new_starts, int),
+                       "end_month": concat(new_ends, int), "rent": concat(new_rents, float)},
+            "units": {"occupied": occupied, "rent": rent, "lease_end": lease_end},
+        }
+
+
+def historical_records(property_ids: Sequence[int], result: Dict[str, Any],
+                       sizes: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Monthly real-estate HistoricalData rows (dated at month end).
+    """
+    dates = _month_ends(result["months"])
+
+    def rounded(values):
+        return [v if v == v and abs(v) != float("inf") else None for v in np.round(values, 2).tolist()]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_per_sqft = result["market_value"] / sizes[:, None]
+        cap_rate = np.where(result["market_value"] > 0, result["cap_rate"], np.nan)
+    columns = {
+        "market_value": result["market_value"], "rental_income": result["rental_income"],
+        "operating_expenses": result["operating_expenses"], "net_operating_income": result["net_operating_income"],
+        "cap_rate": cap_rate, "cash_flow": result["cash_flow"], "avg_price_per_sqft": price_per_sqft,
+        "market_rent_per_sqft": result["rent_per_sqft"], "occupancy_rate": result["occupancy_rate"],
+    }
+    records = []
+    for i, property_id in enumerate(property_ids):
+        values = {name: rounded(matrix[i]) for name, matrix in columns.items()}
+        records.extend({
+            "property_id": property_id,
+            "date": day,
+            **{name: values[name][m] for name in columns},
+        } for m, day in enumerate(dates))
+    return records
+
+
+class PropertyPortfolioGenerator:
+    """
+    Generates Property, FinancialMetrics, MarketIndicators and TenantInfo
+    rows for a portfolio with array operations.
+
+    Args:
+        number_of_properties (int): Properties to generate.
+        as_of (date): Portfolio date; current leases run through the month
+            before it, and the metrics are dated at that month's end.
+        seed (int, optional): Seed for reproducible portfolios.
+    """
+
+    def __init__(self, number_of_properties: int, as_of: Optional[date] = None, seed: Optional[int] = None):
+        self.number_of_properties = number_of_properties
+        self.as_of = as_of or date.today()
+        self.rng = np.random.default_rng(seed)
+
+    def generate(self, first_property_id: int = 1) -> Dict[str, List[Dict[str, Any]]]:
+        n, rng = self.number_of_properties, self.rng
+        types = rng.choice(list(PROPERTY_TYPES), n, p=[0.6, 0.25, 0.15])
+        params = _type_parameters(types)
+        units = np.where(types == "Residential", rng.integers(4, 80, n), rng.integers(1, 12, n))
+        sizes = np.round(units * np.where(types == "Residential", rng.uniform(600, 1400, n),
+                                          rng.uniform(2000, 20000, n)), 2)
+        rent_per_sqft = params["rent_per_sqft"] * rng.lognormal(0.0, 0.2, n)
+        potential_rent = rent_per_sqft * sizes * 12.0
+        expenses = potential_rent * params["expense_ratio"]
+        occupancy = rng.uniform(0.8, 1.0, n)
+        noi = potential_rent * occupancy - expenses
+        cap_rate = params["cap_rate"] + rng.normal(0.0, 0.4, n)
+        value = noi / (cap_rate / 100.0)
+        ltv = rng.uniform(0.4, 0.7, n)
+        mortgage = value * ltv
+        ids = np.arange(first_property_id, first_property_id + n)
+        cities = rng.integers(0, len(CITIES), n)
+        year_built = rng.integers(1950, self.as_of.year, n)
+        # The simulation starts from the state dated before its first month
+        snapshot = _month_ends([_month(self.as_of) - 1])[0]
+
+        properties = [{
+            "property_id": int(ids[i]),
+            "name": f"{CITIES[cities[i]][0]} {types[i]} {int(ids[i])}",
+            "property_type": str(types[i]),
+            "address": f"{int(rng.integers(1, 9999))} Main Street",
+            "city": CITIES[cities[i]][0], "state": CITIES[cities[i]][1],
+            "zip_code": CITIES[cities[i]][2], "country": "United States",
+            "size_in_sqft": float(sizes[i]), "year_built": int(year_built[i]), "num_units": int(units[i]),
+            "occupancy_rate": round(float(occupancy[i]) * 100.0, 2),
+            "historical_data_start_date": None, "historical_data_end_date": None,
+        } for i in range(n)]
+        financials = [{
+            "property_id": int(ids[i]), "rental_income": round(float(potential_rent[i] * occupancy[i]), 2),
+            "operating_expenses": round(float(expenses[i]), 2), "net_operating_income": round(float(noi[i]), 2),
+            "cap_rate": round(float(cap_rate[i]), 2), "cash_flow": None,
+            "mortgage_balance": round(float(mortgage[i]), 2), "loan_to_value_ratio": round(float(ltv[i]) * 100.0, 2),
+            "historical_data_start_date": snapshot, "historical_data_end_date": snapshot,
+        } for i in range(n)]
+        indicators = [{
+            "property_id": int(ids[i]), "avg_price_per_sqft": round(float(value[i] / sizes[i]), 2),
+            "market_rent_per_sqft": round(float(rent_per_sqft[i]), 2), "occupancy_trend": "Stable",
+            "market_value": round(float(value[i]), 2), "appreciation_rate": None,
+            "historical_data_start_date": snapshot, "historical_data_end_date": snapshot,
+        } for i in range(n)]
+
+        # One current lease per occupied unit, started some time in the last term
+        unit_property = np.repeat(np.arange(n), units)
+        unit_number = np.arange(len(unit_property)) - np.repeat(np.cumsum(units) - units, units)
+        let = rng.random(len(unit_property)) < occupancy[unit_property]
+        term = params["lease_months"][unit_property].astype(int)
+        start = _month(self.as_of) - 1 - (rng.random(len(unit_property)) * term).astype(int)
+        rent = rent_per_sqft[unit_property] * (sizes / units)[unit_property] * rng.lognormal(0.0, 0.05, len(term))
+        starts, ends = _month_ends(start[let]), _month_ends(start[let] + term[let] - 1)
+        tenants = [{
+            "property_id": int(ids[p]), "unit_number": _unit_number(u + 1),
+            "tenant_name": f"Tenant {int(ids[p])}-{_unit_number(u + 1)}",
+            "lease_start_date": s.replace(day=1), "lease_end_date": e,
+            "monthly_rent": round(float(r), 2), "security_deposit": round(float(r), 2),
+        } for p, u, s, e, r in zip(unit_property[let].tolist(), unit_number[let].tolist(), starts, ends,
+                                   rent[let].tolist())]
+        return {"properties": properties, "financial_metrics": financials,
+                "market_indicators": indicators, "tenant_info": tenants}
+
+
+class RealEstateEngine:
+    """
+    Loads the stored portfolio, runs the monthly simulation and writes
+    HistoricalData, the signed leases and a FinancialMetrics and
+    MarketIndicators snapshot dated at the end of the run.
+
+    A run starts from the latest snapshot dated before its first month and
+    replaces only what falls inside its window (history, leases signed in
+    it and snapshots dated in it), so re-running a window reproduces it.
+
+    FinancialMetrics and TenantInfo amounts are annual and monthly
+    respectively: rental_income, operating_expenses and
+    net_operating_income are per year; monthly_rent per month.
+
+    Args:
+        session (Session): Session on the real estate database.
+        seed (int, optional): Seed for reproducible simulations.
+    """
+
+    def __init__(self, session: Session, seed: Optional[int] = None):
+        self.session = session
+        self.seed = seed
+
+    def load_portfolio(self, first_month: int) -> Dict[str, Any]:
+        """
+        Property and unit arrays as of the start of first_month.
+
+        Metrics come from each property's latest FinancialMetrics and
+        MarketIndicators snapshot dated before first_month. Units with a
+        lease covering the month before first_month start occupied at that
+        rent; the remaining units up to num_units start vacant, under the
+        lowest unit numbers no current lease uses.
+        """
+        properties = self.session.query(
+            Property.property_id, Property.property_type, Property.size_in_sqft, Property.num_units,
+            Property.historical_data_start_date
+        ).order_by(Property.property_id).all()
+        ids = [row.property_id for row in properties]
+        index = {property_id: i for i, property_id in enumerate(ids)}
+        types = [row.property_type or DEFAULT_PROPERTY_TYPE for row in properties]
+        params = _type_parameters(types)
+        sizes = np.array([float(row.size_in_sqft or 0.0) for row in properties])
+        num_units = np.array([max(int(row.num_units or 1), 1) for row in properties])
+        # Mortgages have run down since the property's history started
+        elapsed = np.array([max(first_month - _month(row.historical_data_start_date), 0)
+                            if row.historical_data_start_date else 0 for row in properties], dtype=np.int64)
+
+        # Latest snapshot per property dated before the run (undated rows count as oldest)
+        start = _month_ends([first_month - 1])[0]
+
+        def snapshots(model):
+            return {row.property_id: row for row in self.session.query(model).filter(
+                or_(model.historical_data_end_date <= start, model.historical_data_end_date.is_(None))
+            ).order_by(model.historical_data_end_date, model.id).all()}
+
+        financials, indicators = snapshots(FinancialMetrics), snapshots(MarketIndicators)
+
+        def column(rows, name, fallback):
+            return np.array([float(getattr(rows[i], name)) if i in rows and getattr(rows[i], name) is not None
+                             else float(fallback[k]) for k, i in enumerate(ids)])
+
+        rent_per_sqft = column(indicators, "market_rent_per_sqft", params["rent_per_sqft"])
+        potential_rent = rent_per_sqft * sizes * 12.0
+        expenses = column(financials, "operating_expenses", potential_rent * params["expense_ratio"])
+        noi = column(financials, "net_operating_income", potential_rent * 0.9 - expenses)
+
+        # Current leases: the latest one per (property, unit) in force last month
+        unit_property, unit_numbers, unit_rent, unit_end = [], [], [], []
+        seen = set()
+        for property_id, unit_number, start, end, rent in self.session.query(
+                TenantInfo.property_id, TenantInfo.unit_number, TenantInfo.lease_start_date,
+                TenantInfo.lease_end_date, TenantInfo.monthly_rent
+        ).order_by(TenantInfo.lease_start_date.desc(), TenantInfo.id.desc()).all():
+            key = (property_id, unit_number)
+            if property_id not in index or key in seen or _month(start) >= first_month:
+                continue
+            seen.add(key)
+            end_month = _month(end) if end else _month(start) + int(params["lease_months"][index[property_id]]) - 1
+            if end_month < first_month - 1:
+                continue
+            unit_property.append(index[property_id])
+            unit_numbers.append(unit_number)
+            unit_rent.append(float(rent or 0.0))
+            unit_end.append(end_month)
+
+        leased = np.bincount(np.array(unit_property, dtype=int), minlength=len(ids))
+        empty = np.maximum(num_units - leased, 0)
+        taken = {(ids[p], number) for p, number in zip(unit_property, unit_numbers)}
+        for p in np.flatnonzero(empty):
+            free = (_unit_number(k) for k in range(1, num_units[p] + leased[p] + 1)
+                    if (ids[p], _unit_number(k)) not in taken)
+            unit_numbers.extend(next(free) for _ in range(empty[p]))
+        unit_property = np.concatenate([np.array(unit_property, dtype=int), np.repeat(np.arange(len(ids)), empty)])
+        occupied = np.arange(len(unit_property)) < len(unit_rent)
+        unit_sqft = (sizes / num_units)[unit_property]
+        return {
+            "property_ids": ids, "property_types": types, "type_parameters": params,
+            "size_in_sqft": sizes, "num_units": num_units,
+            "market_rent_per_sqft": rent_per_sqft,
+            "cap_rate": column(financials, "cap_rate", params["cap_rate"]),
+            "monthly_expenses": expenses / 12.0, "monthly_noi": noi / 12.0,
+            "mortgage_balance": column(financials, "mortgage_balance", np.zeros(len(ids))),
+            "mortgage_months": np.maximum(MORTGAGE_REMAINING_YEARS * 12 - elapsed, 0),
+            "unit_property": unit_property, "unit_numbers": unit_numbers, "unit_sqft": unit_sqft,
+            "unit_rent": np.concatenate([np.array(unit_rent), np.zeros(int(empty.sum()))]),
+            "unit_lease_end": np.concatenate([np.array(unit_end, dtype=np.int64),
+                                              np.full(int(empty.sum()), first_month - 1, dtype=np.int64)]),
+            "unit_occupied": occupied,
+        }
+
+    def run(self, start_date: date, end_date: date) -> Dict[str, int]:
+        """
+        Simulate every month from start_date's month through end_date's.
+
+        Returns:
+            dict: Rows written per table.
+        """
+        first_month, last_month = _month(_to_date(start_date)), _month(_to_date(end_date))
+        months = last_month - first_month + 1
+        with stage_timer("real_estate", "init"):
+            portfolio = self.load_portfolio(first_month)
+        ids = portfolio["property_ids"]
+        if not ids or months <= 0:
+            return {}
+
+        with stage_timer("real_estate", "simulate"):
+            result = RealEstatePortfolioSimulator(portfolio, self.seed).run(first_month, months)
+            history = historical_records(ids, result, portfolio["size_in_sqft"])
+
+            leases = result["leases"]
+            unit_property = portfolio["unit_property"][leases["unit"]]
+            unit_numbers = [portfolio["unit_numbers"][u] for u in leases["unit"].tolist()]
+            starts = [day.replace(day=1) for day in _month_ends(leases["start_month"])]
+            ends = _month_ends(leases["end_month"])
+            tenants = [{
+                "property_id": ids[p], "unit_number": u, "tenant_name": f"Tenant {ids[p]}-{u}",
+                "lease_start_date": s, "lease_end_date": e,
+                "monthly_rent": round(r, 2), "security_deposit": round(r, 2),
+            } for p, u, s, e, r in zip(unit_property.tolist(), unit_numbers, starts, ends,
+                                       leases["rent"].tolist())]
+
+            last = _month_ends([last_month])[0]
+            first = _month_ends([first_month])[0].replace(day=1)
+            # FinancialMetrics hold annual figures: the last year, scaled up for shorter runs
+            window = min(months, 12)
+
+            def annual(matrix):
+                return matrix[:, -window:].sum(axis=1) * 12.0 / window
+
+            value, noi = result["market_value"][:, -1], annual(result["net_operating_income"])
+            balance = result["mortgage_balance"][:, -1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ltv = np.where(value > 0, balance / value * 100.0, np.nan)
+                years = months / 12.0
+                appreciation = ((value / result["market_value"][:, 0]) ** (1.0 / max(years, 1.0 / 12.0)) - 1.0) * 100.0
+            occupancy = result["occupancy_rate"]
+            change = occupancy[:, -1] - occupancy[:, max(months - 13, 0)]
+
+            def rounded(values):
+                return [v if v == v and abs(v) != float("inf") else None for v in np.round(values, 2).tolist()]
+
+            columns = {
+                "rental_income": rounded(annual(result["rental_income"])),
+                "operating_expenses": rounded(annual(result["operating_expenses"])),
+                "net_operating_income": rounded(noi),
+                "cap_rate": rounded(result["cap_rate"][:, -1]),
+                "cash_flow": rounded(annual(result["cash_flow"])),
+                "mortgage_balance": rounded(balance),
+                "loan_to_value_ratio": rounded(np.clip(ltv, 0.0, 999.99)),
+            }
+            financials = [{"property_id": property_id, **{name: values[i] for name, values in columns.items()},
+                           "historical_data_start_date": first, "historical_data_end_date": last}
+                          for i, property_id in enumerate(ids)]
+            price_per_sqft = rounded(value / portfolio["size_in_sqft"])
+            rent_per_sqft, value_rounded = rounded(result["rent_per_sqft"][:, -1]), rounded(value)
+            appreciation = rounded(np.clip(appreciation, -999.99, 999.99))
+            trend = np.where(change > 1.0, "Increasing", np.where(change < -1.0, "Decreasing", "Stable"))
+            indicators = [{
+                "property_id": property_id, "avg_price_per_sqft": price_per_sqft[i],
+                "market_rent_per_sqft": rent_per_sqft[i], "occupancy_trend": str(trend[i]),
+                "market_value": value_rounded[i], "appreciation_rate": appreciation[i],
+                "historical_data_start_date": first, "historical_data_end_date": last,
+            } for i, property_id in enumerate(ids)]
+
+        with stage_timer("real_estate", "db_write"):
+            for start in range(0, len(ids), _IN_CHUNK):
+                chunk = ids[start:start + _IN_CHUNK]
+                self.session.query(HistoricalData).filter(
+                    HistoricalData.property_id.in_(chunk), HistoricalData.date >= first, HistoricalData.date <= last
+                ).delete(synchronize_session=False)
+                self.session.query(TenantInfo).filter(
+                    TenantInfo.property_id.in_(chunk), TenantInfo.lease_start_date >= first,
+                    TenantInfo.lease_start_date <= last
+                ).delete(synchronize_session=False)
+                for model in (FinancialMetrics, MarketIndicators):
+                    self.session.query(model).filter(
+                        model.property_id.in_(chunk), model.historical_data_end_date >= first,
+                        model.historical_data_end_date <= last
+                    ).delete(synchronize_session=False)
+            tables = [(HistoricalData, history), (TenantInfo, tenants), (FinancialMetrics, financials),
+                      (MarketIndicators, indicators)]
+            for model, rows in tables:
+                if rows:
+                    self.session.execute(model.__table__.insert(), rows)
+
+            occupancy_now = rounded(occupancy[:, -1])
+            self.session.execute(Property.__table__.update().where(
+                Property.__table__.c.property_id == bindparam("id")
+            ), [{"id": property_id, "occupancy_rate": occupancy_now[i], "historical_data_end_date": last}
+                for i, property_id in enumerate(ids)])
+            self.session.query(Property).filter(Property.historical_data_start_date.is_(None)).update(
+                {Property.historical_data_start_date: first}, synchronize_session=False)
+            self.session.commit()
+
+        for model, rows in tables:
+            ROWS_WRITTEN.inc(len(rows), asset="real_estate", table=model.__tablename__)
+        return {model.__tablename__: len(rows) for model, rows in tables}
+
+
+def simulate_real_estate(number_of_properties: Optional[int] = None, start_date: Optional[date] = None,
+                         end_date: Optional[date] = None, seed: Optional[int] = None) -> Dict[str, int]:
+    """
+    Simulate monthly history for the stored portfolio (the last
+    DEFAULT_HISTORY_MONTHS up to today by default), generating
+    number_of_properties new properties first when given.
+
+    Returns:
+        dict: Rows written per table.
+    """
+    end_date = end_date or date.today()
+    if start_date is None:
+        month = _month(end_date) - DEFAULT_HISTORY_MONTHS + 1
+        start_date = date(1970 + month // 12, month % 12 + 1, 1)
+    engine = create_engine(REAL_ESTATE_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        if number_of_properties:
+            first_id = (session.query(func.max(Property.property_id)).scalar() or 0) + 1
+            generator = PropertyPortfolioGenerator(number_of_properties, start_date, seed)
+            with stage_timer("real_estate", "init"):
+                portfolio = generator.generate(first_id)
+            for table, rows in portfolio.items():
+                model = {"properties": Property, "financial_metrics": FinancialMetrics,
+                         "market_indicators": MarketIndicators, "tenant_info": TenantInfo}[table]
+                session.execute(model.__table__.insert(), rows)
+                ROWS_WRITTEN.inc(len(rows), asset="real_estate", table=table)
+            session.commit()
+        summary = RealEstateEngine(session, seed).run(start_date, end_date)
+    finally:
+        session.close()
+
+    print(f"Real estate portfolio simulated: {summary}")
+    return summary
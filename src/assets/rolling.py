@@ -0,0 +1,88 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: rolling.py
+
+Relative Path: src/assets/rolling.py
+"""
+
+from typing import Dict
+
+import numpy as np
+
+# Trading days in the 52-week range and in the average-volume window
+WEEK_52_WINDOW = 252
+AVERAGE_VOLUME_WINDOW = 30
+
+
+def _windows(values: np.ndarray, window: int, fill: float) -> np.ndarray:
+    """
+    (..., T, window) strided view of trailing windows; the first rows are
+    padded with `fill` so every day's window ends on that day.
+    """
+    values = np.asarray(values, dtype=float)
+    padding = [(0, 0)] * (values.ndim - 1) + [(window - 1, 0)]
+    padded = np.pad(values, padding, constant_values=fill)
+    return np.lib.stride_tricks.sliding_window_view(padded, window, axis=-1)
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Maximum over the trailing `window` values (fewer at the start), along
+    the last axis. NaNs are ignored.
+    """
+    return np.fmax.reduce(_windows(values, window, np.nan), axis=-1)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Minimum over the trailing `window` values (fewer at the start), along
+    the last axis. NaNs are ignored.
+    """
+    return np.fmin.reduce(_windows(values, window, np.nan), axis=-1)
+
+
+def rolling_sum_count(values: np.ndarray, window: int) -> Dict[str, np.ndarray]:
+    """
+    Sum and number of non-NaN values over trailing windows, from one
+    cumulative sum along the last axis.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.isfinite(values)
+    padding = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    sums = np.pad(np.cumsum(np.where(valid, values, 0.0), axis=-1), padding)
+    counts = np.pad(np.cumsum(valid, axis=-1), padding)
+    end = np.arange(1, values.shape[-1] + 1)
+    start = np.maximum(end - window, 0)
+    return {"sum": sums[..., end] - sums[..., start], "count": counts[..., end] - counts[..., start]}
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean over the trailing `window` values (fewer at the start), along the
+    last axis. NaNs are ignored; windows without values are NaN.
+    """
+    totals = rolling_sum_count(values, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return totals["sum"] / totals["count"]
+
+
+def range_and_volume_metrics(closes: np.ndarray, volumes: np.ndarray,
+                             range_window: int = WEEK_52_WINDOW,
+                             volume_window: int = AVERAGE_VOLUME_WINDOW) -> Dict[str, np.ndarray]:
+    """
+    52-week high/low of closes and average trading volume, for one series
+    or a (series, days) matrix at once.
+
+    Returns:
+        dict: "week_52_high", "week_52_low" and "average_volume" (floored
+            to whole shares), each shaped like closes.
+    """
+    volumes = np.asarray(volumes, dtype=float)
+    return {
+        "week_52_high": rolling_max(closes, range_window),
+        "week_52_low": rolling_min(closes, range_window),
+        "average_volume": np.floor(rolling_mean(volumes, volume_window)),
+    }
@@ -2,6 +2,7 @@
 from datetime import datetime, timedelta
 from assets.stocks.model import Base, Stock, PriceTradingInfo, FundamentalMetrics, VolatilityRisk, MarketIndicators, HistoricalData
 from assets.stocks.historical_data import generate_historical_data
+from monitoring.metrics import ROWS_WRITTEN, stage_timer
 
 
 def create_and_insert_historical_data(session, ticker: str, start_price: float, shares_outstanding: int,
@@ -9,55 +10,59 @@ def create_and_insert_historical_data(session, ticker: str, start_price: float,
                                       initial_eps: float = 10.0, annual_dividend: float = 5.0, base_volume: int = 1_000_000):
 
     # Generate historical data
-    historical_data = generate_historical_data(
-        ticker=ticker,
-        start_price=start_price,
-        shares_outstanding=shares_outstanding,
-        start_date=start_date,
-        days=days,
-        initial_eps=initial_eps,
-        annual_dividend=annual_dividend,
-        base_volume=base_volume
-    )
+    with stage_timer("stock", "daily_generation"):
+        historical_data = generate_historical_data(
+            ticker=ticker,
+            start_price=start_price,
+            shares_outstanding=shares_outstanding,
+            start_date=start_date,
+            days=days,
+            initial_eps=initial_eps,
+            annual_dividend=annual_dividend,
+            base_volume=base_volume
+        )
 
     historical_start = start_date.date()
     historical_end = (start_date + timedelta(days=days-1)).date()
 
-    # Insert HistoricalData
-    for day_record in historical_data:
-        hd = HistoricalData(
-            ticker=day_record['ticker'],
-            date=datetime.strptime(day_record['date'], "%Y-%m-%d").date(),
-            open_price=day_record['open_price'],
-            close_price=day_record['close_price'],
-            day_high=day_record['day_high'],
-            day_low=day_record['day_low'],
-            week_52_high=day_record['week_52_high'],
-            week_52_low=day_record['week_52_low'],
-            trading_volume=day_record['trading_volume'],
-            average_volume=day_record['average_volume'],
-            eps=day_record['eps'],
-            p_e_ratio=day_record['p_e_ratio'],
-            dividend_yield=day_record['dividend_yield'],
-            roe=day_record['roe'],
-            debt_to_equity=day_record['debt_to_equity'],
-            revenue_growth=day_record['revenue_growth'],
-            net_income=day_record['net_income'],
-            beta=day_record['beta'],
-            standard_deviation=day_record['standard_deviation'],
-            sharpe_ratio=day_record['sharpe_ratio'],
-            RSI=day_record['RSI'],
-            moving_avg_50=day_record['moving_avg_50'],
-            moving_avg_200=day_record['moving_avg_200'],
-            MACD=day_record['MACD'],
-            analyst_rating=day_record['analyst_rating'],
-            historical_data_start_date=historical_start,
-            historical_data_end_date=historical_end
-        )
-        session.add(hd)
-
-    # Commit HistoricalData first
-    session.commit()
+    with stage_timer("stock", "db_write"):
+        # Insert HistoricalData
+        for day_record in historical_data:
+            hd = HistoricalData(
+                ticker=day_record['ticker'],
+                date=datetime.strptime(day_record['date'], "%Y-%m-%d").date(),
+                open_price=day_record['open_price'],
+                close_price=day_record['close_price'],
+                day_high=day_record['day_high'],
+                day_low=day_record['day_low'],
+                week_52_high=day_record['week_52_high'],
+                week_52_low=day_record['week_52_low'],
+                trading_volume=day_record['trading_volume'],
+                average_volume=day_record['average_volume'],
+                eps=day_record['eps'],
+                p_e_ratio=day_record['p_e_ratio'],
+                dividend_yield=day_record['dividend_yield'],
+                roe=day_record['roe'],
+                debt_to_equity=day_record['debt_to_equity'],
+                revenue_growth=day_record['revenue_growth'],
+                net_income=day_record['net_income'],
+                beta=day_record['beta'],
+                standard_deviation=day_record['standard_deviation'],
+                sharpe_ratio=day_record['sharpe_ratio'],
+                RSI=day_record['RSI'],
+                moving_avg_50=day_record['moving_avg_50'],
+                moving_avg_200=day_record['moving_avg_200'],
+                MACD=day_record['MACD'],
+                analyst_rating=day_record['analyst_rating'],
+                historical_data_start_date=historical_start,
+                historical_data_end_date=historical_end
+            )
+            session.add(hd)
+
+        # Commit HistoricalData first
+        session.commit()
+    ROWS_WRITTEN.inc(len(historical_data), asset="stock",
+                     table="historical_data")
 
     # Fetch the stock and update with the final day's metrics
     stock = session.query(Stock).filter_by(ticker=ticker).first()
@@ -136,3 +141,5 @@ def create_and_insert_historical_data(session, ticker: str, start_price: float,
     session.commit()
     print(
         f"Historical data generated and all related tables updated successfully for {ticker}!")
+
+    return historical_data
@@ -19,7 +19,9 @@ from typing import List, Dict, Any
 # NEW: Import Session if you plan to bulk-insert intraday data
 from sqlalchemy.orm import Session
 
+from assets.rolling import range_and_volume_metrics
 from assets.stocks.model import IntradayData
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
 
 
 class StockDataGenerator:
@@ -190,6 +192,7 @@ class StockDataGenerator:
 
             current_time += timedelta(seconds=frequency_seconds)
 
+        ROWS_GENERATED.inc(len(records), asset="stock", kind="intraday")
         return records
 
     def store_intraday_data(self, session: Session, intraday_records: List[Dict[str, Any]]):
@@ -207,8 +210,10 @@ class StockDataGenerator:
             )
             to_insert.append(obj)
 
-        session.bulk_save_objects(to_insert)
-        session.commit()
+        with stage_timer("stock", "db_write"):
+            session.bulk_save_objects(to_insert)
+            session.commit()
+        ROWS_WRITTEN.inc(len(to_insert), asset="stock", table="intraday_data")
 
     # -------------------
     # Daily Data Logic
@@ -436,6 +441,7 @@ class StockDataGenerator:
             current_date += timedelta(days=1)
 
         self._add_extended_metrics(data)
+        ROWS_GENERATED.inc(len(data), asset="stock", kind="daily")
         return data
 
     def _add_extended_metrics(self, data: List[Dict[str, Any]]) -> None:
@@ -443,21 +449,16 @@ class StockDataGenerator:
         After data is generated, compute 52-week high/low + 30-day average volume.
         """
         # For 52-week, we just consider up to 252 days in the past
-        closes = [day["close_price"] for day in data]
+        metrics = range_and_volume_metrics(
+            [day["close_price"] for day in data],
+            [day["trading_volume"] for day in data]
+        )
 
         for i, day_dict in enumerate(data):
-            window = closes[max(0, i - 251):i + 1]
-            day_dict["week_52_high"] = round(max(window), 2)
-            day_dict["week_52_low"] = round(min(window), 2)
-
+            day_dict["week_52_high"] = round(float(metrics["week_52_high"][i]), 2)
+            day_dict["week_52_low"] = round(float(metrics["week_52_low"][i]), 2)
             # 30-day average volume
-            volumes_window = [d["trading_volume"]
-                              for d in data[max(0, i - 29):i + 1]]
-            if volumes_window:
-                day_dict["average_volume"] = int(
-                    sum(volumes_window) / len(volumes_window))
-            else:
-                day_dict["average_volume"] = day_dict["trading_volume"]
+            day_dict["average_volume"] = int(metrics["average_volume"][i])
 
 
 # ------------
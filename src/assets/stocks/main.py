@@ -9,6 +9,7 @@ Relative Path: src/assets/stocks/main.py
 """
 
 from datetime import datetime, time
+from typing import Optional
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from assets.stocks.model import Base, HistoricalData
@@ -17,9 +18,32 @@ from assets.stocks.create_historical_data import create_and_insert_historical_da
 import pwd
 # 1) Import your store_intraday_data function and StockDataGenerator
 from assets.stocks.historical_data import StockDataGenerator
+from events.bus import ASSETS_TOPIC, EventBus, make_event
+from monitoring.metrics import StageTimer, stage_timer
+
+
+def main(number_of_stocks: int = 1, start_date: datetime = datetime(2020, 1, 1), days: int = 5,
+         event_bus: Optional[EventBus] = None, timer: Optional[StageTimer] = None):
+    """
+    Generate stocks with daily and intraday history.
+
+    When an event bus is given, intraday ticks are published to the assets
+    topic and their persistence is left to its consumers (see
+    events.consumer); otherwise ticks are written synchronously. Daily bars
+    are always written synchronously, as the intraday pass reads them back.
+
+    Stage durations (init, daily_generation, intraday_generation, db_write,
+    response_build) are collected in `timer` and logged at the end.
+    """
+    timer = timer or StageTimer("stock")
+    with timer.activate():
+        all_stock_data = _generate_stocks(
+            number_of_stocks, start_date, days, event_bus)
+    timer.log()
+    return all_stock_data
 
 
-def main(number_of_stocks: int = 1, start_date: datetime = datetime(2020, 1, 1), days: int = 5):
+def _generate_stocks(number_of_stocks: int, start_date: datetime, days: int, event_bus: Optional[EventBus]):
     # Dictionary to store all generated stock data
     all_stock_data = {}
 
@@ -31,14 +55,15 @@ def main(number_of_stocks: int = 1, start_date: datetime = datetime(2020, 1, 1),
         session = Session()
 
         # Generate a single new random stock and insert it into the database
-        stock, price_info, fundamentals, risk_metrics, market_indicators = generate_random_stock_data()
+        with stage_timer("stock", "init"):
+            stock, price_info, fundamentals, risk_metrics, market_indicators = generate_random_stock_data()
 
-        session.add(stock)
-        session.add(price_info)
-        session.add(fundamentals)
-        session.add(risk_metrics)
-        session.add(market_indicators)
-        session.commit()
+            session.add(stock)
+            session.add(price_info)
+            session.add(fundamentals)
+            session.add(risk_metrics)
+            session.add(market_indicators)
+            session.commit()
 
         # Generate daily historical data
         ticker = stock.ticker
@@ -90,17 +115,24 @@ def main(number_of_stocks: int = 1, start_date: datetime = datetime(2020, 1, 1),
                 print(f"Generating intraday data for {ticker} on {trade_date}")
 
                 # For each day, use that day's O/H/L/C in the intraday generation
-                intraday_records = generator.generate_intraday_data(
-                    ticker=ticker,
-                    trade_date=trade_date,
-                    open_price=float(daily_record.open_price),
-                    close_price=float(daily_record.close_price),
-                    day_high=float(daily_record.day_high),
-                    day_low=float(daily_record.day_low),
-                    market_open=market_open,
-                    market_close=market_close,
-                    frequency_seconds=60  # e.g. every 60 seconds
-                )
+                with stage_timer("stock", "intraday_generation"):
+                    intraday_records = generator.generate_intraday_data(
+                        ticker=ticker,
+                        trade_date=trade_date,
+                        open_price=float(daily_record.open_price),
+                        close_price=float(daily_record.close_price),
+                        day_high=float(daily_record.day_high),
+                        day_low=float(daily_record.day_low),
+                        market_open=market_open,
+                        market_close=market_close,
+                        frequency_seconds=60  # e.g. every 60 seconds
+                    )
+
+                if event_bus is not None:
+                    # Hand the day's ticks to the bus; storage happens downstream
+                    event_bus.publish(ASSETS_TOPIC, make_event(
+                        "stock.tick", ticker, intraday_records))
+                    continue
 
                 # Store intraday data in the DB
                 generator.store_intraday_data(session, intraday_records)
@@ -110,69 +142,58 @@ def main(number_of_stocks: int = 1, start_date: datetime = datetime(2020, 1, 1),
                 )
         # ----------------------------------------------------
 
-        # Collect all data for the current stock
-        stock_data = {
-            "stock_info": {
-                "ticker": stock.ticker,
-                "company_name": stock.company_name,
-                "sector": stock.sector,
-                "shares_outstanding": stock.shares_outstanding,
-                "market_cap": stock.market_cap,
-                "cap_category": stock.cap_category,
-                "historical_data_start_date": stock.historical_data_start_date,
-                "historical_data_end_date": stock.historical_data_end_date
-            },
-            "price_trading_info": {
-                "current_price": price_info.current_price,
-                "open_price": price_info.open_price,
-                "close_price": price_info.close_price,
-                "day_high": price_info.day_high,
-                "day_low": price_info.day_low,
-                "week_52_high": price_info.week_52_high,
-                "week_52_low": price_info.week_52_low,
-                "trading_volume": price_info.trading_volume,
-                "average_volume": price_info.average_volume
-            },
-            "fundamental_metrics": {
-                "earnings_per_share": fundamentals.earnings_per_share,
-                "price_to_earnings": fundamentals.price_to_earnings,
-                "dividend_yield": fundamentals.dividend_yield,
-                "return_on_equity": fundamentals.return_on_equity,
-                "debt_to_equity": fundamentals.debt_to_equity,
-                "revenue_growth": fundamentals.revenue_growth,
-                "net_income": fundamentals.net_income
-            },
-            "volatility_risk": {
-                "beta": risk_metrics.beta,
-                "standard_deviation": risk_metrics.standard_deviation,
-                "sharpe_ratio": risk_metrics.sharpe_ratio
-            },
-            "market_indicators": {
-                "RSI": market_indicators.RSI,
-                "moving_avg_50": market_indicators.moving_avg_50,
-                "moving_avg_200": market_indicators.moving_avg_200,
-                "MACD": market_indicators.MACD,
-                "analyst_rating": market_indicators.analyst_rating
+        with stage_timer("stock", "response_build"):
+            # Collect all data for the current stock
+            stock_data = {
+                "stock_info": {
+                    "ticker": stock.ticker,
+                    "company_name": stock.company_name,
+                    "sector": stock.sector,
+                    "shares_outstanding": stock.shares_outstanding,
+                    "market_cap": stock.market_cap,
+                    "cap_category": stock.cap_category,
+                    "historical_data_start_date": stock.historical_data_start_date,
+                    "historical_data_end_date": stock.historical_data_end_date
+                },
+                "price_trading_info": {
+                    "current_price": price_info.current_price,
+                    "open_price": price_info.open_price,
+                    "close_price": price_info.close_price,
+                    "day_high": price_info.day_high,
+                    "day_low": price_info.day_low,
+                    "week_52_high": price_info.week_52_high,
+                    "week_52_low": price_info.week_52_low,
+                    "trading_volume": price_info.trading_volume,
+                    "average_volume": price_info.average_volume
+                },
+                "fundamental_metrics": {
+                    "earnings_per_share": fundamentals.earnings_per_share,
+                    "price_to_earnings": fundamentals.price_to_earnings,
+                    "dividend_yield": fundamentals.dividend_yield,
+                    "return_on_equity": fundamentals.return_on_equity,
+                    "debt_to_equity": fundamentals.debt_to_equity,
+                    "revenue_growth": fundamentals.revenue_growth,
+                    "net_income": fundamentals.net_income
+                },
+                "volatility_risk": {
+                    "beta": risk_metrics.beta,
+                    "standard_deviation": risk_metrics.standard_deviation,
+                    "sharpe_ratio": risk_metrics.sharpe_ratio
+                },
+                "market_indicators": {
+                    "RSI": market_indicators.RSI,
+                    "moving_avg_50": market_indicators.moving_avg_50,
+                    "moving_avg_200": market_indicators.moving_avg_200,
+                    "MACD": market_indicators.MACD,
+                    "analyst_rating": market_indicators.analyst_rating
+                }
             }
-        }
-
-        # Fetch daily historical data
-        historical_records = session.query(
-            HistoricalData).filter_by(ticker=ticker).all()
-        stock_data["historical_data"] = [
-            {
-                "date": record.date,
-                "open_price": record.open_price,
-                "close_price": record.close_price,
-                "day_high": record.day_high,
-                "day_low": record.day_low,
-                "trading_volume": record.trading_volume,
-                "eps": record.eps,
-                "p_e_ratio": record.p_e_ratio,
-                "beta": record.beta
-            }
-            for record in historical_records
-        ]
+
+            # Daily closes in date order, for the performance summary
+            stock_data["close_prices"] = [
+                float(close) for (close,) in session.query(HistoricalData.close_price)
+                .filter_by(ticker=ticker).order_by(HistoricalData.date.asc())
+            ]
 
         # Example: fetch intraday data if you want to attach it to the output
         # intraday_db_data = session.query(IntradayData).filter_by(ticker=ticker).all()
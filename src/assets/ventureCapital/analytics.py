@@ -0,0 +1,351 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: analytics.py
+
+Relative Path: src/assets/ventureCapital/analytics.py
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.ventureCapital.model import (
+    Base, Exit, Investment, InvestmentMetrics, PortfolioCompany
+)
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+
+VENTURE_CAPITAL_DATABASE_URL = "sqlite:///data/venture_capital.db"
+
+DAYS_PER_YEAR = 365.0
+# XIRR search bracket (annual rates as fractions)
+XIRR_LOWER = -0.9999
+XIRR_UPPER = 100.0
+XIRR_TOLERANCE = 1e-10
+XIRR_MAX_ITERATIONS = 100
+
+# Companies whose remaining stake is worth nothing
+WRITTEN_OFF_STATUSES = {"Defunct"}
+
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+
+def xirr(set_index: np.ndarray, ordinals: np.ndarray, amounts: np.ndarray, sets: int,
+         guess: float = 0.1, tolerance: float = XIRR_TOLERANCE,
+         max_iterations: int = XIRR_MAX_ITERATIONS) -> np.ndarray:
+    """
+    Annual internal rates of return of many dated cash-flow sets at once.
+
+    Flows are given in coordinate form, so sets of any length share one
+    array and each NPV evaluation is a single bincount. Every set keeps a
+    bracket [lower, upper] on which its NPV changes sign; a Newton step is
+    taken when it lands inside the bracket and a bisection step otherwise,
+    so the solver never leaves the bracket and cannot diverge.
+
+    Args:
+        set_index (array): Set of each flow.
+        ordinals (array): Date ordinal of each flow.
+        amounts (array): Signed amount of each flow (negative = paid in).
+        sets (int): Number of sets.
+        guess (float): Starting rate.
+
+    Returns:
+        array: (sets,) rates as fractions; -1 for sets that only pay in
+            (a total loss) and NaN for other sets whose NPV does not change
+            sign on [XIRR_LOWER, XIRR_UPPER].
+    """
+    set_index = np.asarray(set_index, dtype=int)
+    amounts = np.asarray(amounts, dtype=float)
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if not len(amounts):
+        return np.full(sets, np.nan)
+
+    first = np.full(sets, np.iinfo(np.int64).max)
+    np.minimum.at(first, set_index, ordinals)
+    times = (ordinals - first[set_index]) / DAYS_PER_YEAR
+
+    def npv(rates):
+        growth = 1.0 + rates[set_index]
+        discounted = amounts * growth ** -times
+        value = np.bincount(set_index, discounted, minlength=sets)
+        slope = np.bincount(set_index, -times * discounted / growth, minlength=sets)
+        return value, slope
+
+    lower = np.full(sets, XIRR_LOWER)
+    upper = np.full(sets, XIRR_UPPER)
+    with np.errstate(over="ignore", invalid="ignore"):
+        lower_value = npv(lower)[0]
+        upper_value = npv(upper)[0]
+    solvable = np.isfinite(lower_value) & np.isfinite(upper_value) & \
+        (np.sign(lower_value) * np.sign(upper_value) < 0)
+    lower_sign = np.sign(lower_value)
+
+    rates = np.full(sets, float(np.clip(guess, XIRR_LOWER, XIRR_UPPER)))
+    for _ in range(max_iterations):
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            value, slope = npv(rates)
+            newton = rates - value / slope
+        # Narrow each bracket to the side that still contains the sign change
+        on_lower_side = np.sign(value) == lower_sign
+        lower = np.where(on_lower_side, rates, lower)
+        upper = np.where(on_lower_side, upper, rates)
+
+        inside = np.isfinite(newton) & (newton > lower) & (newton < upper)
+        updated = np.where(inside, newton, (lower + upper) / 2.0)
+        updated = np.where(value == 0.0, rates, updated)
+        step = np.abs(updated - rates)
+        rates = updated
+        if not (step[solvable] > tolerance).any():
+            break
+
+    paid_out = np.bincount(set_index, amounts < 0, minlength=sets) > 0
+    received = np.bincount(set_index, amounts > 0, minlength=sets) > 0
+    return np.where(solvable, rates, np.where(paid_out & ~received, -1.0, np.nan))
+
+
+def multiples(paid_in: np.ndarray, distributions: np.ndarray,
+              residual: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    TVPI, DPI and RVPI (NaN without paid-in capital).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        paid = np.where(paid_in > 0, paid_in, np.nan)
+        dpi = distributions / paid
+        rvpi = residual / paid
+    return {"tvpi": dpi + rvpi, "dpi": dpi, "rvpi": rvpi}
+
+
+class VentureCapitalAnalytics:
+    """
+    IRR and multiples of venture capital investments and funds.
+
+    Each investment pays amount_invested on its date and receives its
+    share of every later Exit.proceeds_to_firm, split across the
+    company's earlier investments by equity stake (amount invested when
+    stakes are missing). Investments in companies without an exit are
+    valued at equity_stake percent of PortfolioCompany.valuation on
+    as_of (nothing for defunct companies); that residual value closes
+    the cash-flow set for IRR. A fund's set is the union of its
+    investments' flows.
+
+    Args:
+        session (Session): Session on the venture capital database.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def cash_flows(self, as_of: date, fund_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """
+        Dated flows of every investment in coordinate form.
+
+        Returns:
+            dict: "investments" (rows of investment_id, fund_id), flow arrays
+                "investment_index", "ordinals", "amounts", and per-investment
+                "paid_in", "distributions" and "residual".
+        """
+        columns = (Investment.investment_id, Investment.fund_id, Investment.company_id,
+                   Investment.date, Investment.amount_invested, Investment.equity_stake)
+        if fund_ids is None:
+            investments = self.session.query(*columns).filter(Investment.date <= as_of) \
+                .order_by(Investment.investment_id).all()
+            company_ids = sorted({i.company_id for i in investments})
+        else:
+            # Other funds' stakes in the same companies still share the exit proceeds
+            fund_ids = list(fund_ids)
+            company_ids = sorted({company_id for (company_id,) in self.session.query(
+                Investment.company_id).filter(Investment.fund_id.in_(fund_ids)).distinct().all()})
+            investments = []
+            for start in range(0, len(company_ids), _IN_CHUNK):
+                investments += self.session.query(*columns).filter(
+                    Investment.company_id.in_(company_ids[start:start + _IN_CHUNK]),
+                    Investment.date <= as_of).all()
+            investments.sort(key=lambda i: i.investment_id)
+
+        exits, companies = defaultdict(list), {}
+        for start in range(0, len(company_ids), _IN_CHUNK):
+            chunk = company_ids[start:start + _IN_CHUNK]
+            for company_id, exit_date, proceeds in self.session.query(
+                    Exit.company_id, Exit.date, Exit.proceeds_to_firm
+            ).filter(Exit.company_id.in_(chunk), Exit.date <= as_of).all():
+                exits[company_id].append((exit_date, float(proceeds or 0.0)))
+            for company_id, valuation, status in self.session.query(
+                    PortfolioCompany.company_id, PortfolioCompany.valuation, PortfolioCompany.status
+            ).filter(PortfolioCompany.company_id.in_(chunk)).all():
+                companies[company_id] = (float(valuation or 0.0), status)
+
+        # Exit proceeds are shared by the firm's stakes in the company at the
+        # time of the exit, which may span several funds
+        stakes = defaultdict(list)
+        for row, investment in enumerate(investments):
+            stake = float(investment.equity_stake or 0.0)
+            stakes[investment.company_id].append((investment.date, row, stake,
+                                                  float(investment.amount_invested or 0.0)))
+
+        paid_in = np.array([float(i.amount_invested or 0.0) for i in investments])
+        distributions = np.zeros(len(investments))
+        residual = np.zeros(len(investments))
+        rows, ordinals, amounts = [], [], []
+        for row, investment in enumerate(investments):
+            rows.append(row)
+            ordinals.append(investment.date.toordinal())
+            amounts.append(-paid_in[row])
+
+        for company_id, holders in stakes.items():
+            for exit_date, proceeds in exits.get(company_id, []):
+                eligible = [h for h in holders if h[0] <= exit_date]
+                if not eligible:
+                    continue
+                weights = np.array([h[2] for h in eligible])
+                if weights.sum() <= 0:
+                    weights = np.array([h[3] for h in eligible])
+                if weights.sum() <= 0:
+                    weights = np.ones(len(eligible))
+                for (_, row, _, _), share in zip(eligible, proceeds * weights / weights.sum()):
+                    distributions[row] += share
+                    rows.append(row)
+                    ordinals.append(exit_date.toordinal())
+                    amounts.append(share)
+
+            valuation, status = companies.get(company_id, (0.0, None))
+            if company_id in exits or status in WRITTEN_OFF_STATUSES:
+                continue
+            for _, row, stake, _ in holders:
+                residual[row] = stake / 100.0 * valuation
+                if residual[row]:
+                    rows.append(row)
+                    ordinals.append(as_of.toordinal())
+                    amounts.append(residual[row])
+
+        wanted = None if fund_ids is None else set(fund_ids)
+        selected = np.array([wanted is None or i.fund_id in wanted for i in investments], dtype=bool)
+        renumber = np.cumsum(selected) - 1
+        rows = np.array(rows, dtype=int)
+        keep = selected[rows] if len(rows) else np.zeros(0, dtype=bool)
+        ROWS_GENERATED.inc(int(keep.sum()), asset="venture_capital", kind="cash_flow")
+        return {
+            "investments": [(i.investment_id, i.fund_id) for i, chosen in zip(investments, selected) if chosen],
+            "investment_index": renumber[rows[keep]],
+            "ordinals": np.array(ordinals, dtype=np.int64)[keep],
+            "amounts": np.array(amounts, dtype=float)[keep],
+            "paid_in": paid_in[selected],
+            "distributions": distributions[selected],
+            "residual": residual[selected],
+        }
+
+    def run(self, as_of: Optional[date] = None,
+            fund_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """
+        Metrics for every investment and fund as of a date.
+
+        Returns:
+            dict: "investments" and "funds", each a dict of aligned arrays
+                "irr" (percent), "tvpi", "dpi", "rvpi" plus their ids.
+        """
+        as_of = as_of or date.today()
+        with stage_timer("venture_capital", "cash_flows"):
+            flows = self.cash_flows(as_of, fund_ids)
+        investments = flows["investments"]
+        funds = sorted({fund_id for _, fund_id in investments if fund_id is not None})
+        fund_position = {fund_id: i for i, fund_id in enumerate(funds)}
+        fund_of = np.array([fund_position.get(fund_id, -1) for _, fund_id in investments], dtype=int)
+
+        with stage_timer("venture_capital", "xirr"):
+            # Investment sets first, then fund sets (the same flows regrouped)
+            fund_flows = fund_of[flows["investment_index"]]
+            pooled = fund_flows >= 0
+            set_index = np.concatenate([flows["investment_index"], len(investments) + fund_flows[pooled]])
+            rates = xirr(set_index,
+                         np.concatenate([flows["ordinals"], flows["ordinals"][pooled]]),
+                         np.concatenate([flows["amounts"], flows["amounts"][pooled]]),
+                         len(investments) + len(funds)) * 100.0
+
+        def per_fund(values):
+            return np.bincount(fund_of[fund_of >= 0], values[fund_of >= 0], minlength=len(funds))
+
+        investment_metrics = multiples(flows["paid_in"], flows["distributions"], flows["residual"])
+        fund_metrics = multiples(per_fund(flows["paid_in"]), per_fund(flows["distributions"]),
+                                 per_fund(flows["residual"]))
+        return {
+            "as_of": as_of,
+            "investments": {"investment_ids": [i for i, _ in investments],
+                            "fund_ids": [f for _, f in investments],
+                            "irr": rates[:len(investments)], **investment_metrics},
+            "funds": {"fund_ids": funds, "irr": rates[len(investments):], **fund_metrics},
+        }
+
+    def metric_records(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        InvestmentMetrics rows: one per investment and one per fund
+        (investment_id None).
+        """
+        def rounded(value):
+            return round(float(value), 2) if np.isfinite(value) else None
+
+        records = []
+        for group, investment_ids in (("investments", result["investments"]["investment_ids"]),
+                                      ("funds", [None] * len(result["funds"]["fund_ids"]))):
+            metrics = result[group]
+            records += [{
+                "fund_id": fund_id,
+                "investment_id": investment_id,
+                "irr": rounded(metrics["irr"][i]),
+                "tvpi": rounded(metrics["tvpi"][i]),
+                "dpi": rounded(metrics["dpi"][i]),
+                "rvpi": rounded(metrics["rvpi"][i]),
+            } for i, (fund_id, investment_id) in enumerate(zip(metrics["fund_ids"], investment_ids))]
+        return records
+
+    def write(self, result: Dict[str, Any]) -> int:
+        """
+        Replace InvestmentMetrics of the computed funds and investments in one transaction.
+
+        Returns:
+            int: Number of rows written.
+        """
+        fund_ids = result["funds"]["fund_ids"]
+        investment_ids = result["investments"]["investment_ids"]
+        for column, ids in ((InvestmentMetrics.fund_id, fund_ids),
+                            (InvestmentMetrics.investment_id, investment_ids)):
+            for start in range(0, len(ids), _IN_CHUNK):
+                self.session.query(InvestmentMetrics).filter(
+                    column.in_(ids[start:start + _IN_CHUNK])
+                ).delete(synchronize_session=False)
+
+        records = self.metric_records(result)
+        if records:
+            self.session.execute(InvestmentMetrics.__table__.insert(), records)
+        self.session.commit()
+        ROWS_WRITTEN.inc(len(records), asset="venture_capital", table="investment_metrics")
+        return len(records)
+
+
+def update_investment_metrics(as_of: Optional[date] = None,
+                              fund_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    """
+    Recompute and store InvestmentMetrics for venture capital funds (all by default).
+
+    Returns:
+        dict: Analytics result plus "rows_written".
+    """
+    engine = create_engine(VENTURE_CAPITAL_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        analytics = VentureCapitalAnalytics(session)
+        result = analytics.run(as_of, fund_ids)
+        with stage_timer("venture_capital", "db_write"):
+            result["rows_written"] = analytics.write(result)
+    finally:
+        session.close()
+
+    print(f"Metrics computed for {len(result['investments']['investment_ids'])} investments "
+          f"in {len(result['funds']['fund_ids'])} funds")
+    return result
@@ -70,6 +70,8 @@ class Fund(Base):
     vc_firm = relationship("VentureCapitalFirm", back_populates="funds")
     investments = relationship(
         "Investment", back_populates="fund", cascade="all, delete-orphan")
+    metrics = relationship(
+        "InvestmentMetrics", back_populates="fund", cascade="all, delete-orphan")
 
 
 # Table 3: Portfolio Companies
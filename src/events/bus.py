@@ -0,0 +1,460 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: bus.py
+
+Relative Path: src/events/bus.py
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Topic referenced by run.sh (kcat -t assets)
+ASSETS_TOPIC = "assets"
+
+# Handlers always receive a *batch* of events
+EventHandler = Callable[[List[Dict[str, Any]]], None]
+
+# A failing handler is retried this many times, waiting HANDLER_BACKOFF
+# seconds and doubling, before its batch goes to the dead-letter log
+HANDLER_RETRIES = 3
+HANDLER_BACKOFF = 0.5
+DEAD_LETTER_LOG = "data/events/dead_letter.log"
+
+
+def _json_default(value: Any) -> Any:
+    """
+    JSON fallback for the types found in generator records.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_event(event: Dict[str, Any]) -> bytes:
+    """
+    Serialize an event for the log / Kafka backends.
+    """
+    return json.dumps(event, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def decode_event(raw: bytes) -> Dict[str, Any]:
+    """
+    Deserialize an event written by encode_event.
+    """
+    return json.loads(raw)
+
+
+def make_event(event_type: str, key: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build a batched tick event.
+
+    Args:
+        event_type (str): E.g. "stock.tick", "bond.tick".
+        key (str): Partition key, usually the ticker or ISIN.
+        records (list): Rows produced by a generator.
+
+    Returns:
+        dict: The event envelope.
+    """
+    return {
+        "type": event_type,
+        "key": key,
+        "published_at": datetime.now().isoformat(),
+        "records": records,
+    }
+
+
+def dead_letter(topic: str, events: List[Dict[str, Any]], error: Exception) -> None:
+    """
+    Append undeliverable events to the dead-letter log (FUNDSIM_DEAD_LETTER_LOG)
+    so they can be inspected and replayed.
+    """
+    path = os.environ.get("FUNDSIM_DEAD_LETTER_LOG", DEAD_LETTER_LOG)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    failed_at = datetime.now().isoformat()
+    payload = b"".join(encode_event({"topic": topic, "error": str(error), "failed_at": failed_at,
+                                     "event": event}) + b"\n" for event in events)
+    with open(path, "ab") as log:
+        log.write(payload)
+    print(f"Moved {len(events)} undeliverable events on {topic} to {path}: {error}")
+
+
+def deliver(topic: str, handler: EventHandler, events: List[Dict[str, Any]]) -> bool:
+    """
+    Run a handler on a batch, retrying with exponential backoff (e.g. while
+    SQLite reports "database is locked") and dead-lettering the batch when
+    every attempt fails.
+
+    Returns:
+        bool: Whether the handler accepted the batch.
+    """
+    for attempt in range(HANDLER_RETRIES + 1):
+        try:
+            handler(events)
+            return True
+        except Exception as e:
+            error = e
+            if attempt < HANDLER_RETRIES:
+                print(f"Event handler failed for batch of {len(events)} (attempt {attempt + 1}), retrying: {e}")
+                time.sleep(HANDLER_BACKOFF * 2 ** attempt)
+    dead_letter(topic, events, error)
+    return False
+
+
+class EventBus:
+    """
+    Minimal publish/subscribe interface shared by all backends.
+    """
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def publish_batch(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            self.publish(topic, event)
+
+    def subscribe(self, topic: str, handler: EventHandler, batch_size: int = 500,
+                  name: Optional[str] = None) -> None:
+        """
+        Deliver the topic's events to handler in batches. `name` identifies
+        the subscription; backends with consumer groups give every name its
+        own group so each subscriber sees every event.
+        """
+        raise NotImplementedError
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until every published event has been handed to its subscribers.
+        """
+
+    def close(self) -> None:
+        self.flush()
+
+
+class InProcessBroker(EventBus):
+    """
+    asyncio broker running on its own event loop in a daemon thread.
+
+    publish() only schedules a queue put on the loop, so generators never
+    wait on subscribers. Each subscription drains its queue in batches and
+    runs the (blocking) handler in the default executor.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # topic -> list of (queue, handler, batch_size)
+        self._subscriptions: Dict[str, List[Tuple[asyncio.Queue, EventHandler, int]]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="fundsim-event-bus", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _consume(self, topic: str, queue: asyncio.Queue, handler: EventHandler, batch_size: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await loop.run_in_executor(None, deliver, topic, handler, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _add_subscription(self, topic: str, handler: EventHandler, batch_size: int):
+        queue = asyncio.Queue()
+        self._subscriptions.setdefault(topic, []).append(
+            (queue, handler, batch_size))
+        self._tasks.append(asyncio.get_running_loop().create_task(
+            self._consume(topic, queue, handler, batch_size)))
+
+    def subscribe(self, topic: str, handler: EventHandler, batch_size: int = 500,
+                  name: Optional[str] = None) -> None:
+        loop = self._ensure_started()
+        asyncio.run_coroutine_threadsafe(
+            self._add_subscription(topic, handler, batch_size), loop).result()
+
+    def _enqueue(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        for queue, _, _ in self._subscriptions.get(topic, []):
+            for event in events:
+                queue.put_nowait(event)
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        self.publish_batch(topic, [event])
+
+    def publish_batch(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        loop = self._ensure_started()
+        loop.call_soon_threadsafe(self._enqueue, topic, list(events))
+
+    async def _join_all(self):
+        for subscriptions in self._subscriptions.values():
+            for queue, _, _ in subscriptions:
+                await queue.join()
+
+    async def _cancel_all(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(
+            self._join_all(), self._loop).result(timeout)
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        self.flush()
+        asyncio.run_coroutine_threadsafe(self._cancel_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._tasks = []
+        self._subscriptions = {}
+
+
+class LocalLogBus(EventBus):
+    """
+    Append-only JSON-lines log per topic, used for tests and offline replay.
+
+    Subscribers are driven explicitly with poll(), so delivery is fully
+    deterministic. With poll_interval set (as the app does), a daemon
+    thread polls in the background until close().
+
+    Args:
+        directory (str): Folder holding one <topic>.log per topic.
+        poll_interval (float, optional): Seconds between background polls
+            when the log is idle; None leaves polling to the caller.
+    """
+
+    def __init__(self, directory: str = "data/events", poll_interval: Optional[float] = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        # topic -> list of [handler, batch_size, byte_offset]
+        self._subscriptions: Dict[str, List[List[Any]]] = {}
+        self.poll_interval = poll_interval
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _poll_forever(self):
+        while not self._stopping.is_set():
+            if not self.poll():
+                self._stopping.wait(self.poll_interval)
+
+    def _path(self, topic: str) -> str:
+        return os.path.join(self.directory, f"{topic}.log")
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        self.publish_batch(topic, [event])
+
+    def publish_batch(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        payload = b"".join(encode_event(event) + b"\n" for event in events)
+        with self._lock:
+            with open(self._path(topic), "ab") as log:
+                log.write(payload)
+
+    def read(self, topic: str, offset: int = 0, max_events: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read events from a byte offset.
+
+        Returns:
+            Tuple of the decoded events and the offset to resume from.
+        """
+        path = self._path(topic)
+        if not os.path.exists(path):
+            return [], offset
+
+        events = []
+        with open(path, "rb") as log:
+            log.seek(offset)
+            while max_events is None or len(events) < max_events:
+                line = log.readline()
+                if not line.endswith(b"\n"):
+                    break
+                events.append(decode_event(line))
+                offset = log.tell()
+        return events, offset
+
+    def subscribe(self, topic: str, handler: EventHandler, batch_size: int = 500,
+                  name: Optional[str] = None, from_beginning: bool = False) -> None:
+        offset = 0
+        if not from_beginning and os.path.exists(self._path(topic)):
+            offset = os.path.getsize(self._path(topic))
+        with self._poll_lock:
+            self._subscriptions.setdefault(topic, []).append(
+                [handler, batch_size, offset])
+        if self.poll_interval is not None and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._poll_forever, name="fundsim-event-log", daemon=True)
+            self._thread.start()
+
+    def poll(self) -> int:
+        """
+        Deliver at most one batch per subscription.
+
+        Returns:
+            int: Number of events delivered.
+        """
+        delivered = 0
+        with self._poll_lock:
+            for topic, subscriptions in self._subscriptions.items():
+                for subscription in subscriptions:
+                    handler, batch_size, offset = subscription
+                    events, subscription[2] = self.read(topic, offset, batch_size)
+                    if events:
+                        deliver(topic, handler, events)
+                        delivered += len(events)
+        return delivered
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        while self.poll():
+            pass
+
+    def close(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+class KafkaBus(EventBus):
+    """
+    Kafka backend (optional, requires kafka-python).
+
+    Uses the broker from docker-compose.yml by default.
+    """
+
+    def __init__(self, bootstrap_servers: Optional[str] = None, group_id: str = "fundsim"):
+        try:
+            from kafka import KafkaProducer
+        except ImportError as e:
+            raise ImportError(
+                "The Kafka event bus requires kafka-python (pip install kafka-python)") from e
+
+        self.bootstrap_servers = bootstrap_servers or os.environ.get(
+            "FUNDSIM_KAFKA_BOOTSTRAP", "localhost:9092")
+        self.group_id = group_id
+        self._producer = KafkaProducer(
+            bootstrap_servers=self.bootstrap_servers,
+            linger_ms=20,
+            value_serializer=encode_event,
+            key_serializer=lambda key: key.encode("utf-8") if key else None,
+        )
+        self._consumers = []
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        self._producer.send(topic, key=event.get("key"), value=event)
+
+    def _consume(self, topic: str, consumer, handler: EventHandler, batch_size: int):
+        while not self._stopping.is_set():
+            polled = consumer.poll(timeout_ms=500, max_records=batch_size)
+            batch = [message.value for messages in polled.values()
+                     for message in messages]
+            if batch:
+                deliver(topic, handler, batch)
+        consumer.close()
+
+    def subscribe(self, topic: str, handler: EventHandler, batch_size: int = 500,
+                  name: Optional[str] = None) -> None:
+        from kafka import KafkaConsumer
+
+        # Subscribers sharing a group would split the partitions between
+        # them, so every named subscription gets its own group
+        consumer = KafkaConsumer(
+            topic,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=f"{self.group_id}-{name}" if name else self.group_id,
+            value_deserializer=decode_event,
+        )
+        thread = threading.Thread(
+            target=self._consume, args=(topic, consumer, handler, batch_size), daemon=True)
+        thread.start()
+        self._consumers.append(consumer)
+        self._threads.append(thread)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        self._producer.flush(timeout)
+
+    def close(self) -> None:
+        self.flush()
+        self._producer.close()
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+
+
+def create_event_bus(backend: Optional[str] = None) -> Optional[EventBus]:
+    """
+    Build an event bus from a backend name.
+
+    Args:
+        backend (str, optional): "inprocess", "log", "kafka" or "none".
+            Defaults to the FUNDSIM_EVENT_BUS environment variable.
+
+    Returns:
+        EventBus or None when publishing is disabled.
+    """
+    backend = (backend or os.environ.get("FUNDSIM_EVENT_BUS", "none")).lower()
+    if backend == "none":
+        return None
+    if backend == "inprocess":
+        return InProcessBroker()
+    if backend == "log":
+        return LocalLogBus(os.environ.get("FUNDSIM_EVENT_LOG_DIR", "data/events"),
+                           poll_interval=float(os.environ.get("FUNDSIM_EVENT_LOG_POLL", "0.5")))
+    if backend == "kafka":
+        return KafkaBus()
+    raise ValueError(f"Unknown event bus backend: {backend}")
+
+
+_event_bus: Optional[EventBus] = None
+_event_bus_created = False
+
+
+def get_event_bus() -> Optional[EventBus]:
+    """
+    Process-wide event bus, created on first use.
+    """
+    global _event_bus, _event_bus_created
+    if not _event_bus_created:
+        _event_bus = create_event_bus()
+        _event_bus_created = True
+    return _event_bus
+
+
+def shutdown_event_bus() -> None:
+    """
+    Flush and close the process-wide event bus.
+    """
+    global _event_bus, _event_bus_created
+    if _event_bus is not None:
+        _event_bus.close()
+    _event_bus = None
+    _event_bus_created = False
@@ -0,0 +1,127 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: consumer.py
+
+Relative Path: src/events/consumer.py
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import Date, DateTime, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from events.bus import ASSETS_TOPIC, EventBus
+from monitoring.metrics import ROWS_WRITTEN
+
+
+class BatchedDBWriter:
+    """
+    Event handler that bulk-inserts every delivered batch in one transaction.
+
+    The bus decides how many events make up a batch, so a single commit
+    covers many generator publishes.
+
+    Args:
+        session_factory (callable): Returns a new SQLAlchemy session.
+        models (dict): Maps an event type (e.g. "stock.tick") to the ORM model
+            its records are written to. Other event types are ignored.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], models: Dict[str, Any]):
+        self.session_factory = session_factory
+        self.models = models
+        self._lock = threading.Lock()
+        self._converters = {model: self._column_converters(
+            model) for model in models.values()}
+
+    @staticmethod
+    def _column_converters(model) -> Dict[str, Callable[[Any], Any]]:
+        """
+        Events replayed from the log or Kafka carry dates as ISO strings.
+        """
+        converters = {}
+        for column in model.__table__.columns:
+            if isinstance(column.type, DateTime):
+                converters[column.name] = lambda v: datetime.fromisoformat(
+                    v) if isinstance(v, str) else v
+            elif isinstance(column.type, Date):
+                converters[column.name] = lambda v: date.fromisoformat(
+                    v[:10]) if isinstance(v, str) else v
+            else:
+                converters[column.name] = None
+        return converters
+
+    def _to_row(self, model, record: Dict[str, Any]) -> Dict[str, Any]:
+        row = {}
+        for name, convert in self._converters[model].items():
+            if name in record:
+                value = record[name]
+                row[name] = convert(value) if convert else value
+        return row
+
+    def __call__(self, events: List[Dict[str, Any]]) -> None:
+        rows_by_model: Dict[Any, List[Dict[str, Any]]] = {}
+        for event in events:
+            model = self.models.get(event.get("type"))
+            if model is None:
+                continue
+            rows_by_model.setdefault(model, []).extend(
+                self._to_row(model, record) for record in event.get("records", []))
+
+        if not rows_by_model:
+            return
+
+        with self._lock:
+            session = self.session_factory()
+            try:
+                for model, rows in rows_by_model.items():
+                    session.bulk_insert_mappings(model, rows)
+                session.commit()
+                for model, rows in rows_by_model.items():
+                    ROWS_WRITTEN.inc(len(rows), asset="event_bus",
+                                     table=model.__tablename__)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+
+def register_default_consumers(bus: EventBus, batch_size: int = 64) -> List[BatchedDBWriter]:
+    """
+    Subscribe the storage writers for generated ticks to the assets topic.
+
+    Each writer subscribes under its own name, so on Kafka both get every
+    partition of the topic instead of sharing one consumer group.
+
+    Args:
+        bus (EventBus): Bus the generators publish to.
+        batch_size (int): Maximum number of events written per transaction.
+
+    Returns:
+        list: The registered writers.
+    """
+    from assets.stocks.model import Base as StockBase, IntradayData
+    from assets.bonds.model import Base as BondBase, BondIntradayData
+
+    stock_engine = create_engine('sqlite:///data/stocks.db')
+    StockBase.metadata.create_all(stock_engine)
+    stock_writer = BatchedDBWriter(
+        sessionmaker(bind=stock_engine),
+        {"stock.tick": IntradayData}
+    )
+    bus.subscribe(ASSETS_TOPIC, stock_writer, batch_size=batch_size, name="stock-writer")
+
+    bond_engine = create_engine('sqlite:///data/bonds.db')
+    BondBase.metadata.create_all(bond_engine)
+    bond_writer = BatchedDBWriter(
+        sessionmaker(bind=bond_engine),
+        {"bond.tick": BondIntradayData}
+    )
+    bus.subscribe(ASSETS_TOPIC, bond_writer, batch_size=batch_size, name="bond-writer")
+    return [stock_writer, bond_writer]
@@ -1,14 +1,41 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from server.routers.route import router  # Import the FastAPI router
+from events.bus import get_event_bus, shutdown_event_bus
+from events.consumer import register_default_consumers
+from monitoring.metrics import instrument_sqlalchemy
+from server.middleware import metrics_middleware
+from monitoring.profiling import profiling_middleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Hook SQLAlchemy into /metrics, start the event bus consumers
+    (if FUNDSIM_EVENT_BUS is set) and drain them on shutdown.
+    """
+    instrument_sqlalchemy()
+    bus = get_event_bus()
+    if bus is not None:
+        register_default_consumers(bus)
+    yield
+    shutdown_event_bus()
+
 
 # Create the FastAPI app
 app = FastAPI(
     title="FundSim API",
     description="API Documentation for FundSim",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Latency histograms for /metrics
+app.middleware("http")(metrics_middleware)
+# Opt-in cProfile of single requests (X-Profile header, FUNDSIM_PROFILING=1)
+app.middleware("http")(profiling_middleware)
+
 # Root route for testing
 
 
@@ -0,0 +1,281 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: metrics.py
+
+Relative Path: src/monitoring/metrics.py
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Same defaults as the Prometheus client libraries (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Counter:
+    """
+    Monotonically increasing value per label set.
+    """
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Counter):
+    """
+    Cumulative bucket counts, sum and count per label set.
+    """
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # key -> [count per bucket..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, amount: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += amount
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        raise TypeError("Use observe() on a histogram")
+
+    def value(self, **labels) -> float:
+        """
+        Number of observations for a label set.
+        """
+        state = self._values.get(self._key(labels))
+        return sum(state[:-1]) if state else 0.0
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket", dict(labels, le=repr(float(bound))), cumulative
+            cumulative += state[len(self.buckets)]
+            yield f"{self.name}_bucket", dict(labels, le="+Inf"), cumulative
+            yield f"{self.name}_sum", labels, state[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+REGISTRY: List[Counter] = []
+
+
+def render_latest() -> str:
+    """
+    Render every registered metric in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value!r}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------
+# HTTP
+# -------------------
+HTTP_REQUEST_SECONDS = Histogram(
+    "fundsim_http_request_duration_seconds",
+    "HTTP request latency by route, method and status.",
+    ("route", "method", "status"))
+
+# -------------------
+# Database
+# -------------------
+DB_QUERIES = Counter(
+    "fundsim_db_queries_total",
+    "SQL statements executed by table and operation.",
+    ("table", "operation"))
+DB_QUERY_SECONDS = Histogram(
+    "fundsim_db_query_duration_seconds",
+    "SQL statement execution time by table.",
+    ("table",))
+
+# -------------------
+# Generators
+# -------------------
+ROWS_GENERATED = Counter(
+    "fundsim_rows_generated_total",
+    "Records produced by the asset generators.",
+    ("asset", "kind"))
+ROWS_WRITTEN = Counter(
+    "fundsim_rows_written_total",
+    "Generated records written to the database.",
+    ("asset", "table"))
+STAGE_SECONDS = Counter(
+    "fundsim_generation_stage_seconds_total",
+    "Wall-clock seconds spent per generation stage.",
+    ("asset", "stage"))
+
+
+class StageTimer:
+    """
+    Collects named stage durations for one generation run.
+
+    While activated, every stage_timer() block for the same asset is also
+    recorded here, so stages timed deep inside the generators show up in
+    the run's summary without threading the timer through every call.
+    """
+
+    def __init__(self, asset: str):
+        self.asset = asset
+        self.timings: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            STAGE_SECONDS.inc(elapsed, asset=self.asset, stage=stage)
+            self.add(stage, elapsed)
+
+    @contextmanager
+    def activate(self):
+        token = _ACTIVE_STAGE_TIMER.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE_STAGE_TIMER.reset(token)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Stage durations in milliseconds, in the order they first ran.
+        """
+        return {stage: round(seconds * 1000, 2) for stage, seconds in self.timings.items()}
+
+    def server_timing(self) -> str:
+        """
+        The summary as a Server-Timing header value.
+        """
+        return ", ".join(f"{stage};dur={ms}" for stage, ms in self.summary().items())
+
+    def log(self) -> None:
+        stages = ", ".join(f"{stage}={ms}ms" for stage,
+                           ms in self.summary().items())
+        print(f"Stage timings for {self.asset} generation: {stages}")
+
+
+_ACTIVE_STAGE_TIMER: ContextVar[Optional[StageTimer]] = ContextVar(
+    "fundsim_stage_timer", default=None)
+
+
+@contextmanager
+def stage_timer(asset: str, stage: str):
+    """
+    Add the time spent in the block to STAGE_SECONDS (and to the active
+    StageTimer for the same asset, if any).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.inc(elapsed, asset=asset, stage=stage)
+        timer = _ACTIVE_STAGE_TIMER.get()
+        if timer is not None and timer.asset == asset:
+            timer.add(stage, elapsed)
+
+
+# -------------------
+# SQLAlchemy hooks
+# -------------------
+_TABLE_RE = re.compile(
+    r'\b(?:FROM|INTO|UPDATE|TABLE)\s+["`\[]?(\w+)', re.IGNORECASE)
+
+
+def _statement_labels(statement: str) -> Tuple[str, str]:
+    match = _TABLE_RE.search(statement)
+    table = match.group(1) if match else "unknown"
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "unknown"
+    return table, operation
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("fundsim_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("fundsim_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    table, operation = _statement_labels(statement)
+    DB_QUERIES.inc(table=table, operation=operation)
+    DB_QUERY_SECONDS.observe(elapsed, table=table)
+
+
+def instrument_sqlalchemy() -> None:
+    """
+    Time every statement on every engine (idempotent).
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,118 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: profiling.py
+
+Relative Path: src/monitoring/profiling.py
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+
+# Request header that asks for a profile: "store" (default) or "inline"
+PROFILE_HEADER = "X-Profile"
+PROFILE_DIRECTORY = "data/profiles"
+
+_ACTIVE_PROFILER: ContextVar[Optional[cProfile.Profile]] = ContextVar(
+    "fundsim_profiler", default=None)
+
+
+def profiling_enabled() -> bool:
+    """
+    Admin switch: the X-Profile header is ignored unless FUNDSIM_PROFILING=1.
+    """
+    return os.environ.get("FUNDSIM_PROFILING", "0") == "1"
+
+
+def profiled(endpoint):
+    """
+    Decorator for sync route handlers.
+
+    FastAPI runs sync handlers in a worker thread and cProfile only sees the
+    thread it was enabled on, so the profiler created by the middleware is
+    switched on here, around the handler itself.
+    """
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profiler = _ACTIVE_PROFILER.get()
+        if profiler is None:
+            return endpoint(*args, **kwargs)
+        profiler.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.disable()
+
+    return wrapper
+
+
+def format_report(profiler: cProfile.Profile, limit: int = 40) -> str:
+    """
+    Top functions by cumulative time.
+    """
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(
+        "cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def store_report(profiler: cProfile.Profile, path: str) -> str:
+    """
+    Save the raw .prof dump (for snakeviz/pstats) and a text summary next to it.
+
+    Returns:
+        str: Path of the .prof file.
+    """
+    os.makedirs(PROFILE_DIRECTORY, exist_ok=True)
+    name = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    base = os.path.join(
+        PROFILE_DIRECTORY, f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{name}")
+    profiler.dump_stats(f"{base}.prof")
+    with open(f"{base}.txt", "w") as report:
+        report.write(format_report(profiler))
+    return f"{base}.prof"
+
+
+async def profiling_middleware(request: Request, call_next):
+    """
+    Profile a single request when it carries the X-Profile header.
+
+    "inline" replaces the response with the text report; anything else
+    stores the report under data/profiles and returns its path in the
+    X-Profile-Report header.
+    """
+    mode = request.headers.get(PROFILE_HEADER)
+    if not mode or not profiling_enabled():
+        return await call_next(request)
+
+    profiler = cProfile.Profile()
+    token = _ACTIVE_PROFILER.set(profiler)
+    try:
+        response = await call_next(request)
+    finally:
+        _ACTIVE_PROFILER.reset(token)
+
+    profiler.create_stats()
+    if not profiler.stats:
+        # The route is not decorated with @profiled
+        response.headers["X-Profile-Report"] = "unavailable"
+        return response
+
+    if mode.lower() == "inline":
+        return PlainTextResponse(format_report(profiler), status_code=response.status_code)
+
+    response.headers["X-Profile-Report"] = store_report(
+        profiler, request.url.path)
+    return response
@@ -9,55 +9,66 @@ Relative Path: src/server/controller/generate_bond.py
 """
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import HTTPException
 # Import the main bond data generation function
 from assets.bonds.main import main
+from events.bus import get_event_bus
+from monitoring.metrics import StageTimer
 
 
 def bond_data_controller(
     number_of_bonds: int = 3,
-    days: int = 365
+    days: int = 365,
+    timer: Optional[StageTimer] = None,
+    columnar: bool = False
 ) -> Dict[str, Any]:
     """
     Controller function to generate bond data for FastAPI
 
     :param number_of_bonds: Number of bonds to generate
     :param days: Number of days of historical data to generate
+    :param timer: Collects generation stage timings for the response metadata
+    :param columnar: Return historical data and coupon payments as one list per field
     :return: Dictionary with bond data
     """
+    timer = timer or StageTimer("bond")
     try:
         # Generate bond data
-        all_bond_data = main(number_of_bonds, days)
+        all_bond_data = main(number_of_bonds, days,
+                             event_bus=get_event_bus(), timer=timer,
+                             columnar=columnar)
 
         # Prepare response dictionary
         response_data = {
             "total_bonds": len(all_bond_data),
-            "bonds": {}
+            "bonds": {},
+            "metadata": {"stage_timings_ms": timer.summary()}
         }
 
         # Process each bond
         for isin, bond_info in all_bond_data.items():
             # Prepare bond details
+            historical_data = bond_info["historical_data"]
             bond_details = {
                 "basic_info": bond_info["bond_info"],
-                "historical_data": bond_info["historical_data"],
+                "historical_data": historical_data,
                 "coupon_payments": bond_info["coupon_payments"],
                 "risk_metrics": bond_info["risk_metrics"],
                 "bond_rating": bond_info["bond_rating"]
             }
 
             # Add performance summary
-            historical_data = bond_info["historical_data"]
+            closes = historical_data["close_price"] if columnar else [
+                day["close_price"] for day in historical_data]
             performance_summary = {
                 "total_return_percent": round(
-                    (historical_data[-1]["close_price"] /
-                     historical_data[0]["close_price"] - 1) * 100, 2
-                ) if len(historical_data) > 1 else 0.0,
-                "start_price": historical_data[0]["close_price"] if historical_data else None,
-                "end_price": historical_data[-1]["close_price"] if historical_data else None,
-                "highest_price": max(day["close_price"] for day in historical_data) if historical_data else None,
-                "lowest_price": min(day["close_price"] for day in historical_data) if historical_data else None
+                    (closes[-1] / closes[0] - 1) * 100, 2
+                ) if len(closes) > 1 else 0.0,
+                "start_price": closes[0] if closes else None,
+                "end_price": closes[-1] if closes else None,
+                "highest_price": max(closes) if closes else None,
+                "lowest_price": min(closes) if closes else None
             }
             bond_details["performance_summary"] = performance_summary
 
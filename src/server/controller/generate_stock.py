@@ -9,16 +9,19 @@ Relative Path: src/server/controller/generate_stock.py
 """
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import HTTPException
 # Import the main stock data generation function
 from assets.stocks.main import main
+from events.bus import get_event_bus
+from monitoring.metrics import StageTimer
 
 
 def stock_data_controller(
     number_of_stocks: int = 3,
     start_date: datetime = datetime(2020, 1, 1),
-    days: int = 365
+    days: int = 365,
+    timer: Optional[StageTimer] = None
 ) -> Dict[str, Any]:
     """
     Controller function to generate stock data for FastAPI
@@ -26,16 +29,20 @@ def stock_data_controller(
     :param number_of_stocks: Number of stocks to generate
     :param start_date: Start date for historical data
     :param days: Number of days of historical data to generate
+    :param timer: Collects generation stage timings for the response metadata
     :return: Dictionary with stock data
     """
+    timer = timer or StageTimer("stock")
     try:
         # Generate stock data
-        all_stock_data = main(number_of_stocks, start_date, days)
+        all_stock_data = main(number_of_stocks, start_date, days,
+                              event_bus=get_event_bus(), timer=timer)
 
         # Prepare response dictionary
         response_data = {
             "total_stocks": len(all_stock_data),
-            "stocks": {}
+            "stocks": {},
+            "metadata": {"stage_timings_ms": timer.summary()}
         }
 
         # Process each stock
@@ -50,16 +57,15 @@ def stock_data_controller(
             }
 
             # Add performance summary
-            historical_data = stock_info["historical_data"]
+            closes = stock_info["close_prices"]
             performance_summary = {
                 "total_return_percent": round(
-                    (historical_data[-1]["close_price"] /
-                     historical_data[0]["close_price"] - 1) * 100, 2
+                    (closes[-1] / closes[0] - 1) * 100, 2
                 ),
-                "start_price": historical_data[0]["close_price"],
-                "end_price": historical_data[-1]["close_price"],
-                "highest_price": max(day["close_price"] for day in historical_data),
-                "lowest_price": min(day["close_price"] for day in historical_data)
+                "start_price": closes[0],
+                "end_price": closes[-1],
+                "highest_price": max(closes),
+                "lowest_price": min(closes)
             }
             stock_details["performance_summary"] = performance_summary
 
@@ -0,0 +1,36 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: middleware.py
+
+Relative Path: src/server/middleware.py
+"""
+
+import time
+
+from fastapi import Request
+
+from monitoring.metrics import HTTP_REQUEST_SECONDS
+
+
+async def metrics_middleware(request: Request, call_next):
+    """
+    Record request latency per route template, method and status.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Use the route template (e.g. /candlestick/{ticker}) to bound label cardinality
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            route=getattr(route, "path", "<unmatched>"),
+            method=request.method,
+            status=str(status)
+        )
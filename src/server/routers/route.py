@@ -1,15 +1,21 @@
 from datetime import datetime
-from fastapi import APIRouter, Path, Query, HTTPException
-from typing import Any, Dict, Optional
+from fastapi import APIRouter, Path, Query, HTTPException, Request
+from fastapi.responses import Response
+from typing import Optional
 from server.controller.send_visualise import get_candlestick_chart, get_subplot_chart
 from server.controller.generate_stock import stock_data_controller
 from server.controller.generate_bond import bond_data_controller
+from server.serialization import FastJSONResponse, encode_response
+from monitoring.metrics import CONTENT_TYPE_LATEST, StageTimer, render_latest
+from monitoring.profiling import profiled
 # Create a FastAPI router
 router = APIRouter()
 
 
-@router.get('/generate_stocks', summary="Generate Stock Data", response_model=Dict[str, Any])
+@router.get('/generate_stocks', summary="Generate Stock Data", response_class=FastJSONResponse)
+@profiled
 def generate_stocks(
+    request: Request,
     number_of_stocks: int = Query(
         default=3, ge=1, le=20, description="Number of stocks to generate (1-20)"),
     start_date: Optional[str] = Query(
@@ -26,7 +32,7 @@ def generate_stocks(
         days (int): Number of days of historical data.
 
     Returns:
-        Generated stock data.
+        Generated stock data, as JSON or MessagePack (Accept: application/msgpack).
     """
     # Validate and parse start date
     try:
@@ -41,19 +47,29 @@ def generate_stocks(
         )
 
     # Call the stock data controller with parameters
-    return stock_data_controller(
+    timer = StageTimer("stock")
+    payload = stock_data_controller(
         number_of_stocks=number_of_stocks,
         start_date=parsed_start_date,
-        days=days
+        days=days,
+        timer=timer
     )
+    with timer.stage("json_encode"):
+        response = encode_response(payload, request)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
 
 
-@router.get('/generate_bonds', summary="Generate Bond Data", response_model=Dict[str, Any])
+@router.get('/generate_bonds', summary="Generate Bond Data", response_class=FastJSONResponse)
+@profiled
 def generate_bonds(
+    request: Request,
     number_of_bonds: int = Query(
         default=3, ge=1, le=20, description="Number of bonds to generate (1-20)"),
     days: int = Query(default=365, ge=1, le=1825,
-                      description="Number of days of historical data (1-1825)")
+                      description="Number of days of historical data (1-1825)"),
+    columnar: bool = Query(
+        default=False, description="Return time series as one list per field instead of rows")
 ):
     """
     Generate bond data with configurable parameters.
@@ -62,9 +78,10 @@ def generate_bonds(
         number_of_bonds (int): Number of bonds to generate.
         start_date (str): Start date for historical data.
         days (int): Number of days of historical data.
+        columnar (bool): Return historical_data and coupon_payments column-wise.
 
     Returns:
-        Generated bond data.
+        Generated bond data, as JSON or MessagePack (Accept: application/msgpack).
     """
     # Validate and parse start date
     # try:
@@ -79,11 +96,18 @@ def generate_bonds(
     # )
 
     # Call the bond data controller with parameters
-    return bond_data_controller(
+    timer = StageTimer("bond")
+    payload = bond_data_controller(
         number_of_bonds=number_of_bonds,
         # start_date=parsed_start_date,
-        days=days
+        days=days,
+        timer=timer,
+        columnar=columnar
     )
+    with timer.stage("json_encode"):
+        response = encode_response(payload, request)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
 
 
 @router.get("/candlestick/{ticker}", summary="Get Candlestick Chart")
@@ -120,3 +144,12 @@ def subplot_chart(
         HTML of the subplot chart or an error message.
     """
     return get_subplot_chart(ticker, start_date, end_date)
+
+
+@router.get("/metrics", summary="Prometheus Metrics")
+def metrics():
+    """
+    Expose request latency, database query and generator counters
+    in the Prometheus text format.
+    """
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,81 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: serialization.py
+
+Relative Path: src/server/serialization.py
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # MessagePack support is optional
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """
+    Fallback for the types orjson/msgpack do not encode natively.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # numpy arrays/scalars (msgpack)
+        return value.tolist()
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded with orjson, bypassing jsonable_encoder.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class MsgPackResponse(Response):
+    """
+    MessagePack response (requires the optional msgpack package).
+    """
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_default, use_bin_type=True)
+
+
+def wants_msgpack(request: Optional[Request]) -> bool:
+    """
+    Whether the client asked for MessagePack through the Accept header.
+    """
+    if request is None or msgpack is None:
+        return False
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def encode_response(content: Any, request: Optional[Request] = None, status_code: int = 200) -> Response:
+    """
+    Encode a controller payload, negotiating MessagePack vs JSON.
+
+    Returning a Response directly means FastAPI skips response_model
+    validation and jsonable_encoder for the endpoint.
+    """
+    if wants_msgpack(request):
+        return MsgPackResponse(content, status_code=status_code)
+    return FastJSONResponse(content, status_code=status_code)
@@ -0,0 +1,153 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: fx.py
+
+Relative Path: src/valuation/fx.py
+"""
+
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.bonds.model import Bond
+from assets.loan.model import Loan
+from assets.currency.simulation import CURRENCY_DATABASE_URL, NUMERAIRE, CrossRateCache, load_cross_rates
+from monitoring.metrics import stage_timer
+
+# Currency column per asset type; assets of other types (stocks) are
+# quoted in DEFAULT_CURRENCY
+CURRENCY_SOURCES = {
+    "Bond": (Bond, "isin", "currency"),
+    "Loan": (Loan, "loan_id", "currency"),
+}
+DEFAULT_CURRENCY = NUMERAIRE
+
+# Stay below SQLite's limit on bound parameters in IN (...) clauses
+_IN_CHUNK = 500
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def load_asset_currencies(price_sessions: Dict[str, Session],
+                          assets: Sequence[Tuple[str, str]]) -> List[str]:
+    """
+    Quote currency of each (asset_type, asset_id), one query per chunk of ids.
+    """
+    currencies = [DEFAULT_CURRENCY] * len(assets)
+    column_of = {asset: i for i, asset in enumerate(assets)}
+    for asset_type, (model, key, currency) in CURRENCY_SOURCES.items():
+        ids = [asset_id for kind, asset_id in assets if kind == asset_type]
+        session = price_sessions.get(asset_type)
+        if not ids or session is None:
+            continue
+        key_column, currency_column = getattr(model, key), getattr(model, currency)
+        for start in range(0, len(ids), _IN_CHUNK):
+            for asset_id, iso_code in session.query(key_column, currency_column) \
+                    .filter(key_column.in_(ids[start:start + _IN_CHUNK])).all():
+                currencies[column_of[(asset_type, asset_id)]] = iso_code or DEFAULT_CURRENCY
+    return currencies
+
+
+class FXConverter:
+    """
+    FX rates of one valuation run aligned on its date axis.
+
+    The (dates x currencies) matrix of numeraire rates is gathered once
+    from a CrossRateCache. A whole (assets x dates) price panel then
+    converts into any base currency with one broadcast multiply, and each
+    base currency's panel is built once and shared by every fund that
+    reports in it. Dates before the first fixing use the first fixing.
+
+    Args:
+        rates (CrossRateCache): Rates against the numeraire.
+        ordinals (array): (dates,) proleptic ordinals of the valuation axis.
+    """
+
+    def __init__(self, rates: CrossRateCache, ordinals: np.ndarray):
+        days = (np.asarray(ordinals, dtype=np.int64) - _EPOCH).astype("datetime64[D]")
+        if len(rates.dates):
+            days = np.maximum(days, rates.dates[0])
+        self.currencies = rates.currencies
+        self.index = rates.index
+        self.matrix = rates.rates[rates.rows(days)] if len(days) else \
+            np.empty((0, len(rates.currencies)))
+        self._panels: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._missing = set()
+
+    def _column(self, iso_code: str) -> np.ndarray:
+        if iso_code in self.index:
+            return self.matrix[:, self.index[iso_code]]
+        if iso_code not in self._missing:
+            print(f"No exchange rates for {iso_code}, valuing it at par with {NUMERAIRE}")
+            self._missing.add(iso_code)
+        return np.ones(len(self.matrix))
+
+    def factors(self, currencies: Sequence[str], base_currency: str) -> np.ndarray:
+        """
+        (dates, currencies) units of base_currency per unit of each currency.
+        """
+        quoted = np.column_stack([self._column(iso) for iso in currencies]) if len(currencies) else \
+            np.empty((len(self.matrix), 0))
+        return quoted / self._column(base_currency)[:, None]
+
+    def convert(self, closes: np.ndarray, asset_currencies: Sequence[str], base_currency: str) -> np.ndarray:
+        """
+        (assets, dates) closes expressed in base_currency.
+
+        Panels are cached per (closes, base_currency), so converting the
+        same panel for many funds costs one multiply per base currency.
+        """
+        cached = self._panels.get(base_currency)
+        if cached is not None and cached[0] is closes:
+            return cached[1]
+        unique, inverse = np.unique(np.asarray(asset_currencies, dtype=object).astype(str),
+                                    return_inverse=True)
+        if len(unique) == 1 and unique[0] == base_currency:
+            panel = closes
+        else:
+            panel = closes * self.factors(list(unique), base_currency).T[inverse.ravel()]
+        self._panels[base_currency] = (closes, panel)
+        return panel
+
+    def clear(self) -> None:
+        self._panels.clear()
+
+
+def currency_groups(closes: np.ndarray, asset_currencies: Sequence[str], fund_currencies: Sequence[str],
+                    converter: Optional[FXConverter]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    (fund rows, price panel in their base currency) per base currency.
+
+    Without a converter every fund is valued on the unconverted panel.
+    """
+    if converter is None:
+        yield np.arange(len(fund_currencies)), closes
+        return
+    bases = np.asarray([iso or DEFAULT_CURRENCY for iso in fund_currencies], dtype=object).astype(str)
+    for base_currency in np.unique(bases):
+        yield np.flatnonzero(bases == base_currency), converter.convert(closes, asset_currencies, base_currency)
+
+
+def load_fx_rates(database_url: str = CURRENCY_DATABASE_URL) -> Optional[CrossRateCache]:
+    """
+    Stored exchange rates as a CrossRateCache, or None when there are none.
+
+    The matrix comes from load_cross_rates, so consecutive valuation runs
+    (mutual funds, then ETFs, ...) reuse the same loaded rates.
+    """
+    session = sessionmaker(bind=create_engine(database_url))()
+    try:
+        with stage_timer("valuation", "fx_load"):
+            return load_cross_rates(session)
+    except (OperationalError, ValueError):
+        print("No exchange rates found, valuing holdings in their own currencies")
+        return None
+    finally:
+        session.close()
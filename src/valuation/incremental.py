@@ -0,0 +1,687 @@
+"""
+Created on 19/10/2026
+
+@author: Aryan
+
+Filename: incremental.py
+
+Relative Path: src/valuation/incremental.py
+"""
+
+import hashlib
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from assets.creditFund.model import Base as CreditFundBase
+from assets.creditFund.model import CreditFund, CreditFundHoldings, CreditFundPerformance
+from assets.loan.amortization import LOAN_DATABASE_URL
+from assets.mutualFund.model import MutualFundPerformance
+from assets.mutualFund.nav import (
+    BONDS_DATABASE_URL, DEFAULT_BASE_NAV, MUTUAL_FUND_DATABASE_URL, PRICE_SOURCES,
+    RETURN_HORIZONS, STOCKS_DATABASE_URL, MutualFundNAVEngine
+)
+from monitoring.metrics import ROWS_GENERATED, ROWS_WRITTEN, stage_timer
+from valuation.fx import DEFAULT_CURRENCY, FXConverter, load_asset_currencies, load_fx_rates
+
+CREDIT_FUND_DATABASE_URL = "sqlite:///data/credit_funds.db"
+
+STATE_DIRECTORY = os.path.join("data", "nav_state")
+MUTUAL_FUND_STATE_PATH = os.path.join(STATE_DIRECTORY, "mutual_funds.npz")
+CREDIT_FUND_STATE_PATH = os.path.join(STATE_DIRECTORY, "credit_funds.npz")
+
+# Lookback in calendar days per MutualFundPerformance return column
+HORIZON_DAYS = {column: int(round(365.25 * years))
+                for column, years in RETURN_HORIZONS.items()}
+# A horizon whose target day has no NAV (weekend, holiday) uses the latest
+# NAV up to this many days earlier
+HORIZON_TOLERANCE_DAYS = 7
+NAV_BUFFER_DAYS = max(HORIZON_DAYS.values()) + HORIZON_TOLERANCE_DAYS + 1
+
+# Daily returns kept for the rolling volatility (one calendar year)
+VOLATILITY_WINDOW = 365
+DAYS_PER_YEAR = 365
+
+# Holdings priced at par every day
+CASH_ASSET_TYPES = {"Cash"}
+# Holdings priced from their discounted repayments (assets.creditFund.cashflows)
+DISCOUNTED_ASSET_TYPES = {"Loan"}
+# Position holding a credit fund's unallocated weight
+CASH_POSITION = ("Cash", "")
+
+
+class IncrementalNAVState:
+    """
+    Per-fund valuation state that moves forward one day at a time.
+
+    Holdings are stored flat (fund index, asset index, units), so a day
+    costs O(funds x holdings) no matter how long the history is. Rolling
+    windows are ring buffers indexed by date ordinal: NAVs for the trailing
+    return horizons and log returns (with running sums) for the volatility.
+    Each slot remembers its ordinal, so returns older than a calendar year
+    leave the window even when no later day lands on their slot, and a
+    return across a gap (weekend, holiday) counts for the days it spans. With exchange rates, each holding's close is converted
+    into its fund's currency at the day's rate before valuation. Assets
+    whose price includes cash paid out before the state bought them (loans
+    priced with their repayments received) carry that amount as a price
+    offset, so holdings only gain the cash paid while they are held.
+
+    Args:
+        fund_ids (list): Fund identifiers, one row each.
+        assets (list): (asset_type, asset_id) pairs, one column each.
+        units (array): (funds, assets) units held per fund unit.
+        last_prices (array): (assets,) latest known closes.
+        as_of (date): Valuation date of the state.
+        digest (str): holdings_digest of the funds and holdings the state
+            was seeded from; a different digest means it must be re-seeded.
+        asset_currencies (list, optional): Quote currency per asset.
+        fund_currencies (list, optional): Reporting currency per fund.
+        price_offsets (array, optional): (assets,) amount deducted from each
+            price before valuation.
+    """
+
+    def __init__(self, fund_ids: Sequence[Any], assets: Sequence[Tuple[str, str]],
+                 units: np.ndarray, last_prices: np.ndarray, as_of: date, digest: str = "",
+                 asset_currencies: Optional[Sequence[str]] = None,
+                 fund_currencies: Optional[Sequence[str]] = None,
+                 price_offsets: Optional[np.ndarray] = None):
+        units = np.asarray(units, dtype=float)
+        self.fund_ids = list(fund_ids)
+        self.digest = digest
+        self.assets = [tuple(asset) for asset in assets]
+        self.asset_currencies = list(asset_currencies or [DEFAULT_CURRENCY] * len(self.assets))
+        self.fund_currencies = [iso or DEFAULT_CURRENCY for iso in
+                                (fund_currencies or [DEFAULT_CURRENCY] * len(self.fund_ids))]
+        self.holding_fund, self.holding_asset = np.nonzero(units > 0)
+        self.holding_units = units[self.holding_fund, self.holding_asset]
+        # Fund-currency units per unit of the holding's quote currency
+        self.holding_fx = np.ones(len(self.holding_units))
+        self.last_prices = np.asarray(last_prices, dtype=float).copy()
+        self.price_offsets = np.zeros(len(self.assets)) if price_offsets is None \
+            else np.asarray(price_offsets, dtype=float).copy()
+        self.last_ordinal = as_of.toordinal()
+
+        funds = len(self.fund_ids)
+        self.nav_buffer = np.full((funds, NAV_BUFFER_DAYS), np.nan)
+        self.nav_ordinals = np.full(NAV_BUFFER_DAYS, -1, dtype=int)
+        self.return_buffer = np.full((funds, VOLATILITY_WINDOW), np.nan)
+        self.return_ordinals = np.full(VOLATILITY_WINDOW, -1, dtype=int)
+        self.return_days = np.zeros(VOLATILITY_WINDOW, dtype=int)
+        self.return_span = np.zeros(funds)
+        self.return_sum = np.zeros(funds)
+        self.return_sum_squares = np.zeros(funds)
+        self.return_count = np.zeros(funds, dtype=int)
+        self.peak_nav = np.full(funds, np.nan)
+        self.max_drawdown = np.zeros(funds)
+        self.last_nav = self.valuation()
+
+    @property
+    def as_of(self) -> date:
+        return date.fromordinal(self.last_ordinal)
+
+    def valuation(self) -> np.ndarray:
+        """
+        NAV of every fund at the latest prices (NaN for funds holding nothing).
+        """
+        prices = self.last_prices - self.price_offsets
+        values = self.holding_units * prices[self.holding_asset] * self.holding_fx
+        nav = np.bincount(self.holding_fund, weights=values, minlength=len(self.fund_ids))
+        held = np.bincount(self.holding_fund, minlength=len(self.fund_ids)) > 0
+        return np.where(held, nav, np.nan)
+
+    def _record(self, ordinal: int, nav: np.ndarray, log_return: np.ndarray, days: int = 1) -> None:
+        """
+        Push one day's NAVs and returns (spanning `days` calendar days) into
+        the rolling windows, evicting returns older than VOLATILITY_WINDOW.
+        """
+        slot = ordinal % NAV_BUFFER_DAYS
+        self.nav_buffer[:, slot] = nav
+        self.nav_ordinals[slot] = ordinal
+
+        stale = np.flatnonzero((self.return_ordinals >= 0) &
+                               (self.return_ordinals <= ordinal - VOLATILITY_WINDOW))
+        if len(stale):
+            outgoing = self.return_buffer[:, stale]
+            leaving = np.isfinite(outgoing)
+            self.return_sum -= np.where(leaving, outgoing, 0.0).sum(axis=1)
+            self.return_sum_squares -= np.where(leaving, outgoing ** 2, 0.0).sum(axis=1)
+            self.return_count -= leaving.sum(axis=1)
+            self.return_span -= (leaving * self.return_days[stale]).sum(axis=1)
+            self.return_buffer[:, stale] = np.nan
+            self.return_ordinals[stale] = -1
+            self.return_days[stale] = 0
+
+        slot = ordinal % VOLATILITY_WINDOW
+        entering = np.isfinite(log_return)
+        self.return_sum += np.where(entering, log_return, 0.0)
+        self.return_sum_squares += np.where(entering, log_return ** 2, 0.0)
+        self.return_count += entering
+        self.return_span += np.where(entering, days, 0)
+        self.return_buffer[:, slot] = log_return
+        self.return_ordinals[slot] = ordinal
+        self.return_days[slot] = days
+
+        self.peak_nav = np.fmax(self.peak_nav, nav)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = (nav / self.peak_nav - 1.0) * 100.0
+        self.max_drawdown = np.fmin(self.max_drawdown, drawdown)
+
+    def update_fx(self, fx_rates: Any, as_of: date) -> None:
+        """
+        Convert every holding into its fund's currency at as_of's rates
+        (a CrossRateCache; the latest fixing on or before as_of).
+        """
+        converter = FXConverter(fx_rates, np.array([as_of.toordinal()]))
+        holding_base = np.asarray(self.fund_currencies, dtype=object).astype(str)[self.holding_fund]
+        for base_currency in np.unique(holding_base):
+            factors = converter.factors(self.asset_currencies, base_currency)[0]
+            rows = holding_base == base_currency
+            self.holding_fx[rows] = factors[self.holding_asset[rows]]
+
+    def nav_on_or_before(self, ordinal: int) -> np.ndarray:
+        """
+        Each fund's latest buffered NAV on or before a day, looking back at
+        most HORIZON_TOLERANCE_DAYS (NaN when there is none).
+        """
+        days = ordinal - np.arange(HORIZON_TOLERANCE_DAYS + 1)
+        slots = days % NAV_BUFFER_DAYS
+        candidates = np.where(self.nav_ordinals[slots] == days, self.nav_buffer[:, slots], np.nan)
+        latest = np.argmax(np.isfinite(candidates), axis=1)
+        return candidates[np.arange(len(candidates)), latest]
+
+    def carry_history(self, previous: "IncrementalNAVState") -> None:
+        """
+        Take over the rolling windows of funds that were already in a
+        previous state valued on the same day (after a re-seed).
+        """
+        if previous.last_ordinal != self.last_ordinal:
+            raise ValueError("Both states must be valued on the same day")
+        old_index = {fund_id: i for i, fund_id in enumerate(previous.fund_ids)}
+        rows = [(i, old_index[fund_id]) for i, fund_id in enumerate(self.fund_ids) if fund_id in old_index]
+        if not rows:
+            return
+        new, old = (np.array(column) for column in zip(*rows))
+        self.nav_ordinals = previous.nav_ordinals.copy()
+        self.return_ordinals = previous.return_ordinals.copy()
+        self.return_days = previous.return_days.copy()
+        for name in ("nav_buffer", "return_buffer", "return_span", "return_sum", "return_sum_squares",
+                     "return_count", "peak_nav", "max_drawdown"):
+            getattr(self, name)[new] = getattr(previous, name)[old]
+
+    @classmethod
+    def from_history(cls, result: Dict[str, Any]) -> "IncrementalNAVState":
+        """
+        Seed the state from a full MutualFundNAVEngine.run result.
+        """
+        dates = result["dates"]
+        if not dates:
+            raise ValueError("Cannot seed an incremental state without price history")
+        state = cls(result["fund_ids"], result["assets"], result["units"],
+                    result["last_prices"], dates[0], result.get("digest", ""),
+                    result.get("asset_currencies"), result.get("fund_currencies"))
+        nav = result["nav"]
+        ordinals = np.array([d.toordinal() for d in dates])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_returns = np.log(nav[:, 1:] / nav[:, :-1])
+        first = max(len(dates) - max(NAV_BUFFER_DAYS, VOLATILITY_WINDOW), 0)
+        for i in range(first, len(dates)):
+            state._record(int(ordinals[i]), nav[:, i],
+                          log_returns[:, i - 1] if i > 0 else np.full(len(nav), np.nan),
+                          int(ordinals[i] - ordinals[i - 1]) if i > 0 else 1)
+
+        # Drawdown over the full history, not just the buffered window
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = (nav / np.fmax.accumulate(nav, axis=1) - 1.0) * 100.0
+        state.peak_nav = np.fmax.reduce(nav, axis=1)
+        state.max_drawdown = np.fmin(np.fmin.reduce(drawdowns, axis=1), 0.0)
+        state.last_ordinal = int(ordinals[-1])
+        state.last_nav = nav[:, -1].copy()
+        return state
+
+    @classmethod
+    def from_weights(cls, fund_ids: Sequence[Any], assets: Sequence[Tuple[str, str]],
+                     weights: np.ndarray, prices: np.ndarray, as_of: date,
+                     base_nav: Any = DEFAULT_BASE_NAV, digest: str = "",
+                     asset_currencies: Optional[Sequence[str]] = None,
+                     fund_currencies: Optional[Sequence[str]] = None,
+                     fx_rates: Optional[Any] = None,
+                     price_offsets: Optional[np.ndarray] = None) -> "IncrementalNAVState":
+        """
+        Start funds on as_of, buying their weights at that day's prices.
+
+        Args:
+            weights (array): (funds, assets) weights in any unit.
+            prices (array): (assets,) closes on as_of (NaN = not priced).
+            base_nav (float or array): Starting NAV, shared or per fund.
+            fx_rates (CrossRateCache, optional): Rates to buy holdings in
+                other currencies with.
+            price_offsets (array, optional): (assets,) see the class.
+        """
+        offsets = np.zeros(len(assets)) if price_offsets is None else np.asarray(price_offsets, dtype=float)
+        value = prices - offsets
+        priced = np.isfinite(value) & (value > 0)
+        weights = np.asarray(weights, dtype=float) * priced[None, :]
+        totals = weights.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = np.where(totals > 0, weights / totals, 0.0)
+            per_unit = np.where(priced, 1.0 / value, 0.0)
+        base_nav = np.broadcast_to(np.asarray(base_nav, dtype=float), (len(fund_ids),))
+        units = base_nav[:, None] * weights * per_unit[None, :]
+        state = cls(fund_ids, assets, units, prices, as_of, digest, asset_currencies, fund_currencies,
+                    offsets)
+        if fx_rates is not None:
+            state.update_fx(fx_rates, as_of)
+            state.holding_units = state.holding_units / state.holding_fx
+            state.last_nav = state.valuation()
+        state._record(state.last_ordinal, state.last_nav, np.full(len(fund_ids), np.nan))
+        return state
+
+    def advance(self, as_of: date, prices: np.ndarray, risk_free_rate: float = 4.0,
+                fx_rates: Optional[Any] = None) -> Dict[str, np.ndarray]:
+        """
+        Value every fund on the next day from that day's price vector.
+
+        Assets without a close on as_of keep their last price.
+
+        Args:
+            as_of (date): New valuation date (after the current one).
+            prices (array): (assets,) closes on as_of, NaN where missing.
+            risk_free_rate (float): Annual rate in percent for the Sharpe ratio.
+            fx_rates (CrossRateCache, optional): Rates converting prices into
+                the funds' currencies; without them the last conversion holds.
+
+        Returns:
+            dict: (funds,) arrays "nav", "daily_return" (percent), one per
+                RETURN_HORIZONS column (percent, 3y/5y annualised),
+                "volatility" (annualised percent), "sharpe_ratio" and
+                "max_drawdown" (percent, <= 0).
+        """
+        ordinal = as_of.toordinal()
+        if ordinal <= self.last_ordinal:
+            raise ValueError(f"State is already valued up to {self.as_of}")
+
+        prices = np.asarray(prices, dtype=float)
+        self.last_prices = np.where(np.isfinite(prices), prices, self.last_prices)
+        if fx_rates is not None:
+            self.update_fx(fx_rates, as_of)
+        nav = self.valuation()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_return = np.log(nav / self.last_nav)
+        self._record(ordinal, nav, log_return, ordinal - self.last_ordinal)
+
+        values = {"nav": nav, "daily_return": np.expm1(log_return) * 100.0}
+        for column, days in HORIZON_DAYS.items():
+            reference = self.nav_on_or_before(ordinal - days)
+            years = RETURN_HORIZONS[column]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values[column] = ((nav / reference) ** (1.0 / years) - 1.0) * 100.0
+
+        # Per-observation moments, rescaled to calendar days by the span they cover
+        count = np.maximum(self.return_count, 1)
+        span = np.maximum(self.return_span, 1.0)
+        mean = self.return_sum / count
+        variance = np.maximum(self.return_sum_squares / count - mean ** 2, 0.0) * count / span
+        volatility = np.where(self.return_count > 1,
+                              np.sqrt(variance * DAYS_PER_YEAR) * 100.0, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = (self.return_sum / span * DAYS_PER_YEAR * 100.0 - risk_free_rate) / volatility
+        values.update({"volatility": volatility, "sharpe_ratio": sharpe,
+                       "max_drawdown": self.max_drawdown.copy()})
+
+        self.last_ordinal = ordinal
+        self.last_nav = nav
+        ROWS_GENERATED.inc(int(np.isfinite(nav).sum()), asset="fund", kind="eod_nav")
+        return values
+
+    def save(self, path: str) -> None:
+        """
+        Persist the state as a compressed numpy archive.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            fund_ids=np.asarray(self.fund_ids),
+            asset_types=np.array([asset_type for asset_type, _ in self.assets], dtype=str),
+            asset_ids=np.array([asset_id for _, asset_id in self.assets], dtype=str),
+            holding_fund=self.holding_fund, holding_asset=self.holding_asset,
+            holding_units=self.holding_units, holding_fx=self.holding_fx, last_prices=self.last_prices,
+            price_offsets=self.price_offsets,
+            asset_currencies=np.array(self.asset_currencies, dtype=str),
+            fund_currencies=np.array(self.fund_currencies, dtype=str),
+            last_ordinal=self.last_ordinal, last_nav=self.last_nav, digest=np.array(self.digest),
+            nav_buffer=self.nav_buffer, nav_ordinals=self.nav_ordinals,
+            return_buffer=self.return_buffer, return_ordinals=self.return_ordinals,
+            return_days=self.return_days, return_span=self.return_span, return_sum=self.return_sum,
+            return_sum_squares=self.return_sum_squares, return_count=self.return_count,
+            peak_nav=self.peak_nav, max_drawdown=self.max_drawdown
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalNAVState":
+        with np.load(path, allow_pickle=False) as archive:
+            state = cls.__new__(cls)
+            state.fund_ids = archive["fund_ids"].tolist()
+            state.assets = list(zip(archive["asset_types"].tolist(),
+                                    archive["asset_ids"].tolist()))
+            state.last_ordinal = int(archive["last_ordinal"])
+            state.digest = str(archive["digest"]) if "digest" in archive else ""
+            state.asset_currencies = archive["asset_currencies"].tolist() if "asset_currencies" in archive \
+                else [DEFAULT_CURRENCY] * len(state.assets)
+            state.fund_currencies = archive["fund_currencies"].tolist() if "fund_currencies" in archive \
+                else [DEFAULT_CURRENCY] * len(state.fund_ids)
+            for name in ("holding_fund", "holding_asset", "holding_units", "last_prices",
+                         "last_nav", "nav_buffer", "nav_ordinals", "return_buffer",
+                         "return_sum", "return_sum_squares", "return_count",
+                         "peak_nav", "max_drawdown"):
+                setattr(state, name, archive[name])
+            state.holding_fx = archive["holding_fx"] if "holding_fx" in archive \
+                else np.ones(len(state.holding_units))
+            state.price_offsets = archive["price_offsets"] if "price_offsets" in archive \
+                else np.zeros(len(state.assets))
+            if "return_ordinals" in archive:
+                for name in ("return_ordinals", "return_days", "return_span"):
+                    setattr(state, name, archive[name])
+            else:
+                # Older states: each filled slot held its latest day, one day long
+                slots = np.arange(VOLATILITY_WINDOW)
+                filled = np.isfinite(state.return_buffer).any(axis=0)
+                state.return_ordinals = np.where(
+                    filled, state.last_ordinal - (state.last_ordinal - slots) % VOLATILITY_WINDOW, -1)
+                state.return_days = filled.astype(int)
+                state.return_span = state.return_count.astype(float)
+
+        # States saved with another buffer length are re-slotted by ordinal
+        if state.nav_ordinals.shape[0] != NAV_BUFFER_DAYS:
+            kept = np.flatnonzero(state.nav_ordinals >= 0)
+            ordinals, navs = state.nav_ordinals[kept], state.nav_buffer[:, kept]
+            recent = np.argsort(ordinals)[-NAV_BUFFER_DAYS:]
+            state.nav_ordinals = np.full(NAV_BUFFER_DAYS, -1, dtype=int)
+            state.nav_buffer = np.full((len(state.fund_ids), NAV_BUFFER_DAYS), np.nan)
+            state.nav_ordinals[ordinals[recent] % NAV_BUFFER_DAYS] = ordinals[recent]
+            state.nav_buffer[:, ordinals[recent] % NAV_BUFFER_DAYS] = navs[:, recent]
+        return state
+
+
+def holdings_digest(funds: Sequence[Sequence[Any]], holdings: Sequence[Sequence[Any]]) -> str:
+    """
+    Fingerprint of fund and holding rows, used to detect when a persisted
+    state no longer matches the stored portfolios.
+    """
+    rows = (sorted(tuple(str(v) for v in row) for row in funds),
+            sorted(tuple(str(v) for v in row) for row in holdings))
+    return hashlib.sha1(repr(rows).encode("utf-8")).hexdigest()
+
+
+def _rounded(values: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else v for v in np.round(values, 2).tolist()]
+
+
+def load_price_vector(price_sessions: Dict[str, Session],
+                      assets: Sequence[Tuple[str, str]], as_of: date) -> np.ndarray:
+    """
+    Closes of the given assets on one day (NaN where there is none).
+
+    Cash holdings are priced at 1.0, and loans (with a "Loan" session) at
+    the present value of their remaining repayments plus the repayments
+    received so far, so the cash they pay out stays in the price.
+    """
+    prices = np.full(len(assets), np.nan)
+    column_of = {asset: i for i, asset in enumerate(assets)}
+    for i, (asset_type, _) in enumerate(assets):
+        if asset_type in CASH_ASSET_TYPES:
+            prices[i] = 1.0
+
+    loans = _loan_values(price_sessions, assets, as_of)
+    if loans is not None:
+        rows, values = loans
+        total = values["present_value"] + values["received"]
+        prices[rows] = np.where(total > 0, total, np.nan)
+
+    for asset_type, (model, key) in PRICE_SOURCES.items():
+        ids = [asset_id for kind, asset_id in assets if kind == asset_type]
+        session = price_sessions.get(asset_type)
+        if not ids or session is None:
+            continue
+        key_column = getattr(model, key)
+        for asset_id, close in session.query(key_column, model.close_price) \
+                .filter(model.date == as_of, key_column.in_(ids)).all():
+            if close is not None:
+                prices[column_of[(asset_type, asset_id)]] = float(close)
+    return prices
+
+
+def _loan_values(price_sessions: Dict[str, Session], assets: Sequence[Tuple[str, str]],
+                 as_of: date) -> Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """
+    Rows of the loan assets and their assets.creditFund.cashflows.loan_values
+    (None without loans or a "Loan" session).
+    """
+    rows = np.array([i for i, (kind, _) in enumerate(assets) if kind in DISCOUNTED_ASSET_TYPES], dtype=int)
+    session = price_sessions.get("Loan")
+    if not len(rows) or session is None:
+        return None
+    # Imported here: assets.creditFund.cashflows builds on this module
+    from assets.creditFund.cashflows import loan_values
+    return rows, loan_values(session, [assets[i][1] for i in rows], as_of)
+
+
+def mutual_fund_performance_records(state: IncrementalNAVState, as_of: date,
+                                    values: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    MutualFundPerformance rows for one day.
+    """
+    columns = {"nav": _rounded(values["nav"])}
+    columns.update({column: _rounded(values[column]) for column in RETURN_HORIZONS})
+    return [{
+        "fund_id": fund_id,
+        "date": as_of,
+        **{column: columns[column][i] for column in columns}
+    } for i, fund_id in enumerate(state.fund_ids) if columns["nav"][i] is not None]
+
+
+def credit_fund_performance_records(state: IncrementalNAVState, as_of: date,
+                                    values: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    CreditFundPerformance rows for one day (return_percentage is the daily return).
+    """
+    nav, daily_return = _rounded(values["nav"]), _rounded(values["daily_return"])
+    volatility, sharpe = _rounded(values["volatility"]), _rounded(values["sharpe_ratio"])
+    drawdown = _rounded(values["max_drawdown"])
+    return [{
+        "fund_id": fund_id,
+        "date": as_of,
+        "nav": nav[i],
+        "return_percentage": daily_return[i],
+        "volatility": volatility[i],
+        "sharpe_ratio": sharpe[i],
+        "drawdown": drawdown[i]
+    } for i, fund_id in enumerate(state.fund_ids) if nav[i] is not None]
+
+
+def _price_sessions() -> Dict[str, Session]:
+    return {
+        "Stock": sessionmaker(bind=create_engine(STOCKS_DATABASE_URL))(),
+        "Bond": sessionmaker(bind=create_engine(BONDS_DATABASE_URL))(),
+        "Loan": sessionmaker(bind=create_engine(LOAN_DATABASE_URL))(),
+    }
+
+
+def update_mutual_funds_eod(as_of: date, state_path: str = MUTUAL_FUND_STATE_PATH) -> Dict[str, Any]:
+    """
+    Append one day of MutualFundPerformance from the persisted state.
+
+    Without a saved state, or when funds or holdings changed since it was
+    seeded, the full history is computed and stored by MutualFundNAVEngine
+    and the state is (re-)seeded from it.
+
+    Returns:
+        dict: "as_of", "funds" and "rows_written".
+    """
+    fund_session = sessionmaker(bind=create_engine(MUTUAL_FUND_DATABASE_URL))()
+    price_sessions = _price_sessions()
+    records = []
+    try:
+        fx_rates = load_fx_rates()
+        engine = MutualFundNAVEngine(fund_session, price_sessions, fx_rates=fx_rates)
+        digest = holdings_digest(*engine.load_funds())
+        state = IncrementalNAVState.load(state_path) if os.path.exists(state_path) else None
+        if state is None or state.digest != digest:
+            print("No NAV state found, computing the full history once" if state is None else
+                  "Funds or holdings changed, recomputing the full history")
+            result = engine.run()
+            with stage_timer("mutual_fund", "db_write"):
+                engine.write_performance(result)
+            result["digest"] = digest
+            state = IncrementalNAVState.from_history(result)
+
+        if state.last_ordinal >= as_of.toordinal():
+            # The recomputed history already covers as_of
+            state.save(state_path)
+            print(f"Mutual fund NAV history already covers {as_of}")
+            return {"as_of": as_of, "funds": len(state.fund_ids), "rows_written": 0}
+
+        with stage_timer("mutual_fund", "eod_nav"):
+            prices = load_price_vector(price_sessions, state.assets, as_of)
+            values = state.advance(as_of, prices, fx_rates=fx_rates)
+            records = mutual_fund_performance_records(state, as_of, values)
+
+        with stage_timer("mutual_fund", "db_write"):
+            if records:
+                fund_session.execute(MutualFundPerformance.__table__.insert(), records)
+            fund_session.commit()
+            ROWS_WRITTEN.inc(len(records), asset="mutual_fund", table="mutual_fund_performance")
+            state.save(state_path)
+    finally:
+        fund_session.close()
+        for session in price_sessions.values():
+            session.close()
+
+    print(f"EOD NAV for {len(records)} mutual funds on {as_of}")
+    return {"as_of": as_of, "funds": len(state.fund_ids), "rows_written": len(records)}
+
+
+def _load_credit_funds(session: Session) -> Tuple[List[Any], List[Any], str]:
+    """
+    Credit funds (id, net_asset_value), their holdings and their holdings_digest.
+    """
+    funds = session.query(CreditFund.fund_id, CreditFund.net_asset_value) \
+        .order_by(CreditFund.fund_id).all()
+    holdings = session.query(CreditFundHoldings.fund_id, CreditFundHoldings.asset_type,
+                             CreditFundHoldings.asset_id, CreditFundHoldings.weight).all()
+    return funds, holdings, holdings_digest([(fund_id,) for fund_id, _ in funds], holdings)
+
+
+def _seed_credit_funds(session: Session, price_sessions: Dict[str, Session], as_of: date,
+                       previous: Optional[IncrementalNAVState] = None,
+                       fx_rates: Optional[Any] = None) -> IncrementalNAVState:
+    """
+    Start every credit fund on as_of from its holdings' weights. Credit
+    funds report in DEFAULT_CURRENCY; with fx_rates, holdings quoted in
+    other currencies are converted into it.
+
+    Holdings are valued as CreditFundCashFlowEngine values them: loans at
+    their discounted repayments (keeping the repayments received from
+    as_of on), stocks and bonds at their closes, cash and other holdings
+    at cost. Weight left unallocated, or on holdings without a value on
+    as_of, is held as cash.
+
+    When re-seeding, funds already in the previous state (valued on as_of)
+    start from its NAV and keep its rolling windows.
+    """
+    funds, holdings, digest = _load_credit_funds(session)
+    fund_ids = [fund_id for fund_id, _ in funds]
+    fund_index = {fund_id: i for i, fund_id in enumerate(fund_ids)}
+    assets = sorted({(h.asset_type, h.asset_id) for h in holdings} | {CASH_POSITION})
+    asset_index = {asset: i for i, asset in enumerate(assets)}
+    weights = np.zeros((len(fund_ids), len(assets)))
+    for h in holdings:
+        if h.fund_id in fund_index:
+            weights[fund_index[h.fund_id], asset_index[(h.asset_type, h.asset_id)]] += \
+                float(h.weight or 0.0)
+
+    base_nav = [float(nav) if nav else DEFAULT_BASE_NAV for _, nav in funds]
+    if previous is not None:
+        last_nav = {fund_id: nav for fund_id, nav in zip(previous.fund_ids, previous.last_nav.tolist())
+                    if nav == nav}
+        base_nav = [last_nav.get(fund_id, nav) for fund_id, nav in zip(fund_ids, base_nav)]
+    prices = load_price_vector(price_sessions, assets, as_of)
+    at_cost = np.array([kind not in PRICE_SOURCES and kind not in DISCOUNTED_ASSET_TYPES
+                        for kind, _ in assets])
+    prices[at_cost] = 1.0
+    offsets = np.zeros(len(assets))
+    loans = _loan_values(price_sessions, assets, as_of)
+    if loans is not None:
+        offsets[loans[0]] = loans[1]["received"]
+
+    value = prices - offsets
+    unpriced = ~(np.isfinite(value) & (value > 0))
+    cash = asset_index[CASH_POSITION]
+    weights[:, cash] += np.maximum(100.0 - weights.sum(axis=1), 0.0) + weights[:, unpriced].sum(axis=1)
+    weights[:, unpriced] = 0.0
+    asset_currencies = load_asset_currencies(price_sessions, assets) if fx_rates is not None else None
+    state = IncrementalNAVState.from_weights(fund_ids, assets, weights, prices, as_of, base_nav, digest,
+                                             asset_currencies, fx_rates=fx_rates, price_offsets=offsets)
+    if previous is not None:
+        state.carry_history(previous)
+    return state
+
+
+def update_credit_funds_eod(as_of: date, state_path: str = CREDIT_FUND_STATE_PATH) -> Dict[str, Any]:
+    """
+    Append one day of CreditFundPerformance from the persisted state.
+
+    The first run only seeds the state: funds buy their holdings' weights at
+    as_of's prices, keeping CreditFund.net_asset_value as the starting NAV.
+    Later runs also roll CreditFund.net_asset_value forward. When funds or
+    holdings changed since the last run, the state is re-seeded on its
+    last day (existing funds keep their NAV) before moving to as_of.
+
+    Returns:
+        dict: "as_of", "funds" and "rows_written".
+    """
+    engine = create_engine(CREDIT_FUND_DATABASE_URL)
+    CreditFundBase.metadata.create_all(engine)
+    fund_session = sessionmaker(bind=engine)()
+    price_sessions = _price_sessions()
+    records = []
+    try:
+        fx_rates = load_fx_rates()
+        if not os.path.exists(state_path):
+            state = _seed_credit_funds(fund_session, price_sessions, as_of, fx_rates=fx_rates)
+            state.save(state_path)
+            print(f"Seeded NAV state for {len(state.fund_ids)} credit funds on {as_of}")
+            return {"as_of": as_of, "funds": len(state.fund_ids), "rows_written": 0}
+
+        state = IncrementalNAVState.load(state_path)
+        if state.digest != _load_credit_funds(fund_session)[2]:
+            print("Credit funds or holdings changed, re-seeding the NAV state")
+            state = _seed_credit_funds(fund_session, price_sessions, state.as_of, state, fx_rates)
+        with stage_timer("credit_fund", "eod_nav"):
+            prices = load_price_vector(price_sessions, state.assets, as_of)
+            values = state.advance(as_of, prices, fx_rates=fx_rates)
+            records = credit_fund_performance_records(state, as_of, values)
+
+        with stage_timer("credit_fund", "db_write"):
+            if records:
+                fund_session.execute(CreditFundPerformance.__table__.insert(), records)
+                fund_session.execute(
+                    CreditFund.__table__.update()
+                    .where(CreditFund.__table__.c.fund_id == bindparam("id"))
+                    .values(net_asset_value=bindparam("nav"), historical_data_end_date=as_of),
+                    [{"id": r["fund_id"], "nav": r["nav"]} for r in records]
+                )
+            fund_session.commit()
+            ROWS_WRITTEN.inc(len(records), asset="credit_fund", table="credit_fund_performance")
+            state.save(state_path)
+    finally:
+        fund_session.close()
+        for session in price_sessions.values():
+            session.close()
+
+    print(f"EOD NAV for {len(records)} credit funds on {as_of}")
+    return {"as_of": as_of, "funds": len(state.fund_ids), "rows_written": len(records)}